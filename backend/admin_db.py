@@ -7,6 +7,10 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import uuid
 import hashlib
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
 
 
 class AdminDatabase:
@@ -23,7 +27,7 @@ class AdminDatabase:
             # In production, this should use the DATABASE_URL
             raise ValueError("DATABASE_URL not configured")
         
-        self.pool = await asyncpg.create_pool(self.database_url)
+        self.pool = await get_pool('admin_db', self.database_url)
         await self.create_tables()
     
     async def create_tables(self):
@@ -19,6 +19,22 @@ try:
     from auth_routes import get_current_user
 except ImportError:
     from backend.auth_routes import get_current_user
+try:
+    from db_pool import get_pool
+    from schema_capabilities import get_schema_capabilities, refresh_schema_capabilities
+except ImportError:
+    from backend.db_pool import get_pool
+    from backend.schema_capabilities import get_schema_capabilities, refresh_schema_capabilities
+try:
+    from book_metadata_cache import invalidate_book_metadata
+    from corpus_stats import get_corpus_stats
+    from pagination import Keyset, SortKey, count_total, page_count, resolve_total_mode
+    from metadata_import import MetadataImportEngine, BOOK_COLUMN_TYPES
+except ImportError:
+    from backend.book_metadata_cache import invalidate_book_metadata
+    from backend.corpus_stats import get_corpus_stats
+    from backend.pagination import Keyset, SortKey, count_total, page_count, resolve_total_mode
+    from backend.metadata_import import MetadataImportEngine, BOOK_COLUMN_TYPES
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +72,8 @@ class BulkRemovalSummary(BaseModel):
 _reindex_in_progress = False
 _last_reindex_completed_at: Optional[str] = None
 _last_reindex_duration: Optional[float] = None
+_last_reindex_plan: Optional[Dict[str, Any]] = None
+_last_reindex_error: Optional[str] = None
 
 # Global reference to vector store (will be set by main.py)
 _vector_store = None
@@ -72,16 +90,23 @@ def set_global_cache_invalidator(invalidator_func):
 # Cache invalidation tracking
 _cache_invalidation_timestamp = 0
 
-def invalidate_cache():
-    """Mark cache as invalid by updating timestamp"""
+def invalidate_cache(filenames: Optional[List[str]] = None):
+    """
+    Mark cache as invalid by updating timestamp. With `filenames`, only those
+    documents are re-read by the metadata and global documents caches.
+    """
     global _cache_invalidation_timestamp, _global_cache_invalidator
     _cache_invalidation_timestamp = time.time()
     logger.info(f"📤 Cache invalidated at {_cache_invalidation_timestamp}")
+    targets = filenames if filenames is not None else [None]
+    for filename in targets:
+        invalidate_book_metadata(filename)
     
     # Also invalidate global cache if available
     if _global_cache_invalidator:
         try:
-            _global_cache_invalidator()
+            for filename in targets:
+                _global_cache_invalidator(filename)
         except Exception as e:
             logger.warning(f"Failed to invalidate global cache: {e}")
 
@@ -107,14 +132,35 @@ def set_vector_store(vector_store):
     logger.info("✅ Admin documents router initialized with vector store")
 
 async def get_db_connection():
-    """Get a database connection from the existing pool"""
+    """Get the admin view of the shared application pool"""
     if not _vector_store:
         raise HTTPException(status_code=500, detail="Database not initialized")
 
     if not _vector_store.pool:
         await _vector_store.init_database()
 
-    return _vector_store.pool
+    return await get_pool("admin_documents")
+
+def _document_list_keyset(sort_by: str, sort_direction: str, paged: bool = False) -> Keyset:
+    """
+    Keyset order of list_documents (book id breaks ties). paged=True gives the same
+    order over the page's selected columns (sort_key) instead of the books table.
+    """
+    descending = sort_direction == 'desc'
+    if sort_by == 'id':
+        sort = SortKey("id", "b.id", "integer", descending=descending)
+        return Keyset(sort)
+    expression = {
+        'title': "b.title",
+        'author_name': "COALESCE(pa.name, b.author)",
+        'document_type': "b.document_type",
+    }[sort_by]
+    if paged:
+        sort = SortKey("sort_key", "b.sort_key", "text", descending=descending)
+    else:
+        sort = SortKey("sort_key", expression, "text", descending=descending, nulls_as="''")
+    return Keyset(sort, SortKey("id", "b.id", "integer", descending=descending))
+
 
 @router.get("/documents")
 async def list_documents(
@@ -124,9 +170,23 @@ async def list_documents(
     category: str = Query(""),
     sort_by: str = Query("title"),
     sort_direction: str = Query("asc"),
-    refresh: bool = Query(False, description="Force refresh cache and bypass any caching mechanisms")
+    refresh: bool = Query(False, description="Force refresh cache and bypass any caching mechanisms"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over page)"),
+    total: Optional[str] = Query(None, description="exact, estimate or none (default: exact for pages, none with a cursor)")
 ):
     """List all documents from books table with proper IDs and metadata"""
+    # Add sorting
+    valid_sort_fields = ['id', 'title', 'author_name', 'document_type']
+    if sort_by not in valid_sort_fields:
+        sort_by = 'title'
+    keyset = _document_list_keyset(sort_by, sort_direction)
+
+    try:
+        after = keyset.decode(cursor)
+        total_mode = resolve_total_mode(total, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # Check if we should refresh cache
         force_refresh = should_refresh_cache(refresh)
@@ -134,16 +194,11 @@ async def list_documents(
             logger.info("🔄 Cache refresh requested - bypassing any caching mechanisms")
         
         pool = await get_db_connection()
+        schema = await get_schema_capabilities()
 
         async with pool.acquire() as conn:
             # First check if books table exists
-            table_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    AND table_name = 'books'
-                )
-            """)
+            table_exists = schema.has_table('books')
 
             if not table_exists:
                 logger.info("Books table doesn't exist, creating it now...")
@@ -233,222 +288,140 @@ async def list_documents(
                 if updated_count:
                     logger.info(f"Updated {len(updated_count) if isinstance(updated_count, list) else 'some'} books with real author data")
 
+                await refresh_schema_capabilities(conn)
+
             # FIXED: Use proper multi-author query structure like chat system
             # Check if multi-author tables exist and have correct structure
-            authors_table_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    AND table_name = 'authors'
-                )
-            """)
-            
-            document_authors_table_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    AND table_name = 'document_authors'
-                )
-            """)
+            authors_table_exists = schema.has_table('authors')
+            document_authors_table_exists = schema.has_table('document_authors')
 
             # Check if document_authors has the correct column structure
-            has_correct_structure = False
-            if document_authors_table_exists:
-                try:
-                    # Test if the expected columns exist
-                    await conn.fetchval("""
-                        SELECT book_id, author_id, author_order 
-                        FROM document_authors 
-                        LIMIT 1
-                    """)
-                    has_correct_structure = True
-                    logger.info("✅ Multi-author tables have correct structure")
-                except Exception as e:
-                    logger.info(f"❌ Multi-author tables exist but have wrong structure: {e}")
-                    has_correct_structure = False
-
-            # Use multi-author query if tables exist and have correct structure
-            if authors_table_exists and document_authors_table_exists and has_correct_structure:
-                # Multi-author query with correct column names (book_id, not document_id)
+            has_correct_structure = schema.has_columns('document_authors', 'book_id', 'author_id', 'author_order')
+            if document_authors_table_exists and not has_correct_structure:
+                logger.info("❌ Multi-author tables exist but have wrong structure")
+
+            # One row per book (authors aggregated), so pages never split a book's authors
+            use_multi_author = authors_table_exists and document_authors_table_exists and has_correct_structure
+            if use_multi_author:
                 logger.info("Using multi-author query with correct column structure")
-                query = """
-                    SELECT DISTINCT b.id, b.filename, b.title, b.category, 
-                           COALESCE(b.document_type, 'book') as document_type, 
-                           b.mc_press_url, 
-                           COALESCE(b.article_url, '') as article_url,
-                           b.created_at,
-                           COALESCE(a.name, b.author, 'Unknown Author') as author_name,
-                           a.site_url as author_site_url,
-                           da.author_order,
-                           (SELECT COUNT(*) FROM documents d WHERE d.filename = b.filename) AS chunk_count
+                # The primary (first) author, for sorting and as the fallback for author search
+                from_clause = """
                     FROM books b
-                    LEFT JOIN document_authors da ON b.id = da.book_id
-                    LEFT JOIN authors a ON da.author_id = a.id
-                    WHERE 1=1
-                """
-                
-                count_query = """
-                    SELECT COUNT(DISTINCT b.id) FROM books b
-                    LEFT JOIN document_authors da ON b.id = da.book_id
-                    LEFT JOIN authors a ON da.author_id = a.id
-                    WHERE 1=1
+                    LEFT JOIN LATERAL (
+                        SELECT a.name FROM document_authors da
+                        JOIN authors a ON da.author_id = a.id
+                        WHERE da.book_id = b.id
+                        ORDER BY da.author_order
+                        LIMIT 1
+                    ) pa ON true
                 """
-                
-                sort_field_map = {
-                    'id': 'b.id',
-                    'title': 'b.title', 
-                    'author': 'COALESCE(a.name, b.author)',
-                    'author_name': 'COALESCE(a.name, b.author)',
-                    'document_type': 'b.document_type'
-                }
-                
-                use_multi_author = True
             else:
-                # Simple query without JOINs (current state)
                 logger.info("Using simple query without multi-author JOINs")
-                query = """
-                    SELECT b.id, b.filename, b.title, b.category, 
-                           COALESCE(b.document_type, 'book') as document_type, 
-                           b.mc_press_url, 
-                           COALESCE(b.article_url, '') as article_url,
-                           b.created_at,
-                           COALESCE(b.author, 'Unknown Author') as author_name,
-                           (SELECT COUNT(*) FROM documents d WHERE d.filename = b.filename) AS chunk_count
-                    FROM books b
-                    WHERE 1=1
-                """
-                
-                count_query = """
-                    SELECT COUNT(*) FROM books b
-                    WHERE 1=1
-                """
-                
-                sort_field_map = {
-                    'id': 'b.id',
-                    'title': 'b.title', 
-                    'author': 'b.author',
-                    'author_name': 'b.author',
-                    'document_type': 'b.document_type'
-                }
-                
-                use_multi_author = False
+                from_clause = "FROM books b LEFT JOIN LATERAL (SELECT NULL::text AS name) pa ON true"
 
+            conditions = []
             params = []
-            param_count = 0
 
             # Add search filter
             if search:
-                param_count += 1
-                if use_multi_author:
-                    query += f" AND (LOWER(b.title) LIKE LOWER(${param_count}) OR LOWER(COALESCE(a.name, b.author)) LIKE LOWER(${param_count}))"
-                    count_query += f" AND (LOWER(b.title) LIKE LOWER('%{search}%') OR LOWER(COALESCE(a.name, b.author)) LIKE LOWER('%{search}%'))"
-                else:
-                    query += f" AND (LOWER(b.title) LIKE LOWER(${param_count}) OR LOWER(b.author) LIKE LOWER(${param_count}))"
-                    count_query += f" AND (LOWER(b.title) LIKE LOWER('%{search}%') OR LOWER(b.author) LIKE LOWER('%{search}%'))"
                 params.append(f"%{search}%")
+                author_match = f"LOWER(b.author) LIKE LOWER(${len(params)})"
+                if use_multi_author:
+                    author_match = f"""(
+                        EXISTS (
+                            SELECT 1 FROM document_authors da
+                            JOIN authors a ON da.author_id = a.id
+                            WHERE da.book_id = b.id AND LOWER(a.name) LIKE LOWER(${len(params)})
+                        )
+                        OR (pa.name IS NULL AND {author_match})
+                    )"""
+                conditions.append(f"(LOWER(b.title) LIKE LOWER(${len(params)}) OR {author_match})")
 
             # Add category filter
             if category:
-                param_count += 1
-                query += f" AND b.category = ${param_count}"
-                count_query += f" AND b.category = '{category}'"
                 params.append(category)
+                conditions.append(f"b.category = ${len(params)}")
 
-            # Add sorting
-            valid_sort_fields = ['id', 'title', 'author_name', 'document_type']
-            if sort_by not in valid_sort_fields:
-                sort_by = 'title'
-            
-            db_sort_field = sort_field_map.get(sort_by, 'b.title')
-            sort_dir = 'DESC' if sort_direction == 'desc' else 'ASC'
-            
-            if use_multi_author:
-                query += f" ORDER BY {db_sort_field} {sort_dir}, da.author_order ASC"
-            else:
-                query += f" ORDER BY {db_sort_field} {sort_dir}"
+            where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
 
-            # Get total count before pagination
-            total = await conn.fetchval(count_query)
+            # Get total count before pagination (exact, estimated or skipped)
+            total = await count_total(conn, total_mode, f"SELECT 1 {from_clause} {where_clause}", *params)
 
-            # Add pagination
-            param_count += 1
-            query += f" LIMIT ${param_count}"
-            params.append(per_page)
+            # A cursor replaces the OFFSET; page still works without one
+            keyset_condition, keyset_params = keyset.after(after, len(params) + 1)
+            limit_param = len(params) + len(keyset_params) + 1
+            offset = 0 if after else (page - 1) * per_page
 
-            param_count += 1
-            query += f" OFFSET ${param_count}"
-            params.append((page - 1) * per_page)
+            if use_multi_author:
+                authors_sql = """
+                    (SELECT json_agg(json_build_object(
+                                'name', a.name, 'site_url', a.site_url, 'order', COALESCE(da.author_order, 0)
+                            ) ORDER BY da.author_order)
+                     FROM document_authors da
+                     JOIN authors a ON da.author_id = a.id
+                     WHERE da.book_id = b.id)
+                """
+            else:
+                authors_sql = "NULL::json"
+
+            # Page first, then chunk counts and author lists for those rows only
+            # (one row past the page tells whether there is a next one)
+            query = f"""
+                WITH page AS (
+                    SELECT b.id, b.filename, b.title, b.category,
+                           COALESCE(b.document_type, 'book') as document_type,
+                           b.mc_press_url,
+                           COALESCE(b.article_url, '') as article_url,
+                           b.created_at,
+                           COALESCE(b.author, 'Unknown Author') as author_name,
+                           {keyset.keys[0].sql()} as sort_key
+                    {from_clause}
+                    {where_clause or 'WHERE TRUE'} AND {keyset_condition}
+                    ORDER BY {keyset.order_by()}
+                    LIMIT ${limit_param} OFFSET ${limit_param + 1}
+                )
+                SELECT b.*,
+                       {authors_sql} as authors_json,
+                       (SELECT COUNT(*) FROM documents d WHERE d.filename = b.filename) AS chunk_count
+                FROM page b
+                ORDER BY {_document_list_keyset(sort_by, sort_direction, paged=True).order_by()}
+            """
 
             # Execute query
-            rows = await conn.fetch(query, *params)
+            rows = await conn.fetch(query, *params, *keyset_params, per_page + 1, offset)
+            next_cursor = keyset.cursor_for(rows[per_page - 1]) if len(rows) > per_page else None
+            rows = rows[:per_page]
 
             # Process results
-            if use_multi_author:
-                # Group authors by document since we have one row per document-author pair
-                documents_dict = {}
-                for row in rows:
-                    doc_id = row['id']
-                    if doc_id not in documents_dict:
-                        documents_dict[doc_id] = {
-                            'id': doc_id,
-                            'filename': row['filename'],
-                            'title': row['title'] or row['filename'].replace('.pdf', ''),
-                            'category': row['category'],
-                            'document_type': row['document_type'] or 'book',
-                            'mc_press_url': row['mc_press_url'],
-                            'article_url': row['article_url'],
-                            'created_at': row['created_at'].isoformat() if row.get('created_at') else None,
-                            'chunk_count': row['chunk_count'] or 0,
-                            'authors': []
-                        }
-                    
-                    # Add author info if available
-                    if row['author_name']:
-                        author_info = {
-                            'name': row['author_name'],
-                            'site_url': row.get('author_site_url'),
-                            'order': row.get('author_order', 0) or 0
-                        }
-                        documents_dict[doc_id]['authors'].append(author_info)
-                
-                # Convert to list and sort authors by order
-                documents = []
-                for doc in documents_dict.values():
-                    # Sort authors by order
-                    doc['authors'].sort(key=lambda x: x['order'])
-                    
-                    # Set primary author for backward compatibility
-                    if doc['authors']:
-                        doc['author'] = doc['authors'][0]['name']
-                    else:
-                        doc['author'] = 'Unknown Author'
-                    
-                    documents.append(doc)
-            else:
-                # Simple processing without multi-author support
-                documents = []
-                for row in rows:
-                    doc = {
-                        'id': row['id'],
-                        'filename': row['filename'],
-                        'title': row['title'] or row['filename'].replace('.pdf', ''),
-                        'category': row['category'],
-                        'document_type': row['document_type'] or 'book',
-                        'mc_press_url': row['mc_press_url'],
-                        'article_url': row['article_url'],
-                        'created_at': row['created_at'].isoformat() if row.get('created_at') else None,
-                        'chunk_count': row['chunk_count'] or 0,
-                        'author': row['author_name'],
-                        'authors': [{'name': row['author_name'], 'site_url': None, 'order': 0}] if row['author_name'] else []
-                    }
-                    documents.append(doc)
+            documents = []
+            for row in rows:
+                authors_json = row['authors_json']
+                authors = json.loads(authors_json) if isinstance(authors_json, str) else (authors_json or [])
+                if not authors and row['author_name']:
+                    authors = [{'name': row['author_name'], 'site_url': None, 'order': 0}]
+
+                documents.append({
+                    'id': row['id'],
+                    'filename': row['filename'],
+                    'title': row['title'] or row['filename'].replace('.pdf', ''),
+                    'category': row['category'],
+                    'document_type': row['document_type'] or 'book',
+                    'mc_press_url': row['mc_press_url'],
+                    'article_url': row['article_url'],
+                    'created_at': row['created_at'].isoformat() if row.get('created_at') else None,
+                    'chunk_count': row['chunk_count'] or 0,
+                    # Primary author for backward compatibility
+                    'author': authors[0]['name'] if authors else 'Unknown Author',
+                    'authors': authors
+                })
 
             return {
                 "documents": documents,
-                "total": total or 0,
+                "total": total,
                 "page": page,
                 "per_page": per_page,
-                "total_pages": ((total or 0) + per_page - 1) // per_page
+                "total_pages": page_count(total, per_page),
+                "next_cursor": next_cursor
             }
 
     except Exception as e:
@@ -528,7 +501,7 @@ async def update_document(doc_id: int, updates: Dict[str, Any]):
                     """, doc_id, field, str(new_value))
 
             # Invalidate cache after successful update
-            invalidate_cache()
+            invalidate_cache([row['filename']])
             logger.info(f"📝 Document {doc_id} updated, cache invalidated")
 
             return {
@@ -587,7 +560,7 @@ async def bulk_update_documents(ids: List[int], updates: Dict[str, Any]):
                 UPDATE books
                 SET {', '.join(set_clauses)}
                 WHERE id = ANY(${param_count})
-                RETURNING id
+                RETURNING id, filename
             """
             params.append(ids)
 
@@ -604,7 +577,7 @@ async def bulk_update_documents(ids: List[int], updates: Dict[str, Any]):
                         """, doc_id, field, str(value))
 
             # Invalidate cache after successful bulk update
-            invalidate_cache()
+            invalidate_cache([row['filename'] for row in result])
             logger.info(f"📝 Bulk update of {updated_count} documents completed, cache invalidated")
 
             return {
@@ -618,33 +591,54 @@ async def bulk_update_documents(ids: List[int], updates: Dict[str, Any]):
         logger.error(f"Error in bulk update: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def _do_reindex():
-    """Background task to reindex the vector index."""
+async def _do_reindex(index_type: Optional[str] = None, concurrently: bool = True):
+    """Background task to rebuild the vector index."""
     global _reindex_in_progress, _last_reindex_completed_at, _last_reindex_duration
+    global _last_reindex_plan, _last_reindex_error
     start = time.time()
     try:
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            await conn.execute("REINDEX INDEX documents_embedding_idx")
+            if getattr(_vector_store, 'has_pgvector', False):
+                # Fresh HNSW/IVFFlat index sized for the current corpus, swapped in when built
+                plan = await _vector_store.index_manager.rebuild(
+                    conn, index_type=index_type, concurrently=concurrently
+                )
+                _last_reindex_plan = plan.to_dict()
+            else:
+                await conn.execute("REINDEX INDEX documents_embedding_idx")
+                _last_reindex_plan = None
         elapsed = time.time() - start
         _last_reindex_completed_at = datetime.utcnow().isoformat()
         _last_reindex_duration = round(elapsed, 2)
+        _last_reindex_error = None
         logger.info(f"✅ Vector index rebuild completed in {_last_reindex_duration}s")
     except Exception as e:
+        _last_reindex_error = str(e)
         logger.error(f"❌ Vector index rebuild failed: {e}")
     finally:
         _reindex_in_progress = False
 
 
 @router.post("/documents/reindex")
-async def reindex_documents(current_user=Depends(get_current_user)):
-    """Trigger a background vector index rebuild."""
+async def reindex_documents(
+    index_type: Optional[str] = Query(None, pattern="^(hnsw|ivfflat)$"),
+    concurrently: bool = Query(True),
+    current_user=Depends(get_current_user),
+):
+    """
+    Trigger a background vector index rebuild.
+
+    The index is rebuilt with parameters derived from the current row count, as
+    `index_type` (hnsw or ivfflat; defaults to VECTOR_INDEX_TYPE). With
+    `concurrently=true` searches and writes continue while the new index builds.
+    """
     global _reindex_in_progress
     if _reindex_in_progress:
         raise HTTPException(status_code=409, detail="Rebuild already in progress")
 
     _reindex_in_progress = True
-    asyncio.create_task(_do_reindex())
+    asyncio.create_task(_do_reindex(index_type=index_type, concurrently=concurrently))
 
     return {"status": "started", "message": "Vector index rebuild initiated"}
 
@@ -652,11 +646,16 @@ async def reindex_documents(current_user=Depends(get_current_user)):
 @router.get("/documents/reindex/status")
 async def reindex_status(current_user=Depends(get_current_user)):
     """Return the current status of the vector index rebuild."""
-    return {
+    status = {
         "in_progress": _reindex_in_progress,
         "last_completed_at": _last_reindex_completed_at,
         "last_duration_seconds": _last_reindex_duration,
+        "last_plan": _last_reindex_plan,
+        "last_error": _last_reindex_error,
     }
+    if _vector_store is not None and getattr(_vector_store, 'index_manager', None) is not None:
+        status["index"] = _vector_store.index_manager.stats()
+    return status
 
 
 @router.delete("/documents/{doc_id}", response_model=SingleRemovalSummary)
@@ -679,18 +678,9 @@ async def delete_document(doc_id: int, current_user=Depends(get_current_user)):
             title = book["title"] or filename
 
             # Check which optional tables exist before starting transaction
-            has_document_authors = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.columns
-                    WHERE table_name = 'document_authors' AND column_name = 'book_id'
-                )
-            """)
-            has_metadata_history = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.columns
-                    WHERE table_name = 'metadata_history' AND column_name = 'book_id'
-                )
-            """)
+            schema = await get_schema_capabilities()
+            has_document_authors = schema.has_columns('document_authors', 'book_id')
+            has_metadata_history = schema.has_columns('metadata_history', 'book_id')
 
             async with conn.transaction():
                 # 1. Delete author associations (if table/column exists)
@@ -725,7 +715,9 @@ async def delete_document(doc_id: int, current_user=Depends(get_current_user)):
                 )
 
             # Invalidate cache after successful deletion
-            invalidate_cache()
+            invalidate_cache([filename])
+            if _vector_store is not None:
+                _vector_store.on_chunks_deleted(filename)
             logger.info(
                 f"🗑️ Document {doc_id} ({filename}) deleted: "
                 f"{chunks_deleted} chunks, {author_associations_deleted} author assocs, "
@@ -773,18 +765,9 @@ async def bulk_delete_documents(request: BulkDeleteRequest, current_user=Depends
             total_metadata_history_deleted = 0
 
             # Check which optional tables exist before starting deletes
-            has_document_authors = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.columns
-                    WHERE table_name = 'document_authors' AND column_name = 'book_id'
-                )
-            """)
-            has_metadata_history = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.columns
-                    WHERE table_name = 'metadata_history' AND column_name = 'book_id'
-                )
-            """)
+            schema = await get_schema_capabilities()
+            has_document_authors = schema.has_columns('document_authors', 'book_id')
+            has_metadata_history = schema.has_columns('metadata_history', 'book_id')
 
             # For each found document, perform cascading delete inside a transaction
             for row in rows:
@@ -823,6 +806,9 @@ async def bulk_delete_documents(request: BulkDeleteRequest, current_user=Depends
                         doc_id
                     )
 
+                if _vector_store is not None:
+                    _vector_store.on_chunks_deleted(filename)
+
                 # Accumulate totals
                 total_chunks_deleted += chunks_deleted
                 total_author_associations_deleted += author_associations_deleted
@@ -835,7 +821,7 @@ async def bulk_delete_documents(request: BulkDeleteRequest, current_user=Depends
                 ))
 
             # Invalidate cache after successful deletion
-            invalidate_cache()
+            invalidate_cache([doc.filename for doc in deleted_documents])
             logger.info(
                 f"🗑️ Bulk delete of {len(deleted_documents)} documents completed: "
                 f"{total_chunks_deleted} chunks, {total_author_associations_deleted} author assocs, "
@@ -956,36 +942,22 @@ async def import_documents_csv(file_content: str):
                 if update['updates']:
                     updates.append(update)
 
-        # Apply updates
-        updated_count = 0
-        async with pool.acquire() as conn:
-            for update in updates:
-                # Build update query
-                set_clauses = []
-                params = []
-                param_count = 0
+        # Apply all updates in one set-based UPDATE; a later row for the same file
+        # overrides the fields it sets
+        merged: Dict[str, Dict[str, Any]] = {}
+        for update in updates:
+            merged.setdefault(update['filename'], {}).update(update['updates'])
 
-                for field, value in update['updates'].items():
-                    param_count += 1
-                    set_clauses.append(f"{field} = ${param_count}")
-                    params.append(value)
-
-                if set_clauses:
-                    param_count += 1
-                    query = f"""
-                        UPDATE books
-                        SET {', '.join(set_clauses)}
-                        WHERE filename = ${param_count}
-                    """
-                    params.append(update['filename'])
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                updated = await MetadataImportEngine(conn).update_books('filename', merged, BOOK_COLUMN_TYPES)
 
-                    result = await conn.execute(query, *params)
-                    if '1' in result:
-                        updated_count += 1
+        updated_count = sum(1 for update in updates if update['filename'] in updated)
+        updated_filenames = [filename for filename in merged if filename in updated]
 
         # Invalidate cache after successful import
         if updated_count > 0:
-            invalidate_cache()
+            invalidate_cache(updated_filenames)
             logger.info(f"📥 CSV import completed, {updated_count} documents updated, cache invalidated")
 
         return {
@@ -1006,13 +978,7 @@ async def get_document_history(doc_id: int):
 
         async with pool.acquire() as conn:
             # Check if metadata_history table exists
-            table_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    AND table_name = 'metadata_history'
-                )
-            """)
+            table_exists = (await get_schema_capabilities()).has_table('metadata_history')
 
             if not table_exists:
                 return {"history": []}
@@ -1049,17 +1015,11 @@ async def get_admin_stats():
 
         async with pool.acquire() as conn:
             # Check if books table exists
-            table_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    AND table_name = 'books'
-                )
-            """)
+            table_exists = (await get_schema_capabilities()).has_table('books')
 
             if table_exists:
                 doc_count = await conn.fetchval("SELECT COUNT(*) FROM books")
-                chunk_count = await conn.fetchval("SELECT COUNT(*) FROM documents")
+                chunk_count = (await get_corpus_stats()).total_chunks
                 last_upload = await conn.fetchval("SELECT MAX(processed_at) FROM books")
 
                 # Get category breakdown
@@ -1074,7 +1034,7 @@ async def get_admin_stats():
                                     for row in categories}
             else:
                 doc_count = 0
-                chunk_count = await conn.fetchval("SELECT COUNT(*) FROM documents")
+                chunk_count = (await get_corpus_stats()).total_chunks
                 last_upload = await conn.fetchval("SELECT MAX(created_at) FROM documents")
                 category_breakdown = {}
 
@@ -9,18 +9,18 @@ Provides REST API endpoints for managing authors:
 - Get documents by author
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel, validator
 from typing import List, Optional
 import re
 
 # Import services
 try:
-    from author_service import AuthorService
-    from document_author_service import DocumentAuthorService
+    from author_service import AuthorService, author_list_keyset
+    from document_author_service import DocumentAuthorService, AUTHOR_DOCUMENTS_KEYSET
 except ImportError:
-    from backend.author_service import AuthorService
-    from backend.document_author_service import DocumentAuthorService
+    from backend.author_service import AuthorService, author_list_keyset
+    from backend.document_author_service import DocumentAuthorService, AUTHOR_DOCUMENTS_KEYSET
 
 author_router = APIRouter(prefix="/api/authors", tags=["authors"])
 
@@ -208,13 +208,16 @@ async def update_author(author_id: int, update: AuthorUpdateRequest):
 @author_router.get("/{author_id}/documents", response_model=List[DocumentResponse])
 async def get_author_documents(
     author_id: int,
+    response: Response,
     limit: int = Query(100, ge=1, le=1000, description="Maximum results"),
-    offset: int = Query(0, ge=0, description="Results offset for pagination")
+    offset: int = Query(0, ge=0, description="Results offset for pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (takes precedence over offset)")
 ):
     """
     Get all documents by an author
     
-    Returns documents with pagination support.
+    Returns documents with pagination support. When there are more results the
+    X-Next-Cursor response header holds the cursor of the next page.
     
     **Validates:** Requirements 8.1
     """
@@ -222,11 +225,21 @@ async def get_author_documents(
         raise HTTPException(status_code=503, detail="Document author service not initialized")
     
     try:
+        after = AUTHOR_DOCUMENTS_KEYSET.decode(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # One row past the page tells whether there is a next one
         documents = await _doc_author_service.get_documents_by_author(
             author_id=author_id,
-            limit=limit,
-            offset=offset
+            limit=limit + 1,
+            offset=offset,
+            after=after
         )
+        if len(documents) > limit:
+            documents = documents[:limit]
+            response.headers["X-Next-Cursor"] = AUTHOR_DOCUMENTS_KEYSET.cursor_for(documents[-1])
         
         return [
             DocumentResponse(
@@ -248,17 +261,20 @@ async def get_author_documents(
 
 @author_router.get("/", response_model=List[AuthorResponse])
 async def list_authors(
+    response: Response,
     limit: int = Query(50, ge=1, le=1000, description="Maximum results"),
     offset: int = Query(0, ge=0, description="Results offset for pagination"),
     sort_by: str = Query("name", description="Sort field: 'name' or 'document_count'"),
     sort_direction: str = Query("asc", description="Sort direction: 'asc' or 'desc'"),
-    exclude_empty: bool = Query(False, description="Exclude authors with zero documents")
+    exclude_empty: bool = Query(False, description="Exclude authors with zero documents"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (takes precedence over offset)")
 ):
     """
     List all authors with pagination, sorting, and filtering
     
     Supports sorting by name or document count, and filtering out authors
-    with no associated documents.
+    with no associated documents. When there are more results the
+    X-Next-Cursor response header holds the cursor of the next page.
     
     **Validates:** Requirements 8.4, 8.5
     """
@@ -272,14 +288,25 @@ async def list_authors(
     if sort_direction not in ["asc", "desc"]:
         raise HTTPException(status_code=400, detail="sort_direction must be 'asc' or 'desc'")
     
+    keyset = author_list_keyset(sort_by, sort_direction)
+    try:
+        after = keyset.decode(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
+        # One row past the page tells whether there is a next one
         authors = await _author_service.list_authors_with_sorting(
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
             sort_by=sort_by,
             sort_direction=sort_direction,
-            exclude_empty=exclude_empty
+            exclude_empty=exclude_empty,
+            after=after
         )
+        if len(authors) > limit:
+            authors = authors[:limit]
+            response.headers["X-Next-Cursor"] = keyset.cursor_for(authors[-1])
         
         return [
             AuthorResponse(
@@ -12,8 +12,34 @@ Manages author-related operations including:
 import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import asyncpg
 import re
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
+try:
+    from book_metadata_cache import invalidate_book_metadata
+except ImportError:
+    from backend.book_metadata_cache import invalidate_book_metadata
+try:
+    from pagination import Keyset, SortKey
+except ImportError:
+    from backend.pagination import Keyset, SortKey
+
+
+def author_list_keyset(sort_by: str = "name", sort_direction: str = "asc") -> Keyset:
+    """Keyset order of list_authors_with_sorting for a sort field/direction (id breaks ties)"""
+    descending = sort_direction.lower() == "desc"
+    if sort_by == "document_count":
+        return Keyset(
+            SortKey("document_count", "a.document_count", "bigint", descending=descending),
+            SortKey("name", "a.name", "text"),
+            SortKey("id", "a.id", "integer")
+        )
+    return Keyset(
+        SortKey("name", "a.name", "text", descending=descending),
+        SortKey("id", "a.id", "integer", descending=descending)
+    )
 
 
 class AuthorService:
@@ -37,13 +63,7 @@ class AuthorService:
         if self.pool:
             return
         
-        self.pool = await asyncpg.create_pool(
-            self.database_url,
-            statement_cache_size=0,  # Fix for pgbouncer compatibility
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
+        self.pool = await get_pool('author_service', self.database_url)
     
     async def _ensure_pool(self):
         """Ensure connection pool is initialized (lazy initialization)"""
@@ -171,6 +191,9 @@ class AuthorService:
             if result == "UPDATE 0":
                 raise ValueError(f"Author with ID {author_id} not found")
 
+        # Author names/URLs are cached per book for chat source enrichment
+        invalidate_book_metadata()
+
     async def get_author_by_id(self, author_id: int) -> Optional[Dict[str, Any]]:
         """
         Retrieve author details by ID.
@@ -312,7 +335,8 @@ class AuthorService:
         offset: int = 0,
         sort_by: str = "name",
         sort_direction: str = "asc",
-        exclude_empty: bool = False
+        exclude_empty: bool = False,
+        after: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         List authors with pagination, sorting, and filtering.
@@ -323,6 +347,9 @@ class AuthorService:
             sort_by: Field to sort by ('name' or 'document_count')
             sort_direction: Sort direction ('asc' or 'desc')
             exclude_empty: If True, exclude authors with zero documents
+            after: Sort key values of the last author of the previous page, from
+                author_list_keyset(sort_by, sort_direction).decode(cursor) (keyset
+                pagination instead of offset)
             
         Returns:
             List of author dictionaries with id, name, site_url, document_count
@@ -331,33 +358,31 @@ class AuthorService:
         """
         await self._ensure_pool()
         
-        # Build ORDER BY clause
-        if sort_by == "document_count":
-            order_clause = f"document_count {sort_direction.upper()}, a.name ASC"
-        else:  # sort_by == "name"
-            order_clause = f"a.name {sort_direction.upper()}"
+        keyset = author_list_keyset(sort_by, sort_direction)
+        keyset_condition, keyset_params = keyset.after(after, 3)
         
         # Build WHERE clause for filtering
-        where_clause = ""
+        where_clause = f"WHERE {keyset_condition}"
         if exclude_empty:
-            where_clause = "HAVING COUNT(da.book_id) > 0"
+            where_clause += " AND a.document_count > 0"
         
         async with self.pool.acquire() as conn:
             query = f"""
-                SELECT 
-                    a.id,
-                    a.name,
-                    a.site_url,
-                    COUNT(da.book_id) as document_count
-                FROM authors a
-                LEFT JOIN document_authors da ON a.id = da.author_id
-                GROUP BY a.id, a.name, a.site_url
+                SELECT a.id, a.name, a.site_url, a.document_count
+                FROM (
+                    SELECT 
+                        a.id,
+                        a.name,
+                        a.site_url,
+                        (SELECT COUNT(*) FROM document_authors da WHERE da.author_id = a.id) as document_count
+                    FROM authors a
+                ) a
                 {where_clause}
-                ORDER BY {order_clause}
+                ORDER BY {keyset.order_by()}
                 LIMIT $1 OFFSET $2
             """
             
-            rows = await conn.fetch(query, limit, offset)
+            rows = await conn.fetch(query, limit, 0 if after else offset, *keyset_params)
             
             return [
                 {
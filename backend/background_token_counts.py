@@ -0,0 +1,121 @@
+"""
+Background task to backfill chunk token counts and content hashes in batches
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any
+
+try:
+    from chunk_tokens import chunk_token_counter
+except ImportError:
+    from backend.chunk_tokens import chunk_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Global state for background task
+_backfill_task = None
+_backfill_status = {
+    "running": False,
+    "processed": 0,
+    "total": 0,
+    "errors": 0,
+    "current_batch": 0,
+    "total_batches": 0
+}
+
+async def backfill_token_counts_background(vector_store, batch_size: int = 1000):
+    """
+    Fill token_count/content_hash for chunks stored before they were computed at ingestion.
+    Walks the table by id (keyset batches) and writes each batch with one UPDATE.
+    """
+    global _backfill_status
+
+    try:
+        _backfill_status["running"] = True
+        _backfill_status["processed"] = 0
+        _backfill_status["errors"] = 0
+
+        logger.info("🔄 Starting background token count backfill...")
+
+        if not vector_store.pool:
+            await vector_store.init_database()
+
+        async with vector_store.pool.acquire() as conn:
+            total_docs = await conn.fetchval("""
+                SELECT COUNT(*)
+                FROM documents
+                WHERE token_count IS NULL OR content_hash IS NULL
+            """)
+            _backfill_status["total"] = total_docs
+            _backfill_status["total_batches"] = (total_docs + batch_size - 1) // batch_size
+
+            logger.info(f"📊 Found {total_docs} chunks needing token counts")
+            logger.info(f"📦 Processing in batches of {batch_size}")
+
+            loop = asyncio.get_running_loop()
+            last_id = 0
+            batch_num = 0
+            while True:
+                _backfill_status["current_batch"] = batch_num + 1
+
+                rows = await conn.fetch("""
+                    SELECT id, content
+                    FROM documents
+                    WHERE (token_count IS NULL OR content_hash IS NULL) AND id > $1
+                    ORDER BY id
+                    LIMIT $2
+                """, last_id, batch_size)
+
+                if not rows:
+                    logger.info("✅ No more chunks to process - all token counts filled!")
+                    break
+
+                batch_num += 1
+                last_id = rows[-1]['id']
+
+                try:
+                    contents = [row['content'] for row in rows]
+                    # Tokenizing a batch is CPU work - keep it off the event loop
+                    counts = await loop.run_in_executor(None, chunk_token_counter.count_many, contents)
+                    hashes = chunk_token_counter.hash_many(contents)
+
+                    await conn.execute("""
+                        UPDATE documents AS d
+                        SET token_count = COALESCE(v.token_count, d.token_count),
+                            content_hash = v.content_hash
+                        FROM unnest($1::int[], $2::int[], $3::text[]) AS v(id, token_count, content_hash)
+                        WHERE d.id = v.id
+                    """, [row['id'] for row in rows], counts, hashes)
+                    _backfill_status["processed"] += len(rows)
+
+                    processed_pct = (_backfill_status['processed'] / total_docs * 100) if total_docs else 100
+                    logger.info(f"✅ Batch {batch_num} complete: {_backfill_status['processed']} chunks processed ({processed_pct:.1f}%)")
+
+                except Exception as e:
+                    logger.error(f"❌ Error processing batch {batch_num}: {e}")
+                    _backfill_status["errors"] += len(rows)
+
+        logger.info(f"🎉 Token count backfill complete! Processed {_backfill_status['processed']}/{total_docs} chunks with {_backfill_status['errors']} errors")
+
+    except Exception as e:
+        logger.error(f"❌ Background token count backfill failed: {e}")
+        raise
+    finally:
+        _backfill_status["running"] = False
+
+def start_background_backfill(vector_store, batch_size: int = 1000):
+    """Start the background token count backfill task"""
+    global _backfill_task
+
+    if _backfill_status["running"]:
+        return {"error": "Backfill already running", "status": _backfill_status}
+
+    loop = asyncio.get_event_loop()
+    _backfill_task = loop.create_task(backfill_token_counts_background(vector_store, batch_size))
+
+    return {"message": "Background token count backfill started", "status": _backfill_status}
+
+def get_backfill_status() -> Dict[str, Any]:
+    """Get current status of the token count backfill"""
+    return _backfill_status.copy()
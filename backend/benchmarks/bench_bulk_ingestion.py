@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row INSERT vs bulk COPY ingestion for PostgresVectorStore.
+
+Writes synthetic chunks (random 384-dim embeddings, no model load) into a
+scratch copy of the documents table and reports rows/sec for both paths.
+The scratch table is dropped afterwards; the real documents table is untouched.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_bulk_ingestion
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_bulk_ingestion --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+try:
+    from backend.vector_store_postgres import PostgresVectorStore
+    from backend.db_pool import close_pool_registry
+except ImportError:
+    from vector_store_postgres import PostgresVectorStore
+    from db_pool import close_pool_registry
+
+SCRATCH_TABLE = "documents_bench_ingest"
+
+
+def make_chunks(count: int, dim: int):
+    """Synthetic chunks roughly the size of real PDF chunks"""
+    rng = np.random.default_rng(42)
+    embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+    documents = [
+        {
+            "content": f"Chunk {i} " + "lorem ipsum dolor sit amet " * 40,
+            "page_number": i // 4 + 1,
+            "chunk_index": i,
+            "metadata": {"type": "text"},
+        }
+        for i in range(count)
+    ]
+    return documents, embeddings
+
+
+async def run(sizes):
+    store = PostgresVectorStore()
+    await store.init_database()
+
+    print(f"pgvector: {store.has_pgvector}")
+    print(f"{'chunks':>8} | {'INSERT rows/s':>14} | {'COPY rows/s':>12} | {'speedup':>8}")
+    print("-" * 52)
+
+    async with store.pool.acquire() as conn:
+        for size in sizes:
+            documents, embeddings = make_chunks(size, store.embedding_dim)
+            meta = {"filename": "bench.pdf"}
+            timings = {}
+
+            for mode in ("insert", "copy"):
+                await conn.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+                await conn.execute(
+                    f"CREATE TABLE {SCRATCH_TABLE} (LIKE documents INCLUDING DEFAULTS)"
+                )
+                start = time.perf_counter()
+                if mode == "insert":
+                    records = store._build_records(documents, embeddings, "bench.pdf", meta, binary_vectors=False)
+                    await store._insert_records(conn, records, table=SCRATCH_TABLE)
+                else:
+                    records = store._build_records(documents, embeddings, "bench.pdf", meta, binary_vectors=True)
+                    await store._copy_records(conn, records, table=SCRATCH_TABLE)
+                timings[mode] = time.perf_counter() - start
+
+                written = await conn.fetchval(f"SELECT COUNT(*) FROM {SCRATCH_TABLE}")
+                assert written == size, f"{mode} wrote {written} rows, expected {size}"
+
+            insert_rate = size / timings["insert"]
+            copy_rate = size / timings["copy"]
+            print(f"{size:>8} | {insert_rate:>14,.0f} | {copy_rate:>12,.0f} | {copy_rate / insert_rate:>7.1f}x")
+
+        await conn.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+
+    await store.close()
+    await close_pool_registry()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: word-by-word context truncation vs the token-budgeted packer.
+
+Builds realistic chat contexts (N retrieved chunks of ~1000 characters of
+RPG/SQL prose and code, each with its [Source: ...] header) and times:
+
+  legacy   the previous truncate_context_by_tokens (re-tokenizes the growing
+           string after every word)
+  cold     ContextPacker.pack with an empty token-count cache
+  warm     ContextPacker.pack again (chunks seen in an earlier turn)
+
+Needs the tiktoken encoding for the model (downloaded on first use).
+
+Usage:
+    python3 -m backend.benchmarks.bench_context_packing
+    python3 -m backend.benchmarks.bench_context_packing --chunks 10 30 60 --budget 6000 --model gpt-4o-mini
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import tiktoken
+
+try:
+    from backend.context_packer import ContextPacker
+except ImportError:
+    from context_packer import ContextPacker
+
+PROSE = (
+    "The subfile is loaded one page at a time, so the program only reads as many records "
+    "as the user can see. When the user presses Page Down the next block is fetched with "
+    "SETLL and READE against the logical file keyed by customer number. "
+)
+CODE = (
+    "dcl-s custName char(50);\n"
+    "dcl-ds custRec extname('CUSTMAST') qualified end-ds;\n"
+    "exec sql select CUSNAM into :custName from CUSTMAST where CUSNUM = :custNum;\n"
+    "if sqlcode <> 0;\n  custName = 'Unknown';\nendif;\n"
+)
+
+
+def make_chunks(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(count):
+        body = "".join(rng.choice((PROSE, PROSE, CODE)) for _ in range(5))[:1000]
+        chunks.append(f"[Source: book{i % 12}.pdf, Page {rng.randint(1, 400)}, Type: text]\n{body}\n")
+    return chunks
+
+
+def legacy_truncate(encoding, context: str, max_tokens: int) -> str:
+    """The previous ChatHandler.truncate_context_by_tokens"""
+    if len(encoding.encode(context)) <= max_tokens:
+        return context
+    truncated = ""
+    for word in context.split():
+        test_context = truncated + " " + word if truncated else word
+        if len(encoding.encode(test_context)) > max_tokens:
+            break
+        truncated = test_context
+    return truncated
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(chunk_counts, budget: int, model: str, repeat: int):
+    encoding = tiktoken.encoding_for_model(model)
+    print(f"model={model} budget={budget} tokens")
+    print(f"{'chunks':>6} | {'legacy ms':>10} | {'cold ms':>8} | {'warm ms':>8} | {'tokens':>6}")
+    print("-" * 50)
+    for count in chunk_counts:
+        chunks = make_chunks(count)
+        context = "\n---\n".join(chunks)
+
+        legacy_ms = timed(lambda: legacy_truncate(encoding, context, budget), max(1, repeat // 5))
+        cold_ms = timed(lambda: ContextPacker(encoding).pack(chunks, budget), repeat)
+        packer = ContextPacker(encoding)
+        packed = packer.pack(chunks, budget)
+        warm_ms = timed(lambda: packer.pack(chunks, budget), repeat)
+        assert len(encoding.encode(packed.text)) <= budget
+
+        print(f"{count:>6} | {legacy_ms:>10.1f} | {cold_ms:>8.2f} | {warm_ms:>8.2f} | {packed.tokens:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10, 30, 60])
+    parser.add_argument("--budget", type=int, default=6000)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.chunks, args.budget, args.model, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
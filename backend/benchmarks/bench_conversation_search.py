@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark: conversation search, ILIKE scan vs the messages full-text index.
+
+Creates conversations/messages tables in a scratch schema, fills them with
+three users whose conversations hold N messages in total (sentences drawn from
+a small IBM i vocabulary, plus a rare term in ~1% of messages), installs migration 008 through
+ConversationService.install_search_schema() and times one user's search:
+
+  ilike      the previous query (ILIKE '%q%' over every message, plus a COUNT)
+  fts        the ranked tsvector query (GIN index, snippets, total in one round trip)
+  fts next   the second page through the keyset cursor
+
+The two don't match the same rows: ILIKE wants the query as one substring,
+the ranked query wants every word (as a stem prefix) anywhere in a message,
+title or summary - both match counts are printed. The scratch schema is
+dropped afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_conversation_search
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_conversation_search --messages 10000 50000 200000 --query "commitment journal"
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import asyncpg
+
+try:
+    from backend.conversation_service import ConversationService
+except ImportError:
+    from conversation_service import ConversationService
+
+SCRATCH_SCHEMA = "bench_conversation_search"
+MESSAGES_PER_CONVERSATION = 20
+WORDS = (
+    "declare subfile free-form rpg program data structure embedded sql cursor fetch "
+    "procedure service program binding directory activation group job queue spool file "
+    "message queue display file record format indicator array pointer varchar timestamp "
+    "commitment control journal library list object authority command prompt"
+).split()
+RARE_TERM = "deadlocked"
+
+
+class _Store:
+    """Just enough of the vector store for ConversationService: a pool"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+
+async def create_tables(conn):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCRATCH_SCHEMA}")
+    await conn.execute("""
+        CREATE TABLE conversations (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            title TEXT,
+            summary TEXT,
+            tags TEXT[] DEFAULT '{}',
+            is_favorite BOOLEAN DEFAULT false,
+            is_archived BOOLEAN DEFAULT false,
+            message_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            last_message_at TIMESTAMP
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE messages (
+            id TEXT PRIMARY KEY,
+            conversation_id TEXT REFERENCES conversations(id) ON DELETE CASCADE,
+            role TEXT,
+            content TEXT,
+            metadata JSONB,
+            tokens_used INTEGER,
+            created_at TIMESTAMP
+        )
+    """)
+    await conn.execute("CREATE INDEX ON messages (conversation_id, created_at)")
+    await conn.execute("CREATE INDEX ON conversations (user_id)")
+
+
+async def populate(conn, user_id, messages, rng):
+    now = datetime.utcnow()
+    conv_rows, msg_rows = [], []
+    for _ in range(max(1, messages // MESSAGES_PER_CONVERSATION)):
+        conv_id = str(uuid.uuid4())
+        created = now - timedelta(days=rng.uniform(0, 120))
+        conv_rows.append((
+            conv_id, user_id, " ".join(rng.sample(WORDS, 4)).capitalize(), None, [],
+            MESSAGES_PER_CONVERSATION, created, created, created,
+        ))
+        for i in range(MESSAGES_PER_CONVERSATION):
+            content = ". ".join(" ".join(rng.choices(WORDS, k=12)) for _ in range(4))
+            if rng.random() < 0.01:
+                content += f". The job was {RARE_TERM} on a record lock"
+            msg_rows.append((
+                str(uuid.uuid4()), conv_id, "user" if i % 2 == 0 else "assistant",
+                content, "{}", None, created + timedelta(seconds=i),
+            ))
+    await conn.copy_records_to_table("conversations", records=conv_rows, columns=[
+        "id", "user_id", "title", "summary", "tags", "message_count", "created_at", "updated_at", "last_message_at",
+    ])
+    await conn.copy_records_to_table("messages", records=msg_rows, columns=[
+        "id", "conversation_id", "role", "content", "metadata", "tokens_used", "created_at",
+    ])
+
+
+async def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+async def run(sizes, query, per_page, repeat):
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    pool = await asyncpg.create_pool(
+        database_url, min_size=1, max_size=2, server_settings={"search_path": SCRATCH_SCHEMA}
+    )
+    service = ConversationService(_Store(pool))
+    rng = random.Random(42)
+    user_id = "user2"
+
+    print(f"query: {query!r}, per page: {per_page}")
+    print(f"{'messages/user':>13} | {'ilike hits':>10} | {'fts hits':>8} | {'ilike ms':>9} | {'fts ms':>8} | {'fts next ms':>11} | {'speedup':>7}")
+    print("-" * 85)
+    try:
+        for size in sizes:
+            async with pool.acquire() as conn:
+                await create_tables(conn)
+                for user in range(3):
+                    await populate(conn, f"user{user}", size, rng)
+
+            service.search_index = False
+            ilike_ms, (_, ilike_total, _, _) = await timed(
+                lambda: service.search_conversations(user_id, query, 1, per_page), repeat
+            )
+
+            service.search_index = None  # installs migration 008 on the next call
+            await service.install_search_schema()
+            async with pool.acquire() as conn:
+                await conn.execute("ANALYZE")
+            fts_ms, (hits, total, snippets, next_after) = await timed(
+                lambda: service.search_conversations(user_id, query, 1, per_page), repeat
+            )
+            next_ms, (next_hits, _, _, _) = await timed(
+                lambda: service.search_conversations(user_id, query, 1, per_page, after=next_after), repeat
+            )
+
+            # Every page-1 hit has a snippet, and the cursor page continues where page 1 ended
+            assert len(snippets) == len(hits)
+            assert not {c.id for c in hits} & {c.id for c in next_hits}
+
+            print(f"{size:>13} | {ilike_total:>10} | {total:>8} | {ilike_ms:>9.2f} | {fts_ms:>8.2f} | {next_ms:>11.2f} | "
+                  f"{ilike_ms / fts_ms:>6.1f}x")
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[10000, 50000, 200000],
+                        help="messages per user")
+    parser.add_argument("--query", default="deadlock")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.query, args.per_page, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark: conversation stats endpoint, COUNT queries vs trigger-maintained counters.
+
+Creates conversations/messages tables in a scratch schema, fills them with
+users that have N conversations each (M messages per conversation, random
+tags/favorites/archived), installs migration 007 through
+ConversationService.install_stats_schema() and times for one user:
+
+  count      the previous get_conversation_stats (five COUNTs + tag unnest)
+  counters   the one-row lookup of conversation_user_stats
+
+It checks both return the same numbers, then times a batch of message writes
+with and without the triggers. The scratch schema is dropped afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_conversation_stats
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_conversation_stats --conversations 100 1000 5000 --messages 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import asyncpg
+
+try:
+    from backend.conversation_service import ConversationService
+    from backend.conversation_models import Message
+except ImportError:
+    from conversation_service import ConversationService
+    from conversation_models import Message
+
+SCRATCH_SCHEMA = "bench_conversation_stats"
+TAGS = ["rpg", "sql", "cl", "ile", "db2", "subfiles", "free-form", "api", "performance", "security", "jobs", "ifs"]
+
+
+class _Store:
+    """Just enough of the vector store for ConversationService: a pool"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+
+async def create_tables(conn):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCRATCH_SCHEMA}")
+    await conn.execute("""
+        CREATE TABLE conversations (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            title TEXT,
+            summary TEXT,
+            tags TEXT[] DEFAULT '{}',
+            is_favorite BOOLEAN DEFAULT false,
+            is_archived BOOLEAN DEFAULT false,
+            message_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            last_message_at TIMESTAMP
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE messages (
+            id TEXT PRIMARY KEY,
+            conversation_id TEXT REFERENCES conversations(id) ON DELETE CASCADE,
+            role TEXT,
+            content TEXT,
+            metadata JSONB,
+            tokens_used INTEGER,
+            created_at TIMESTAMP
+        )
+    """)
+    await conn.execute("CREATE INDEX ON messages (conversation_id, created_at)")
+    await conn.execute("CREATE INDEX ON conversations (user_id)")
+
+
+async def populate(conn, user_id, conversations, messages_per_conversation, rng):
+    now = datetime.utcnow()
+    conv_rows, msg_rows = [], []
+    for _ in range(conversations):
+        conv_id = str(uuid.uuid4())
+        created = now - timedelta(days=rng.uniform(0, 120))
+        conv_rows.append((
+            conv_id, user_id, "Bench conversation", None, rng.sample(TAGS, rng.randint(0, 3)),
+            rng.random() < 0.1, rng.random() < 0.2, messages_per_conversation, created, created, created,
+        ))
+        for i in range(messages_per_conversation):
+            msg_rows.append((
+                str(uuid.uuid4()), conv_id, "user" if i % 2 == 0 else "assistant",
+                "How do I declare a subfile in free-form RPG? " * 5, "{}", None, created + timedelta(seconds=i),
+            ))
+    await conn.copy_records_to_table("conversations", records=conv_rows, columns=[
+        "id", "user_id", "title", "summary", "tags", "is_favorite", "is_archived",
+        "message_count", "created_at", "updated_at", "last_message_at",
+    ])
+    await conn.copy_records_to_table("messages", records=msg_rows, columns=[
+        "id", "conversation_id", "role", "content", "metadata", "tokens_used", "created_at",
+    ])
+    await conn.execute("ANALYZE")
+    return [row[0] for row in conv_rows]
+
+
+async def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def _comparable(stats):
+    # Which tag wins a tie for 10th place is unspecified in the COUNT query - compare the counts
+    return {**stats, "most_used_tags": [t["count"] for t in stats["most_used_tags"]]}
+
+
+async def run(sizes, messages_per_conversation, repeat):
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    pool = await asyncpg.create_pool(
+        database_url, min_size=1, max_size=2, server_settings={"search_path": SCRATCH_SCHEMA}
+    )
+    service = ConversationService(_Store(pool))
+    rng = random.Random(42)
+
+    print(f"messages per conversation: {messages_per_conversation}")
+    print(f"{'conversations':>13} | {'count ms':>9} | {'counters ms':>11} | {'speedup':>7} | "
+          f"{'write ms (count)':>16} | {'write ms (trigger)':>18}")
+    print("-" * 90)
+    try:
+        for size in sizes:
+            async with pool.acquire() as conn:
+                await create_tables(conn)
+                conv_ids = []
+                for user in range(3):
+                    conv_ids = await populate(conn, f"user{user}", size, messages_per_conversation, rng)
+
+            user_id = "user2"
+            service.stats_triggers = False
+            write_count_ms = await time_writes(service, conv_ids, repeat)
+            count_ms, count_stats = await timed(lambda: service.get_conversation_stats(user_id), repeat)
+
+            service.stats_triggers = None  # installs migration 007 on the next call
+            await service.install_stats_schema()
+            counters_ms, counter_stats = await timed(lambda: service.get_conversation_stats(user_id), repeat)
+            write_trigger_ms = await time_writes(service, conv_ids, repeat)
+            assert _comparable(count_stats) == _comparable(counter_stats), (count_stats, counter_stats)
+
+            # The counters must still agree after the writes above
+            service.stats_triggers = False
+            recount = await service.get_conversation_stats(user_id)
+            service.stats_triggers = True
+            assert _comparable(recount) == _comparable(await service.get_conversation_stats(user_id))
+
+            print(f"{size:>13} | {count_ms:>9.2f} | {counters_ms:>11.2f} | {count_ms / counters_ms:>6.1f}x | "
+                  f"{write_count_ms:>16.2f} | {write_trigger_ms:>18.2f}")
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+        await pool.close()
+
+
+async def time_writes(service, conv_ids, repeat):
+    """Median time to write one chat turn (user + assistant message) in a busy conversation"""
+    samples = []
+    for i in range(repeat):
+        conv_id = conv_ids[i % len(conv_ids)]
+        turn = [Message(conversation_id=conv_id, role=role, content="bench turn") for role in ("user", "assistant")]
+        start = time.perf_counter()
+        await service._write_messages(turn)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="conversations per user")
+    parser.add_argument("--messages", type=int, default=20, help="messages per conversation")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(run(args.conversations, args.messages, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark: document catalog listing, per-book queries vs one set-based query.
+
+Creates books/authors/document_authors/documents tables in a scratch schema,
+fills them with N books (1-3 authors each, up to 40 chunks per book) and times:
+
+  per-book     the previous listing (books, then a chunk COUNT and an authors
+               query per book - 2N+1 round trips)
+  set-based    PostgresVectorStore.list_documents (chunk counts and authors
+               aggregated in the same query)
+  incremental  DocumentsCatalog re-reading 3 changed files after a write
+
+It checks both listings return the same catalog, and that the incrementally
+refreshed catalog matches a full reload. The scratch schema is dropped afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_documents_catalog
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_documents_catalog --books 500 2000 10000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+import asyncpg
+
+try:
+    from backend.vector_store_postgres import PostgresVectorStore
+    from backend.documents_catalog import DocumentsCatalog
+    from backend.schema_capabilities import refresh_schema_capabilities
+except ImportError:
+    from vector_store_postgres import PostgresVectorStore
+    from documents_catalog import DocumentsCatalog
+    from schema_capabilities import refresh_schema_capabilities
+
+SCRATCH_SCHEMA = "bench_documents_catalog"
+
+
+async def create_tables(conn):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCRATCH_SCHEMA}")
+    await conn.execute("""
+        CREATE TABLE books (
+            id SERIAL PRIMARY KEY,
+            filename TEXT UNIQUE NOT NULL,
+            title TEXT,
+            author TEXT,
+            category TEXT,
+            mc_press_url TEXT,
+            article_url TEXT,
+            document_type TEXT,
+            total_pages INTEGER
+        );
+        CREATE TABLE authors (id SERIAL PRIMARY KEY, name TEXT NOT NULL, site_url TEXT);
+        CREATE TABLE document_authors (
+            book_id INTEGER REFERENCES books(id) ON DELETE CASCADE,
+            author_id INTEGER REFERENCES authors(id),
+            author_order INTEGER,
+            PRIMARY KEY (book_id, author_id)
+        );
+        CREATE TABLE documents (
+            id SERIAL PRIMARY KEY,
+            filename TEXT,
+            content TEXT,
+            page_number INTEGER,
+            chunk_index INTEGER,
+            metadata JSONB
+        );
+        CREATE INDEX ON documents (filename);
+    """)
+
+
+async def populate(conn, books, rng):
+    await conn.copy_records_to_table("authors", records=[
+        (f"Author {i}", f"https://example.com/author{i}" if i % 2 else None) for i in range(300)
+    ], columns=["name", "site_url"])
+    await conn.copy_records_to_table("books", records=[
+        (f"book{i}.pdf", f"Book {i}", f"Legacy Author {i}", "Programming", "book", 100 + i % 400)
+        for i in range(books)
+    ], columns=["filename", "title", "author", "category", "document_type", "total_pages"])
+    links = []
+    for book_id in range(1, books + 1):
+        for order, author_id in enumerate(rng.sample(range(1, 301), rng.randint(1, 3))):
+            links.append((book_id, author_id, order))
+    await conn.copy_records_to_table("document_authors", records=links,
+                                     columns=["book_id", "author_id", "author_order"])
+    await conn.copy_records_to_table("documents", records=[
+        (f"book{i}.pdf", "chunk", 1, k) for i in range(books) for k in range(rng.randint(1, 40))
+    ], columns=["filename", "content", "page_number", "chunk_index"])
+    await conn.execute("ANALYZE")
+
+
+async def list_per_book(pool):
+    """The previous listing: one chunk COUNT and one authors query per book"""
+    async with pool.acquire() as conn:
+        rows = await conn.fetch("""
+            SELECT id, filename, title, author, category, mc_press_url, article_url, document_type, total_pages
+            FROM books ORDER BY id DESC
+        """)
+        documents = []
+        for row in rows:
+            chunk_count = await conn.fetchval("SELECT COUNT(*) FROM documents WHERE filename = $1", row['filename'])
+            author_rows = await conn.fetch("""
+                SELECT a.id, a.name, a.site_url
+                FROM authors a
+                JOIN document_authors da ON a.id = da.author_id
+                WHERE da.book_id = $1
+                ORDER BY da.author_order
+            """, row['id'])
+            authors = [dict(a) for a in author_rows] or [{'id': None, 'name': row['author'] or 'Unknown', 'site_url': None}]
+            documents.append({
+                'id': row['id'],
+                'filename': row['filename'],
+                'title': row['title'] or row['filename'].replace('.pdf', ''),
+                'author': ', '.join(a['name'] for a in authors),
+                'authors': authors,
+                'category': row['category'] or 'Uncategorized',
+                'document_type': row['document_type'] or 'book',
+                'mc_press_url': row['mc_press_url'],
+                'article_url': row['article_url'],
+                'total_pages': row['total_pages'] or 'N/A',
+                'chunk_count': chunk_count or 0,
+                'uploaded_at': None
+            })
+    return {'documents': documents}
+
+
+async def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+async def run(sizes, repeat):
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    pool = await asyncpg.create_pool(
+        database_url, min_size=1, max_size=2, server_settings={"search_path": SCRATCH_SCHEMA}
+    )
+    store = PostgresVectorStore()
+    store.pool = pool
+    rng = random.Random(42)
+
+    print(f"{'books':>7} | {'per-book ms':>11} | {'set-based ms':>12} | {'speedup':>7} | {'incremental ms':>14}")
+    print("-" * 65)
+    try:
+        for size in sizes:
+            async with pool.acquire() as conn:
+                await create_tables(conn)
+                await populate(conn, size, rng)
+                await refresh_schema_capabilities(conn)
+
+            per_book_ms, per_book = await timed(lambda: list_per_book(pool), max(1, repeat // 5))
+            set_ms, listing = await timed(store.list_documents, repeat)
+            assert per_book == listing
+
+            catalog = DocumentsCatalog()
+            catalog.set_loader(store.list_documents)
+            await catalog.get()
+            samples = []
+            for i in range(repeat):
+                async with pool.acquire() as conn:
+                    await conn.execute("UPDATE books SET title = $1 WHERE filename = 'book1.pdf'", f"Edit {i}")
+                    await conn.execute("INSERT INTO documents (filename, content) VALUES ('book2.pdf', 'more')")
+                    await conn.execute("INSERT INTO books (filename, title) VALUES ($1, 'New book')", f"new{i}.pdf")
+                for filename in ("book1.pdf", "book2.pdf", f"new{i}.pdf"):
+                    catalog.invalidate(filename)
+                start = time.perf_counter()
+                await catalog.get()
+                samples.append((time.perf_counter() - start) * 1000)
+            assert (await catalog.get())["documents"] == (await store.list_documents())["documents"]
+
+            print(f"{size:>7} | {per_book_ms:>11.1f} | {set_ms:>12.1f} | {per_book_ms / set_ms:>6.1f}x | "
+                  f"{statistics.median(samples):>14.2f}")
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, nargs="+", default=[500, 2000, 10000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.books, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
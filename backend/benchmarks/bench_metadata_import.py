@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row vs set-based apply of an article metadata import.
+
+Creates books/authors/document_authors tables in a scratch schema with N
+articles (A<i>.pdf) and an article export of N rows (1-2 authors each, ~300
+distinct authors, some IDs without a matching document), then times applying it:
+
+  per-row    the previous import_article_metadata loop (filename lookup, UPDATE,
+             author upsert, EXISTS check and INSERT per row and author)
+  set-based  MetadataImportEngine (COPY into temp tables, then one
+             UPDATE ... FROM / INSERT ... ON CONFLICT per step)
+
+Each variant runs on freshly created tables; the resulting books, authors and
+document_authors must be identical. The scratch schema is dropped afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_metadata_import
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_metadata_import --rows 1000 10000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+import asyncpg
+
+try:
+    from backend.metadata_import import AuthorLink, MetadataImportEngine, BOOK_COLUMN_TYPES
+except ImportError:
+    from metadata_import import AuthorLink, MetadataImportEngine, BOOK_COLUMN_TYPES
+
+SCRATCH_SCHEMA = "bench_metadata_import"
+
+
+async def create_tables(conn, articles):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCRATCH_SCHEMA}")
+    await conn.execute("""
+        CREATE TABLE books (
+            id SERIAL PRIMARY KEY,
+            filename TEXT UNIQUE NOT NULL,
+            title TEXT,
+            article_url TEXT,
+            document_type TEXT
+        );
+        CREATE TABLE authors (
+            id SERIAL PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL,
+            site_url TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE document_authors (
+            id SERIAL PRIMARY KEY,
+            book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+            author_id INTEGER NOT NULL REFERENCES authors(id) ON DELETE CASCADE,
+            author_order INTEGER NOT NULL DEFAULT 0,
+            UNIQUE(book_id, author_id)
+        );
+    """)
+    await conn.copy_records_to_table("books", records=[
+        (f"A{i}.pdf", f"Untitled {i}", "book") for i in range(articles)
+    ], columns=["filename", "title", "document_type"])
+    await conn.execute("ANALYZE")
+
+
+def make_rows(count, rng):
+    """(row_no, article_id, title, article_url, [authors], author_url) like the prepared export"""
+    rows = []
+    for row_no in range(1, count + 1):
+        article_id = f"A{rng.randrange(int(count * 1.05))}"  # ~5% without a document
+        authors = [f"Author {a}" for a in rng.sample(range(300), rng.randint(1, 2))]
+        author_url = f"https://example.com/{authors[0].split()[-1]}" if rng.random() < 0.7 else None
+        rows.append((row_no, article_id, f"Article {row_no}", f"https://mcpress.com/a/{row_no}", authors, author_url))
+    return rows
+
+
+async def apply_per_row(conn, rows):
+    """The previous loop: several awaited statements per row and author"""
+    async with conn.transaction():
+        for _, article_id, title, article_url, authors, author_url in rows:
+            book_id = await conn.fetchval(
+                "SELECT id FROM books WHERE filename = $1 OR filename = $2", f"{article_id}.pdf", article_id
+            )
+            if not book_id:
+                continue
+            await conn.execute("""
+                UPDATE books SET title = $1, article_url = $2, document_type = 'article' WHERE id = $3
+            """, title, article_url, book_id)
+            for order, name in enumerate(authors):
+                author_id = await conn.fetchval("""
+                    INSERT INTO authors (name, site_url) VALUES ($1, $2)
+                    ON CONFLICT (name) DO UPDATE
+                    SET site_url = COALESCE(EXCLUDED.site_url, authors.site_url), updated_at = CURRENT_TIMESTAMP
+                    RETURNING id
+                """, name, author_url)
+                exists = await conn.fetchval("""
+                    SELECT EXISTS(SELECT 1 FROM document_authors WHERE book_id = $1 AND author_id = $2)
+                """, book_id, author_id)
+                if not exists:
+                    await conn.execute("""
+                        INSERT INTO document_authors (book_id, author_id, author_order) VALUES ($1, $2, $3)
+                    """, book_id, author_id, order)
+
+
+async def apply_set_based(conn, rows):
+    async with conn.transaction():
+        engine = MetadataImportEngine(conn)
+        book_ids = await engine.resolve_filenames({
+            row_no: [f"{article_id}.pdf", article_id] for row_no, article_id, *_ in rows
+        })
+        updates, links = {}, []
+        for row_no, _, title, article_url, authors, author_url in rows:
+            book_id = book_ids.get(row_no)
+            if not book_id:
+                continue
+            updates[book_id] = {'title': title, 'article_url': article_url, 'document_type': 'article'}
+            links.extend(AuthorLink(row_no, book_id, order, name, author_url) for order, name in enumerate(authors))
+        await engine.update_books('id', updates, BOOK_COLUMN_TYPES, keep_nulls=True)
+        await engine.link_authors(links)
+
+
+async def snapshot(conn):
+    books = await conn.fetch("SELECT id, title, article_url, document_type FROM books ORDER BY id")
+    authors = await conn.fetch("SELECT name, site_url FROM authors ORDER BY name")
+    links = await conn.fetch("""
+        SELECT da.book_id, a.name, da.author_order
+        FROM document_authors da JOIN authors a ON a.id = da.author_id
+        ORDER BY da.book_id, a.name
+    """)
+    return [list(map(dict, part)) for part in (books, authors, links)]
+
+
+async def run(sizes):
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    conn = await asyncpg.connect(database_url, server_settings={"search_path": SCRATCH_SCHEMA})
+    rng = random.Random(42)
+
+    print(f"{'rows':>7} | {'per-row ms':>10} | {'set-based ms':>12} | {'speedup':>7}")
+    print("-" * 46)
+    try:
+        for size in sizes:
+            rows = make_rows(size, rng)
+            results = {}
+            for name, apply in (("per-row", apply_per_row), ("set-based", apply_set_based)):
+                await create_tables(conn, size)
+                start = time.perf_counter()
+                await apply(conn, rows)
+                results[name] = ((time.perf_counter() - start) * 1000, await snapshot(conn))
+            (per_row_ms, expected), (set_ms, actual) = results["per-row"], results["set-based"]
+            assert actual == expected
+            print(f"{size:>7} | {per_row_ms:>10.0f} | {set_ms:>12.0f} | {per_row_ms / set_ms:>6.1f}x")
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+    asyncio.run(run(args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF extraction pages/sec by page worker count.
+
+Runs PDFProcessorFull on one PDF with different PDF_PAGE_WORKERS settings and
+reports wall time and pages/sec, and checks every run produces the same chunks
+as the serial (1 worker) run. Without --pdf a synthetic illustrated book is
+generated (text, RPG/SQL snippets, a repeated logo and two figures per page).
+
+Usage:
+    python3 -m backend.benchmarks.bench_pdf_extraction
+    python3 -m backend.benchmarks.bench_pdf_extraction --pdf path/to/book.pdf --workers 1 2 4 8
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+try:
+    from backend.pdf_processor_full import PDFProcessorFull
+except ImportError:
+    from pdf_processor_full import PDFProcessorFull
+
+
+def _png(rng, height: int, width: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(rng.integers(0, 255, (height, width, 3), dtype=np.uint8)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def make_book(path: str, pages: int):
+    rng = np.random.default_rng(42)
+    logo = _png(rng, 40, 120)
+    logo_xref = 0
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        text = f"Chapter {page_num}\n" + ("RPG programming on IBM i with embedded SQL. " * 10 + "\n") * 4
+        text += "dcl-s customerName char(50) inz('unknown customer');\n"
+        text += "SELECT CUSNAM, CUSNUM FROM QGPL.CUSTOMERS WHERE CUSNUM > 1000\n"
+        page.insert_text((50, 60), text, fontsize=7)
+        # Same embedded logo (one xref) on every page, like a running header
+        logo_xref = page.insert_image(fitz.Rect(400, 10, 520, 50), stream=logo, xref=logo_xref)
+        for i in range(2):
+            page.insert_image(fitz.Rect(50, 400 + i * 150, 350, 540 + i * 150), stream=_png(rng, 200, 300))
+    doc.save(path)
+    doc.close()
+
+
+def run(pdf_path: str, worker_counts):
+    processor = PDFProcessorFull()
+    processor.parallel_min_pages = 1
+
+    baseline = None
+    print(f"{'workers':>7} | {'seconds':>8} | {'pages/s':>8} | {'chunks':>6} | {'images':>6} | same as serial")
+    print("-" * 61)
+    for workers in worker_counts:
+        processor.page_workers = workers
+        processor.shutdown()  # fresh pool sized for this run
+        start = time.perf_counter()
+        result = processor._process_pdf_sync(pdf_path, page_workers=workers)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = result["chunks"]
+        pages = result["total_pages"]
+        print(f"{workers:>7} | {elapsed:>8.2f} | {pages / elapsed:>8.1f} | {len(result['chunks']):>6} | "
+              f"{len(result['images']):>6} | {result['chunks'] == baseline}")
+    processor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", help="PDF to process (default: generate a synthetic book)")
+    parser.add_argument("--pages", type=int, default=200, help="pages in the synthetic book")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    if args.pdf:
+        run(args.pdf, args.workers)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic_book.pdf")
+        make_book(path, args.pages)
+        run(path, args.workers)
+
+
+if __name__ == "__main__":
+    main()
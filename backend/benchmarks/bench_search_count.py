@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-query cost of the corpus COUNT(*) in vector search.
+
+Loads synthetic chunks (random 384-dim embeddings, no model load) into a
+scratch table with an HNSW index, then times the search path two ways:
+
+  count(*)      SELECT COUNT(*) for the log line, then the ANN query (old path)
+  corpus stats  read the incrementally maintained count, then the ANN query
+
+Reports p50/p95 latency per query for each. The scratch table is dropped
+afterwards; the real documents table is untouched.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_search_count
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_search_count --sizes 10000 100000 --queries 200
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+try:
+    from backend.vector_store_postgres import PostgresVectorStore
+    from backend.vector_index_manager import VectorIndexManager
+    from backend.corpus_stats import CorpusStats
+    from backend.db_pool import close_pool_registry
+except ImportError:
+    from vector_store_postgres import PostgresVectorStore
+    from vector_index_manager import VectorIndexManager
+    from corpus_stats import CorpusStats
+    from db_pool import close_pool_registry
+
+SCRATCH_TABLE = "documents_bench_count"
+
+
+async def time_queries(conn, queries, count_step):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await count_step()
+        async with conn.transaction():
+            await conn.execute("SET LOCAL hnsw.ef_search = 40")
+            await conn.fetch(
+                f"SELECT id, content FROM {SCRATCH_TABLE} ORDER BY embedding <=> $1 LIMIT 5", query
+            )
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 95])
+
+
+async def run(sizes, num_queries):
+    store = PostgresVectorStore()
+    await store.init_database()
+    if not store.has_pgvector:
+        print("pgvector is not installed - nothing to benchmark")
+        return
+
+    rng = np.random.default_rng(42)
+    dim = store.embedding_dim
+    print(f"{'chunks':>8} | {'count(*) p50':>12} | {'p95':>7} | {'stats p50':>9} | {'p95':>7}")
+    print("-" * 56)
+
+    async with store.pool.acquire() as conn:
+        for size in sizes:
+            await conn.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+            await conn.execute(
+                f"CREATE TABLE {SCRATCH_TABLE} (id SERIAL PRIMARY KEY, filename TEXT, "
+                f"content TEXT, embedding vector({dim}))"
+            )
+            content = "lorem ipsum dolor sit amet " * 40
+            await conn.copy_records_to_table(
+                SCRATCH_TABLE,
+                records=[(f"doc{i // 500}.pdf", content, vector)
+                         for i, vector in enumerate(rng.standard_normal((size, dim)).astype(np.float32))],
+                columns=["filename", "content", "embedding"],
+            )
+            await conn.execute(f"ANALYZE {SCRATCH_TABLE}")
+            manager = VectorIndexManager(table=SCRATCH_TABLE, index_name=f"{SCRATCH_TABLE}_embedding_idx")
+            await manager.rebuild(conn, index_type="hnsw", concurrently=False)
+
+            stats = CorpusStats(table=SCRATCH_TABLE)
+            await stats.refresh(conn)
+            queries = rng.standard_normal((num_queries, dim)).astype(np.float32)
+
+            async def count_star():
+                await conn.fetchval(f"SELECT COUNT(*) FROM {SCRATCH_TABLE}")
+
+            async def from_stats():
+                await stats.ensure_fresh()
+                return stats.total_chunks
+
+            old_p50, old_p95 = await time_queries(conn, queries, count_star)
+            new_p50, new_p95 = await time_queries(conn, queries, from_stats)
+            print(f"{size:>8} | {old_p50:>12.2f} | {old_p95:>7.2f} | {new_p50:>9.2f} | {new_p95:>7.2f}")
+
+        await conn.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+
+    print("(latency per search in ms)")
+    await store.close()
+    await close_pool_registry()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recall@k vs latency for pgvector HNSW / IVFFlat indexes.
+
+Loads a synthetic clustered corpus (random 384-dim embeddings, no model load)
+into a scratch table, computes exact top-k neighbours with NumPy, then builds
+each index type with the parameters VectorIndexManager derives from the row
+count and sweeps the query-time setting (hnsw.ef_search / ivfflat.probes).
+Reports recall@k and p50/p95 latency per setting, next to an exact
+(sequential scan) baseline. The scratch table is dropped afterwards; the real
+documents table is untouched.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_vector_recall
+    DATABASE_URL=postgresql://... python3 -m backend.benchmarks.bench_vector_recall --rows 100000 --queries 200 -k 10
+"""
+
+import argparse
+import asyncio
+import math
+import time
+
+import numpy as np
+
+try:
+    from backend.vector_store_postgres import PostgresVectorStore
+    from backend.vector_index_manager import VectorIndexManager
+    from backend.db_pool import close_pool_registry
+except ImportError:
+    from vector_store_postgres import PostgresVectorStore
+    from vector_index_manager import VectorIndexManager
+    from db_pool import close_pool_registry
+
+SCRATCH_TABLE = "documents_bench_recall"
+SCRATCH_INDEX = f"{SCRATCH_TABLE}_embedding_idx"
+
+
+def make_corpus(rows: int, queries: int, dim: int, clusters: int = 200):
+    """Gaussian clusters around random centres - closer to real embeddings than pure noise"""
+    rng = np.random.default_rng(42)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    corpus = centres[rng.integers(0, clusters, rows)] + 1.5 * rng.standard_normal((rows, dim)).astype(np.float32)
+    probes = centres[rng.integers(0, clusters, queries)] + 1.5 * rng.standard_normal((queries, dim)).astype(np.float32)
+    return corpus, probes
+
+
+def exact_neighbours(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Ground-truth top-k row ids (1-based, matching SERIAL ids) by cosine distance"""
+    corpus_n = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries_n = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries_n @ corpus_n.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return top + 1
+
+
+async def run_queries(conn, queries: np.ndarray, k: int, setting=None):
+    """Return (list of id lists, latencies in ms)"""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        async with conn.transaction():
+            if setting is not None:
+                await conn.execute(f"SET LOCAL {setting[0]} = {int(setting[1])}")
+            else:
+                # Exact baseline: keep the planner off the index
+                await conn.execute("SET LOCAL enable_indexscan = off")
+            rows = await conn.fetch(
+                f"SELECT id FROM {SCRATCH_TABLE} ORDER BY embedding <=> $1 LIMIT $2", query, k
+            )
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([row["id"] for row in rows])
+    return results, latencies
+
+
+def recall_at_k(results, truth: np.ndarray) -> float:
+    hits = sum(len(set(found) & set(expected.tolist())) for found, expected in zip(results, truth))
+    return hits / truth.size
+
+
+def report(label: str, results, latencies, truth):
+    p50, p95 = np.percentile(latencies, [50, 95])
+    print(f"{label:<28} | {recall_at_k(results, truth):>8.3f} | {p50:>8.2f} | {p95:>8.2f}")
+
+
+async def run(rows: int, num_queries: int, k: int):
+    store = PostgresVectorStore()
+    await store.init_database()
+    if not store.has_pgvector:
+        print("pgvector is not installed - nothing to benchmark")
+        return
+
+    corpus, queries = make_corpus(rows, num_queries, store.embedding_dim)
+    truth = exact_neighbours(corpus, queries, k)
+    manager = VectorIndexManager(table=SCRATCH_TABLE, index_name=SCRATCH_INDEX)
+
+    async with store.pool.acquire() as conn:
+        await conn.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+        await conn.execute(
+            f"CREATE TABLE {SCRATCH_TABLE} (id SERIAL PRIMARY KEY, embedding vector({store.embedding_dim}))"
+        )
+        await conn.copy_records_to_table(
+            SCRATCH_TABLE, records=[(vector,) for vector in corpus], columns=["embedding"]
+        )
+        await conn.execute(f"ANALYZE {SCRATCH_TABLE}")
+
+        print(f"rows={rows:,} queries={num_queries} k={k}")
+        print(f"{'setting':<28} | {'recall':>8} | {'p50 ms':>8} | {'p95 ms':>8}")
+        print("-" * 62)
+
+        results, latencies = await run_queries(conn, queries, k)
+        report("exact (seq scan)", results, latencies, truth)
+
+        for index_type in ("ivfflat", "hnsw"):
+            start = time.perf_counter()
+            plan = await manager.rebuild(conn, index_type=index_type, concurrently=False)
+            print(f"-- {index_type} {plan.to_dict()} built in {time.perf_counter() - start:.1f}s")
+
+            if index_type == "ivfflat":
+                base = max(1, round(math.sqrt(plan.lists)))
+                sweep = sorted({1, base // 2 or 1, base, base * 2, max(1, plan.lists // 4)})
+                gucs = [("ivfflat.probes", probes) for probes in sweep]
+            else:
+                gucs = [("hnsw.ef_search", ef) for ef in (max(k, 10), 20, 40, 80, 160) if ef >= k]
+
+            default = manager.search_settings(k)
+            for guc in gucs:
+                results, latencies = await run_queries(conn, queries, k, guc)
+                marker = " *" if default.get(guc[0]) == guc[1] else ""
+                report(f"{guc[0]}={guc[1]}{marker}", results, latencies, truth)
+
+            await conn.execute(f"DROP INDEX IF EXISTS {SCRATCH_INDEX}")
+
+        await conn.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+
+    print("(* = setting applied by default at query time)")
+    await store.close()
+    await close_pool_registry()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.queries, args.k))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Process-local cache of book metadata used to enrich chat sources.
+
+ChatHandler resolves every source filename to its title, authors, URLs and
+temporal fields when an answer finishes streaming. Book metadata changes only
+through admin edits, so results are cached per filename (including "not found")
+and invalidated by the admin write paths via `invalidate_book_metadata()`.
+A TTL bounds staleness for writes that bypass those paths (scripts, other workers).
+
+Configuration (environment):
+    BOOK_METADATA_CACHE_TTL     seconds before an entry is re-read (default 600)
+    BOOK_METADATA_CACHE_SIZE    maximum cached filenames (default 5000)
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BookMetadataCache:
+    """LRU + TTL cache of filename -> enrichment dict ({} when the book is unknown)"""
+
+    def __init__(self, ttl: float = 600.0, max_size: int = 5000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, filenames: Iterable[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Split filenames into cached results and the ones that still need a query"""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        for filename in filenames:
+            if filename in found or filename in missing:
+                continue
+            entry = self._entries.get(filename)
+            if entry is not None and entry[0] >= now:
+                self._entries.move_to_end(filename)
+                found[filename] = entry[1]
+                self.hits += 1
+            else:
+                if entry is not None:
+                    del self._entries[filename]
+                missing.append(filename)
+                self.misses += 1
+        return found, missing
+
+    def put_many(self, results: Dict[str, Dict[str, Any]]):
+        expires_at = time.monotonic() + self.ttl
+        for filename, metadata in results.items():
+            self._entries[filename] = (expires_at, metadata)
+            self._entries.move_to_end(filename)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, filename: Optional[str] = None):
+        if filename is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(filename, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+book_metadata_cache = BookMetadataCache(
+    ttl=float(os.getenv("BOOK_METADATA_CACHE_TTL", "600")),
+    max_size=int(os.getenv("BOOK_METADATA_CACHE_SIZE", "5000")),
+)
+
+
+def invalidate_book_metadata(filename: Optional[str] = None):
+    """Drop one filename (or everything) after books/authors are edited"""
+    book_metadata_cache.invalidate(filename)
+    logger.info(f"📤 Book metadata cache invalidated ({filename or 'all'})")
@@ -5,12 +5,29 @@ Provides enhanced book endpoints with proper multi-author metadata
 
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
-import asyncpg
 import os
 import logging
+try:
+    from db_pool import get_pool
+    from schema_capabilities import get_schema_capabilities
+    from pagination import Keyset, SortKey, count_total, page_count, resolve_total_mode
+except ImportError:
+    from backend.db_pool import get_pool
+    from backend.schema_capabilities import get_schema_capabilities
+    from backend.pagination import Keyset, SortKey, count_total, page_count, resolve_total_mode
 
 logger = logging.getLogger(__name__)
 
+# Keyset orders: newest books first, authors by name (id breaks ties)
+BOOKS_KEYSET = Keyset(
+    SortKey("processed_at", "b.processed_at", "timestamp", descending=True, nulls_as="'-infinity'"),
+    SortKey("id", "b.id", "integer", descending=True)
+)
+AUTHORS_KEYSET = Keyset(
+    SortKey("name", "a.name", "text"),
+    SortKey("id", "a.id", "integer")
+)
+
 router = APIRouter(prefix="/api/v2/books", tags=["books-v2"])
 
 # Global database pool
@@ -23,7 +40,7 @@ async def get_db_pool():
         database_url = os.getenv('DATABASE_URL')
         if not database_url:
             raise HTTPException(status_code=500, detail="Database not configured")
-        _pool = await asyncpg.create_pool(database_url)
+        _pool = await get_pool('books_api', database_url)
     return _pool
 
 @router.get("/")
@@ -32,7 +49,9 @@ async def list_books_v2(
     limit: int = Query(50, ge=1, le=100, description="Items per page"),
     author: Optional[str] = Query(None, description="Filter by author name"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    document_type: Optional[str] = Query(None, description="Filter by document type (book/article)")
+    document_type: Optional[str] = Query(None, description="Filter by document type (book/article)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over page)"),
+    total: Optional[str] = Query(None, description="exact, estimate or none (default: exact for pages, none with a cursor)")
 ):
     """
     List books with multi-author support and filtering
@@ -40,17 +59,18 @@ async def list_books_v2(
     Returns books from the books table with proper author relationships,
     replacing the old documents-based aggregation.
     """
+    try:
+        after = BOOKS_KEYSET.decode(cursor)
+        total_mode = resolve_total_mode(total, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         pool = await get_db_pool()
         
         async with pool.acquire() as conn:
             # Check if books table exists
-            books_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'books'
-                )
-            """)
+            books_exists = (await get_schema_capabilities()).has_table('books')
             
             if not books_exists:
                 raise HTTPException(
@@ -65,7 +85,11 @@ async def list_books_v2(
             
             if author:
                 param_count += 1
-                where_conditions.append(f"a.name ILIKE ${param_count}")
+                where_conditions.append(f"""EXISTS (
+                    SELECT 1 FROM document_authors fda
+                    JOIN authors fa ON fa.id = fda.author_id
+                    WHERE fda.book_id = b.id AND fa.name ILIKE ${param_count}
+                )""")
                 params.append(f"%{author}%")
             
             if category:
@@ -82,27 +106,34 @@ async def list_books_v2(
             if where_conditions:
                 where_clause = "WHERE " + " AND ".join(where_conditions)
             
-            # Calculate offset
-            offset = (page - 1) * limit
+            # A cursor replaces the OFFSET; page still works without one
+            keyset_condition, keyset_params = BOOKS_KEYSET.after(after, param_count + 1)
+            param_count += len(keyset_params)
+            offset = 0 if after else (page - 1) * limit
             param_count += 1
             limit_param = param_count
             param_count += 1
             offset_param = param_count
-            params.extend([limit, offset])
             
-            # Main query with multi-author support
+            # Pick the page of books first, then aggregate authors and chunk counts
+            # for those rows only (one row past the page tells whether there is a next one)
             query = f"""
-                WITH book_authors AS (
-                    SELECT 
-                        b.id,
-                        b.filename,
-                        b.title,
-                        b.category,
-                        b.document_type,
-                        b.mc_press_url,
-                        b.article_url,
-                        b.total_pages,
-                        b.processed_at,
+                WITH page AS (
+                    SELECT b.id, b.filename, b.title, b.category, b.document_type,
+                           b.mc_press_url, b.article_url, b.total_pages, b.processed_at
+                    FROM books b
+                    {where_clause or 'WHERE TRUE'} AND {keyset_condition}
+                    ORDER BY {BOOKS_KEYSET.order_by()}
+                    LIMIT ${limit_param} OFFSET ${offset_param}
+                )
+                SELECT 
+                    b.*,
+                    ba.authors_json,
+                    ba.authors_string,
+                    (SELECT COUNT(*) FROM documents d WHERE d.filename = b.filename) as chunk_count
+                FROM page b
+                LEFT JOIN LATERAL (
+                    SELECT
                         ARRAY_AGG(
                             json_build_object(
                                 'id', a.id,
@@ -110,35 +141,21 @@ async def list_books_v2(
                                 'site_url', a.site_url,
                                 'order', da.author_order
                             ) ORDER BY da.author_order
-                        ) FILTER (WHERE a.id IS NOT NULL) as authors_json,
-                        STRING_AGG(a.name, '; ' ORDER BY da.author_order) as authors_string,
-                        COUNT(d.id) as chunk_count
-                    FROM books b
-                    LEFT JOIN document_authors da ON b.id = da.book_id
-                    LEFT JOIN authors a ON da.author_id = a.id
-                    LEFT JOIN documents d ON b.filename = d.filename
-                    {where_clause}
-                    GROUP BY b.id, b.filename, b.title, b.category, 
-                             b.document_type, b.mc_press_url, b.article_url, 
-                             b.total_pages, b.processed_at
-                    ORDER BY b.processed_at DESC
-                    LIMIT ${limit_param} OFFSET ${offset_param}
-                )
-                SELECT * FROM book_authors
+                        ) as authors_json,
+                        STRING_AGG(a.name, '; ' ORDER BY da.author_order) as authors_string
+                    FROM document_authors da
+                    JOIN authors a ON da.author_id = a.id
+                    WHERE da.book_id = b.id
+                ) ba ON true
+                ORDER BY {BOOKS_KEYSET.order_by()}
             """
             
-            rows = await conn.fetch(query, *params)
+            rows = await conn.fetch(query, *params, *keyset_params, limit + 1, offset)
+            next_cursor = BOOKS_KEYSET.cursor_for(rows[limit - 1]) if len(rows) > limit else None
+            rows = rows[:limit]
             
-            # Get total count for pagination
-            count_query = f"""
-                SELECT COUNT(DISTINCT b.id)
-                FROM books b
-                LEFT JOIN document_authors da ON b.id = da.book_id
-                LEFT JOIN authors a ON da.author_id = a.id
-                {where_clause}
-            """
-            
-            total_count = await conn.fetchval(count_query, *params[:-2])  # Exclude limit/offset params
+            # Total for pagination (exact, estimated or skipped)
+            total_count = await count_total(conn, total_mode, f"SELECT 1 FROM books b {where_clause}", *params)
             
             books = []
             for row in rows:
@@ -167,7 +184,8 @@ async def list_books_v2(
                     'page': page,
                     'limit': limit,
                     'total': total_count,
-                    'pages': (total_count + limit - 1) // limit
+                    'pages': page_count(total_count, limit),
+                    'next_cursor': next_cursor
                 },
                 'filters': {
                     'author': author,
@@ -253,11 +271,19 @@ async def get_book_v2(book_id: int):
 async def list_authors_v2(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(50, ge=1, le=100, description="Items per page"),
-    search: Optional[str] = Query(None, description="Search author names")
+    search: Optional[str] = Query(None, description="Search author names"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over page)"),
+    total: Optional[str] = Query(None, description="exact, estimate or none (default: exact for pages, none with a cursor)")
 ):
     """
     List all authors with their document counts
     """
+    try:
+        after = AUTHORS_KEYSET.decode(cursor)
+        total_mode = resolve_total_mode(total, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         pool = await get_db_pool()
         
@@ -269,37 +295,31 @@ async def list_authors_v2(
                 where_clause = "WHERE a.name ILIKE $1"
                 params.append(f"%{search}%")
             
-            # Calculate offset
-            offset = (page - 1) * limit
-            params.extend([limit, offset])
+            # A cursor replaces the OFFSET; page still works without one
+            keyset_condition, keyset_params = AUTHORS_KEYSET.after(after, len(params) + 1)
+            offset = 0 if after else (page - 1) * limit
+            limit_param = len(params) + len(keyset_params) + 1
             
-            # Main query
+            # Main query (one row past the page tells whether there is a next one)
             query = f"""
                 SELECT 
                     a.id,
                     a.name,
                     a.site_url,
                     a.created_at,
-                    COUNT(da.book_id) as document_count
+                    (SELECT COUNT(*) FROM document_authors da WHERE da.author_id = a.id) as document_count
                 FROM authors a
-                LEFT JOIN document_authors da ON a.id = da.author_id
-                {where_clause}
-                GROUP BY a.id, a.name, a.site_url, a.created_at
-                ORDER BY a.name
-                LIMIT ${len(params)-1} OFFSET ${len(params)}
+                {where_clause or 'WHERE TRUE'} AND {keyset_condition}
+                ORDER BY {AUTHORS_KEYSET.order_by()}
+                LIMIT ${limit_param} OFFSET ${limit_param + 1}
             """
             
-            rows = await conn.fetch(query, *params)
-            
-            # Get total count
-            count_query = f"""
-                SELECT COUNT(DISTINCT a.id)
-                FROM authors a
-                {where_clause}
-            """
+            rows = await conn.fetch(query, *params, *keyset_params, limit + 1, offset)
+            next_cursor = AUTHORS_KEYSET.cursor_for(rows[limit - 1]) if len(rows) > limit else None
+            rows = rows[:limit]
             
-            count_params = params[:-2] if search else []
-            total_count = await conn.fetchval(count_query, *count_params)
+            # Total (exact, estimated or skipped)
+            total_count = await count_total(conn, total_mode, f"SELECT 1 FROM authors a {where_clause}", *params)
             
             authors = []
             for row in rows:
@@ -317,7 +337,8 @@ async def list_authors_v2(
                     'page': page,
                     'limit': limit,
                     'total': total_count,
-                    'pages': (total_count + limit - 1) // limit
+                    'pages': page_count(total_count, limit),
+                    'next_cursor': next_cursor
                 },
                 'search': search
             }
@@ -1,12 +1,21 @@
 import openai
-from typing import AsyncGenerator, Dict, Any, List
+from typing import AsyncGenerator, Dict, Any, List, Optional
+import asyncio
 import os
 import json
 import logging
+import time
 from datetime import datetime
 import tiktoken
-import asyncpg
 from .config import OPENAI_CONFIG, SEARCH_CONFIG, RESPONSE_CONFIG, TEMPORAL_CONFIG
+from .db_pool import get_pool
+from .book_metadata_cache import book_metadata_cache
+from .schema_capabilities import get_schema_capabilities, TEMPORAL_COLUMNS
+from .context_packer import ContextPacker
+from .conversation_history import (
+    ConversationHistory, ConversationHistoryStore, create_history_store, persistent_conversation_id,
+)
+from .stage_timings import StageTimings
 
 # Set up logging for source relevance debugging
 logging.basicConfig(level=logging.INFO)
@@ -102,7 +111,7 @@ def apply_temporal_boost(documents: list, era_intent: str, boost_amount: float =
 
 
 class ChatHandler:
-    def __init__(self, vector_store, conversation_service=None):
+    def __init__(self, vector_store, conversation_service=None, history_store: Optional[ConversationHistoryStore] = None):
         self.vector_store = vector_store
         self.conversation_service = conversation_service  # Optional - for persistence
         api_key = os.getenv("OPENAI_API_KEY")
@@ -110,64 +119,91 @@ class ChatHandler:
             logger.error("OPENAI_API_KEY not found in environment variables!")
             raise ValueError("OPENAI_API_KEY environment variable is required")
         self.client = openai.AsyncOpenAI(api_key=api_key)
-        self.conversations = {}  # In-memory cache for performance
-        self.db_conversation_ids = {}  # Map in-memory IDs to DB conversation IDs
+        # Recent messages + DB conversation id per conversation (bounded; misses reload from the DB)
+        self.history_limit = RESPONSE_CONFIG["max_conversation_history"]
+        self.history = history_store or create_history_store(self.history_limit)
         # Initialize tiktoken encoder for token counting
         self.model = OPENAI_CONFIG["model"]
         self.encoding = tiktoken.encoding_for_model(self.model)
         self.max_context_tokens = 6000  # Increased from 3000 to provide richer context
+        # Packs ranked chunks into the budget; token counts cached per chunk content
+        self.context_packer = ContextPacker(self.encoding)
         
     async def _ensure_conversation_exists(self, conversation_id: str, first_message: str, user_id: str = "guest") -> str:
         """
         Ensure conversation exists in database. Creates if needed.
         Returns the database conversation ID.
         """
-        if not self.conversation_service:
-            return conversation_id  # No persistence - return as-is
+        return (await self._load_history(conversation_id, first_message, user_id)).db_id
 
-        # Check if we already have a DB conversation for this in-memory ID
-        if conversation_id in self.db_conversation_ids:
-            return self.db_conversation_ids[conversation_id]
+    async def _load_history(self, conversation_id: str, first_message: str, user_id: str = "guest") -> ConversationHistory:
+        """
+        Recent history of a conversation: from the history store, else the last
+        max_conversation_history messages from the database (creating the
+        conversation there if it doesn't exist yet).
 
+        The client's id is either a DB conversation id or its own label (the
+        frontend sends 'default'). A label is stored under the
+        persistent_conversation_id derived from it, so any worker finds it again.
+        """
+        key = persistent_conversation_id(conversation_id, user_id)
+        history = await self.history.get(key, user_id)
+        if history is not None:
+            return history
+
+        history = ConversationHistory(db_id=key, user_id=user_id)
+        if self.conversation_service:
+            for db_id in dict.fromkeys((conversation_id, key)):
+                try:
+                    # Try to get existing conversation from DB
+                    messages = await self.conversation_service.get_recent_messages(
+                        db_id, user_id, self.history_limit
+                    )
+                except ValueError:
+                    continue
+                history.db_id = db_id
+                history.messages.extend({"role": m.role, "content": m.content} for m in messages)
+                logger.info(f"✅ Found existing conversation in DB: {db_id} ({len(messages)} recent messages)")
+                break
+            else:
+                # Conversation doesn't exist - create it under the derived id
+                try:
+                    conv = await self.conversation_service.create_conversation(
+                        user_id=user_id,
+                        initial_message=first_message,
+                        conversation_id=key
+                    )
+                    logger.info(f"✅ Created new conversation in DB: {conv.id} - '{conv.title}'")
+                except Exception as e:
+                    # Includes losing the race to another worker creating it - db_id is right either way
+                    logger.error(f"⚠️ Failed to create conversation in DB: {e}")
+
+        await self.history.put(key, history)
+        return history
+
+    async def _load_history_or_none(self, conversation_id: str, first_message: str, user_id: str = "guest") -> Optional[ConversationHistory]:
+        """_load_history that logs failures instead of raising (chat works without persistence)"""
         try:
-            # Try to get existing conversation from DB
-            conv, messages = await self.conversation_service.get_conversation_with_messages(
-                conversation_id, user_id
-            )
-            # Found existing - map it
-            self.db_conversation_ids[conversation_id] = conv.id
-            logger.info(f"✅ Found existing conversation in DB: {conv.id}")
-            return conv.id
-        except ValueError:
-            # Conversation doesn't exist - create it
-            try:
-                conv = await self.conversation_service.create_conversation(
-                    user_id=user_id,
-                    initial_message=first_message
-                )
-                self.db_conversation_ids[conversation_id] = conv.id
-                logger.info(f"✅ Created new conversation in DB: {conv.id} - '{conv.title}'")
-                return conv.id
-            except Exception as e:
-                logger.error(f"⚠️ Failed to create conversation in DB: {e}")
-                return conversation_id  # Fallback to in-memory only
+            return await self._load_history(conversation_id, first_message, user_id)
+        except Exception as e:
+            logger.error(f"⚠️ Failed to create/load conversation (continuing without persistence): {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            return None
 
-    async def _save_message_to_db(self, conversation_id: str, role: str, content: str, metadata: dict = None):
-        """Save message to database"""
+    async def _save_message_to_db(self, db_conversation_id: str, role: str, content: str, metadata: dict = None):
+        """Queue message for the database (written behind, in batches - doesn't wait for the write)"""
         if not self.conversation_service:
             return  # No persistence available
 
-        # Get the DB conversation ID
-        db_conv_id = self.db_conversation_ids.get(conversation_id, conversation_id)
-
         try:
-            await self.conversation_service.add_message(
-                conversation_id=db_conv_id,
+            await self.conversation_service.queue_message(
+                conversation_id=db_conversation_id,
                 role=role,
                 content=content,
                 metadata=metadata or {}
             )
-            logger.info(f"✅ Saved {role} message to DB conversation {db_conv_id}")
+            logger.info(f"✅ Queued {role} message for DB conversation {db_conversation_id}")
         except Exception as e:
             logger.error(f"⚠️ Failed to save message to DB: {e}")
 
@@ -177,24 +213,10 @@ class ChatHandler:
     
     def truncate_context_by_tokens(self, context: str) -> str:
         """Truncate context to fit within token limits"""
-        token_count = self.count_tokens(context)
-        
-        if token_count <= self.max_context_tokens:
-            return context
-            
-        logger.info(f"Context too long ({token_count} tokens), truncating to {self.max_context_tokens}")
-        
-        # Simple truncation - take first portion that fits
-        words = context.split()
-        truncated = ""
-        
-        for word in words:
-            test_context = truncated + " " + word if truncated else word
-            if self.count_tokens(test_context) > self.max_context_tokens:
-                break
-            truncated = test_context
-            
-        return truncated
+        packed = self.context_packer.pack([context], self.max_context_tokens)
+        if packed.truncated:
+            logger.info(f"Context too long, truncated to {packed.tokens} tokens")
+        return packed.text
     
     def calculate_confidence(self, relevant_docs: List[Dict[str, Any]]) -> float:
         """
@@ -220,41 +242,58 @@ class ChatHandler:
         logger.info(f"Conversation ID: {conversation_id}")
         logger.info(f"User ID: {user_id}")
 
-        # Ensure conversation exists in database (non-blocking - chat works even if this fails)
-        try:
-            await self._ensure_conversation_exists(conversation_id, message, user_id)
-        except Exception as e:
-            logger.error(f"⚠️ Failed to create/load conversation (continuing without persistence): {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-        
-        # Get more results initially to have options for filtering
-        logger.info("Step 1: Calling vector store search...")
-        search_results = await self.vector_store.search(message, n_results=SEARCH_CONFIG["initial_search_results"])
-        logger.info(f"Step 1 Result: Found {len(search_results)} initial search results")
+        # Pre-LLM pipeline: conversation bookkeeping (may create the conversation and
+        # generate its title) doesn't feed retrieval, so the two run side by side
+        timings = StageTimings()
+        history_task = asyncio.create_task(
+            timings.run("history", self._load_history_or_none(conversation_id, message, user_id))
+        )
         
-        # Log raw search results
-        for i, result in enumerate(search_results[:3]):
-            logger.info(f"  Raw Result {i+1}: distance={result.get('distance', 'N/A')}, filename={result.get('metadata', {}).get('filename', 'Unknown')}")
+        try:
+            # Get more results initially to have options for filtering
+            logger.info("Step 1: Calling vector store search...")
+            search_results = await timings.run(
+                "search",
+                self.vector_store.search(message, n_results=SEARCH_CONFIG["initial_search_results"], timings=timings),
+            )
+            logger.info(f"Step 1 Result: Found {len(search_results)} initial search results")
         
-        # Filter results by relevance threshold
-        logger.info("Step 2: Filtering results by relevance...")
-        relevant_docs = await self._filter_relevant_documents(search_results, message)
-        logger.info(f"Step 2 Result: {len(relevant_docs)} documents passed filtering")
+            # Log raw search results
+            for i, result in enumerate(search_results[:3]):
+                logger.info(f"  Raw Result {i+1}: distance={result.get('distance', 'N/A')}, filename={result.get('metadata', {}).get('filename', 'Unknown')}")
         
-        # Build context
-        logger.info("Step 3: Building context from relevant documents...")
-        context = self._build_context(relevant_docs)
+            # Filter results by relevance threshold
+            logger.info("Step 2: Filtering results by relevance...")
+            relevant_docs = await timings.run("filter", self._filter_relevant_documents(search_results, message))
+            logger.info(f"Step 2 Result: {len(relevant_docs)} documents passed filtering")
         
-        # Apply token-based truncation
-        context = self.truncate_context_by_tokens(context)
-        context_tokens = self.count_tokens(context)
+            # Build context: whole chunks in ranked order within the token budget
+            logger.info("Step 3: Building context from relevant documents...")
+            with timings.measure("context"):
+                packed = self.context_packer.pack(
+                    self._context_parts(relevant_docs),
+                    self.max_context_tokens,
+                    token_counts=self._context_token_counts(relevant_docs),
+                )
+            context = packed.text
+            context_tokens = packed.tokens
+            if packed.truncated:
+                logger.info(f"Context packed to {packed.chunks_used}/{packed.chunks_total} chunks within {self.max_context_tokens} tokens")
         
-        logger.info(f"Step 3 Result: Context length = {len(context)} characters, {context_tokens} tokens")
-        logger.info(f"Context preview: {context[:200]}..." if context else "Context is EMPTY")
+            logger.info(f"Step 3 Result: Context length = {len(context)} characters, {context_tokens} tokens")
+            logger.info(f"Context preview: {context[:200]}..." if context else "Context is EMPTY")
         
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
+            history = await history_task
+        finally:
+            # Search or filtering failed: don't leave the bookkeeping task orphaned
+            # (or its exception unretrieved)
+            history_task.cancel()
+            await asyncio.gather(history_task, return_exceptions=True)
+        timings.mark("pre_llm")
+        history_key = persistent_conversation_id(conversation_id, user_id)
+        if history is None:
+            history = ConversationHistory(db_id=history_key, user_id=user_id)
+            await self.history.put(history_key, history)
         
         current_date = datetime.now().strftime('%Y-%m-%d')
         current_year = datetime.now().year
@@ -352,7 +391,7 @@ class ChatHandler:
             }
         ]
         
-        messages.extend(self.conversations[conversation_id][-RESPONSE_CONFIG["max_conversation_history"]:])
+        messages.extend(list(history.messages)[-self.history_limit:])
         
         if context.strip():
             user_content = f"""Here is the relevant content from the uploaded PDF documents:
@@ -378,7 +417,11 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
             "content": user_content
         })
         
+        # Source enrichment (book/author lookup) runs while the answer streams
+        sources_task = asyncio.create_task(timings.run("sources", self._format_sources(relevant_docs)))
+        
         try:
+            llm_started = time.perf_counter()
             stream = await self.client.chat.completions.create(
                 model=OPENAI_CONFIG["model"],
                 messages=messages,
@@ -391,6 +434,10 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
             async for chunk in stream:
                 if chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
+                    if not full_response:
+                        timings.record("llm_first_token", time.perf_counter() - llm_started)
+                        timings.mark("first_token")
+                        logger.info(f"⏱️ Time to first token: {timings.summary()}")
                     full_response += content
                     yield {
                         "type": "content",
@@ -398,32 +445,39 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
                         "timestamp": datetime.now().isoformat()
                     }
             
-            # Save to in-memory conversation
-            self.conversations[conversation_id].append({"role": "user", "content": message})
-            self.conversations[conversation_id].append({"role": "assistant", "content": full_response})
+            # Save to in-memory conversation (no-op if it was evicted meanwhile - reloaded next turn)
+            await self.history.append(history_key, [
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": full_response},
+            ])
 
             # Save messages to database (non-blocking - chat works even if this fails)
             try:
                 await self._save_message_to_db(
-                    conversation_id,
+                    history.db_id,
                     "user",
                     message,
                     metadata={"sources": relevant_docs[:3] if relevant_docs else []}  # Store top 3 sources
                 )
                 await self._save_message_to_db(
-                    conversation_id,
+                    history.db_id,
                     "assistant",
                     full_response,
                     metadata={
                         "model": OPENAI_CONFIG["model"],
                         "confidence": self.calculate_confidence(relevant_docs),
                         "source_count": len(relevant_docs),
-                        "context_tokens": self.count_tokens(context) if context else 0
+                        "context_tokens": context_tokens
                     }
                 )
             except Exception as e:
                 logger.error(f"⚠️ Failed to save messages to DB (continuing): {e}")
             
+            timings.record("llm", time.perf_counter() - llm_started)
+            sources = await sources_task
+            timings.mark("total")
+            logger.info(f"⏱️ Chat stages: {timings.summary()}")
+            
             # Calculate response metadata
             confidence_score = self.calculate_confidence(relevant_docs)
             threshold_used = self._get_dynamic_threshold(message)
@@ -435,13 +489,14 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
                 "model_used": OPENAI_CONFIG["model"],
                 "temperature": OPENAI_CONFIG["temperature"],
                 "threshold_used": threshold_used,
-                "context_tokens": self.count_tokens(context) if context else 0,
+                "context_tokens": context_tokens,
+                "timings_ms": timings.as_dict(),
                 "timestamp": datetime.now().isoformat()
             }
             
             yield {
                 "type": "done",
-                "sources": await self._format_sources(relevant_docs),
+                "sources": sources,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -451,35 +506,61 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
-    
+        finally:
+            # The LLM call failed or the client went away mid-stream (generator closed
+            # or cancelled): don't leave the enrichment task orphaned (or its exception
+            # unretrieved)
+            sources_task.cancel()
+            await asyncio.gather(sources_task, return_exceptions=True)
+
     def _build_context(self, documents: List[Dict[str, Any]]) -> str:
-        context_parts = []
-        
+        return "\n---\n".join(self._context_parts(documents))
+
+    def _context_parts(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """One '[Source: ...]' annotated block per document, in ranked order"""
+        return [f"{self._source_header(doc)}\n{doc['content']}\n" for doc in documents]
+
+    def _context_token_counts(self, documents: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Token count of each _context_parts block from the chunk's stored token_count.
+
+        Only the short source header is tokenized (and cached by the packer); None
+        for chunks without a stored count, which the packer then counts itself.
+        """
+        counts = []
         for doc in documents:
-            metadata = doc.get("metadata", {})
-            source_info = f"[Source: {metadata.get('filename', 'Unknown')}"
-            
-            if metadata.get("page"):
-                source_info += f", Page {metadata['page']}"
-            
-            if metadata.get("type"):
-                source_info += f", Type: {metadata['type']}"
-            
-            # Era annotation: include only when rpg_era is set and not "general"
-            rpg_era = doc.get("rpg_era")
-            if rpg_era is not None and rpg_era != "general":
-                source_info += f", Era: {rpg_era}"
-            
-            # Year annotation: include only when publication_year is set
-            publication_year = doc.get("publication_year")
-            if publication_year is not None:
-                source_info += f", Year: {publication_year}"
-            
-            source_info += "]"
-            
-            context_parts.append(f"{source_info}\n{doc['content']}\n")
+            stored = doc.get("token_count")
+            if stored is None:
+                counts.append(None)
+                continue
+            counts.append(
+                self.context_packer.count(f"{self._source_header(doc)}\n")
+                + stored
+                + self.context_packer.count("\n")
+            )
+        return counts
+
+    def _source_header(self, doc: Dict[str, Any]) -> str:
+        metadata = doc.get("metadata", {})
+        source_info = f"[Source: {metadata.get('filename', 'Unknown')}"
+        
+        if metadata.get("page"):
+            source_info += f", Page {metadata['page']}"
+        
+        if metadata.get("type"):
+            source_info += f", Type: {metadata['type']}"
+        
+        # Era annotation: include only when rpg_era is set and not "general"
+        rpg_era = doc.get("rpg_era")
+        if rpg_era is not None and rpg_era != "general":
+            source_info += f", Era: {rpg_era}"
+        
+        # Year annotation: include only when publication_year is set
+        publication_year = doc.get("publication_year")
+        if publication_year is not None:
+            source_info += f", Year: {publication_year}"
         
-        return "\n---\n".join(context_parts)
+        return source_info + "]"
     
     def _get_dynamic_threshold(self, query: str) -> float:
         """
@@ -533,19 +614,22 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
         era_intent = intent_detector.detect_era(query)
         logger.info(f"🕰️ Era intent detected: '{era_intent}'")
 
-        # 2. Extract filenames and look up rpg_era metadata
-        filenames = [
-            doc.get("metadata", {}).get("filename", "")
-            for doc in documents
-        ]
-        era_lookup = await self._lookup_rpg_eras(filenames)
-
-        # 3. Attach rpg_era to each document
-        for doc in documents:
-            filename = doc.get("metadata", {}).get("filename", "")
-            era_info = era_lookup.get(filename, {"rpg_era": "general", "publication_year": None})
-            doc["rpg_era"] = era_info["rpg_era"]
-            doc["publication_year"] = era_info["publication_year"]
+        # 2. rpg_era metadata: joined into the search query by the Postgres store;
+        #    looked up here only for results that came without it
+        unresolved = [doc for doc in documents if "rpg_era" not in doc]
+        if unresolved:
+            filenames = [
+                doc.get("metadata", {}).get("filename", "")
+                for doc in unresolved
+            ]
+            era_lookup = await self._lookup_rpg_eras(filenames)
+
+            # 3. Attach rpg_era to each document
+            for doc in unresolved:
+                filename = doc.get("metadata", {}).get("filename", "")
+                era_info = era_lookup.get(filename, {"rpg_era": "general", "publication_year": None})
+                doc["rpg_era"] = era_info["rpg_era"]
+                doc["publication_year"] = era_info["publication_year"]
 
         # 4. Apply temporal boost
         boost_amount = TEMPORAL_CONFIG["era_boost_amount"]
@@ -587,7 +671,7 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
         return filtered_docs
     
     async def _format_sources(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        sources = []
+        unique_docs = []
         seen = set()
         
         for doc in documents:
@@ -604,31 +688,35 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
             
             if key not in seen:
                 seen.add(key)
-                
-                # Extract content type from metadata
-                content_type = (metadata.get("type") or 
-                               metadata.get("content_type") or 
-                               "text")
-                
-                # Enrich with database metadata
-                logger.info(f"About to enrich metadata for: {filename}")
-                enriched_metadata = await self._enrich_source_metadata(filename)
-                logger.info(f"Enrichment result: {enriched_metadata}")
-                
-                sources.append({
-                    "filename": filename,
-                    "page": page,
-                    "type": content_type,
-                    "distance": doc.get("distance", 0),
-                    "title": enriched_metadata.get("title", filename.replace('.pdf', '')),  # Add title field
-                    "author": enriched_metadata.get("author", metadata.get("author", "Unknown")),
-                    "mc_press_url": enriched_metadata.get("mc_press_url", metadata.get("mc_press_url", "")),
-                    "article_url": enriched_metadata.get("article_url"),
-                    "document_type": enriched_metadata.get("document_type", "book"),
-                    "authors": enriched_metadata.get("authors", []),
-                    "publication_year": enriched_metadata.get("publication_year"),
-                    "rpg_era": enriched_metadata.get("rpg_era", "general"),
-                })
+                unique_docs.append((doc, metadata, page, filename))
+        
+        # Enrich every source in one batched (and cached) lookup
+        enriched_by_filename = await self._enrich_sources_metadata(
+            [filename for _, _, _, filename in unique_docs]
+        )
+        
+        sources = []
+        for doc, metadata, page, filename in unique_docs:
+            # Extract content type from metadata
+            content_type = (metadata.get("type") or 
+                           metadata.get("content_type") or 
+                           "text")
+            enriched_metadata = enriched_by_filename.get(filename, {})
+            
+            sources.append({
+                "filename": filename,
+                "page": page,
+                "type": content_type,
+                "distance": doc.get("distance", 0),
+                "title": enriched_metadata.get("title", filename.replace('.pdf', '')),  # Add title field
+                "author": enriched_metadata.get("author", metadata.get("author", "Unknown")),
+                "mc_press_url": enriched_metadata.get("mc_press_url", metadata.get("mc_press_url", "")),
+                "article_url": enriched_metadata.get("article_url"),
+                "document_type": enriched_metadata.get("document_type", "book"),
+                "authors": enriched_metadata.get("authors", []),
+                "publication_year": enriched_metadata.get("publication_year"),
+                "rpg_era": enriched_metadata.get("rpg_era", "general"),
+            })
         
         return sources
     
@@ -653,14 +741,11 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
                 logger.warning("DATABASE_URL not available for rpg_era lookup")
                 return {fn: dict(default_entry) for fn in filenames}
 
-            conn = await asyncpg.connect(database_url)
-            try:
+            pool = await get_pool("chat_handler", database_url)
+            schema = await get_schema_capabilities()
+            async with pool.acquire() as conn:
                 # Check if temporal columns exist before querying them
-                temporal_cols = await conn.fetch("""
-                    SELECT column_name FROM information_schema.columns
-                    WHERE table_name = 'books' AND column_name IN ('publication_year', 'rpg_era')
-                """)
-                temporal_col_names = {row['column_name'] for row in temporal_cols}
+                temporal_col_names = schema.columns_of('books') & set(TEMPORAL_COLUMNS)
                 
                 if 'rpg_era' not in temporal_col_names:
                     logger.info("rpg_era column not yet available — returning defaults")
@@ -697,8 +782,6 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
                     len(rows),
                 )
                 return result
-            finally:
-                await conn.close()
 
         except Exception as e:
             logger.error(f"Error looking up rpg_eras: {e}")
@@ -706,97 +789,108 @@ If this question is clearly off-topic (not related to IBM i/midrange technologie
 
     async def _enrich_source_metadata(self, filename: str) -> Dict[str, Any]:
         """Enrich source with full book and author metadata from database"""
+        enriched = await self._enrich_sources_metadata([filename])
+        return enriched.get(filename, {})
+
+    async def _enrich_sources_metadata(self, filenames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Book and author metadata for a batch of source filenames.
+
+        Served from the process-local book metadata cache; misses are resolved with a
+        single query joining books, document_authors and authors. Filenames with no
+        book map to {} (callers fall back to chunk metadata).
+        """
+        enriched, missing = book_metadata_cache.get_many(filenames)
+        if not missing:
+            return enriched
+
         try:
-            # Create direct database connection
-            database_url = os.getenv('DATABASE_URL')
-            if not database_url:
-                logger.warning("DATABASE_URL not available for enrichment")
-                return {}
-            
-            logger.info(f"Enriching metadata for filename: {filename}")
-            conn = await asyncpg.connect(database_url)
-            
-            try:
-                # Check which temporal columns exist (safe for pre-migration state)
-                temporal_cols = await conn.fetch("""
-                    SELECT column_name FROM information_schema.columns
-                    WHERE table_name = 'books' AND column_name IN ('publication_year', 'rpg_era')
-                """)
-                temporal_col_names = {row['column_name'] for row in temporal_cols}
-                
-                # Build SELECT dynamically to avoid errors if temporal columns don't exist yet
-                select_fields = [
-                    "b.id", "b.filename", "b.title",
-                    "b.author as legacy_author", "b.mc_press_url",
-                    "b.article_url", "b.document_type",
-                ]
-                if 'publication_year' in temporal_col_names:
-                    select_fields.append("b.publication_year")
-                if 'rpg_era' in temporal_col_names:
-                    select_fields.append("b.rpg_era")
-                
-                # Get book metadata
-                book_data = await conn.fetchrow(f"""
-                    SELECT {', '.join(select_fields)}
-                    FROM books b
-                    WHERE b.filename = $1
-                    LIMIT 1
-                """, filename)
-                
-                if not book_data:
-                    logger.info(f"No book found for filename: {filename}")
-                    return {}
-                
-                logger.info(f"Found book: {book_data['title']} by {book_data['legacy_author']}")
-                
-                # Get detailed author information from document_authors table
-                authors = await conn.fetch("""
-                    SELECT 
-                        a.id,
-                        a.name,
-                        a.site_url,
-                        da.author_order
-                    FROM document_authors da
-                    JOIN authors a ON da.author_id = a.id
-                    WHERE da.book_id = $1
-                    ORDER BY da.author_order
-                """, book_data['id'])
-                
-                # Determine author information
-                if authors:
-                    # Use multi-author data if available
-                    author_names = ", ".join([author['name'] for author in authors])
-                    authors_list = [
-                        {
-                            "id": author['id'],
-                            "name": author['name'],
-                            "site_url": author['site_url'],
-                            "order": author['author_order']
-                        }
-                        for author in authors
-                    ]
-                    logger.info(f"Using multi-author data: {author_names}")
-                else:
-                    # Fall back to legacy author field
-                    author_names = book_data['legacy_author'] or "Unknown"
-                    authors_list = []
-                    logger.info(f"Using legacy author: {author_names}")
-                
-                return {
-                    "title": book_data['title'] or filename.replace('.pdf', ''),
-                    "author": author_names,
-                    "mc_press_url": book_data['mc_press_url'] or "",
-                    "article_url": book_data['article_url'],
-                    "document_type": book_data['document_type'] or "book",
-                    "authors": authors_list,
-                    "publication_year": book_data.get('publication_year'),
-                    "rpg_era": (book_data.get('rpg_era') or "general"),
-                }
-            finally:
-                await conn.close()
-                
+            fetched = await self._fetch_sources_metadata(missing)
         except Exception as e:
-            logger.error(f"Error enriching source metadata for {filename}: {e}")
+            # Don't cache failures - the next answer will retry
+            logger.error(f"Error enriching source metadata for {missing}: {e}")
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
-            return {}
\ No newline at end of file
+            return enriched
+
+        book_metadata_cache.put_many(fetched)
+        enriched.update(fetched)
+        return enriched
+
+    async def _fetch_sources_metadata(self, filenames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """One round trip for all filenames"""
+        database_url = os.getenv('DATABASE_URL')
+        if not database_url:
+            raise RuntimeError("DATABASE_URL not available for enrichment")
+
+        pool = await get_pool("chat_handler", database_url)
+        schema = await get_schema_capabilities()
+        async with pool.acquire() as conn:
+            # Check which temporal columns exist (safe for pre-migration state)
+            temporal_col_names = schema.columns_of('books') & set(TEMPORAL_COLUMNS)
+
+            # Build SELECT dynamically to avoid errors if temporal columns don't exist yet
+            select_fields = [
+                "b.id", "b.filename", "b.title",
+                "b.author as legacy_author", "b.mc_press_url",
+                "b.article_url", "b.document_type",
+            ]
+            if 'publication_year' in temporal_col_names:
+                select_fields.append("b.publication_year")
+            if 'rpg_era' in temporal_col_names:
+                select_fields.append("b.rpg_era")
+
+            rows = await conn.fetch(f"""
+                SELECT {', '.join(select_fields)},
+                    COALESCE(
+                        json_agg(
+                            json_build_object(
+                                'id', a.id,
+                                'name', a.name,
+                                'site_url', a.site_url,
+                                'order', da.author_order
+                            ) ORDER BY da.author_order
+                        ) FILTER (WHERE a.id IS NOT NULL),
+                        '[]'
+                    ) AS authors
+                FROM books b
+                LEFT JOIN document_authors da ON da.book_id = b.id
+                LEFT JOIN authors a ON a.id = da.author_id
+                WHERE b.filename = ANY($1::text[])
+                GROUP BY b.id
+                ORDER BY b.id
+            """, filenames)
+
+        result: Dict[str, Dict[str, Any]] = {filename: {} for filename in filenames}
+        for row in rows:
+            # Keep the first book per filename, as the per-filename lookup did
+            if not result.get(row['filename']):
+                result[row['filename']] = self._book_row_to_source_metadata(row)
+
+        logger.info(f"Enriched {len(filenames)} source filenames with one query ({len(rows)} books found)")
+        return result
+
+    @staticmethod
+    def _book_row_to_source_metadata(row) -> Dict[str, Any]:
+        """Shape a books row (with aggregated authors) into source enrichment fields"""
+        authors = row['authors']
+        if isinstance(authors, str):
+            authors = json.loads(authors)
+        authors = authors or []
+
+        if authors:
+            # Use multi-author data if available
+            author_names = ", ".join([author['name'] for author in authors])
+        else:
+            # Fall back to legacy author field
+            author_names = row['legacy_author'] or "Unknown"
+
+        return {
+            "title": row['title'] or row['filename'].replace('.pdf', ''),
+            "author": author_names,
+            "mc_press_url": row['mc_press_url'] or "",
+            "article_url": row['article_url'],
+            "document_type": row['document_type'] or "book",
+            "authors": authors,
+            "publication_year": row.get('publication_year'),
+            "rpg_era": (row.get('rpg_era') or "general"),
+        }
@@ -0,0 +1,62 @@
+"""
+Per-chunk token counts and content hashes, computed once at ingestion.
+
+Chunk text never changes after it is stored, so `add_documents` records each
+chunk's token count (for the chat model's tokenizer) and a content hash in the
+documents table. Retrieval returns both and ChatHandler budgets context with
+integer arithmetic instead of re-tokenizing. Rows ingested before the columns
+existed are filled in by `background_token_counts`.
+
+Configuration (environment):
+    OPENAI_MODEL    model whose tokenizer is used (default gpt-4o-mini, as in config.py)
+"""
+
+import logging
+import os
+import threading
+from typing import List, Optional, Sequence
+
+import tiktoken
+
+try:
+    from context_packer import content_hash
+except ImportError:
+    from backend.context_packer import content_hash
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkTokenCounter:
+    """Lazily loaded tokenizer for counting chunk tokens in batches"""
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self._encoding = None
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def _get_encoding(self):
+        if self._encoding is None:
+            with self._lock:
+                if self._encoding is None:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+        return self._encoding
+
+    def count_many(self, texts: Sequence[str]) -> List[Optional[int]]:
+        """Token count per text; None for all when the tokenizer can't be loaded (backfilled later)"""
+        try:
+            encoding = self._get_encoding()
+        except Exception as e:
+            if not self._warned:
+                logger.warning(f"⚠️ Tokenizer for {self.model} unavailable, chunk token counts left empty: {e}")
+                self._warned = True
+            return [None] * len(texts)
+        # Chunk text is data: count special-token strings as ordinary text
+        return [len(tokens) for tokens in encoding.encode_ordinary_batch(list(texts))]
+
+    @staticmethod
+    def hash_many(texts: Sequence[str]) -> List[str]:
+        return [content_hash(text) for text in texts]
+
+
+chunk_token_counter = ChunkTokenCounter()
@@ -22,6 +22,10 @@ try:
 except ImportError:
     from backend.code_file_validator import FileValidator, ValidationResult
     from backend.code_file_storage import CodeFileStorage, StoredFile
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
 
 
 class UploadSession(BaseModel):
@@ -88,12 +92,7 @@ class CodeUploadService:
 
     async def init_database(self):
         """Initialize database connection pool"""
-        self.pool = await asyncpg.create_pool(
-            self.database_url,
-            min_size=2,
-            max_size=10,
-            command_timeout=60
-        )
+        self.pool = await get_pool('code_upload', self.database_url)
         print("✅ Code Upload Service: Database pool created")
 
     async def close(self):
@@ -0,0 +1,120 @@
+"""
+Token-budgeted context packing for chat prompts.
+
+ChatHandler used to build the whole context string and then truncate it word
+by word, re-tokenizing the growing string after every word (quadratic in the
+context length). The packer instead:
+
+  - tokenizes each chunk once, caching the token count by content hash, so a
+    chunk retrieved again in a later turn costs a dictionary lookup
+  - adds whole chunks in ranked order while they fit the budget
+  - trims the first chunk that doesn't fit at a token boundary and stops
+
+Counts are summed per chunk (plus the separator), which can only overestimate
+the tokens of the joined string slightly, so the packed text stays within the
+budget. Callers that already know a chunk's count (token_count stored with the
+chunk at ingestion) pass it in and the chunk is not tokenized at all.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    chunks_used: int
+    chunks_total: int
+    truncated: bool
+
+
+class ContextPacker:
+    """Packs ranked context chunks into a token budget using cached per-chunk counts"""
+
+    def __init__(self, encoding, cache_size: int = 4096):
+        self.encoding = encoding
+        self.cache_size = cache_size
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str) -> int:
+        """Token count of one chunk (cached by content hash)"""
+        key = content_hash(text)
+        count = self._counts.get(key)
+        if count is not None:
+            self._counts.move_to_end(key)
+            self.hits += 1
+            return count
+        self.misses += 1
+        count = len(self.encoding.encode(text))
+        self._counts[key] = count
+        if len(self._counts) > self.cache_size:
+            self._counts.popitem(last=False)
+        return count
+
+    def trim(self, text: str, max_tokens: int) -> str:
+        """First max_tokens tokens of text, cut at a token boundary"""
+        if max_tokens <= 0:
+            return ""
+        tokens = self.encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        # A cut inside a multi-byte character decodes to U+FFFD - drop it
+        return self.encoding.decode(tokens[:max_tokens]).rstrip("�")
+
+    def pack(self, chunks: Sequence[str], budget: int, separator: str = "\n---\n",
+             token_counts: Optional[Sequence[Optional[int]]] = None) -> PackedContext:
+        """
+        Join chunks (highest ranked first) with separator, within budget tokens.
+
+        token_counts, if given, lines up with chunks; None entries are counted here.
+        """
+        separator_tokens = self.count(separator) if separator else 0
+        parts: List[str] = []
+        used = 0
+        truncated = False
+
+        for i, chunk in enumerate(chunks):
+            known = token_counts[i] if token_counts is not None else None
+            cost = (known if known is not None else self.count(chunk)) + (separator_tokens if parts else 0)
+            if used + cost <= budget:
+                parts.append(chunk)
+                used += cost
+                continue
+
+            # Doesn't fit: keep what fits of this chunk, then stop
+            truncated = True
+            remaining = budget - used - (separator_tokens if parts else 0)
+            head = self.trim(chunk, remaining)
+            if head.strip():
+                parts.append(head)
+                used += (separator_tokens if len(parts) > 1 else 0) + len(self.encoding.encode(head))
+            break
+
+        return PackedContext(
+            text=separator.join(parts),
+            tokens=used,
+            chunks_used=len(parts),
+            chunks_total=len(chunks),
+            truncated=truncated,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._counts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,184 @@
+"""
+Bounded store for recent chat history, keyed by conversation id.
+
+ChatHandler used to keep every conversation it had ever seen in two plain
+dicts (messages and the in-memory -> DB conversation id map), so a long-running
+worker grew without bound. History now lives in a ConversationHistoryStore, and
+the id map is not kept at all:
+
+  - a conversation the client labels with its own id (the frontend always sends
+    'default') is stored in the database under `persistent_conversation_id`,
+    derived from that label and the user, so every worker finds the same
+    conversation again without remembering anything
+  - the default `LRUConversationHistoryStore` keeps recent conversations in
+    process, capped by entry count and by (approximate) resident bytes, and
+    evicts the least recently used ones
+  - only the last `history_limit` messages are kept per conversation - the
+    prompt never uses more than MAX_CONVERSATION_HISTORY of them
+  - a miss is not an error: ChatHandler reloads the tail of the conversation
+    from ConversationService under that id, so eviction (or another worker
+    serving the next turn) costs a small query or two (one if the client sent a
+    DB id) instead of the context of the conversation
+
+The interface is async so a shared store (e.g. Redis) can be plugged in
+without touching ChatHandler.
+
+Configuration (environment):
+    CONVERSATION_CACHE_MAX_ENTRIES  conversations kept per process (default 1000)
+    CONVERSATION_CACHE_MAX_BYTES    approximate resident bytes kept per process (default 64MB)
+"""
+
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough per-message cost of the dict, its keys and the str headers on top of the text itself
+MESSAGE_OVERHEAD_BYTES = 200
+
+
+# Namespace of the DB ids derived from client conversation labels
+CLIENT_CONVERSATION_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "mcpress-chatbot/conversations")
+
+
+def persistent_conversation_id(conversation_id: str, user_id: Optional[str]) -> str:
+    """Stable DB id of the conversation a user's client labels `conversation_id`"""
+    return str(uuid.uuid5(CLIENT_CONVERSATION_NAMESPACE, f"{user_id or ''}/{conversation_id}"))
+
+
+def message_bytes(message: Dict[str, str]) -> int:
+    return len(message.get("content", "").encode("utf-8")) + MESSAGE_OVERHEAD_BYTES
+
+
+@dataclass
+class ConversationHistory:
+    """Recent messages of one conversation plus the id it is persisted under"""
+    db_id: str
+    user_id: Optional[str] = None
+    messages: Deque[Dict[str, str]] = field(default_factory=deque)
+    size_bytes: int = 0
+
+
+class ConversationHistoryStore(ABC):
+    """Interface for chat history storage (see LRUConversationHistoryStore)"""
+
+    @abstractmethod
+    async def get(self, conversation_id: str, user_id: Optional[str] = None) -> Optional[ConversationHistory]:
+        """History of the conversation, or None on a miss (or if it belongs to another user)"""
+
+    @abstractmethod
+    async def put(self, conversation_id: str, history: ConversationHistory):
+        """Store (or replace) the history of a conversation"""
+
+    @abstractmethod
+    async def append(self, conversation_id: str, messages: Iterable[Dict[str, str]]):
+        """Add messages to a stored conversation; a no-op if it isn't stored"""
+
+    @abstractmethod
+    async def discard(self, conversation_id: str):
+        """Forget a conversation"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class LRUConversationHistoryStore(ConversationHistoryStore):
+    """Per-process LRU of recent conversations, bounded by entries and bytes"""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024, history_limit: int = 10):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.history_limit = history_limit
+        self._entries: "OrderedDict[str, ConversationHistory]" = OrderedDict()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, conversation_id: str, user_id: Optional[str] = None) -> Optional[ConversationHistory]:
+        """Cached history, or None on a miss (also when it belongs to a different user)"""
+        history = self._entries.get(conversation_id)
+        if history is None or (user_id is not None and history.user_id not in (None, user_id)):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(conversation_id)
+        self.hits += 1
+        return history
+
+    async def put(self, conversation_id: str, history: ConversationHistory):
+        self._remove(conversation_id)
+        messages = list(history.messages)[-self.history_limit:] if self.history_limit > 0 else []
+        history.messages = deque(messages, maxlen=max(self.history_limit, 0))
+        history.size_bytes = sum(message_bytes(m) for m in history.messages)
+        self._entries[conversation_id] = history
+        self.resident_bytes += history.size_bytes
+        self._evict(keep=conversation_id)
+
+    async def append(self, conversation_id: str, messages: Iterable[Dict[str, str]]):
+        """Add messages to a resident conversation (no-op if it has been evicted)"""
+        history = self._entries.get(conversation_id)
+        if history is None:
+            return
+        for message in messages:
+            if history.messages.maxlen is not None and len(history.messages) == history.messages.maxlen:
+                if history.messages.maxlen == 0:
+                    continue
+                dropped = history.messages[0]
+                history.size_bytes -= message_bytes(dropped)
+                self.resident_bytes -= message_bytes(dropped)
+            history.messages.append(message)
+            size = message_bytes(message)
+            history.size_bytes += size
+            self.resident_bytes += size
+        self._entries.move_to_end(conversation_id)
+        self._evict(keep=conversation_id)
+
+    async def discard(self, conversation_id: str):
+        self._remove(conversation_id)
+
+    def _remove(self, conversation_id: str):
+        history = self._entries.pop(conversation_id, None)
+        if history is not None:
+            self.resident_bytes -= history.size_bytes
+
+    def _evict(self, keep: str):
+        """Drop least recently used conversations until both caps hold (never `keep`)"""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.resident_bytes > self.max_bytes
+        ):
+            conversation_id = next(iter(self._entries))
+            if conversation_id == keep:
+                break
+            self._remove(conversation_id)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "resident_bytes": self.resident_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def create_history_store(history_limit: int) -> ConversationHistoryStore:
+    """History store configured from the environment"""
+    return LRUConversationHistoryStore(
+        max_entries=int(os.getenv("CONVERSATION_CACHE_MAX_ENTRIES", "1000")),
+        max_bytes=int(os.getenv("CONVERSATION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        history_limit=history_limit,
+    )
@@ -115,10 +115,16 @@ class ConversationListFilters(BaseModel):
 class ConversationListResponse(BaseModel):
     """Response for listing conversations"""
     conversations: List[Conversation]
-    total: int
+    total: Optional[int]  # None when not requested (total=none, the default for cursor pages)
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to get the next page
+
+
+class ConversationSearchResponse(ConversationListResponse):
+    """Search results, best match first"""
+    snippets: Dict[str, str] = {}  # Conversation id -> matching excerpt, terms wrapped in <mark>
 
 
 class ConversationWithMessages(BaseModel):
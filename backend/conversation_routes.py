@@ -16,11 +16,14 @@ try:
         UpdateConversationRequest,
         ConversationListFilters,
         ConversationListResponse,
+        ConversationSearchResponse,
         ConversationWithMessages,
         ConversationSearchRequest,
         BulkOperationRequest,
         ConversationStatsResponse
     )
+    from pagination import encode_cursor, decode_cursor, resolve_total_mode, page_count
+    from conversation_service import CONVERSATION_KEYSET
 except ImportError:
     from backend.conversation_models import (
         Conversation,
@@ -30,11 +33,14 @@ except ImportError:
         UpdateConversationRequest,
         ConversationListFilters,
         ConversationListResponse,
+        ConversationSearchResponse,
         ConversationWithMessages,
         ConversationSearchRequest,
         BulkOperationRequest,
         ConversationStatsResponse
     )
+    from backend.pagination import encode_cursor, decode_cursor, resolve_total_mode, page_count
+    from backend.conversation_service import CONVERSATION_KEYSET
 
 router = APIRouter(prefix="/api/conversations", tags=["conversations"])
 
@@ -71,22 +77,33 @@ async def create_conversation(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/search", response_model=ConversationListResponse)
+@router.get("/search", response_model=ConversationSearchResponse)
 async def search_conversations(
     user_id: str = Query(..., description="User ID"),
     query: str = Query(..., description="Search query"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over page)"),
     service = Depends(get_conversation_service)
 ):
-    """Search conversations by title, content, or tags"""
+    """Search conversations by title, content, or tags, best match first"""
     print(f"🔍 [ROUTE] Search endpoint called: user_id={user_id}, query={query}, page={page}, per_page={per_page}")
+
+    after = None
+    if cursor:
+        try:
+            values = decode_cursor(cursor)
+            after = (float(values["rank"]), str(values["id"]))
+        except (ValueError, KeyError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
     try:
-        conversations, total = await service.search_conversations(
+        conversations, total, snippets, next_after = await service.search_conversations(
             user_id=user_id,
             query=query,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            after=after
         )
 
         total_pages = (total + per_page - 1) // per_page
@@ -94,12 +111,14 @@ async def search_conversations(
         print(f"🔍 [ROUTE] Search completed: found {len(conversations)} conversations, total={total}")
 
         # Return empty results if no conversations found (not an error)
-        return ConversationListResponse(
+        return ConversationSearchResponse(
             conversations=conversations,
             total=total or 0,
             page=page,
             per_page=per_page,
-            total_pages=total_pages
+            total_pages=total_pages,
+            snippets=snippets,
+            next_cursor=encode_cursor({"rank": next_after[0], "id": next_after[1]}) if next_after else None
         )
     except ValueError as e:
         # Conversation not found or access denied
@@ -123,9 +142,17 @@ async def list_conversations(
     tags: Optional[str] = Query(None, description="Comma-separated tags"),
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over page)"),
+    total: Optional[str] = Query(None, description="exact, estimate or none (default: exact for pages, none with a cursor)"),
     service = Depends(get_conversation_service)
 ):
     """List user's conversations with filtering and pagination"""
+    try:
+        after = CONVERSATION_KEYSET.decode(cursor)
+        total_mode = resolve_total_mode(total, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # Parse tags if provided
         tag_list = tags.split(",") if tags else None
@@ -139,21 +166,22 @@ async def list_conversations(
             date_to=date_to
         )
 
-        conversations, total = await service.list_conversations(
+        conversations, total_count, next_cursor = await service.list_conversations(
             user_id=user_id,
             filters=filters,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            after=after,
+            total_mode=total_mode
         )
 
-        total_pages = (total + per_page - 1) // per_page
-
         return ConversationListResponse(
             conversations=conversations,
-            total=total,
+            total=total_count,
             page=page,
             per_page=per_page,
-            total_pages=total_pages
+            total_pages=page_count(total_count, per_page),
+            next_cursor=next_cursor
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -4,7 +4,10 @@ Manages conversation CRUD operations, message persistence, and search
 """
 
 import os
+import re
 import json
+import html
+import time
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
@@ -32,6 +35,130 @@ except ImportError:
         ConversationListFilters
     )
 
+try:
+    from message_write_queue import MessageWriteQueue
+    from pagination import Keyset, SortKey, count_total
+    from schema_capabilities import apply_migration
+except ImportError:
+    from backend.message_write_queue import MessageWriteQueue
+    from backend.pagination import Keyset, SortKey, count_total
+    from backend.schema_capabilities import apply_migration
+
+
+# Conversation lists: most recent activity first, id breaks ties
+CONVERSATION_KEYSET = Keyset(
+    SortKey("last_message_at", "last_message_at", "timestamp", descending=True),
+    SortKey("id", "id", "text", descending=True)
+)
+
+# Optional migrations are run explicitly (run_migration_00x.py) - they rewrite or lock
+# busy tables. Until one is installed the service keeps its fallback path, re-checking
+# this often so every worker picks it up without a restart.
+SCHEMA_RECHECK_SECONDS = float(os.getenv('CONVERSATION_SCHEMA_RECHECK_SECONDS', '300'))
+
+STATS_MIGRATION_LOCK_SQL = "LOCK TABLE conversations, messages IN SHARE ROW EXCLUSIVE MODE"
+
+STATS_SCHEMA_CHECK_SQL = """
+    SELECT to_regclass('conversation_user_stats') IS NOT NULL
+       AND EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'messages_count')
+       AND EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'conversations_user_stats')
+"""
+
+SEARCH_SCHEMA_CHECK_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = 'messages'::regclass AND attname = 'search_vector' AND NOT attisdropped
+    ) AND to_regclass('idx_messages_search_vector') IS NOT NULL
+"""
+
+# Explicit columns so the messages.search_vector tsvector (migration 008) isn't fetched
+MESSAGE_COLUMNS = "id, conversation_id, role, content, metadata, tokens_used, created_at"
+
+# Matched terms in snippets are delimited with private-use characters, then HTML-escaped
+# and turned into <mark> tags (message content may itself contain markup)
+_MARK_START, _MARK_STOP = "\ue000", "\ue001"
+HEADLINE_OPTIONS = (
+    f'StartSel="{_MARK_START}", StopSel="{_MARK_STOP}", '
+    'MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=" … "'
+)
+
+ILIKE_MATCH = """
+    c.user_id = $1
+    AND (
+        c.title ILIKE $2
+        OR COALESCE(c.summary, '') ILIKE $2
+        OR COALESCE(m.content, '') ILIKE $2
+        OR (c.tags IS NOT NULL AND $3 = ANY(c.tags))
+    )
+"""
+
+# Ranked search over the messages GIN index plus the user's titles/summaries/tags.
+# $1 user_id, $2 tsquery text, $3 raw query (exact tag match), $4 limit,
+# $5/$6 keyset (rank, id) of the previous page's last row or NULL, $7 offset, $8 ts_headline options.
+# A title match (weight A) outranks a summary match (B) outranks a message match (D).
+SEARCH_SQL = """
+    WITH q AS (
+        SELECT to_tsquery('english', $2) AS query
+    ),
+    message_hits AS (
+        SELECT DISTINCT ON (m.conversation_id)
+            m.conversation_id, m.id AS message_id, ts_rank_cd(m.search_vector, q.query) AS rank
+        FROM q
+        JOIN messages m ON m.search_vector @@ q.query
+        JOIN conversations c ON c.id = m.conversation_id
+        WHERE c.user_id = $1
+        ORDER BY m.conversation_id, rank DESC, m.created_at DESC
+    ),
+    scored AS (
+        SELECT c.*, h.message_id, h.rank AS message_rank,
+            setweight(to_tsvector('english', COALESCE(c.title, '')), 'A')
+                || setweight(to_tsvector('english', COALESCE(c.summary, '')), 'B') AS doc_vector
+        FROM conversations c
+        LEFT JOIN message_hits h ON h.conversation_id = c.id
+        WHERE c.user_id = $1
+    ),
+    ranked AS (
+        SELECT s.*, GREATEST(
+            COALESCE(s.message_rank, 0),
+            ts_rank_cd(s.doc_vector, q.query),
+            CASE WHEN $3 = ANY(s.tags) THEN 1 ELSE 0 END
+        )::real AS rank
+        FROM scored s, q
+        WHERE s.message_id IS NOT NULL OR s.doc_vector @@ q.query OR $3 = ANY(s.tags)
+    ),
+    page AS (
+        SELECT * FROM ranked
+        WHERE $5::real IS NULL OR (rank, id) < ($5::real, $6::text)
+        ORDER BY rank DESC, id DESC
+        LIMIT $4 OFFSET $7
+    )
+    SELECT t.total_count, p.id, p.user_id, p.title, p.summary, p.tags, p.is_favorite, p.is_archived,
+        p.message_count, p.created_at, p.updated_at, p.last_message_at, p.rank,
+        ts_headline('english', COALESCE(m.content, p.summary, p.title), q.query, $8) AS snippet
+    FROM (SELECT COUNT(*) AS total_count FROM ranked) t
+    CROSS JOIN q
+    LEFT JOIN page p ON true
+    LEFT JOIN messages m ON m.id = p.message_id
+    ORDER BY p.rank DESC, p.id DESC
+"""
+
+
+def build_prefix_tsquery(text: str) -> Optional[str]:
+    """
+    to_tsquery() text matching every word of a free-text query as a prefix
+    ("free form rpg" -> "free:* & form:* & rpg:*"), or None if it has no words.
+    Only word characters are kept, so user input can't produce tsquery syntax errors;
+    single letters ("subfile's" -> "subfile", "s") are dropped unless nothing else is left.
+    """
+    words = re.findall(r"[^\W_]+", text.lower())
+    words = [word for word in words if len(word) > 1] or words
+    return " & ".join(f"{word}:*" for word in words) if words else None
+
+
+def highlight_snippet(headline: str) -> str:
+    """HTML-safe snippet with matched terms wrapped in <mark>"""
+    return html.escape(headline).replace(_MARK_START, "<mark>").replace(_MARK_STOP, "</mark>")
+
 
 class ConversationService:
     """Service for managing conversation history"""
@@ -53,14 +180,31 @@ class ConversationService:
             print("⚠️ Warning: No Claude API key found. AI title generation will be disabled.")
             self.claude_client = None
         else:
-            self.claude_client = anthropic.Anthropic(api_key=self.claude_api_key)
+            # Async client: titles are generated on the chat request path, beside retrieval
+            self.claude_client = anthropic.AsyncAnthropic(api_key=self.claude_api_key)
+
+        # Write-behind queue for chat turns (see queue_message)
+        self.write_queue = MessageWriteQueue(
+            self._write_messages,
+            max_batch_size=int(os.getenv('MESSAGE_QUEUE_BATCH_SIZE', '100')),
+            flush_interval_ms=float(os.getenv('MESSAGE_QUEUE_FLUSH_MS', '250')),
+            max_queue_size=int(os.getenv('MESSAGE_QUEUE_MAX_SIZE', '10000'))
+        )
+
+        # Whether the incremental stats triggers (migration 007) are installed; None = not checked yet
+        self.stats_triggers: Optional[bool] = None
+        # Whether the messages full-text index (migration 008) is installed; None = not checked yet
+        self.search_index: Optional[bool] = None
+        # When each schema flag was last read from the catalog (see _detect_schema)
+        self._schema_checked_at: Dict[str, float] = {}
 
     async def create_conversation(
         self,
         user_id: str,
-        initial_message: str
+        initial_message: str,
+        conversation_id: Optional[str] = None
     ) -> Conversation:
-        """Create new conversation with AI-generated title"""
+        """Create new conversation with AI-generated title (under `conversation_id` if given)"""
 
         # Generate title from first message
         title = await self._generate_title(initial_message)
@@ -70,6 +214,8 @@ class ConversationService:
             title=title,
             message_count=0  # Will increment when first message is added
         )
+        if conversation_id:
+            conversation.id = conversation_id
 
         await self._save_conversation(conversation)
 
@@ -100,14 +246,48 @@ class ConversationService:
 
         return message
 
+    async def queue_message(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        metadata: Dict[str, Any] = {},
+        tokens_used: Optional[int] = None
+    ) -> Message:
+        """
+        Add message to conversation without waiting for the write.
+        Batched with other messages by the write queue; written directly if the queue is full.
+        """
+
+        message = Message(
+            conversation_id=conversation_id,
+            role=role,
+            content=content,
+            metadata=metadata,
+            tokens_used=tokens_used
+        )
+
+        if not self.write_queue.enqueue(message):
+            await self._write_messages([message])
+
+        return message
+
     async def list_conversations(
         self,
         user_id: str,
         filters: Optional[ConversationListFilters] = None,
         page: int = 1,
-        per_page: int = 20
-    ) -> Tuple[List[Conversation], int]:
-        """List user's conversations with filtering and pagination"""
+        per_page: int = 20,
+        after: Optional[Dict[str, Any]] = None,
+        total_mode: str = "exact"
+    ) -> Tuple[List[Conversation], Optional[int], Optional[str]]:
+        """
+        List user's conversations with filtering and pagination, most recent first.
+
+        Returns (conversations, total, cursor of the next page or None). `after` is
+        CONVERSATION_KEYSET.decode() of such a cursor (keyset pagination, `page` is
+        then ignored); total_mode is "exact", "estimate" or "none" (total is None).
+        """
 
         query_conditions = [f"user_id = $1"]
         params = [user_id]
@@ -146,90 +326,112 @@ class ConversationService:
 
         # Build query
         where_clause = " AND ".join(query_conditions)
-        offset = (page - 1) * per_page
+        # A cursor replaces the OFFSET; page still works without one
+        offset = 0 if after else (page - 1) * per_page
+        keyset_condition, keyset_params = CONVERSATION_KEYSET.after(after, param_index)
+        param_index += len(keyset_params)
 
         # Get conversations
         query = f"""
             SELECT * FROM conversations
-            WHERE {where_clause}
-            ORDER BY last_message_at DESC
+            WHERE {where_clause} AND {keyset_condition}
+            ORDER BY {CONVERSATION_KEYSET.order_by()}
             LIMIT ${param_index} OFFSET ${param_index + 1}
         """
-        params.extend([per_page, offset])
 
         async with self.vector_store.pool.acquire() as conn:
-            rows = await conn.fetch(query, *params)
+            # One row past the page tells whether there is a next one
+            rows = await conn.fetch(query, *params, *keyset_params, per_page + 1, offset)
 
-            # Get total count
-            count_query = f"SELECT COUNT(*) FROM conversations WHERE {where_clause}"
-            total = await conn.fetchval(count_query, *params[:-2])  # Exclude limit/offset
+            total = await count_total(
+                conn, total_mode, f"SELECT 1 FROM conversations WHERE {where_clause}", *params
+            )
 
-        conversations = [self._row_to_conversation(row) for row in rows]
+        conversations = [self._row_to_conversation(row) for row in rows[:per_page]]
+        next_cursor = CONVERSATION_KEYSET.cursor_for(conversations[-1]) if len(rows) > per_page else None
 
-        return conversations, total
+        return conversations, total, next_cursor
 
     async def search_conversations(
         self,
         user_id: str,
         query: str,
         page: int = 1,
-        per_page: int = 20
-    ) -> Tuple[List[Conversation], int]:
-        """Full-text search across conversations and messages"""
-        print(f"🔍 [SERVICE] Search called: user_id={user_id}, query={query}, page={page}, per_page={per_page}")
-
-        offset = (page - 1) * per_page
+        per_page: int = 20,
+        after: Optional[Tuple[float, str]] = None
+    ) -> Tuple[List[Conversation], int, Dict[str, str], Optional[Tuple[float, str]]]:
+        """
+        Full-text search across conversations and messages, best match first.
 
-        search_query = """
-            SELECT DISTINCT c.* FROM conversations c
-            LEFT JOIN messages m ON c.id = m.conversation_id
-            WHERE c.user_id = $1
-            AND (
-                c.title ILIKE $2
-                OR COALESCE(c.summary, '') ILIKE $2
-                OR COALESCE(m.content, '') ILIKE $2
-                OR (c.tags IS NOT NULL AND $3 = ANY(c.tags))
-            )
-            ORDER BY c.last_message_at DESC
-            LIMIT $4 OFFSET $5
+        Returns (conversations, total, snippets by conversation id, keyset of the last
+        row when there are more results). Pass that keyset back as `after` to get the
+        next page without an OFFSET; `page` is still honoured when `after` is None.
         """
+        print(f"🔍 [SERVICE] Search called: user_id={user_id}, query={query}, page={page}, per_page={per_page}")
 
-        pattern = f"%{query}%"
+        if not await self.detect_search_schema():
+            conversations, total = await self._search_conversations_ilike(user_id, query, page, per_page)
+            return conversations, total, {}, None
+
+        tsquery = build_prefix_tsquery(query)
+        offset = 0 if after else (page - 1) * per_page
+        after_rank, after_id = after if after else (None, None)
 
         try:
-            print(f"🔍 [SERVICE] Acquiring DB connection (pool exists: {self.vector_store.pool is not None})")
             async with self.vector_store.pool.acquire() as conn:
-                print(f"🔍 [SERVICE] Connection acquired, executing search query")
-                rows = await conn.fetch(search_query, user_id, pattern, query, per_page, offset)
-                print(f"🔍 [SERVICE] Search query executed, found {len(rows)} rows")
-
-                # Get total count
-                count_query = """
-                    SELECT COUNT(DISTINCT c.id) FROM conversations c
-                    LEFT JOIN messages m ON c.id = m.conversation_id
-                    WHERE c.user_id = $1
-                    AND (
-                        c.title ILIKE $2
-                        OR COALESCE(c.summary, '') ILIKE $2
-                        OR COALESCE(m.content, '') ILIKE $2
-                        OR (c.tags IS NOT NULL AND $3 = ANY(c.tags))
-                    )
-                """
-                print(f"🔍 [SERVICE] Executing count query")
-                total = await conn.fetchval(count_query, user_id, pattern, query)
-                print(f"🔍 [SERVICE] Count query executed, total={total}")
-
-            conversations = [self._row_to_conversation(row) for row in rows]
-            print(f"🔍 [SERVICE] Converted {len(conversations)} conversations, returning")
-
-            return conversations, total
-
+                # One row past the page tells whether there is a next one
+                rows = await conn.fetch(
+                    SEARCH_SQL, user_id, tsquery or '', query, per_page + 1, after_rank, after_id, offset, HEADLINE_OPTIONS
+                )
         except Exception as e:
             print(f"🔍 [SERVICE ERROR] Exception in search_conversations: {type(e).__name__}: {str(e)}")
             import traceback
             traceback.print_exc()
             raise
 
+        total = rows[0]['total_count'] if rows else 0
+        hits = [row for row in rows if row['id'] is not None]
+        has_more = len(hits) > per_page
+        hits = hits[:per_page]
+        conversations = [self._row_to_conversation(row) for row in hits]
+        snippets = {row['id']: highlight_snippet(row['snippet']) for row in hits if row['snippet']}
+
+        next_after = None
+        if has_more:
+            next_after = (hits[-1]['rank'], hits[-1]['id'])
+        print(f"🔍 [SERVICE] Search found {len(hits)} of {total} conversations")
+
+        return conversations, total, snippets, next_after
+
+    async def _search_conversations_ilike(
+        self,
+        user_id: str,
+        query: str,
+        page: int,
+        per_page: int
+    ) -> Tuple[List[Conversation], int]:
+        """Substring search without the index (used until migration 008 is applied)"""
+
+        offset = (page - 1) * per_page
+        pattern = f"%{query}%"
+
+        async with self.vector_store.pool.acquire() as conn:
+            rows = await conn.fetch(f"""
+                SELECT DISTINCT c.* FROM conversations c
+                LEFT JOIN messages m ON c.id = m.conversation_id
+                WHERE {ILIKE_MATCH}
+                ORDER BY c.last_message_at DESC
+                LIMIT $4 OFFSET $5
+            """, user_id, pattern, query, per_page, offset)
+
+            total = await conn.fetchval(f"""
+                SELECT COUNT(DISTINCT c.id) FROM conversations c
+                LEFT JOIN messages m ON c.id = m.conversation_id
+                WHERE {ILIKE_MATCH}
+            """, user_id, pattern, query)
+
+        return [self._row_to_conversation(row) for row in rows], total
+
     async def get_conversation_with_messages(
         self,
         conversation_id: str,
@@ -237,6 +439,8 @@ class ConversationService:
     ) -> Tuple[Conversation, List[Message]]:
         """Get conversation with all messages"""
 
+        await self.write_queue.flush_conversation(conversation_id)
+
         async with self.vector_store.pool.acquire() as conn:
             # Get conversation
             conv_row = await conn.fetchrow(
@@ -252,7 +456,7 @@ class ConversationService:
 
             # Get messages
             msg_rows = await conn.fetch(
-                "SELECT * FROM messages WHERE conversation_id = $1 ORDER BY created_at ASC",
+                f"SELECT {MESSAGE_COLUMNS} FROM messages WHERE conversation_id = $1 ORDER BY created_at ASC",
                 conversation_id
             )
 
@@ -260,6 +464,41 @@ class ConversationService:
 
         return conversation, messages
 
+    async def get_recent_messages(
+        self,
+        conversation_id: str,
+        user_id: str,
+        limit: int
+    ) -> List[Message]:
+        """Last `limit` messages of a conversation, oldest first (chat history reload)"""
+
+        await self.write_queue.flush_conversation(conversation_id)
+
+        async with self.vector_store.pool.acquire() as conn:
+            exists = await conn.fetchval(
+                "SELECT 1 FROM conversations WHERE id = $1 AND user_id = $2",
+                conversation_id,
+                user_id
+            )
+
+            if not exists:
+                raise ValueError(f"Conversation {conversation_id} not found or access denied")
+
+            msg_rows = await conn.fetch(f"""
+                SELECT * FROM (
+                    SELECT {MESSAGE_COLUMNS} FROM messages
+                    WHERE conversation_id = $1
+                    ORDER BY created_at DESC
+                    LIMIT $2
+                ) recent
+                ORDER BY created_at ASC
+            """,
+                conversation_id,
+                limit
+            )
+
+        return [self._row_to_message(row) for row in msg_rows]
+
     async def update_conversation(
         self,
         conversation_id: str,
@@ -315,6 +554,8 @@ class ConversationService:
     ) -> None:
         """Delete conversation and all messages (CASCADE handles messages)"""
 
+        await self.write_queue.flush_conversation(conversation_id)
+
         async with self.vector_store.pool.acquire() as conn:
             result = await conn.execute(
                 "DELETE FROM conversations WHERE id = $1 AND user_id = $2",
@@ -328,6 +569,40 @@ class ConversationService:
     async def get_conversation_stats(self, user_id: str) -> Dict[str, Any]:
         """Get user conversation statistics"""
 
+        if not await self.detect_stats_schema():
+            return await self._count_conversation_stats(user_id)
+
+        # Totals are maintained by triggers; recent counts are a range scan on (user_id, created_at)
+        async with self.vector_store.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT
+                    s.total_conversations, s.total_messages, s.favorite_count, s.archived_count, s.tag_counts,
+                    (SELECT COUNT(*) FROM conversations
+                     WHERE user_id = $1 AND created_at > NOW() - INTERVAL '7 days') AS convs_this_week,
+                    (SELECT COUNT(*) FROM conversations
+                     WHERE user_id = $1 AND created_at > NOW() - INTERVAL '30 days') AS convs_this_month
+                FROM (SELECT $1::text AS user_id) u
+                LEFT JOIN conversation_user_stats s ON s.user_id = u.user_id
+            """, user_id)
+
+        tag_counts = row['tag_counts'] or {}
+        if isinstance(tag_counts, str):
+            tag_counts = json.loads(tag_counts)
+        top_tags = sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))[:10]
+
+        return {
+            "total_conversations": row['total_conversations'] or 0,
+            "total_messages": row['total_messages'] or 0,
+            "favorite_count": row['favorite_count'] or 0,
+            "archived_count": row['archived_count'] or 0,
+            "most_used_tags": [{"tag": tag, "count": count} for tag, count in top_tags],
+            "conversations_this_week": row['convs_this_week'],
+            "conversations_this_month": row['convs_this_month']
+        }
+
+    async def _count_conversation_stats(self, user_id: str) -> Dict[str, Any]:
+        """Statistics counted from the conversations/messages tables (when the stats triggers aren't installed)"""
+
         async with self.vector_store.pool.acquire() as conn:
             # Total conversations and messages
             total_convs = await conn.fetchval(
@@ -385,8 +660,71 @@ class ConversationService:
             "conversations_this_month": convs_this_month
         }
 
+    async def detect_stats_schema(self) -> bool:
+        """
+        Whether the incremental stats tables/triggers (migrations/007_conversation_stats.sql)
+        are installed; False leaves the COUNT-based paths in use. Installing them locks
+        conversations and messages for a full backfill, so it's never done here - see
+        run_migration_007.py.
+        """
+
+        return await self._detect_schema('stats_triggers', STATS_SCHEMA_CHECK_SQL)
+
+    async def install_stats_schema(self) -> bool:
+        """Apply migration 007 (run_migration_007.py only). Returns whether this call applied it."""
+
+        # Writes wait so the backfill and triggers line up
+        applied = await self._apply_migration(
+            '007_conversation_stats.sql',
+            STATS_SCHEMA_CHECK_SQL,
+            lock_sql=STATS_MIGRATION_LOCK_SQL
+        )
+        self.stats_triggers = True
+        return applied
+
+    async def detect_search_schema(self) -> bool:
+        """
+        Whether the messages full-text index (migrations/008_conversation_search.sql) is
+        installed; False leaves ILIKE search in use. The migration rewrites the messages
+        table, so it's never applied here - see run_migration_008.py.
+        """
+
+        return await self._detect_schema('search_index', SEARCH_SCHEMA_CHECK_SQL)
+
+    async def install_search_schema(self) -> bool:
+        """Apply migration 008 (run_migration_008.py only). Returns whether this call applied it."""
+
+        applied = await self._apply_migration('008_conversation_search.sql', SEARCH_SCHEMA_CHECK_SQL)
+        self.search_index = True
+        return applied
+
     # Private helper methods
 
+    async def _detect_schema(self, flag: str, check_sql: str) -> bool:
+        """
+        Read (and cache in attribute `flag`) whether an optional migration is installed.
+        Once installed it stays on; until then the catalog is re-read every
+        SCHEMA_RECHECK_SECONDS.
+        """
+
+        checked_at = self._schema_checked_at.get(flag)
+        if getattr(self, flag) or (checked_at is not None and time.monotonic() - checked_at < SCHEMA_RECHECK_SECONDS):
+            return bool(getattr(self, flag))
+
+        self._schema_checked_at[flag] = time.monotonic()
+        try:
+            async with self.vector_store.pool.acquire() as conn:
+                setattr(self, flag, bool(await conn.fetchval(check_sql)))
+        except Exception as e:
+            print(f"⚠️ Could not check for {flag}: {e}")
+            setattr(self, flag, False)
+        return getattr(self, flag)
+
+    async def _apply_migration(self, filename: str, check_sql: str, lock_sql: Optional[str] = None) -> bool:
+        """Run migrations/<filename> unless check_sql already returns true (see schema_capabilities.apply_migration)"""
+
+        return await apply_migration(self.vector_store.pool, filename, check_sql, lock_sql)
+
     async def _save_conversation(self, conversation: Conversation) -> None:
         """Save conversation to database"""
 
@@ -428,10 +766,61 @@ class ConversationService:
                 message.created_at
             )
 
+    async def _write_messages(self, messages: List[Message]) -> None:
+        """Insert a batch of messages and update their conversations' stats in one transaction"""
+
+        async with self.vector_store.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany("""
+                    INSERT INTO messages (
+                        id, conversation_id, role, content, metadata, tokens_used, created_at
+                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
+                """, [
+                    (
+                        message.id,
+                        message.conversation_id,
+                        message.role,
+                        message.content,
+                        json.dumps(message.metadata),
+                        message.tokens_used,
+                        message.created_at
+                    )
+                    for message in messages
+                ])
+
+                # One stats update per conversation in the batch
+                conversation_ids = list({message.conversation_id for message in messages})
+                if self.stats_triggers:
+                    # message_count is incremented by the messages trigger
+                    await conn.execute("""
+                        UPDATE conversations
+                        SET last_message_at = NOW(), updated_at = NOW()
+                        WHERE id = ANY($1)
+                    """, conversation_ids)
+                else:
+                    await conn.execute("""
+                        UPDATE conversations c
+                        SET message_count = (
+                            SELECT COUNT(*) FROM messages m WHERE m.conversation_id = c.id
+                        ),
+                        last_message_at = NOW(),
+                        updated_at = NOW()
+                        WHERE c.id = ANY($1)
+                    """, conversation_ids)
+
     async def _update_conversation_stats(self, conversation_id: str) -> None:
         """Update conversation message count and last_message_at"""
 
         async with self.vector_store.pool.acquire() as conn:
+            if self.stats_triggers:
+                # message_count is incremented by the messages trigger
+                await conn.execute("""
+                    UPDATE conversations
+                    SET last_message_at = NOW(), updated_at = NOW()
+                    WHERE id = $1
+                """, conversation_id)
+                return
+
             await conn.execute("""
                 UPDATE conversations
                 SET message_count = (
@@ -456,7 +845,7 @@ class ConversationService:
 
 Title should be descriptive but brief. Respond with ONLY the title, no explanation."""
 
-            response = self.claude_client.messages.create(
+            response = await self.claude_client.messages.create(
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=50,
                 temperature=0.3,
@@ -0,0 +1,132 @@
+"""
+Incrementally maintained corpus statistics (chunk counts per document).
+
+Vector search used to log `SELECT COUNT(*) FROM documents` on every query, a
+sequential scan of the whole chunk table ahead of the ANN query. This module
+keeps chunk counts per filename in process instead:
+
+  - loaded once (one GROUP BY) at startup or on first use
+  - adjusted by the ingestion and delete paths via `record_added()` /
+    `record_deleted()`, so counts stay exact within this worker
+  - re-read in the background once older than CORPUS_STATS_TTL seconds
+    (default 300), which reconciles writes made by other workers or scripts
+
+Readers never wait on the database after the first load:
+
+    stats = await get_corpus_stats()
+    stats.total_chunks, stats.total_documents, stats.chunks_for('book.pdf')
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusStats:
+    """Chunk counts per filename, kept current without scanning the table per request"""
+
+    def __init__(self, ttl: float = 300.0, table: str = 'documents'):
+        self.ttl = ttl
+        self.table = table
+        self.chunks_by_file: Dict[str, int] = {}
+        self.total_chunks = 0
+        self.loaded_at: Optional[float] = None
+        self.refreshes = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Future] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    @property
+    def total_documents(self) -> int:
+        return len(self.chunks_by_file)
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or (self.ttl > 0 and time.monotonic() - self.loaded_at > self.ttl)
+
+    async def refresh(self, conn=None):
+        """Recount from the table (one GROUP BY). Uses the shared pool unless a connection is given."""
+        if conn is None:
+            pool = await get_pool('corpus_stats')
+            async with pool.acquire() as conn:
+                await self._load(conn)
+        else:
+            await self._load(conn)
+
+    async def _load(self, conn):
+        rows = await conn.fetch(f"SELECT filename, COUNT(*) AS chunks FROM {self.table} GROUP BY filename")
+        self.chunks_by_file = {row['filename']: row['chunks'] for row in rows}
+        self.total_chunks = sum(self.chunks_by_file.values())
+        self.loaded_at = time.monotonic()
+        self.refreshes += 1
+        logger.info(f"📊 Corpus stats loaded: {self.total_chunks:,} chunks in {self.total_documents:,} documents")
+
+    async def ensure_fresh(self):
+        if not self.is_stale():
+            return
+        if self.loaded:
+            # Serve the current counts; reconcile in the background so requests never wait
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.ensure_future(self._background_refresh())
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self.refresh()
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"⚠️ Corpus stats refresh failed (keeping previous counts): {e}")
+
+    # ------------------------------------------------------------------
+    # Incremental updates (called after the write has committed)
+    # ------------------------------------------------------------------
+
+    def record_added(self, filename: str, chunks: int):
+        if chunks <= 0:
+            return
+        self.chunks_by_file[filename] = self.chunks_by_file.get(filename, 0) + chunks
+        self.total_chunks += chunks
+
+    def record_deleted(self, filename: str):
+        """All chunks of a filename were deleted"""
+        self.total_chunks -= self.chunks_by_file.pop(filename, 0)
+
+    def chunks_for(self, filename: str) -> int:
+        return self.chunks_by_file.get(filename, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded else None,
+            "total_chunks": self.total_chunks,
+            "total_documents": self.total_documents,
+            "refreshes": self.refreshes,
+        }
+
+
+corpus_stats = CorpusStats(ttl=float(os.getenv('CORPUS_STATS_TTL', '300')))
+
+
+async def get_corpus_stats() -> CorpusStats:
+    """Current counts (loaded on first use, reconciled in the background when older than the TTL)"""
+    await corpus_stats.ensure_fresh()
+    return corpus_stats
+
+
+async def refresh_corpus_stats(conn=None) -> CorpusStats:
+    """Recount now"""
+    await corpus_stats.refresh(conn)
+    return corpus_stats
@@ -0,0 +1,229 @@
+"""
+Shared application-wide asyncpg pool registry.
+
+Every service used to open its own asyncpg pool (or a raw connection per call),
+which under load exhausted Postgres connection slots and added TCP + auth latency
+to every chat turn. The registry owns ONE pool for the process. It is created in
+the FastAPI startup event and closed on shutdown. Services ask for a named view
+of it:
+
+    pool = await get_pool("author_service")
+    async with pool.acquire() as conn:
+        ...
+
+A ServicePool behaves like asyncpg.Pool for `acquire()` and `close()`. close() is
+a no-op because the app owns the shared pool. Every connection the pool opens gets
+the binary pgvector codec (pgvector_codec), so `embedding` decodes the same way
+whichever connection a query lands on. Each view records per-service usage
+stats (acquisitions, wait/hold time, peak concurrency), which are exposed on /health.
+
+Configuration (environment):
+    DB_POOL_MIN_SIZE                 minimum connections (default 2)
+    DB_POOL_MAX_SIZE                 maximum connections (default 20)
+    DB_POOL_COMMAND_TIMEOUT          per-statement timeout in seconds (default 60)
+    DB_POOL_MAX_INACTIVE_LIFETIME    idle connection lifetime in seconds (default 300)
+    DB_STATEMENT_CACHE_SIZE          asyncpg prepared-statement cache (default 0, required
+                                     behind pgbouncer in transaction pooling mode)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import asyncpg
+
+try:
+    from pgvector_codec import register_vector_codec
+except ImportError:
+    from backend.pgvector_codec import register_vector_codec
+
+logger = logging.getLogger(__name__)
+
+
+class _TrackedAcquire:
+    """Async context manager around pool.acquire() that records usage stats"""
+
+    def __init__(self, service: "ServicePool", timeout: Optional[float]):
+        self._service = service
+        self._timeout = timeout
+        self._conn = None
+        self._acquired_at = 0.0
+
+    async def __aenter__(self):
+        service = self._service
+        pool = await service._registry.init()
+        started = time.perf_counter()
+        try:
+            self._conn = await pool.acquire(timeout=self._timeout)
+        except asyncio.TimeoutError:
+            service.timeouts += 1
+            raise
+        except Exception:
+            service.errors += 1
+            raise
+        self._acquired_at = time.perf_counter()
+        service.acquisitions += 1
+        service.wait_seconds += self._acquired_at - started
+        service.active += 1
+        service.peak_active = max(service.peak_active, service.active)
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        service = self._service
+        service.active -= 1
+        service.hold_seconds += time.perf_counter() - self._acquired_at
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            service.errors += 1
+        await self._service._registry.pool.release(self._conn)
+        self._conn = None
+
+
+class ServicePool:
+    """Named view of the shared pool, used by one service"""
+
+    def __init__(self, registry: "PoolRegistry", name: str):
+        self._registry = registry
+        self.name = name
+        self.acquisitions = 0
+        self.active = 0
+        self.peak_active = 0
+        self.wait_seconds = 0.0
+        self.hold_seconds = 0.0
+        self.errors = 0
+        self.timeouts = 0
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _TrackedAcquire:
+        return _TrackedAcquire(self, timeout)
+
+    async def close(self):
+        """No-op: the shared pool is closed by the application on shutdown"""
+        return None
+
+    # asyncpg.Pool-style shortcuts
+    async def execute(self, query: str, *args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def fetch(self, query: str, *args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "acquisitions": self.acquisitions,
+            "active": self.active,
+            "peak_active": self.peak_active,
+            "avg_wait_ms": round(self.wait_seconds * 1000 / self.acquisitions, 2) if self.acquisitions else 0.0,
+            "avg_hold_ms": round(self.hold_seconds * 1000 / self.acquisitions, 2) if self.acquisitions else 0.0,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+        }
+
+
+class PoolRegistry:
+    """Owns the process-wide asyncpg pool and hands out per-service views"""
+
+    def __init__(self):
+        self.pool: Optional[asyncpg.Pool] = None
+        self.database_url: Optional[str] = None
+        self._services: Dict[str, ServicePool] = {}
+        self._lock = asyncio.Lock()
+        # Whether the last connection opened has the pgvector codec (False before CREATE EXTENSION)
+        self.vector_codec = False
+
+    async def _init_connection(self, conn):
+        """Pool `init` hook: runs once per new connection"""
+        self.vector_codec = await register_vector_codec(conn)
+
+    async def reset_connections(self):
+        """Replace the open connections on their next acquire (e.g. after CREATE EXTENSION vector)"""
+        if self.pool is not None:
+            await self.pool.expire_connections()
+
+    @staticmethod
+    def pool_settings() -> Dict[str, Any]:
+        return {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+            "command_timeout": float(os.getenv("DB_POOL_COMMAND_TIMEOUT", "60")),
+            "max_inactive_connection_lifetime": float(os.getenv("DB_POOL_MAX_INACTIVE_LIFETIME", "300")),
+            # Prepared statements don't survive pgbouncer transaction pooling
+            "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "0")),
+        }
+
+    async def init(self, database_url: Optional[str] = None) -> asyncpg.Pool:
+        """Create the shared pool (idempotent; called from app startup or on first use)"""
+        if self.pool is not None:
+            return self.pool
+
+        async with self._lock:
+            if self.pool is not None:
+                return self.pool
+
+            database_url = database_url or os.getenv("DATABASE_URL")
+            if not database_url:
+                raise ValueError("DATABASE_URL environment variable not set")
+
+            settings = self.pool_settings()
+            self.pool = await asyncpg.create_pool(database_url, init=self._init_connection, **settings)
+            self.database_url = database_url
+            logger.info(
+                f"✅ Shared database pool ready (min={settings['min_size']}, max={settings['max_size']}, "
+                f"statement_cache_size={settings['statement_cache_size']})"
+            )
+            return self.pool
+
+    def service(self, name: str) -> ServicePool:
+        service = self._services.get(name)
+        if service is None:
+            service = self._services[name] = ServicePool(self, name)
+        return service
+
+    async def get(self, name: str, database_url: Optional[str] = None) -> ServicePool:
+        await self.init(database_url)
+        return self.service(name)
+
+    def stats(self) -> Dict[str, Any]:
+        pool_stats: Dict[str, Any] = {"initialized": self.pool is not None}
+        if self.pool is not None:
+            pool_stats.update({
+                "size": self.pool.get_size(),
+                "idle": self.pool.get_idle_size(),
+                "min_size": self.pool.get_min_size(),
+                "max_size": self.pool.get_max_size(),
+            })
+        pool_stats["services"] = {name: svc.stats() for name, svc in sorted(self._services.items())}
+        return pool_stats
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+            logger.info("✅ Shared database pool closed")
+
+
+# Process-wide registry
+registry = PoolRegistry()
+
+
+async def init_pool_registry(database_url: Optional[str] = None) -> asyncpg.Pool:
+    return await registry.init(database_url)
+
+
+async def get_pool(service: str, database_url: Optional[str] = None) -> ServicePool:
+    """Shared pool view for a service (creates the pool on first use outside the app)"""
+    return await registry.get(service, database_url)
+
+
+async def close_pool_registry():
+    await registry.close()
@@ -12,7 +12,24 @@ Manages document-author relationship operations including:
 import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import asyncpg
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
+try:
+    from book_metadata_cache import invalidate_book_metadata
+except ImportError:
+    from backend.book_metadata_cache import invalidate_book_metadata
+try:
+    from pagination import Keyset, SortKey
+except ImportError:
+    from backend.pagination import Keyset, SortKey
+
+# get_documents_by_author order: by title, id breaks ties
+AUTHOR_DOCUMENTS_KEYSET = Keyset(
+    SortKey("title", "b.title", "text", nulls_as="''"),
+    SortKey("id", "b.id", "integer")
+)
 
 
 class DocumentAuthorService:
@@ -36,13 +53,7 @@ class DocumentAuthorService:
         if self.pool:
             return
         
-        self.pool = await asyncpg.create_pool(
-            self.database_url,
-            statement_cache_size=0,  # Fix for pgbouncer compatibility
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
+        self.pool = await get_pool('document_author_service', self.database_url)
     
     async def _ensure_pool(self):
         """Ensure connection pool is initialized (lazy initialization)"""
@@ -125,6 +136,9 @@ class DocumentAuthorService:
                 VALUES ($1, $2, $3)
             """, book_id, author_id, order)
 
+        # Chat source enrichment caches authors per book
+        invalidate_book_metadata()
+
     async def remove_author_from_document(
         self,
         book_id: int,
@@ -179,6 +193,8 @@ class DocumentAuthorService:
                 WHERE book_id = $1 AND author_id = $2
             """, book_id, author_id)
 
+        invalidate_book_metadata()
+
     async def reorder_authors(
         self,
         book_id: int,
@@ -237,11 +253,14 @@ class DocumentAuthorService:
                     WHERE book_id = $2 AND author_id = $3
                 """, new_order, book_id, author_id)
 
+        invalidate_book_metadata()
+
     async def get_documents_by_author(
         self,
         author_id: int,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        after: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Find all documents by an author.
@@ -252,6 +271,8 @@ class DocumentAuthorService:
             author_id: ID of author
             limit: Maximum number of results (optional)
             offset: Number of results to skip (optional)
+            after: Sort key values of the last document of the previous page, from
+                AUTHOR_DOCUMENTS_KEYSET.decode(cursor) (keyset pagination instead of offset)
             
         Returns:
             List of document dictionaries with id, filename, title, etc.
@@ -260,29 +281,36 @@ class DocumentAuthorService:
         """
         await self._ensure_pool()
         
+        keyset_condition, keyset_params = AUTHOR_DOCUMENTS_KEYSET.after(after, 2)
+        
         async with self.pool.acquire() as conn:
             # Build query with optional pagination
-            query = """
+            query = f"""
                 SELECT 
                     b.id,
                     b.filename,
                     b.title,
+                    b.category,
+                    b.subcategory,
+                    b.document_type,
+                    b.total_pages,
+                    b.processed_at,
                     da.author_order
                 FROM books b
                 INNER JOIN document_authors da ON b.id = da.book_id
-                WHERE da.author_id = $1
-                ORDER BY b.title
+                WHERE da.author_id = $1 AND {keyset_condition}
+                ORDER BY {AUTHOR_DOCUMENTS_KEYSET.order_by()}
             """
             
-            params = [author_id]
-            param_index = 2
+            params = [author_id, *keyset_params]
+            param_index = len(params) + 1
             
             if limit is not None:
                 query += f" LIMIT ${param_index}"
                 params.append(limit)
                 param_index += 1
             
-            if offset is not None:
+            if offset is not None and after is None:
                 query += f" OFFSET ${param_index}"
                 params.append(offset)
             
@@ -293,6 +321,11 @@ class DocumentAuthorService:
                     'id': row['id'],
                     'filename': row['filename'],
                     'title': row['title'],
+                    'category': row['category'],
+                    'subcategory': row['subcategory'],
+                    'document_type': row['document_type'] or 'book',
+                    'total_pages': row['total_pages'],
+                    'processed_at': row['processed_at'],
                     'author_order': row['author_order']
                 }
                 for row in rows
@@ -332,6 +365,8 @@ class DocumentAuthorService:
                 DELETE FROM document_authors WHERE book_id = $1
             """, book_id)
 
+        invalidate_book_metadata()
+
     async def verify_cascade_deletion(
         self,
         author_id: int,
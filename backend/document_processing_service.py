@@ -23,6 +23,20 @@ except ImportError:
         WebhookEvent, WebhookPayload, ExtractedContent, StorageMetrics
     )
     from backend.pdf_processor import PDFProcessor
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
+try:
+    from pagination import Keyset, SortKey
+except ImportError:
+    from backend.pagination import Keyset, SortKey
+
+# list_jobs order: newest first, job_id breaks ties
+JOBS_KEYSET = Keyset(
+    SortKey("created_at", "created_at", "timestamp", descending=True, nulls_as="'-infinity'"),
+    SortKey("job_id", "job_id", "text", descending=True)
+)
 
 
 class ErrorRecovery:
@@ -145,7 +159,7 @@ class DocumentProcessingService:
             database_url = os.getenv('DATABASE_URL')
             if not database_url:
                 raise ValueError("DATABASE_URL environment variable not set")
-            self.pool = await asyncpg.create_pool(database_url)
+            self.pool = await get_pool('document_processing', database_url)
             self.storage_optimizer = StorageOptimizer(self.pool)
 
     async def process_document(
@@ -372,9 +386,13 @@ class DocumentProcessingService:
         self,
         limit: int = 50,
         offset: int = 0,
-        stage_filter: Optional[ProcessingStage] = None
+        stage_filter: Optional[ProcessingStage] = None,
+        after: Optional[Dict[str, Any]] = None
     ) -> List[ProcessingJob]:
-        """List processing jobs with pagination"""
+        """
+        List processing jobs with pagination, newest first. `after` is
+        JOBS_KEYSET.decode(cursor) of the previous page's cursor (replaces offset).
+        """
         await self.init_pool()
 
         query = "SELECT * FROM processing_jobs"
@@ -384,10 +402,14 @@ class DocumentProcessingService:
             query += " WHERE stage = $1"
             params.append(stage_filter.value)
 
-        query += " ORDER BY created_at DESC LIMIT $%d OFFSET $%d" % (
-            len(params) + 1, len(params) + 2
+        keyset_condition, keyset_params = JOBS_KEYSET.after(after, len(params) + 1)
+        query += (" AND " if params else " WHERE ") + keyset_condition
+        params.extend(keyset_params)
+
+        query += " ORDER BY %s LIMIT $%d OFFSET $%d" % (
+            JOBS_KEYSET.order_by(), len(params) + 1, len(params) + 2
         )
-        params.extend([limit, offset])
+        params.extend([limit, 0 if after else offset])
 
         async with self.pool.acquire() as conn:
             rows = await conn.fetch(query, *params)
@@ -0,0 +1,373 @@
+"""
+Cache of the document catalog served by /documents and /api/books.
+
+The whole catalog is loaded once (one set-based query, see
+PostgresVectorStore.list_documents) and then kept current per file: the next
+read after a change re-lists only the changed files and merges them in
+(replacing, inserting or dropping the entry).
+
+Changes arrive two ways:
+
+  - in-process: writes call invalidate_documents_catalog(filename)
+  - from any process: migration 010 has triggers on books, documents,
+    document_authors and authors take the next documents_catalog_version_seq
+    value and NOTIFY 'documents_catalog' with it and the filenames touched.
+    Every worker LISTENs on a dedicated connection, so an admin edit or an
+    ingestion run in one worker shows up in all of them on their next request.
+    The migration locks those tables, so it is run explicitly
+    (run_migration_010.py), never at startup. Until it is, other workers'
+    changes show up on the TTL; the check for it is repeated with each TTL refresh.
+
+Rebuilds are single-flight: concurrent requests wait for the one reload in
+progress instead of each running their own. Once the catalog is older than
+the TTL it is served as-is while a background check runs - with the listener
+up that is one sequence read, and a full reload only if a change was missed.
+
+Each version of the catalog is serialized once; its hash is the ETag, so a
+client sending If-None-Match gets a 304 while nothing changed, and every
+worker gives the same catalog the same ETag.
+
+Environment variables:
+    DOCUMENTS_CACHE_TTL             seconds before the catalog is re-checked in the background (default 300)
+    DOCUMENTS_CATALOG_LISTEN_URL    connection used for LISTEN (default DATABASE_URL; must be a
+                                    session connection, not pgbouncer in transaction pooling mode)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import asyncpg
+
+try:
+    from schema_capabilities import apply_migration
+except ImportError:
+    from backend.schema_capabilities import apply_migration
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'documents_catalog'
+MIGRATION_FILE = '010_documents_catalog_notify.sql'
+VERSION_SQL = "SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM documents_catalog_version_seq"
+SCHEMA_CHECK_SQL = """
+    SELECT to_regclass('documents_catalog_version_seq') IS NOT NULL
+       AND EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'authors_catalog_update')
+"""
+
+# list_documents(filenames=None) -> {'documents': [...]}
+CatalogLoader = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+def _listing_order(document: Dict[str, Any]):
+    # Same order as list_documents: books newest id first, legacy rows newest upload first
+    return (document.get('id') or 0, document.get('uploaded_at') or '')
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, as HTTP specifies for it)"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith('W/') else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(',')}
+
+
+class DocumentsCatalog:
+    def __init__(self, ttl: float = 300, keepalive: float = 30, reconnect_delay: float = 5):
+        self.ttl = ttl
+        self.keepalive = keepalive
+        self.reconnect_delay = reconnect_delay
+        self.loader: Optional[CatalogLoader] = None
+        self._by_filename: Dict[str, Dict[str, Any]] = {}
+        self._payload: Optional[Dict[str, Any]] = None
+        self._dirty: Set[str] = set()
+        self._stale = False
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Serialized catalog and its ETag (rebuilt on every change)
+        self.documents_json = b'[]'
+        self.etag: Optional[str] = None
+
+        # Cross-worker change feed (migration 010)
+        self.version = 0
+        self.listening = False
+        self._pool = None
+        self._listen_url: Optional[str] = None
+        self._listen_conn = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+        self._feed_configured = False
+
+        self.full_reloads = 0
+        self.partial_reloads = 0
+        self.version_checks = 0
+        self.notifications = 0
+
+    def set_loader(self, loader: CatalogLoader):
+        self.loader = loader
+
+    @property
+    def loaded(self) -> bool:
+        return self._payload is not None
+
+    @property
+    def documents(self) -> List[Dict[str, Any]]:
+        return self._payload['documents'] if self.loaded else []
+
+    # ------------------------------------------------------------------
+    # Invalidation (called after the write has committed)
+    # ------------------------------------------------------------------
+
+    def invalidate(self, filename: Optional[str] = None):
+        """Mark one file (or, without a filename, the whole catalog) for reloading"""
+        if filename is None:
+            self._stale = True
+            self._dirty.clear()
+        else:
+            self._dirty.add(filename)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        The catalog as {'documents': [...]}: loaded if missing (or forced), changed
+        files merged in, and stale catalogs served while they are checked in the background.
+        """
+        if not force_refresh and self.loaded and not self._stale and not self._dirty:
+            if time.monotonic() - self._loaded_at > self.ttl:
+                if self._refresh_task is None or self._refresh_task.done():
+                    self._refresh_task = asyncio.ensure_future(self._background_refresh())
+            return self._payload
+
+        reloads = self.full_reloads
+        async with self._lock:
+            if force_refresh and self.full_reloads != reloads:
+                pass  # Reloaded by the caller we waited for - single flight
+            elif force_refresh or self._stale or not self.loaded:
+                await self._reload_all()
+            elif self._dirty:
+                await self._reload_dirty()
+        return self._payload
+
+    async def _reload_all(self):
+        if self.loader is None:
+            raise RuntimeError("Documents catalog has no loader (set_loader was not called)")
+        # Writes landing while the query runs are re-read by the next get()
+        pending, stale = self._dirty, self._stale
+        self._dirty, self._stale = set(), False
+        start = time.perf_counter()
+        try:
+            # Version first: a change committed after this point is notified again
+            if self.listening:
+                self.version = max(self.version, await self._read_version())
+            documents = self._documents_of(await self.loader())
+        except Exception:
+            self._dirty |= pending
+            self._stale = self._stale or stale
+            raise
+        self._by_filename = {doc['filename']: doc for doc in documents}
+        self._publish(documents)
+        self._loaded_at = time.monotonic()
+        self.full_reloads += 1
+        logger.info(f"📚 Documents catalog loaded: {len(documents)} documents in {time.perf_counter() - start:.2f}s")
+
+    async def _reload_dirty(self):
+        filenames, self._dirty = sorted(self._dirty), set()
+        try:
+            changed = self._documents_of(await self.loader(filenames=filenames))
+        except Exception:
+            self._dirty.update(filenames)
+            raise
+        self.merge(filenames, changed)
+        self.partial_reloads += 1
+        logger.info(f"📚 Documents catalog refreshed {len(filenames)} file(s)")
+
+    async def _background_refresh(self):
+        try:
+            if self._feed_configured and self._listener_task is None:
+                await self.start_listener_if_installed()
+            async with self._lock:
+                if self.listening and await self._read_version() <= self.version:
+                    # Every change since the load was notified (and merged): nothing to rebuild
+                    self._loaded_at = time.monotonic()
+                    self.version_checks += 1
+                    return
+                await self._reload_all()
+        except Exception as e:
+            logger.warning(f"⚠️ Documents catalog refresh failed (keeping previous catalog): {e}")
+
+    def merge(self, filenames: List[str], changed: List[Dict[str, Any]]):
+        """Replace the entries of `filenames` with `changed` (files missing from it were deleted)"""
+        for filename in filenames:
+            self._by_filename.pop(filename, None)
+        for doc in changed:
+            self._by_filename[doc['filename']] = doc
+        self._publish(sorted(self._by_filename.values(), key=_listing_order, reverse=True))
+
+    def _publish(self, documents: List[Dict[str, Any]]):
+        # Serialized once per change (same encoding as FastAPI's JSONResponse), hashed for the ETag
+        self.documents_json = json.dumps(
+            documents, ensure_ascii=False, separators=(",", ":"), default=str
+        ).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.documents_json).hexdigest()[:32]}"'
+        self._payload = {'documents': documents}
+
+    @staticmethod
+    def _documents_of(result: Any) -> List[Dict[str, Any]]:
+        # Defensive: the loader should return a dict with a 'documents' list
+        if isinstance(result, dict):
+            return list(result.get('documents') or [])
+        logger.warning(f"⚠️ Documents loader returned unexpected format: {type(result)}")
+        return list(result or [])
+
+    # ------------------------------------------------------------------
+    # Cross-worker notifications
+    # ------------------------------------------------------------------
+
+    async def start_change_feed(self, database_url: str, pool) -> bool:
+        """
+        Listen for changes from every process if migration 010 is installed;
+        otherwise check again on each TTL refresh. Returns whether it is listening.
+        """
+        self._pool = pool
+        self._listen_url = database_url
+        self._feed_configured = True
+        return await self.start_listener_if_installed()
+
+    async def start_listener_if_installed(self) -> bool:
+        if self._listener_task is not None:
+            return True
+        if not self._feed_configured:
+            return False
+        if not await detect_catalog_schema(self._pool):
+            return False
+        await self.start_listener(self._listen_url, self._pool)
+        return True
+
+    async def start_listener(self, database_url: str, pool):
+        """LISTEN for catalog changes from every process (needs migration 010)"""
+        self._pool = pool
+        self._listen_url = database_url
+        try:
+            await self._connect()
+        except Exception as e:
+            logger.warning(f"⚠️ Documents catalog listener could not connect (retrying): {e}")
+        self._listener_task = asyncio.ensure_future(self._keep_listening())
+
+    async def stop_listener(self):
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        await self._disconnect()
+
+    async def _connect(self):
+        conn = await asyncpg.connect(self._listen_url, statement_cache_size=0)
+        await conn.add_listener(CHANNEL, self._on_notify)
+        self._listen_conn = conn
+        self.listening = True
+        # Notifications sent before this connection listened are lost: rebuild once
+        if self.loaded:
+            self.invalidate()
+        logger.info("📡 Documents catalog listening for changes")
+
+    async def _disconnect(self):
+        conn, self._listen_conn = self._listen_conn, None
+        self.listening = False
+        if conn is not None and not conn.is_closed():
+            try:
+                await conn.close(timeout=5)
+            except Exception:
+                conn.terminate()
+
+    async def _keep_listening(self):
+        while True:
+            try:
+                if self._listen_conn is None:
+                    await self._connect()
+                await asyncio.sleep(self.keepalive)
+                # A dropped connection delivers nothing - probe it so it's noticed
+                await asyncio.wait_for(self._listen_conn.fetchval("SELECT 1"), timeout=10)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.listening:
+                    logger.warning(f"⚠️ Documents catalog listener lost its connection (reconnecting): {e}")
+                await self._disconnect()
+                await asyncio.sleep(self.reconnect_delay)
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            message = {}
+        self.notifications += 1
+        self.version = max(self.version, int(message.get('version') or 0))
+        filenames = message.get('filenames')
+        if filenames is None:
+            self.invalidate()
+        else:
+            for filename in filenames:
+                self.invalidate(filename)
+
+    async def _read_version(self) -> int:
+        async with self._pool.acquire() as conn:
+            return await conn.fetchval(VERSION_SQL)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "documents": len(self.documents),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self.loaded else None,
+            "etag": self.etag,
+            "pending_files": len(self._dirty),
+            "listening": self.listening,
+            "version": self.version,
+            "notifications": self.notifications,
+            "full_reloads": self.full_reloads,
+            "partial_reloads": self.partial_reloads,
+            "version_checks": self.version_checks,
+        }
+
+
+documents_catalog = DocumentsCatalog(ttl=float(os.getenv('DOCUMENTS_CACHE_TTL', '300')))
+
+
+def invalidate_documents_catalog(filename: Optional[str] = None):
+    """Reload one filename's entry (or the whole catalog) on the next read"""
+    documents_catalog.invalidate(filename)
+    logger.info(f"📤 Documents catalog invalidated ({filename or 'all'})")
+
+
+async def detect_catalog_schema(pool) -> bool:
+    """Whether the catalog change triggers (migration 010) are installed"""
+    try:
+        async with pool.acquire() as conn:
+            return bool(await conn.fetchval(SCHEMA_CHECK_SQL))
+    except Exception as e:
+        logger.warning(f"⚠️ Could not check for documents catalog change notifications: {e}")
+        return False
+
+
+async def install_catalog_schema(pool) -> bool:
+    """
+    Install the catalog change triggers (migrations/010_documents_catalog_notify.sql)
+    if they're missing - run_migration_010 only. Returns whether this call installed them.
+    """
+    return await apply_migration(pool, MIGRATION_FILE, SCHEMA_CHECK_SQL)
@@ -0,0 +1,166 @@
+"""
+In-memory embedding index for the no-pgvector fallback search.
+
+Without pgvector, embeddings are stored as JSONB and similarity has to be
+computed in Python. Instead of loading and JSON-decoding the whole documents
+table on every query, PostgresVectorStore keeps this index resident: one
+float32 matrix of L2-normalized embeddings, built once from the database and
+updated incrementally as chunks are added and deleted.
+
+A query is a single matrix-vector product plus argpartition for the top-k.
+Only chunk ids live here; content and metadata are fetched by id afterwards.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryEmbeddingIndex:
+    """Resident cosine-similarity index keyed by documents.id"""
+
+    # Compact the matrix once this fraction of rows are deleted tombstones
+    COMPACT_THRESHOLD = 0.25
+
+    def __init__(self, dim: int, initial_capacity: int = 1024):
+        self.dim = dim
+        self.loaded = False
+        self._matrix = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self._ids = np.zeros(initial_capacity, dtype=np.int64)
+        self._live = np.zeros(initial_capacity, dtype=bool)
+        self._size = 0  # rows in use, including tombstones
+        self._live_count = 0
+        self._positions: Dict[int, int] = {}  # chunk id -> row
+        self._rows_by_filename: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    def _ensure_capacity(self, needed: int):
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        ids = np.zeros(new_capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        self._matrix, self._ids, self._live = matrix, ids, live
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, ids: Iterable[int], filenames: Iterable[str], embeddings) -> int:
+        """
+        Add chunks to the index. Ids already present are skipped, so a build that
+        overlaps with concurrent ingestion can't double-count rows.
+
+        Returns the number of rows added.
+        """
+        ids = list(ids)
+        filenames = list(filenames)
+        if not ids:
+            return 0
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dim embeddings, got {vectors.shape[1]}")
+
+        keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in self._positions]
+        if not keep:
+            return 0
+        if len(keep) < len(ids):
+            vectors = vectors[keep]
+            ids = [ids[i] for i in keep]
+            filenames = [filenames[i] for i in keep]
+
+        start = self._size
+        end = start + len(ids)
+        self._ensure_capacity(end)
+        self._matrix[start:end] = self._normalize(vectors)
+        self._ids[start:end] = ids
+        self._live[start:end] = True
+
+        for offset, (chunk_id, filename) in enumerate(zip(ids, filenames)):
+            row = start + offset
+            self._positions[chunk_id] = row
+            self._rows_by_filename.setdefault(filename, []).append(row)
+
+        self._size = end
+        self._live_count += len(ids)
+        return len(ids)
+
+    def remove_filename(self, filename: str) -> int:
+        """Drop every chunk of a document. Returns the number of rows removed."""
+        rows = self._rows_by_filename.pop(filename, [])
+        removed = 0
+        for row in rows:
+            if self._live[row]:
+                self._live[row] = False
+                self._positions.pop(int(self._ids[row]), None)
+                removed += 1
+        self._live_count -= removed
+
+        if self._size and (self._size - self._live_count) / self._size > self.COMPACT_THRESHOLD:
+            self._compact()
+        return removed
+
+    def _compact(self):
+        """Squeeze out tombstoned rows and rebuild the position maps"""
+        live_rows = np.flatnonzero(self._live[:self._size])
+        row_filename = {}
+        for filename, rows in self._rows_by_filename.items():
+            for row in rows:
+                row_filename[row] = filename
+
+        self._matrix[:len(live_rows)] = self._matrix[live_rows]
+        self._ids[:len(live_rows)] = self._ids[live_rows]
+        self._live[:self._size] = False
+        self._live[:len(live_rows)] = True
+
+        self._positions = {}
+        self._rows_by_filename = {}
+        for new_row, old_row in enumerate(live_rows):
+            self._positions[int(self._ids[new_row])] = new_row
+            self._rows_by_filename.setdefault(row_filename[old_row], []).append(new_row)
+
+        logger.info(f"Compacted in-memory embedding index: {self._size} -> {len(live_rows)} rows")
+        self._size = len(live_rows)
+
+    def search(self, query_embedding, k: int) -> List[Tuple[int, float]]:
+        """
+        Return up to k (chunk_id, cosine_similarity) pairs, best first.
+        """
+        if k <= 0 or self._live_count == 0:
+            return []
+
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32).ravel())
+        scores = self._matrix[:self._size] @ query
+        if self._live_count < self._size:
+            scores[~self._live[:self._size]] = -np.inf
+
+        k = min(k, self._live_count)
+        if k < self._size:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(self._size)
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        return [(int(self._ids[row]), float(scores[row])) for row in top if self._live[row]]
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        """Size figures for logging and health endpoints"""
+        return {
+            "rows": self._live_count,
+            "tombstones": self._size - self._live_count,
+            "capacity": int(self._matrix.shape[0]),
+            "documents": len(self._rows_by_filename),
+            "matrix_bytes": int(self._matrix.nbytes),
+        }
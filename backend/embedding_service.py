@@ -0,0 +1,197 @@
+"""
+Embedding service layer in front of the SentenceTransformer model.
+
+Chat queries used to call `SentenceTransformer.encode` synchronously on the
+event loop, which stalled every other streaming response while it ran. This
+service adds three things between the vector store and the model:
+
+  - A bounded LRU cache with TTL, keyed by normalized query text, so popular
+    questions are encoded once.
+  - A micro-batching queue that merges concurrent query embeddings into a
+    single `encode` call (identical in-flight queries share one slot).
+  - A thread pool executor that runs every `encode` call off the event loop.
+
+Cache hit rate and batch sizes are exposed through `stats()` (surfaced on /health).
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Cache key for a query: case-folded with whitespace collapsed"""
+    return _WHITESPACE.sub(" ", text or "").strip().casefold()
+
+
+class EmbeddingService:
+    """Cached, micro-batched, non-blocking wrapper around a batch encode function"""
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], Any],
+        cache_size: int = 1024,
+        cache_ttl: float = 3600.0,
+        max_batch_size: int = 32,
+        batch_window_ms: float = 5.0,
+        max_workers: int = 2,
+    ):
+        self._encode = encode
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_window = max(0.0, batch_window_ms) / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embedding")
+
+        # normalized text -> (expires_at, embedding)
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # normalized text -> future shared by every waiter for that text
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[str, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks; a running batch must not be collected
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+        self._hits = 0
+        self._misses = 0
+        self._batches = 0
+        self._batched_queries = 0
+        self._max_batch_seen = 0
+        self._last_batch_size = 0
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key: str):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, embedding = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return embedding
+
+    def _cache_put(self, key: str, embedding):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.cache_ttl, embedding)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def embed_query(self, text: str):
+        """Embedding for a single search query (cached and micro-batched)"""
+        key = normalize_query(text)
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._hits += 1
+            return cached
+        self._misses += 1
+
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[key] = future
+            self._pending.append((key, text))
+
+            if len(self._pending) >= self.max_batch_size:
+                self._schedule_flush(loop, immediate=True)
+            elif self._flush_handle is None:
+                self._schedule_flush(loop)
+
+        # shield: one cancelled waiter must not cancel the shared result
+        return await asyncio.shield(future)
+
+    async def embed_documents(self, texts: List[str]):
+        """Embeddings for ingestion - not cached, but still encoded off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode, list(texts))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "cache_entries": len(self._cache),
+            "cache_size": self.cache_size,
+            "cache_hits": self._hits,
+            "cache_misses": self._misses,
+            "cache_hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "batches": self._batches,
+            "batched_queries": self._batched_queries,
+            "avg_batch_size": round(self._batched_queries / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size": self._max_batch_seen,
+            "last_batch_size": self._last_batch_size,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Micro-batching
+    # ------------------------------------------------------------------
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, immediate: bool = False):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        delay = 0 if immediate else self.batch_window
+        self._flush_handle = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        if not self._pending:
+            return
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+        if self._pending:
+            self._schedule_flush(asyncio.get_running_loop(), immediate=len(self._pending) >= self.max_batch_size)
+
+    async def _run_batch(self, batch: List[Tuple[str, str]]):
+        keys = [key for key, _ in batch]
+        texts = [text for _, text in batch]
+
+        self._batches += 1
+        self._batched_queries += len(batch)
+        self._last_batch_size = len(batch)
+        self._max_batch_seen = max(self._max_batch_seen, len(batch))
+
+        loop = asyncio.get_running_loop()
+        try:
+            embeddings = await loop.run_in_executor(self._executor, self._encode, texts)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+            for key in keys:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, embedding in zip(keys, embeddings):
+            # Cached vectors are shared between callers - keep them immutable
+            if hasattr(embedding, "setflags"):
+                embedding.setflags(write=False)
+            self._cache_put(key, embedding)
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(embedding)
@@ -16,12 +16,23 @@ import time
 from typing import List, Dict, Any, Optional, Literal
 from pathlib import Path
 import pandas as pd
-from fuzzywuzzy import fuzz, process
 import asyncpg
 import openpyxl
 from pydantic import BaseModel
 
 from backend.author_service import AuthorService
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
+try:
+    from title_index import TitleIndex
+    from metadata_import import AuthorLink, MetadataImportEngine, BOOK_COLUMN_TYPES
+    from book_metadata_cache import invalidate_book_metadata
+except ImportError:
+    from backend.title_index import TitleIndex
+    from backend.metadata_import import AuthorLink, MetadataImportEngine, BOOK_COLUMN_TYPES
+    from backend.book_metadata_cache import invalidate_book_metadata
 
 
 class ExcelValidationError(BaseModel):
@@ -94,13 +105,7 @@ class ExcelImportService:
         if self.pool:
             return
         
-        self.pool = await asyncpg.create_pool(
-            self.database_url,
-            statement_cache_size=0,  # Fix for pgbouncer compatibility
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
+        self.pool = await get_pool('excel_import_service', self.database_url)
     
     async def _ensure_pool(self):
         """Ensure connection pool is initialized (lazy initialization)"""
@@ -410,52 +415,42 @@ class ExcelImportService:
         
         return authors
 
-    async def fuzzy_match_title(self, title: str) -> Optional[int]:
+    async def fuzzy_match_title(self, title: str, title_index: Optional[TitleIndex] = None) -> Optional[int]:
         """
         Find best matching book by title using fuzzy matching
         
         Args:
             title: Book title to match
+            title_index: Index of the books catalog to match against (see
+                load_title_index); built from the database when not given
             
         Returns:
             Book ID of best match, or None if no good match found
             
         Validates: Requirements 9.2
         """
-        await self._ensure_pool()
-        
         if not title or not title.strip():
             return None
         
-        title = title.strip()
+        if title_index is None:
+            title_index = await self.load_title_index()
         
-        async with self.pool.acquire() as conn:
-            # Get all book titles from database
-            rows = await conn.fetch("SELECT id, title FROM books")
-            
-            if not rows:
-                return None
-            
-            # Create list of titles for fuzzy matching
-            titles = [(row['title'], row['id']) for row in rows]
-            title_strings = [t[0] for t in titles]
-            
-            # Use fuzzywuzzy to find best match
-            best_match = process.extractOne(
-                title, 
-                title_strings, 
-                scorer=fuzz.ratio,
-                score_cutoff=self.fuzzy_threshold
-            )
-            
-            if best_match:
-                matched_title, score = best_match
-                # Find the book ID for the matched title
-                for db_title, book_id in titles:
-                    if db_title == matched_title:
-                        return book_id
-            
-            return None
+        return title_index.match(title.strip())
+
+    async def load_title_index(self, conn: Optional[asyncpg.Connection] = None) -> TitleIndex:
+        """
+        Build a TitleIndex of all book titles - once per import run, not per row
+        
+        Args:
+            conn: Connection to read the catalog with (e.g. the import's transaction)
+        """
+        if conn is None:
+            await self._ensure_pool()
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch("SELECT id, title FROM books ORDER BY id")
+        else:
+            rows = await conn.fetch("SELECT id, title FROM books ORDER BY id")
+        return TitleIndex(rows, score_cutoff=self.fuzzy_threshold)
 
     async def _mock_fuzzy_match_with_data(self, title: str, mock_data: List[tuple]) -> Optional[int]:
         """
@@ -469,34 +464,9 @@ class ExcelImportService:
         Returns:
             Book ID of best match, or None if no good match found
         """
-        if not title or not title.strip():
-            return None
-        
-        title = title.strip()
-        
-        if not mock_data:
-            return None
-        
-        # Create list of titles for fuzzy matching
-        titles = [(row[1], row[0]) for row in mock_data]
-        title_strings = [t[0] for t in titles]
-        
-        # Use fuzzywuzzy to find best match (same logic as real method)
-        best_match = process.extractOne(
-            title, 
-            title_strings, 
-            scorer=fuzz.ratio,
-            score_cutoff=self.fuzzy_threshold
+        return await self.fuzzy_match_title(
+            title, TitleIndex(mock_data, score_cutoff=self.fuzzy_threshold)
         )
-        
-        if best_match:
-            matched_title, score = best_match
-            # Find the book ID for the matched title
-            for db_title, book_id in titles:
-                if db_title == matched_title:
-                    return book_id
-        
-        return None
 
     def _normalize_url(self, url: str) -> str:
         """
@@ -549,50 +519,68 @@ class ExcelImportService:
         
         return bool(url_pattern.match(url))
 
-    async def _get_or_create_author_in_transaction(
-        self, 
-        conn: asyncpg.Connection, 
-        name: str, 
-        site_url: Optional[str] = None
-    ) -> int:
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str, strip: bool = True) -> pd.Series:
+        """Column as str(cell) per row ('' when the column is missing), stripped"""
+        if name not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        if not strip:
+            return df[name]
+        return df[name].map(str).str.strip()
+
+    def _clean_url_cell(self, url_raw: Any) -> str:
+        """URL cell with improved parsing for Numbers exports, normalized"""
+        if url_raw is None or pd.isna(url_raw):
+            url = ''
+        elif isinstance(url_raw, (int, float)):
+            url = str(url_raw) if url_raw != 0 else ''
+        else:
+            url = str(url_raw).strip()
+        
+        # Normalize URL to fix common formatting issues
+        if url:
+            url = self._normalize_url(url)
+        return url
+
+    def _author_links(
+        self,
+        row_no: int,
+        book_id: int,
+        author_string: str,
+        site_url_for,
+        column: str,
+        errors: List[ExcelValidationError]
+    ) -> List[AuthorLink]:
         """
-        Get existing author ID or create new author within an existing transaction.
-        
-        This method works within an existing database transaction and implements
-        author deduplication by using INSERT ... ON CONFLICT.
+        Authors of one row, in order, to link to its book.
         
-        Args:
-            conn: Database connection within a transaction
-            name: Author name (will be deduplicated)
-            site_url: Optional author website URL
-            
-        Returns:
-            Author ID (existing or newly created)
-            
-        Validates: Requirements 6.1, 6.2, 6.3
+        An author with an invalid site URL is reported (with the row) and ends the
+        row's author list there, as it did when authors were written one by one.
         """
-        if not name or not name.strip():
-            raise ValueError("Author name cannot be empty")
-        
-        name = name.strip()
-        
-        # Validate URL if provided
-        if site_url:
-            site_url = self._validate_url(site_url)
-        
-        # Use INSERT ... ON CONFLICT to handle deduplication within the transaction
-        # If author exists, update site_url and return existing ID
-        # If author doesn't exist, create new record
-        author_id = await conn.fetchval("""
-            INSERT INTO authors (name, site_url)
-            VALUES ($1, $2)
-            ON CONFLICT (name) DO UPDATE
-            SET site_url = COALESCE(EXCLUDED.site_url, authors.site_url),
-                updated_at = CURRENT_TIMESTAMP
-            RETURNING id
-        """, name, site_url)
-        
-        return author_id
+        links = []
+        for order, author_name in enumerate(self.parse_authors(author_string)):
+            try:
+                site_url = site_url_for(author_name)
+                if site_url:
+                    site_url = self._validate_url(site_url)
+                links.append(AuthorLink(row_no, book_id, order, author_name.strip(), site_url or None))
+            except ValueError as e:
+                error_msg = f"Error processing author {author_name}: {str(e)}"
+                print(f"❌ Row {row_no}: {error_msg}")
+                errors.append(ExcelValidationError(
+                    row=row_no,
+                    column=column,
+                    message=error_msg,
+                    severity="error"
+                ))
+                errors.append(ExcelValidationError(
+                    row=row_no,
+                    column="row",
+                    message=f"Error processing row: {str(e)}",
+                    severity="error"
+                ))
+                break
+        return links
 
     def _validate_url(self, url: str) -> str:
         """
@@ -697,7 +685,13 @@ class ExcelImportService:
             # Rename columns to standard names
             df = df.rename(columns=column_mapping)
             
-            books_processed = 0
+            # Prepare every row at once (same cleaning as the spreadsheet's cells get one by one)
+            row_nos = pd.Series(range(1, len(df) + 1), index=df.index)
+            urls = self._column(df, 'URL', strip=False).map(self._clean_url_cell)
+            titles = self._column(df, 'Title')
+            author_strings = self._column(df, 'Author')
+            
+            books_processed = len(df)
             books_matched = 0
             books_updated = 0
             authors_created = 0
@@ -705,136 +699,72 @@ class ExcelImportService:
             authors_url_updated = 0
             errors = []
             
+            complete = (titles != '') & (author_strings != '')
+            for row_no in row_nos[~complete].tolist():
+                error_msg = "Title and Author are required"
+                print(f"⚠️  Row {row_no}: {error_msg}")
+                errors.append(ExcelValidationError(
+                    row=row_no,
+                    column="Title/Author",
+                    message=error_msg,
+                    severity="error"
+                ))
+            
             await self._ensure_pool()
             
             # Use a single transaction for all database operations
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     print(f"🔄 Starting transaction for book metadata import ({len(df)} rows)")
+                    title_index = await self.load_title_index(conn)
+                    engine = MetadataImportEngine(conn)
                     
-                    for idx, row in df.iterrows():
-                        try:
-                            books_processed += 1
-                            
-                            # Handle URL with improved parsing for Numbers exports
-                            url_raw = row.get('URL', '')
-                            if pd.isna(url_raw) or url_raw is None:
-                                url = ''
-                            elif isinstance(url_raw, (int, float)):
-                                url = str(url_raw) if url_raw != 0 else ''
-                            else:
-                                url = str(url_raw).strip()
-                            
-                            # Normalize URL to fix common formatting issues
-                            if url:
-                                url = self._normalize_url(url)
-                            
-                            title = str(row.get('Title', '')).strip()
-                            author_string = str(row.get('Author', '')).strip()
-                            
-                            if not title or not author_string:
-                                error_msg = "Title and Author are required"
-                                print(f"⚠️  Row {idx + 1}: {error_msg}")
-                                errors.append(ExcelValidationError(
-                                    row=idx + 1,
-                                    column="Title/Author",
-                                    message=error_msg,
-                                    severity="error"
-                                ))
-                                continue
-                            
-                            # Debug: Print what we're processing
-                            print(f"📝 Processing row {idx + 1}: Title='{title}', Author='{author_string}', URL='{url}'")
-                            
-                            # Find matching book by title
-                            book_id = await self.fuzzy_match_title(title)
-                            if not book_id:
-                                error_msg = f"No matching book found for title: {title}"
-                                print(f"⚠️  Row {idx + 1}: {error_msg}")
-                                errors.append(ExcelValidationError(
-                                    row=idx + 1,
-                                    column="Title",
-                                    message=error_msg,
-                                    severity="warning"
-                                ))
-                                continue
-                            
-                            books_matched += 1
-                            print(f"✅ Row {idx + 1}: Matched book ID {book_id}")
-                            
-                            # Update book with mc_press_url within the transaction
-                            if url and self._is_valid_url(url):
-                                result_tag = await conn.execute(
-                                    "UPDATE books SET mc_press_url = $1 WHERE id = $2",
-                                    url, book_id
-                                )
-                                if result_tag == "UPDATE 1":
-                                    books_updated += 1
-                                    print(f"✅ Row {idx + 1}: Updated book URL")
-                                else:
-                                    print(f"⚠️  Row {idx + 1}: Book update failed - {result_tag}")
-                            
-                            # Parse and create/update authors, then associate with document
-                            authors = self.parse_authors(author_string)
-                            print(f"👥 Row {idx + 1}: Processing {len(authors)} authors: {authors}")
-                            
-                            for order, author_name in enumerate(authors):
-                                try:
-                                    # Look up author URL from mapping if available
-                                    site_url = author_url_mapping.get(author_name) if author_url_mapping else None
-                                    # Create author within the same transaction context
-                                    author_id = await self._get_or_create_author_in_transaction(
-                                        conn, author_name, site_url
-                                    )
-                                    authors_created += 1  # This is approximate
-                                    if site_url:
-                                        authors_url_updated += 1
-                                    
-                                    # Associate author with document in document_authors table
-                                    # Check if association already exists to avoid duplicates
-                                    exists = await conn.fetchval("""
-                                        SELECT EXISTS(
-                                            SELECT 1 FROM document_authors 
-                                            WHERE book_id = $1 AND author_id = $2
-                                        )
-                                    """, book_id, author_id)
-                                    
-                                    if not exists:
-                                        await conn.execute("""
-                                            INSERT INTO document_authors (book_id, author_id, author_order)
-                                            VALUES ($1, $2, $3)
-                                        """, book_id, author_id, order)
-                                        print(f"✅ Row {idx + 1}: Associated author '{author_name}' (ID {author_id}) with book")
-                                    else:
-                                        print(f"ℹ️  Row {idx + 1}: Author '{author_name}' already associated with book")
-                                        
-                                except Exception as e:
-                                    error_msg = f"Error processing author {author_name}: {str(e)}"
-                                    print(f"❌ Row {idx + 1}: {error_msg}")
-                                    errors.append(ExcelValidationError(
-                                        row=idx + 1,
-                                        column="Author",
-                                        message=error_msg,
-                                        severity="error"
-                                    ))
-                                    # Don't continue processing this row if author processing fails
-                                    raise
-                        
-                        except Exception as e:
-                            error_msg = f"Error processing row: {str(e)}"
-                            print(f"❌ Row {idx + 1}: {error_msg}")
+                    # Match titles (in memory), then collect URL updates and author links
+                    url_updates: Dict[int, Dict[str, Any]] = {}
+                    url_rows = []  # (row_no, book_id) of rows setting a URL
+                    links: List[AuthorLink] = []
+                    for row_no, title, author_string, url in zip(
+                        row_nos[complete].tolist(), titles[complete], author_strings[complete], urls[complete]
+                    ):
+                        book_id = await self.fuzzy_match_title(title, title_index)
+                        if not book_id:
+                            error_msg = f"No matching book found for title: {title}"
+                            print(f"⚠️  Row {row_no}: {error_msg}")
                             errors.append(ExcelValidationError(
-                                row=idx + 1,
-                                column="row",
+                                row=row_no,
+                                column="Title",
                                 message=error_msg,
-                                severity="error"
+                                severity="warning"
                             ))
-                            # For critical errors, we might want to rollback the entire transaction
-                            # For now, we'll continue processing other rows
+                            continue
+                        
+                        books_matched += 1
+                        if url and self._is_valid_url(url):
+                            url_updates[book_id] = {'mc_press_url': url}  # later rows win
+                            url_rows.append((row_no, book_id))
+                        
+                        row_links = self._author_links(
+                            row_no, book_id, author_string,
+                            lambda name: author_url_mapping.get(name) if author_url_mapping else None,
+                            "Author", errors
+                        )
+                        links.extend(row_links)
+                        authors_created += len(row_links)  # This is approximate
+                        authors_url_updated += sum(1 for link in row_links if link.site_url)
+                    
+                    # Apply everything with a few set-based statements
+                    updated_ids = await engine.update_books('id', url_updates, BOOK_COLUMN_TYPES)
+                    books_updated = sum(1 for _, book_id in url_rows if book_id in updated_ids)
+                    _, links_added = await engine.link_authors(links)
+                    print(f"✅ Updated {len(updated_ids)} book URLs, added {links_added} of {len(links)} author associations")
                     
                     # Transaction will be committed automatically if we reach here
                     print(f"✅ Transaction committed successfully")
             
+            # Titles, URLs and authors changed: chat sources re-read them
+            invalidate_book_metadata()
+            errors.sort(key=lambda error: error.row)
+            
             result.success = True
             result.books_processed = books_processed
             result.books_matched = books_matched
@@ -903,155 +833,109 @@ class ExcelImportService:
                     df.columns[11]: 'author_url'   # Column L
                 })
             
-            articles_processed = 0
+            # Prepare every row at once (same cleaning as the spreadsheet's cells get one by one)
+            row_nos = pd.Series(range(1, len(df) + 1), index=df.index)
+            featured = self._column(df, 'feature_article').str.lower() == 'yes'
+            article_ids = self._column(df, 'id')
+            article_titles = self._column(df, 'title')
+            author_strings = self._column(df, 'author')
+            article_urls = self._column(df, 'article_url').map(lambda url: self._normalize_url(url) if url else url)
+            author_urls = self._column(df, 'author_url').map(lambda url: self._normalize_url(url) if url else url)
+            
+            # Only process rows where feature_article = "yes"
+            articles_processed = int(featured.sum())
             articles_matched = 0
             documents_updated = 0
             authors_created = 0
             authors_updated = 0
             errors = []
             
+            incomplete = featured & ((article_ids == '') | (author_strings == ''))
+            for row_no in row_nos[incomplete].tolist():
+                error_msg = "Article ID and Author are required"
+                print(f"⚠️  Row {row_no}: {error_msg}")
+                errors.append(ExcelValidationError(
+                    row=row_no,
+                    column="id/author",
+                    message=error_msg,
+                    severity="error"
+                ))
+            
+            # Validate title (optional but recommended)
+            valid = featured & ~incomplete
+            for row_no in row_nos[valid & (article_titles == '')].tolist():
+                print(f"⚠️  Row {row_no}: Article title is missing")
+                errors.append(ExcelValidationError(
+                    row=row_no,
+                    column="title",
+                    message="Article title is missing",
+                    severity="warning"
+                ))
+            
             await self._ensure_pool()
             
             # Use a single transaction for all database operations
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     print(f"🔄 Starting transaction for article metadata import ({len(df)} rows)")
+                    engine = MetadataImportEngine(conn)
                     
-                    for idx, row in df.iterrows():
-                        try:
-                            # Only process rows where feature_article = "yes"
-                            feature_article = str(row.get('feature_article', '')).strip().lower()
-                            if feature_article != 'yes':
-                                continue
-                            
-                            articles_processed += 1
-                            
-                            article_id = str(row.get('id', '')).strip()
-                            article_title = str(row.get('title', '')).strip()
-                            author_string = str(row.get('author', '')).strip()
-                            article_url = str(row.get('article_url', '')).strip()
-                            author_url = str(row.get('author_url', '')).strip()
-                            
-                            # Normalize URLs to fix common formatting issues
-                            if article_url:
-                                article_url = self._normalize_url(article_url)
-                            if author_url:
-                                author_url = self._normalize_url(author_url)
-                            
-                            if not article_id or not author_string:
-                                error_msg = "Article ID and Author are required"
-                                print(f"⚠️  Row {idx + 1}: {error_msg}")
-                                errors.append(ExcelValidationError(
-                                    row=idx + 1,
-                                    column="id/author",
-                                    message=error_msg,
-                                    severity="error"
-                                ))
-                                continue
-                            
-                            # Validate title (optional but recommended)
-                            if not article_title:
-                                print(f"⚠️  Row {idx + 1}: Article title is missing")
-                                errors.append(ExcelValidationError(
-                                    row=idx + 1,
-                                    column="title",
-                                    message="Article title is missing",
-                                    severity="warning"
-                                ))
-                            
-                            print(f"📝 Processing row {idx + 1}: ID='{article_id}', Title='{article_title}', Author='{author_string}'")
-                            
-                            # Match article ID against PDF filenames within the transaction
-                            # Try with and without .pdf extension
-                            book_id = await conn.fetchval(
-                                "SELECT id FROM books WHERE filename = $1 OR filename = $2",
-                                f"{article_id}.pdf", article_id
-                            )
-                            
-                            if not book_id:
-                                error_msg = f"No matching document found for ID: {article_id}"
-                                print(f"⚠️  Row {idx + 1}: {error_msg}")
-                                errors.append(ExcelValidationError(
-                                    row=idx + 1,
-                                    column="id",
-                                    message=error_msg,
-                                    severity="warning"
-                                ))
-                                continue
-                            
-                            articles_matched += 1
-                            print(f"✅ Row {idx + 1}: Matched document ID {book_id}")
-                            
-                            # Update document with title, article_url and document_type within the transaction
-                            result_tag = await conn.execute("""
-                                UPDATE books 
-                                SET title = $1, article_url = $2, document_type = 'article'
-                                WHERE id = $3
-                            """, article_title if article_title else None, article_url if article_url else None, book_id)
-                            
-                            if result_tag == "UPDATE 1":
-                                documents_updated += 1
-                                print(f"✅ Row {idx + 1}: Updated document metadata")
-                            else:
-                                print(f"⚠️  Row {idx + 1}: Document update failed - {result_tag}")
-                            
-                            # Parse and create/update authors, then associate with document
-                            authors = self.parse_authors(author_string)
-                            print(f"👥 Row {idx + 1}: Processing {len(authors)} authors: {authors}")
-                            
-                            for order, author_name in enumerate(authors):
-                                try:
-                                    # Create author with site URL if provided, within the same transaction
-                                    author_id = await self._get_or_create_author_in_transaction(
-                                        conn, author_name, author_url if author_url else None
-                                    )
-                                    authors_created += 1  # This is approximate
-                                    
-                                    # Associate author with document in document_authors table
-                                    # Check if association already exists to avoid duplicates
-                                    exists = await conn.fetchval("""
-                                        SELECT EXISTS(
-                                            SELECT 1 FROM document_authors 
-                                            WHERE book_id = $1 AND author_id = $2
-                                        )
-                                    """, book_id, author_id)
-                                    
-                                    if not exists:
-                                        await conn.execute("""
-                                            INSERT INTO document_authors (book_id, author_id, author_order)
-                                            VALUES ($1, $2, $3)
-                                        """, book_id, author_id, order)
-                                        print(f"✅ Row {idx + 1}: Associated author '{author_name}' (ID {author_id}) with document")
-                                    else:
-                                        print(f"ℹ️  Row {idx + 1}: Author '{author_name}' already associated with document")
-                                        
-                                except Exception as e:
-                                    error_msg = f"Error processing author {author_name}: {str(e)}"
-                                    print(f"❌ Row {idx + 1}: {error_msg}")
-                                    errors.append(ExcelValidationError(
-                                        row=idx + 1,
-                                        column="author",
-                                        message=error_msg,
-                                        severity="error"
-                                    ))
-                                    # Don't continue processing this row if author processing fails
-                                    raise
-                        
-                        except Exception as e:
-                            error_msg = f"Error processing row: {str(e)}"
-                            print(f"❌ Row {idx + 1}: {error_msg}")
+                    # Match article IDs against PDF filenames, with and without .pdf extension
+                    book_ids = await engine.resolve_filenames({
+                        row_no: [f"{article_id}.pdf", article_id]
+                        for row_no, article_id in zip(row_nos[valid].tolist(), article_ids[valid])
+                    })
+                    
+                    document_updates: Dict[int, Dict[str, Any]] = {}
+                    updated_rows = []  # (row_no, book_id)
+                    links: List[AuthorLink] = []
+                    for row_no, article_id, article_title, author_string, article_url, author_url in zip(
+                        row_nos[valid].tolist(), article_ids[valid], article_titles[valid],
+                        author_strings[valid], article_urls[valid], author_urls[valid]
+                    ):
+                        book_id = book_ids.get(row_no)
+                        if not book_id:
+                            error_msg = f"No matching document found for ID: {article_id}"
+                            print(f"⚠️  Row {row_no}: {error_msg}")
                             errors.append(ExcelValidationError(
-                                row=idx + 1,
-                                column="row",
+                                row=row_no,
+                                column="id",
                                 message=error_msg,
-                                severity="error"
+                                severity="warning"
                             ))
-                            # For critical errors, we might want to rollback the entire transaction
-                            # For now, we'll continue processing other rows
+                            continue
+                        
+                        articles_matched += 1
+                        # Title, article_url and document_type; later rows for a document win
+                        document_updates[book_id] = {
+                            'title': article_title if article_title else None,
+                            'article_url': article_url if article_url else None,
+                            'document_type': 'article',
+                        }
+                        updated_rows.append((row_no, book_id))
+                        
+                        # Authors get the row's author URL if provided
+                        row_links = self._author_links(
+                            row_no, book_id, author_string,
+                            lambda name: author_url if author_url else None,
+                            "author", errors
+                        )
+                        links.extend(row_links)
+                        authors_created += len(row_links)  # This is approximate
+                    
+                    # Apply everything with a few set-based statements
+                    updated_ids = await engine.update_books('id', document_updates, BOOK_COLUMN_TYPES, keep_nulls=True)
+                    documents_updated = sum(1 for _, book_id in updated_rows if book_id in updated_ids)
+                    _, links_added = await engine.link_authors(links)
+                    print(f"✅ Updated {len(updated_ids)} documents, added {links_added} of {len(links)} author associations")
                     
                     # Transaction will be committed automatically if we reach here
                     print(f"✅ Transaction committed successfully")
             
+            # Titles, URLs and authors changed: chat sources re-read them
+            invalidate_book_metadata()
+            errors.sort(key=lambda error: error.row)
+            
             result.success = True
             result.articles_processed = articles_processed
             result.articles_matched = articles_matched
@@ -1086,9 +970,9 @@ class ExcelImportService:
         """
         Backfill author site_url values from an author-URL mapping.
         
-        Iterates the mapping and calls _get_or_create_author_in_transaction()
-        for each author with their URL. The ON CONFLICT upsert with
-        COALESCE(EXCLUDED.site_url, authors.site_url) handles updates correctly.
+        Validates the mapping in memory, then upserts all authors in one
+        INSERT ... ON CONFLICT statement. The COALESCE(EXCLUDED.site_url,
+        authors.site_url) update never clears an existing URL.
         
         Args:
             author_url_mapping: Dict mapping author_name -> author_url
@@ -1102,24 +986,28 @@ class ExcelImportService:
         authors_updated = 0
         authors_not_found = 0
         
+        valid_authors = []
+        for author_name, site_url in author_url_mapping.items():
+            authors_checked += 1
+            try:
+                if not author_name or not author_name.strip():
+                    raise ValueError("Author name cannot be empty")
+                valid_authors.append((author_name.strip(), self._validate_url(site_url) if site_url else site_url))
+            except ValueError as e:
+                authors_not_found += 1
+                print(f"⚠️  Failed to backfill author '{author_name}': {e}")
+        
         async with self.pool.acquire() as conn:
             async with conn.transaction():
                 print(f"🔄 Starting backfill for {len(author_url_mapping)} author URL entries")
                 
-                for author_name, site_url in author_url_mapping.items():
-                    authors_checked += 1
-                    try:
-                        author_id = await self._get_or_create_author_in_transaction(
-                            conn, author_name, site_url
-                        )
-                        authors_updated += 1
-                        print(f"✅ Backfilled author '{author_name}' (ID {author_id}) with URL: {site_url}")
-                    except Exception as e:
-                        authors_not_found += 1
-                        print(f"⚠️  Failed to backfill author '{author_name}': {e}")
+                author_ids = await MetadataImportEngine(conn).upsert_authors(valid_authors)
+                authors_updated = len(valid_authors)
+                print(f"✅ Backfilled {len(author_ids)} authors with URLs")
                 
                 print(f"✅ Backfill transaction committed")
         
+        invalidate_book_metadata()
         stats = {
             "mapping_size": len(author_url_mapping),
             "authors_checked": authors_checked,
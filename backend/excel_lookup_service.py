@@ -9,6 +9,9 @@ O(1) lookup by numeric article ID. Supports dual-spreadsheet loading:
 
 Used by MetadataResolver to resolve article titles and authors
 from numeric filenames during ingestion and backfill.
+
+Parsed spreadsheets are compiled into binary sidecars (see spreadsheet_cache),
+so only the first construction after a spreadsheet changes parses the xlsx.
 """
 
 import os
@@ -19,6 +22,11 @@ from typing import Dict, List, Optional
 
 import openpyxl
 
+try:
+    from spreadsheet_cache import CompiledRows, load_compiled
+except ImportError:
+    from backend.spreadsheet_cache import CompiledRows, load_compiled
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +39,10 @@ class ExcelMetadataEntry:
     article_id: Optional[str] = None
 
 
+ARTICLE_COLUMNS = ("article_id", "title", "author", "url")
+BOOK_COLUMNS = ("title", "author", "url")
+
+
 class ExcelLookupService:
     """
     Loads and provides lookup for article metadata from Excel spreadsheets.
@@ -45,6 +57,7 @@ class ExcelLookupService:
         self,
         article_spreadsheet_path: str = "export_subset_DMU_v2.xlsx",
         book_spreadsheet_path: str = "MC Press Books - URL-Title-Author.xlsx",
+        cache_dir: Optional[str] = None,
     ):
         """
         Load spreadsheet data into memory on initialization.
@@ -52,7 +65,14 @@ class ExcelLookupService:
         Args:
             article_spreadsheet_path: Path to the article export spreadsheet.
             book_spreadsheet_path: Path to the book metadata spreadsheet.
+            cache_dir: Directory for the compiled sidecars (default: next to each
+                spreadsheet, or EXCEL_LOOKUP_CACHE_DIR).
         """
+        self.cache_dir = cache_dir
+        # Article rows stay in the (shared, read-only) compiled table; entries are
+        # built on first lookup
+        self._articles: Optional[CompiledRows] = None
+        self._article_rows: Dict[str, int] = {}  # article ID -> row in self._articles
         self._article_mapping: Dict[str, ExcelMetadataEntry] = {}
         self._book_entries: List[ExcelMetadataEntry] = []
 
@@ -61,7 +81,7 @@ class ExcelLookupService:
 
         logger.info(
             "ExcelLookupService initialized: %d article entries, %d book entries",
-            len(self._article_mapping),
+            self.article_count,
             len(self._book_entries),
         )
 
@@ -79,7 +99,12 @@ class ExcelLookupService:
         Returns:
             ExcelMetadataEntry if found, None otherwise.
         """
-        return self._article_mapping.get(article_id)
+        entry = self._article_mapping.get(article_id)
+        if entry is None and article_id in self._article_rows:
+            article_id, title, author, url = self._articles.row(self._article_rows[article_id])
+            entry = ExcelMetadataEntry(title=title, author=author, url=url, article_id=article_id)
+            self._article_mapping[article_id] = entry
+        return entry
 
     def lookup_by_filename(self, filename: str) -> Optional[ExcelMetadataEntry]:
         """
@@ -218,10 +243,32 @@ class ExcelLookupService:
     # Spreadsheet loading (private)
     # ------------------------------------------------------------------
 
-    def _load_article_spreadsheet(self, path: str) -> None:
+    @staticmethod
+    def _clean_cells(raw_title, raw_author, raw_url):
+        """Trimmed title/author/URL with nan-like values blanked and the URL normalized"""
+        title = str(raw_title).strip() if raw_title else ""
+        author = str(raw_author).strip() if raw_author else ""
+        url = str(raw_url).strip() if raw_url else None
+
+        # Skip entries with nan-like values
+        if title.lower() == "nan":
+            title = ""
+        if author.lower() == "nan":
+            author = ""
+        if url and url.lower() == "nan":
+            url = None
+
+        # Normalize URL (fix ww. → www.)
+        if url:
+            url = ExcelLookupService.normalize_url(url)
+
+        return title, author, url
+
+    @classmethod
+    def _read_article_rows(cls, path: str) -> List[tuple]:
         """
-        Read export_subset_DMU_v2.xlsx using openpyxl and build the
-        article ID → ExcelMetadataEntry mapping.
+        Read export_subset_DMU_v2.xlsx using openpyxl into
+        (article ID, title, author, URL) rows.
 
         Column layout:
             A (index 0) = article ID
@@ -229,24 +276,17 @@ class ExcelLookupService:
             J (index 9) = author
             K (index 10) = article URL
         """
-        if not path or not os.path.isfile(path):
-            logger.warning(
-                "Article spreadsheet not found at '%s' — continuing without article lookup.",
-                path,
-            )
-            return
-
+        wb = openpyxl.load_workbook(path, data_only=True, read_only=True)
         try:
-            wb = openpyxl.load_workbook(path, data_only=True, read_only=True)
             ws = wb.active  # Use the active (first) sheet
 
-            rows_loaded = 0
-            for row in ws.iter_rows(min_row=2):  # skip header
+            rows = []
+            for row in ws.iter_rows(min_row=2, values_only=True):  # skip header
                 # Safely read cells — row may be shorter than expected
-                raw_id = row[0].value if len(row) > 0 else None
-                raw_title = row[1].value if len(row) > 1 else None
-                raw_author = row[9].value if len(row) > 9 else None
-                raw_url = row[10].value if len(row) > 10 else None
+                raw_id = row[0] if len(row) > 0 else None
+                raw_title = row[1] if len(row) > 1 else None
+                raw_author = row[9] if len(row) > 9 else None
+                raw_url = row[10] if len(row) > 10 else None
 
                 if raw_id is None:
                     continue
@@ -255,34 +295,72 @@ class ExcelLookupService:
                 if not article_id:
                     continue
 
-                title = str(raw_title).strip() if raw_title else ""
-                author = str(raw_author).strip() if raw_author else ""
-                url = str(raw_url).strip() if raw_url else None
+                rows.append((article_id, *cls._clean_cells(raw_title, raw_author, raw_url)))
+            return rows
+        finally:
+            wb.close()
 
-                # Skip entries with nan-like values
-                if title.lower() == "nan":
-                    title = ""
-                if author.lower() == "nan":
-                    author = ""
-                if url and url.lower() == "nan":
-                    url = None
+    @classmethod
+    def _read_book_rows(cls, path: str) -> List[tuple]:
+        """
+        Read MC Press Books - URL-Title-Author.xlsx using openpyxl into
+        (title, author, URL) rows.
 
-                # Normalize URL (fix ww. → www.)
-                if url:
-                    url = self.normalize_url(url)
+        Expected columns (by header name): URL, Title, Author.
+        """
+        wb = openpyxl.load_workbook(path, data_only=True, read_only=True)
+        try:
+            ws = wb.active
+
+            # Read header row to find column indices
+            header_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True))
+            headers = {
+                str(value).strip().lower(): idx
+                for idx, value in enumerate(header_row)
+                if value is not None
+            }
+
+            url_idx = headers.get("url")
+            title_idx = headers.get("title")
+            author_idx = headers.get("author")
 
-                self._article_mapping[article_id] = ExcelMetadataEntry(
-                    title=title,
-                    author=author,
-                    url=url,
-                    article_id=article_id,
+            if title_idx is None or author_idx is None:
+                raise ValueError(
+                    f"missing required columns (Title, Author). Found headers: {list(headers.keys())}"
                 )
-                rows_loaded += 1
 
+            rows = []
+            for row in ws.iter_rows(min_row=2, values_only=True):
+                raw_title = row[title_idx] if len(row) > title_idx else None
+                raw_author = row[author_idx] if len(row) > author_idx else None
+                raw_url = row[url_idx] if url_idx is not None and len(row) > url_idx else None
+
+                title, author, url = cls._clean_cells(raw_title, raw_author, raw_url)
+                if not title and not author:
+                    continue
+                rows.append((title, author, url))
+            return rows
+        finally:
             wb.close()
+
+    def _load_article_spreadsheet(self, path: str) -> None:
+        """Index the compiled article spreadsheet by article ID."""
+        if not path or not os.path.isfile(path):
+            logger.warning(
+                "Article spreadsheet not found at '%s' — continuing without article lookup.",
+                path,
+            )
+            return
+
+        try:
+            self._articles = load_compiled(path, ARTICLE_COLUMNS, self._read_article_rows, self.cache_dir)
+            # Later rows win, as when each row was assigned into the mapping
+            self._article_rows = {
+                article_id: row for row, article_id in enumerate(self._articles.column("article_id"))
+            }
             logger.info(
                 "Loaded %d article entries from '%s'.",
-                rows_loaded,
+                len(self._articles),
                 path,
             )
 
@@ -295,10 +373,10 @@ class ExcelLookupService:
 
     def _load_book_spreadsheet(self, path: str) -> None:
         """
-        Read MC Press Books - URL-Title-Author.xlsx using openpyxl and
-        store as supplementary book entries.
+        Load the compiled book spreadsheet as supplementary book entries.
 
-        Expected columns (by header name): URL, Title, Author.
+        Book URLs with a numeric ID are also indexed for lookup_by_id (the
+        article spreadsheet takes precedence).
         """
         if not path or not os.path.isfile(path):
             logger.warning(
@@ -308,82 +386,30 @@ class ExcelLookupService:
             return
 
         try:
-            wb = openpyxl.load_workbook(path, data_only=True, read_only=True)
-            ws = wb.active
-
-            # Read header row to find column indices
-            header_row = next(ws.iter_rows(min_row=1, max_row=1))
-            headers = {
-                str(cell.value).strip().lower(): idx
-                for idx, cell in enumerate(header_row)
-                if cell.value is not None
-            }
-
-            url_idx = headers.get("url")
-            title_idx = headers.get("title")
-            author_idx = headers.get("author")
-
-            if title_idx is None or author_idx is None:
-                logger.warning(
-                    "Book spreadsheet '%s' missing required columns (Title, Author). "
-                    "Found headers: %s",
-                    path,
-                    list(headers.keys()),
-                )
-                wb.close()
-                return
-
-            rows_loaded = 0
-            for row in ws.iter_rows(min_row=2):
-                raw_title = row[title_idx].value if len(row) > title_idx else None
-                raw_author = row[author_idx].value if len(row) > author_idx else None
-                raw_url = row[url_idx].value if url_idx is not None and len(row) > url_idx else None
-
-                title = str(raw_title).strip() if raw_title else ""
-                author = str(raw_author).strip() if raw_author else ""
-                url = str(raw_url).strip() if raw_url else None
-
-                if title.lower() == "nan":
-                    title = ""
-                if author.lower() == "nan":
-                    author = ""
-                if url and url.lower() == "nan":
-                    url = None
-
-                # Normalize URL (fix ww. → www.)
-                if url:
-                    url = self.normalize_url(url)
-
-                if not title and not author:
-                    continue
-
-                entry = ExcelMetadataEntry(
-                    title=title,
-                    author=author,
-                    url=url,
-                )
-
-                self._book_entries.append(entry)
+            books = load_compiled(path, BOOK_COLUMNS, self._read_book_rows, self.cache_dir)
+            for row in range(len(books)):
+                title, author, url = books.row(row)
+                self._book_entries.append(ExcelMetadataEntry(title=title, author=author, url=url))
 
                 # If the URL contains a numeric ID, also index it in the article mapping
                 # (only if not already present — article spreadsheet takes precedence)
                 if url:
                     extracted_id = self.extract_id_from_url(url)
-                    if extracted_id and extracted_id not in self._article_mapping:
-                        entry_with_id = ExcelMetadataEntry(
+                    if (
+                        extracted_id
+                        and extracted_id not in self._article_rows
+                        and extracted_id not in self._article_mapping
+                    ):
+                        self._article_mapping[extracted_id] = ExcelMetadataEntry(
                             title=title,
                             author=author,
                             url=url,
                             article_id=extracted_id,
                         )
-                        self._article_mapping[extracted_id] = entry_with_id
-
-                rows_loaded += 1
 
-            wb.close()
             logger.info(
                 "Loaded %d book entries from '%s'.",
-                rows_loaded,
+                len(books),
                 path,
             )
 
@@ -401,7 +427,9 @@ class ExcelLookupService:
     @property
     def article_count(self) -> int:
         """Number of article entries loaded."""
-        return len(self._article_mapping)
+        return len(self._article_rows) + sum(
+            1 for article_id in self._article_mapping if article_id not in self._article_rows
+        )
 
     @property
     def book_count(self) -> int:
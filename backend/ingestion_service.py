@@ -11,21 +11,103 @@ FTP credentials are read from environment variables:
   FTP_USER     – FTP username
   FTP_PASSWORD  – FTP password
   FTP_REMOTE_DIR – Remote directory containing PDFs (default: /)
+
+New files flow through a pipeline of three bounded stages, so downloads, PDF
+extraction/embedding and database writes of different files overlap:
+  download – pooled, persistent FTP connections fetch files ahead of processing
+  process  – text extraction, metadata resolution and embedding
+  store    – chunks and books rows of several files written per transaction
+A file that fails in any stage is recorded and skipped; the others continue.
+
+Runs are resumable: each file's last completed stage is checkpointed in
+ingestion_checkpoints, and its download / extracted embeddings are kept in the
+run's own subdirectory of the work directory (<work dir>/<run_id>) until the run
+completes. After an interrupted run (see mark_interrupted_runs) the next run
+moves those files into its directory and picks them up where they stopped.
+Content is deduplicated by SHA-256: a downloaded file identical to a stored
+book (books.file_hash) is skipped, and chunks already stored elsewhere reuse
+their embeddings (PostgresVectorStore.prepare_documents).
+
+Stage concurrency is read from environment variables:
+  INGESTION_DOWNLOAD_WORKERS   – concurrent FTP downloads / pooled connections (default: 3)
+  INGESTION_DOWNLOAD_AHEAD     – downloaded files waiting for processing (default: 4)
+  INGESTION_PROCESS_WORKERS    – files extracted and embedded concurrently (default: 2)
+  INGESTION_STORE_WORKERS      – concurrent database writers (default: 1)
+  INGESTION_STORE_BATCH_SIZE   – files written per database transaction (default: 8)
+  INGESTION_WORK_DIR           – downloads and checkpointed extractions, one subdirectory
+                                 per run; put it on a persistent volume to resume
+                                 across restarts (default: <tmp>/mcpress_ingestion)
 """
 
 import asyncio
 import ftplib
+import hashlib
 import json
 import logging
 import os
+import shutil
 import tempfile
+import time
 import uuid
-from dataclasses import dataclass, field
+from contextlib import asynccontextmanager, contextmanager, suppress
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from documents_catalog import invalidate_documents_catalog
+    from vector_store_postgres import PreparedDocuments
+except ImportError:
+    from backend.documents_catalog import invalidate_documents_catalog
+    from backend.vector_store_postgres import PreparedDocuments
 
 logger = logging.getLogger(__name__)
 
+PIPELINE_STAGES = ("download", "process", "store")
+
+# Seconds between progress updates of the ingestion_runs row during a run
+PROGRESS_INTERVAL = 2.0
+
+# Suffix of a checkpointed ExtractedDocument in the work directory
+EXTRACTED_SUFFIX = ".extracted.npz"
+
+BOOK_UPSERT_SQL = """
+    INSERT INTO books (filename, title, author, document_type, category, total_pages, file_hash, processed_at)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, CURRENT_TIMESTAMP)
+    ON CONFLICT (filename) DO UPDATE SET
+        title = EXCLUDED.title,
+        author = EXCLUDED.author,
+        document_type = EXCLUDED.document_type,
+        category = EXCLUDED.category,
+        total_pages = EXCLUDED.total_pages,
+        file_hash = COALESCE(EXCLUDED.file_hash, books.file_hash),
+        processed_at = EXCLUDED.processed_at
+"""
+
+# Last completed stage per file: downloaded | processed | stored | duplicate
+# ('pending' until the first one); the error columns hold the latest failure
+CHECKPOINT_SQL = """
+    INSERT INTO ingestion_checkpoints (filename, run_id, stage, file_hash, updated_at)
+    VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP)
+    ON CONFLICT (filename) DO UPDATE SET
+        run_id = EXCLUDED.run_id,
+        stage = EXCLUDED.stage,
+        file_hash = COALESCE(EXCLUDED.file_hash, ingestion_checkpoints.file_hash),
+        error_stage = NULL,
+        error_message = NULL,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
 @dataclass
 class IngestionRunResult:
@@ -38,6 +120,101 @@ class IngestionRunResult:
     files_processed: int = 0
     files_failed: int = 0
     errors: list = field(default_factory=list)
+    # Per pipeline stage: {"done": n, "failed": n, "active": n}
+    stage_progress: dict = field(default_factory=dict)
+
+
+@dataclass
+class ExtractedDocument:
+    """A processed PDF, embedded and ready to be written by the store stage"""
+    filename: str
+    metadata: dict
+    category: str
+    total_pages: int
+    author: str
+    metadata_source: str
+    resolved_authors: list
+    chunk_count: int
+    prepared: Any = None  # PreparedDocuments, None when the PDF had no chunks
+    file_hash: Optional[str] = None  # SHA-256 of the PDF
+
+    def stats(self) -> dict:
+        return {
+            "filename": self.filename,
+            "chunks": self.chunk_count,
+            "pages": self.total_pages,
+            "author": self.author,
+            "category": self.category,
+            "metadata_source": self.metadata_source,
+        }
+
+    def save(self, path: str) -> None:
+        """Checkpoint to `path` (.npz: JSON state and the embeddings), written atomically"""
+        state = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "prepared"}
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+        if self.prepared is not None:
+            state["prepared"] = {
+                f.name: getattr(self.prepared, f.name) for f in fields(self.prepared) if f.name != "embeddings"
+            }
+            embeddings = np.asarray(self.prepared.embeddings, dtype=np.float32)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, state=np.array(json.dumps(state, default=str)), embeddings=embeddings)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ExtractedDocument":
+        with np.load(path, allow_pickle=False) as data:
+            state = json.loads(str(data["state"]))
+            embeddings = data["embeddings"]
+        prepared = state.pop("prepared", None)
+        if prepared is not None:
+            prepared = PreparedDocuments(embeddings=embeddings, **prepared)
+        return cls(prepared=prepared, **state)
+
+
+class FTPConnectionPool:
+    """
+    Persistent, authenticated FTP connections shared by the download workers.
+
+    Connections are opened lazily (at most `size`) and reused across files
+    instead of logging in per download. A connection that fails with anything
+    but a permanent (5xx) reply is discarded, so the next use reconnects.
+    """
+
+    def __init__(self, connect: Callable[[], ftplib.FTP], size: int):
+        self._connect = connect
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[ftplib.FTP] = []
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._slots:
+            ftp = self._idle.pop() if self._idle else None
+            if ftp is None:
+                ftp = await asyncio.get_running_loop().run_in_executor(None, self._connect)
+            try:
+                yield ftp
+            except ftplib.error_perm:
+                self._idle.append(ftp)
+                raise
+            except BaseException:
+                self._close(ftp)
+                raise
+            else:
+                self._idle.append(ftp)
+
+    @staticmethod
+    def _close(ftp: ftplib.FTP) -> None:
+        try:
+            ftp.quit()
+        except Exception:
+            ftp.close()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for ftp in idle:
+            await asyncio.get_running_loop().run_in_executor(None, self._close, ftp)
 
 
 class IngestionService:
@@ -62,12 +239,22 @@ class IngestionService:
         self.ftp_password = os.getenv("FTP_PASSWORD", "")
         self.ftp_remote_dir = os.getenv("FTP_REMOTE_DIR", "/")
 
+        # Pipeline stage limits
+        self.download_workers = max(1, int(os.getenv("INGESTION_DOWNLOAD_WORKERS", "3")))
+        self.download_ahead = max(1, int(os.getenv("INGESTION_DOWNLOAD_AHEAD", "4")))
+        self.process_workers = max(1, int(os.getenv("INGESTION_PROCESS_WORKERS", "2")))
+        self.store_workers = max(1, int(os.getenv("INGESTION_STORE_WORKERS", "1")))
+        self.store_batch_size = max(1, int(os.getenv("INGESTION_STORE_BATCH_SIZE", "8")))
+        self.work_dir = os.getenv("INGESTION_WORK_DIR") or os.path.join(
+            tempfile.gettempdir(), "mcpress_ingestion"
+        )
+
         # Used for logging in ingestion_runs table
         self.source_url = f"ftp://{self.ftp_host}:{self.ftp_port}{self.ftp_remote_dir}"
         self._running = False
 
     async def ensure_table(self) -> None:
-        """Create ingestion_runs table if it doesn't exist."""
+        """Create ingestion_runs and ingestion_checkpoints tables if they don't exist."""
         migration_sql = """
         CREATE TABLE IF NOT EXISTS ingestion_runs (
             id SERIAL PRIMARY KEY,
@@ -81,12 +268,29 @@ class IngestionService:
             files_processed INTEGER NOT NULL DEFAULT 0,
             files_failed INTEGER NOT NULL DEFAULT 0,
             error_details JSONB DEFAULT '[]'::jsonb,
+            stage_progress JSONB DEFAULT '{}'::jsonb,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+        ALTER TABLE ingestion_runs
+            ADD COLUMN IF NOT EXISTS stage_progress JSONB DEFAULT '{}'::jsonb;
         CREATE INDEX IF NOT EXISTS idx_ingestion_runs_status
             ON ingestion_runs (status);
         CREATE INDEX IF NOT EXISTS idx_ingestion_runs_started_at
             ON ingestion_runs (started_at DESC);
+
+        CREATE TABLE IF NOT EXISTS ingestion_checkpoints (
+            filename TEXT PRIMARY KEY,
+            run_id VARCHAR(100) NOT NULL,
+            stage VARCHAR(20) NOT NULL DEFAULT 'pending',
+            file_hash TEXT,
+            error_stage VARCHAR(20),
+            error_message TEXT,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_ingestion_checkpoints_run_id
+            ON ingestion_checkpoints (run_id);
+        CREATE INDEX IF NOT EXISTS idx_books_file_hash
+            ON books (file_hash);
         """
         async with self.vector_store.pool.acquire() as conn:
             await conn.execute(migration_sql)
@@ -103,6 +307,13 @@ class IngestionService:
             count = int(result.split()[-1])
             if count > 0:
                 logger.info(f"⚠️ Marked {count} interrupted ingestion run(s)")
+                resumable = await conn.fetchval("""
+                    SELECT COUNT(*) FROM ingestion_checkpoints c
+                    JOIN ingestion_runs r ON r.run_id = c.run_id
+                    WHERE r.status = 'interrupted' AND c.stage IN ('downloaded', 'processed')
+                """)
+                if resumable:
+                    logger.info(f"⏯️ {resumable} file(s) checkpointed; the next ingestion run resumes them")
 
     # ------------------------------------------------------------------
     # Discovery & Deduplication
@@ -138,11 +349,90 @@ class IngestionService:
         return await asyncio.get_event_loop().run_in_executor(None, _list_files)
 
     async def get_existing_filenames(self) -> set[str]:
-        """Query books table for all known filenames."""
+        """
+        Query books table for all known filenames, plus files an earlier run found
+        to duplicate a stored book (by content) while that book still exists.
+        """
         async with self.vector_store.pool.acquire() as conn:
-            rows = await conn.fetch("SELECT filename FROM books")
+            rows = await conn.fetch("""
+                SELECT filename FROM books
+                UNION
+                SELECT c.filename FROM ingestion_checkpoints c
+                JOIN books b ON b.file_hash = c.file_hash
+                WHERE c.stage = 'duplicate'
+            """)
         return {row["filename"] for row in rows}
 
+    async def get_existing_file_hashes(self) -> Dict[str, str]:
+        """Content hashes of stored books, {file_hash: filename}"""
+        async with self.vector_store.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT file_hash, filename FROM books WHERE file_hash IS NOT NULL")
+        return {row["file_hash"]: row["filename"] for row in rows}
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    async def load_checkpoints(self, filenames: List[str]) -> Dict[str, dict]:
+        """Checkpoints of the given files, {filename: {"stage", "file_hash", ...}}"""
+        async with self.vector_store.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT filename, run_id, stage, file_hash
+                FROM ingestion_checkpoints
+                WHERE filename = ANY($1::text[])
+                """,
+                filenames,
+            )
+        return {row["filename"]: dict(row) for row in rows}
+
+    async def checkpoint(self, run_id: str, filename: str, stage: str, file_hash: Optional[str] = None) -> None:
+        """Record `stage` as the file's last completed stage (best effort: resuming is an optimization)"""
+        try:
+            async with self.vector_store.pool.acquire() as conn:
+                await conn.execute(CHECKPOINT_SQL, filename, run_id, stage, file_hash)
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint {filename} ({stage}): {e}")
+
+    async def checkpoint_failure(self, run_id: str, filename: str, stage: str, error: str) -> None:
+        """Record a failure in `stage`, keeping the file's last completed stage"""
+        try:
+            async with self.vector_store.pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO ingestion_checkpoints (filename, run_id, error_stage, error_message, updated_at)
+                    VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP)
+                    ON CONFLICT (filename) DO UPDATE SET
+                        run_id = EXCLUDED.run_id,
+                        error_stage = EXCLUDED.error_stage,
+                        error_message = EXCLUDED.error_message,
+                        updated_at = EXCLUDED.updated_at
+                    """,
+                    filename,
+                    run_id,
+                    stage,
+                    error,
+                )
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint failure of {filename} ({stage}): {e}")
+
+    @staticmethod
+    def extracted_path(work_dir: str, filename: str) -> str:
+        return os.path.join(work_dir, filename + EXTRACTED_SUFFIX)
+
+    def resumable_artifact(self, work_dir: str, filename: str, checkpoint: Optional[dict]) -> Optional[str]:
+        """The download or extraction an interrupted run left for this file, if still there"""
+        stage = (checkpoint or {}).get("stage")
+        if stage in ("processed", "downloaded"):
+            work_dir = os.path.join(work_dir, checkpoint["run_id"])
+        if stage == "processed":
+            path = self.extracted_path(work_dir, filename)
+        elif stage == "downloaded":
+            path = os.path.join(work_dir, filename)
+        else:
+            return None
+        return path if checkpoint.get("file_hash") and os.path.exists(path) else None
+
     @staticmethod
     def deduplicate(discovered: list[str], existing: set[str]) -> list[str]:
         """Return filenames in discovered but not in existing, no duplicates."""
@@ -164,26 +454,41 @@ class IngestionService:
         """Return True iff filename ends with .pdf (case-insensitive) and size > 0."""
         return filename.lower().endswith(".pdf") and file_size > 0
 
-    async def download_pdf(self, filename: str, dest_dir: str) -> str:
-        """Download a single PDF from FTP with retry. Returns local file path."""
+    async def download_pdf(
+        self, filename: str, dest_dir: str, ftp_pool: Optional[FTPConnectionPool] = None
+    ) -> str:
+        """
+        Download a single PDF from FTP with retry. Returns local file path.
+
+        With `ftp_pool` the download reuses one of the pool's connections;
+        otherwise it opens (and closes) its own.
+        """
         dest_path = os.path.join(dest_dir, filename)
         delays = (5, 15, 60)
         max_retries = 3
 
+        def _retrieve(ftp):
+            with open(dest_path, "wb") as f:
+                ftp.retrbinary(f"RETR {filename}", f.write)
+
         def _download():
             ftp = self._connect_ftp()
             try:
-                with open(dest_path, "wb") as f:
-                    ftp.retrbinary(f"RETR {filename}", f.write)
+                _retrieve(ftp)
             finally:
                 try:
                     ftp.quit()
                 except Exception:
                     ftp.close()
 
+        loop = asyncio.get_running_loop()
         for attempt in range(max_retries):
             try:
-                await asyncio.get_event_loop().run_in_executor(None, _download)
+                if ftp_pool is None:
+                    await loop.run_in_executor(None, _download)
+                else:
+                    async with ftp_pool.connection() as ftp:
+                        await loop.run_in_executor(None, _retrieve, ftp)
 
                 file_size = os.path.getsize(dest_path)
                 if not self.validate_pdf_file(filename, file_size):
@@ -231,7 +536,18 @@ class IngestionService:
 
     async def process_and_store(self, file_path: str, filename: str) -> dict:
         """Process a PDF and store in vector store + books table. Returns stats."""
+        document = await self.extract_document(file_path, filename)
+        await self.store_documents([document])
+        return document.stats()
+
+    async def extract_document(
+        self, file_path: str, filename: str, file_hash: Optional[str] = None
+    ) -> ExtractedDocument:
+        """Extract, resolve metadata for and embed a downloaded PDF (process stage)."""
         try:
+            if file_hash is None:
+                file_hash = await asyncio.get_running_loop().run_in_executor(None, file_sha256, file_path)
+
             # 30-minute processing timeout
             result = await asyncio.wait_for(
                 self.pdf_processor.process_pdf(file_path), timeout=1800
@@ -277,81 +593,100 @@ class IngestionService:
                         e,
                     )
 
-            # Store chunks with embeddings
+            # Embed chunks now; they are written by store_documents
+            prepared = None
             if chunks:
-                await self.vector_store.add_documents(chunks, metadata={"filename": filename})
+                prepared = await self.vector_store.prepare_documents(chunks, metadata={"filename": filename})
 
-            # Upsert into books table
-            async with self.vector_store.pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO books (filename, title, author, document_type, category, total_pages, processed_at)
-                    VALUES ($1, $2, $3, $4, $5, $6, CURRENT_TIMESTAMP)
-                    ON CONFLICT (filename) DO UPDATE SET
-                        title = EXCLUDED.title,
-                        author = EXCLUDED.author,
-                        document_type = EXCLUDED.document_type,
-                        category = EXCLUDED.category,
-                        total_pages = EXCLUDED.total_pages,
-                        processed_at = EXCLUDED.processed_at
-                    """,
-                    filename,
-                    metadata["title"],
-                    metadata["author"],
-                    metadata["document_type"],
-                    category,
-                    total_pages,
-                )
-
-                # Create author records and link via document_authors if resolver found authors
-                if resolved_authors and self.author_service:
-                    try:
-                        book_id = await conn.fetchval(
-                            "SELECT id FROM books WHERE filename = $1", filename
-                        )
-                        if book_id:
-                            for order, author_name in enumerate(resolved_authors):
-                                author_name = author_name.strip()
-                                if not author_name or author_name == "Unknown Author":
-                                    continue
-                                author_id = await self.author_service.get_or_create_author(author_name)
-                                # Insert into document_authors, skip if already linked
-                                await conn.execute(
-                                    """
-                                    INSERT INTO document_authors (book_id, author_id, author_order)
-                                    VALUES ($1, $2, $3)
-                                    ON CONFLICT (book_id, author_id) DO NOTHING
-                                    """,
-                                    book_id,
-                                    author_id,
-                                    order,
-                                )
-                            logger.info(
-                                "Linked %d author(s) for '%s' via %s",
-                                len(resolved_authors),
-                                filename,
-                                metadata_source,
-                            )
-                    except Exception as e:
-                        logger.warning(
-                            "Failed to create author records for '%s': %s",
-                            filename,
-                            e,
-                        )
-
-            return {
-                "filename": filename,
-                "chunks": len(chunks),
-                "pages": total_pages,
-                "author": author,
-                "category": category,
-                "metadata_source": metadata_source,
-            }
+            return ExtractedDocument(
+                filename=filename,
+                metadata=metadata,
+                category=category,
+                total_pages=total_pages,
+                author=author,
+                metadata_source=metadata_source,
+                resolved_authors=resolved_authors,
+                chunk_count=len(chunks),
+                prepared=prepared,
+                file_hash=file_hash,
+            )
         finally:
             # Always clean up temp file
             if os.path.exists(file_path):
                 os.remove(file_path)
 
+    async def store_documents(self, batch: List[ExtractedDocument], run_id: Optional[str] = None) -> None:
+        """
+        Write chunks and books rows of extracted documents in one transaction (store stage).
+
+        Either every document of the batch is stored or none is, so a failed
+        batch can be retried file by file. With `run_id` the files are
+        checkpointed as stored in the same transaction.
+        """
+        prepared = [document.prepared for document in batch if document.prepared]
+        async with self.vector_store.pool.acquire() as conn:
+            async with conn.transaction():
+                await self.vector_store.store_prepared(prepared, conn=conn)
+                await conn.executemany(BOOK_UPSERT_SQL, [
+                    (
+                        document.filename,
+                        document.metadata["title"],
+                        document.metadata["author"],
+                        document.metadata["document_type"],
+                        document.category,
+                        document.total_pages,
+                        document.file_hash,
+                    )
+                    for document in batch
+                ])
+                if run_id:
+                    await conn.executemany(CHECKPOINT_SQL, [
+                        (document.filename, run_id, "stored", document.file_hash) for document in batch
+                    ])
+            self.vector_store.prepared_stored(prepared)
+
+            for document in batch:
+                if document.resolved_authors and self.author_service:
+                    await self._link_resolved_authors(conn, document)
+
+                # The chunks were cataloged before the books row existed - re-read this file
+                invalidate_documents_catalog(document.filename)
+
+    async def _link_resolved_authors(self, conn, document: ExtractedDocument) -> None:
+        """Create author records and link via document_authors for resolver-found authors"""
+        try:
+            book_id = await conn.fetchval(
+                "SELECT id FROM books WHERE filename = $1", document.filename
+            )
+            if book_id:
+                for order, author_name in enumerate(document.resolved_authors):
+                    author_name = author_name.strip()
+                    if not author_name or author_name == "Unknown Author":
+                        continue
+                    author_id = await self.author_service.get_or_create_author(author_name)
+                    # Insert into document_authors, skip if already linked
+                    await conn.execute(
+                        """
+                        INSERT INTO document_authors (book_id, author_id, author_order)
+                        VALUES ($1, $2, $3)
+                        ON CONFLICT (book_id, author_id) DO NOTHING
+                        """,
+                        book_id,
+                        author_id,
+                        order,
+                    )
+                logger.info(
+                    "Linked %d author(s) for '%s' via %s",
+                    len(document.resolved_authors),
+                    document.filename,
+                    document.metadata_source,
+                )
+        except Exception as e:
+            logger.warning(
+                "Failed to create author records for '%s': %s",
+                document.filename,
+                e,
+            )
 
     # ------------------------------------------------------------------
     # Run Orchestration
@@ -415,31 +750,16 @@ class IngestionService:
                 f"{run_result.files_skipped} skipped, {len(new_files)} new"
             )
 
-            # 3. Download & Process each file independently
-            tmp_dir = tempfile.mkdtemp(prefix="ingestion_")
+            # 3. Download, process and store through the pipeline; files fail independently
+            ftp_pool = FTPConnectionPool(self._connect_ftp, self.download_workers)
             try:
-                for filename in new_files:
-                    try:
-                        file_path = await self.download_pdf(filename, tmp_dir)
-                        await self.process_and_store(file_path, filename)
-                        run_result.files_processed += 1
-                        logger.info(f"✅ Processed: {filename}")
-                    except Exception as e:
-                        run_result.files_failed += 1
-                        run_result.errors.append({
-                            "filename": filename,
-                            "error_message": str(e),
-                            "stage": "download_or_process",
-                        })
-                        logger.error(f"❌ Failed: {filename} — {e}")
+                await self._run_pipeline(run_result, new_files, self.work_dir, ftp_pool)
             finally:
-                # Clean up temp directory
-                try:
-                    import shutil
-                    shutil.rmtree(tmp_dir, ignore_errors=True)
-                except Exception:
-                    pass
+                await ftp_pool.close()
 
+            # Nothing left to resume: clean up this run's directory (kept if the run
+            # fails or is interrupted). The work directory itself belongs to the operator.
+            shutil.rmtree(os.path.join(self.work_dir, run_id), ignore_errors=True)
             run_result.status = "completed"
             run_result.completed_at = datetime.utcnow()
 
@@ -464,7 +784,8 @@ class IngestionService:
                             files_skipped = $5,
                             files_processed = $6,
                             files_failed = $7,
-                            error_details = $8::jsonb
+                            error_details = $8::jsonb,
+                            stage_progress = $9::jsonb
                         WHERE run_id = $1
                         """,
                         run_id,
@@ -475,6 +796,7 @@ class IngestionService:
                         run_result.files_processed,
                         run_result.files_failed,
                         json.dumps(run_result.errors),
+                        json.dumps(run_result.stage_progress),
                     )
             except Exception as db_err:
                 logger.error(f"Failed to update ingestion run record: {db_err}")
@@ -489,6 +811,233 @@ class IngestionService:
 
         return run_result
 
+    async def _run_pipeline(
+        self,
+        run_result: IngestionRunResult,
+        filenames: List[str],
+        work_dir: str,
+        ftp_pool: FTPConnectionPool,
+    ) -> None:
+        """
+        Move files through download → process → store with bounded queues between stages.
+
+        Each stage has its own worker count; the queues bound how far downloads
+        and processing run ahead of the next stage. Per-stage counts are kept in
+        run_result.stage_progress and periodically written to ingestion_runs.
+
+        Files are downloaded and extracted into work_dir/<run_id>. Files checkpointed
+        by an interrupted run are moved there from that run's directory and start
+        after their last completed stage; downloads identical to a stored book are skipped before processing.
+        A download identical to a file still in flight in this run waits for it:
+        skipped once that one is stored, processed in its place if it fails.
+        """
+        run_id = run_result.run_id
+        run_dir = os.path.join(work_dir, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        resumed_dirs = set()  # directories of interrupted runs this run took files from
+        loop = asyncio.get_running_loop()
+        progress = run_result.stage_progress
+        progress.update({stage: {"done": 0, "failed": 0, "active": 0} for stage in PIPELINE_STAGES})
+        progress["download"].update({"resumed": 0, "duplicates": 0})
+        reporter = _ProgressReporter(self, run_result)
+
+        checkpoints = await self.load_checkpoints(filenames)
+        known_hashes = await self.get_existing_file_hashes()  # stored content: {file_hash: filename}
+        in_flight: Dict[str, asyncio.Future] = {}  # content being processed -> resolved when it's settled
+        claims: Dict[str, str] = {}  # filename -> the file_hash it has in flight
+
+        def settle(filename: str, stored: bool) -> None:
+            """The file holding a content claim was stored or failed: wake files waiting on it"""
+            file_hash = claims.pop(filename, None)
+            if file_hash is None:
+                return
+            if stored:
+                known_hashes[file_hash] = filename
+            in_flight.pop(file_hash).set_result(None)
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for filename in filenames:
+            pending.put_nowait(filename)
+        downloaded: asyncio.Queue = asyncio.Queue(maxsize=self.download_ahead)
+        extracted: asyncio.Queue = asyncio.Queue(maxsize=self.store_batch_size * self.store_workers)
+
+        @contextmanager
+        def active(stage):
+            progress[stage]["active"] += 1
+            try:
+                yield
+            finally:
+                progress[stage]["active"] -= 1
+
+        async def failed(stage: str, filename: str, error: Exception) -> None:
+            progress[stage]["failed"] += 1
+            run_result.files_failed += 1
+            run_result.errors.append({
+                "filename": filename,
+                "error_message": str(error),
+                "stage": stage,
+            })
+            logger.error(f"❌ Failed ({stage}): {filename} — {error}")
+            reporter.changed()
+            settle(filename, stored=False)
+            await self.checkpoint_failure(run_id, filename, stage, str(error))
+
+        async def download_worker():
+            while not pending.empty():
+                filename = pending.get_nowait()
+                checkpoint = checkpoints.get(filename)
+                try:
+                    with active("download"):
+                        file_path = self.resumable_artifact(work_dir, filename, checkpoint)
+                        if file_path:
+                            file_hash = checkpoint["file_hash"]
+                            if os.path.dirname(file_path) != run_dir:
+                                resumed_dirs.add(os.path.dirname(file_path))
+                                # Adopt the artifact, so its checkpoint points at this run
+                                moved = os.path.join(run_dir, os.path.basename(file_path))
+                                os.replace(file_path, moved)
+                                file_path = moved
+                                await self.checkpoint(run_id, filename, checkpoint["stage"], file_hash)
+                            progress["download"]["resumed"] += 1
+                            logger.info(f"⏯️ Resuming {filename} after stage '{checkpoint['stage']}'")
+                        else:
+                            file_path = await self.download_pdf(filename, run_dir, ftp_pool)
+                            file_hash = await loop.run_in_executor(None, file_sha256, file_path)
+                            await self.checkpoint(run_id, filename, "downloaded", file_hash)
+                except Exception as e:
+                    await failed("download", filename, e)
+                    continue
+
+                # Same content in flight: wait until it's stored (then this is a duplicate)
+                # or has failed (then this file takes its place)
+                while file_hash not in known_hashes and file_hash in in_flight:
+                    await asyncio.shield(in_flight[file_hash])
+
+                duplicate_of = known_hashes.get(file_hash)
+                if duplicate_of:
+                    # Identical content is already stored: nothing to embed
+                    os.remove(file_path)
+                    progress["download"]["duplicates"] += 1
+                    run_result.files_skipped += 1
+                    logger.info(f"⏭️ Skipped {filename}: same content as {duplicate_of}")
+                    await self.checkpoint(run_id, filename, "duplicate", file_hash)
+                    continue
+
+                in_flight[file_hash] = loop.create_future()
+                claims[filename] = file_hash
+                progress["download"]["done"] += 1
+                await downloaded.put((filename, file_path, file_hash))
+
+        async def process_worker():
+            while (item := await downloaded.get()) is not None:
+                filename, file_path, file_hash = item
+                try:
+                    with active("process"):
+                        if file_path.endswith(EXTRACTED_SUFFIX):
+                            document = await loop.run_in_executor(None, ExtractedDocument.load, file_path)
+                        else:
+                            document = await self.extract_document(file_path, filename, file_hash)
+                            await loop.run_in_executor(
+                                None, document.save, self.extracted_path(run_dir, filename)
+                            )
+                            await self.checkpoint(run_id, filename, "processed", file_hash)
+                except Exception as e:
+                    await failed("process", filename, e)
+                    continue
+                progress["process"]["done"] += 1
+                reporter.changed()
+                await extracted.put(document)
+
+        async def store_worker():
+            finished = False
+            while not finished:
+                document = await extracted.get()
+                if document is None:
+                    return
+                # Take whatever else is ready, up to a batch
+                batch = [document]
+                while len(batch) < self.store_batch_size and not extracted.empty():
+                    document = extracted.get_nowait()
+                    if document is None:
+                        finished = True
+                        break
+                    batch.append(document)
+                with active("store"):
+                    stored = await self._store_batch(batch, run_result, failed)
+                for document in stored:
+                    settle(document.filename, stored=True)
+                    path = self.extracted_path(run_dir, document.filename)
+                    if os.path.exists(path):
+                        os.remove(path)
+                reporter.changed()
+
+        def start(worker, count):
+            return [asyncio.create_task(worker()) for _ in range(count)]
+
+        downloaders = start(download_worker, self.download_workers)
+        processors = start(process_worker, self.process_workers)
+        storers = start(store_worker, self.store_workers)
+        tasks = downloaders + processors + storers
+
+        async def finish(stage_tasks):
+            # A crashed worker would leave its neighbours blocked on a queue - surface it instead
+            while not all(task.done() for task in stage_tasks):
+                done, _ = await asyncio.wait(
+                    [task for task in tasks if not task.done()], return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.cancelled() and task.exception():
+                        raise task.exception()
+
+        try:
+            # Each stage ends once the previous one has drained into it
+            await finish(downloaders)
+            for _ in processors:
+                await downloaded.put(None)
+            await finish(processors)
+            for _ in storers:
+                await extracted.put(None)
+            await finish(storers)
+            # Remove run directories left empty; anything still in them is resumable
+            for directory in (*resumed_dirs, run_dir):
+                with suppress(OSError):
+                    os.rmdir(directory)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await reporter.close()
+
+    async def _store_batch(
+        self, batch: List[ExtractedDocument], run_result: IngestionRunResult, failed
+    ) -> List[ExtractedDocument]:
+        """
+        Store a batch in one transaction; if that fails, retry file by file to isolate
+        the failure. Returns the stored documents.
+        """
+        progress = run_result.stage_progress["store"]
+        try:
+            await self.store_documents(batch, run_result.run_id)
+            stored = batch
+        except Exception as e:
+            if len(batch) == 1:
+                await failed("store", batch[0].filename, e)
+                return []
+            logger.warning(f"Batch write of {len(batch)} files failed ({e}); storing them one by one")
+            stored = []
+            for document in batch:
+                try:
+                    await self.store_documents([document], run_result.run_id)
+                    stored.append(document)
+                except Exception as file_error:
+                    await failed("store", document.filename, file_error)
+
+        for document in stored:
+            progress["done"] += 1
+            run_result.files_processed += 1
+            logger.info(f"✅ Processed: {document.filename}")
+        return stored
+
     # ------------------------------------------------------------------
     # Status & History
     # ------------------------------------------------------------------
@@ -500,7 +1049,7 @@ class IngestionService:
                 """
                 SELECT run_id, status, started_at, completed_at, source_url,
                        files_discovered, files_skipped, files_processed, files_failed,
-                       error_details
+                       error_details, stage_progress
                 FROM ingestion_runs
                 ORDER BY started_at DESC
                 LIMIT 1
@@ -517,7 +1066,7 @@ class IngestionService:
                 """
                 SELECT run_id, status, started_at, completed_at, source_url,
                        files_discovered, files_skipped, files_processed, files_failed,
-                       error_details
+                       error_details, stage_progress
                 FROM ingestion_runs
                 ORDER BY started_at DESC
                 LIMIT $1 OFFSET $2
@@ -526,3 +1075,45 @@ class IngestionService:
                 offset,
             )
         return [dict(r) for r in rows]
+
+
+class _ProgressReporter:
+    """Writes a run's counters and stage progress to ingestion_runs, at most every PROGRESS_INTERVAL seconds"""
+
+    def __init__(self, service: IngestionService, run_result: IngestionRunResult):
+        self.service = service
+        self.run_result = run_result
+        self._last_write = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def changed(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        if time.monotonic() - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = time.monotonic()
+        self._task = asyncio.create_task(self._write())
+
+    async def _write(self) -> None:
+        run_result = self.run_result
+        try:
+            async with self.service.vector_store.pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    UPDATE ingestion_runs
+                    SET files_processed = $2,
+                        files_failed = $3,
+                        stage_progress = $4::jsonb
+                    WHERE run_id = $1
+                    """,
+                    run_result.run_id,
+                    run_result.files_processed,
+                    run_result.files_failed,
+                    json.dumps(run_result.stage_progress),
+                )
+        except Exception as e:
+            logger.warning(f"Failed to record ingestion progress: {e}")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            await self._task
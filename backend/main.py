@@ -21,7 +21,7 @@ from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Depends, Re
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import asyncio
@@ -45,6 +45,17 @@ except ImportError:
     from backend.chat_handler import ChatHandler
     from backend.auth_routes import router as auth_router
 
+try:
+    from db_pool import init_pool_registry, close_pool_registry, registry as db_pool_registry
+    from schema_capabilities import refresh_schema_capabilities, schema_capabilities
+    from corpus_stats import refresh_corpus_stats, corpus_stats
+    from documents_catalog import documents_catalog, invalidate_documents_catalog, etag_matches
+except ImportError:
+    from backend.db_pool import init_pool_registry, close_pool_registry, registry as db_pool_registry
+    from backend.schema_capabilities import refresh_schema_capabilities, schema_capabilities
+    from backend.corpus_stats import refresh_corpus_stats, corpus_stats
+    from backend.documents_catalog import documents_catalog, invalidate_documents_catalog, etag_matches
+
 # Import conversation modules separately with better error handling
 conversation_router = None
 set_conversation_service = None
@@ -281,7 +292,7 @@ app.add_middleware(
     allow_credentials=True,  # Required for authentication
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=[],
+    expose_headers=["X-Next-Cursor", "ETag"],  # keyset cursor of list endpoints that return bare arrays; catalog ETag
 )
 
 # Include auth router
@@ -335,6 +346,66 @@ try:
 except Exception as e:
     print(f"⚠️ Migration 006 endpoint not available: {e}")
 
+# Migration 007: Conversation stats triggers (locks conversations/messages for a backfill - run explicitly)
+try:
+    try:
+        from run_migration_007 import router as migration_007_router
+    except ImportError:
+        from backend.run_migration_007 import router as migration_007_router
+
+    app.include_router(migration_007_router)
+    print("✅ Migration 007 endpoint enabled at /api/migrations/007-conversation-stats")
+except Exception as e:
+    print(f"⚠️ Migration 007 endpoint not available: {e}")
+
+# Migration 008: Conversation full-text search (rewrites messages - run explicitly)
+try:
+    try:
+        from run_migration_008 import router as migration_008_router
+    except ImportError:
+        from backend.run_migration_008 import router as migration_008_router
+
+    app.include_router(migration_008_router)
+    print("✅ Migration 008 endpoint enabled at /api/migrations/008-conversation-search")
+except Exception as e:
+    print(f"⚠️ Migration 008 endpoint not available: {e}")
+
+# Migration 009: keyset pagination indexes (built CONCURRENTLY - run explicitly)
+try:
+    try:
+        from run_migration_009 import router as migration_009_router
+    except ImportError:
+        from backend.run_migration_009 import router as migration_009_router
+
+    app.include_router(migration_009_router)
+    print("✅ Migration 009 endpoint enabled at /api/migrations/009-keyset-pagination-indexes")
+except Exception as e:
+    print(f"⚠️ Migration 009 endpoint not available: {e}")
+
+# Migration 010: documents catalog change notifications (locks hot tables - run explicitly)
+try:
+    try:
+        from run_migration_010 import router as migration_010_router
+    except ImportError:
+        from backend.run_migration_010 import router as migration_010_router
+
+    app.include_router(migration_010_router)
+    print("✅ Migration 010 endpoint enabled at /api/migrations/010-documents-catalog-notify")
+except Exception as e:
+    print(f"⚠️ Migration 010 endpoint not available: {e}")
+
+# Migration 011: documents.content_hash index (built CONCURRENTLY - run explicitly)
+try:
+    try:
+        from run_migration_011 import router as migration_011_router
+    except ImportError:
+        from backend.run_migration_011 import router as migration_011_router
+
+    app.include_router(migration_011_router)
+    print("✅ Migration 011 endpoint enabled at /api/migrations/011-content-hash-index")
+except Exception as e:
+    print(f"⚠️ Migration 011 endpoint not available: {e}")
+
 # Temporal Enrichment: Bulk RPG era metadata population
 try:
     try:
@@ -369,66 +440,20 @@ print("="*60)
 vector_store = VectorStoreClass()
 print(f"✅ Vector Store Class: {VectorStoreClass.__name__}")
 
-# Additional verification for PostgresVectorStore
-if VectorStoreClass.__name__ == "PostgresVectorStore":
-    import asyncio
-    async def verify_pgvector():
-        await vector_store.init_database()
-        has_pgvector = getattr(vector_store, 'has_pgvector', False)
-        doc_count = await vector_store.get_document_count()
-        print(f"📊 pgvector enabled: {has_pgvector}")
-        print(f"📊 Total documents in database: {doc_count:,}")
-        if has_pgvector:
-            print("✅ Using native pgvector with cosine distance operator")
-        else:
-            print("⚠️ pgvector NOT available - using fallback Python calculation")
-        print("="*60)
-
-    try:
-        asyncio.run(verify_pgvector())
-    except Exception as e:
-        print(f"⚠️ Could not verify pgvector status: {e}")
-        print("="*60)
+# pgvector status is reported from startup_event: the pool must be created on the
+# server's event loop, not a throwaway one at import time
 
-# Global cache for documents - define functions before using them
-_documents_cache = None
-_cache_timestamp = 0
-CACHE_TTL = 300  # 5 minutes
+# Documents catalog cache: loaded once, then refreshed per file as documents change
+documents_catalog.set_loader(vector_store.list_documents)
 
-def invalidate_global_documents_cache():
-    """Invalidate the global documents cache"""
-    global _documents_cache, _cache_timestamp
-    _documents_cache = None
-    _cache_timestamp = 0
-    print("📤 Global documents cache invalidated")
+def invalidate_global_documents_cache(filename: Optional[str] = None):
+    """Invalidate one document's catalog entry (or, without a filename, the whole catalog)"""
+    invalidate_documents_catalog(filename)
+    print(f"📤 Global documents cache invalidated ({filename or 'all'})")
 
 async def get_cached_documents(force_refresh: bool = False):
     """Get documents with intelligent caching"""
-    global _documents_cache, _cache_timestamp
-    
-    current_time = time.time()
-    cache_expired = (current_time - _cache_timestamp) > CACHE_TTL
-    
-    if _documents_cache is None or cache_expired or force_refresh:
-        print(f"📊 Refreshing documents cache...")
-        start_time = time.time()
-        _documents_cache = await vector_store.list_documents()
-        _cache_timestamp = current_time
-        elapsed = time.time() - start_time
-        
-        # Defensive: ensure cache is always a dict with 'documents' key
-        if not isinstance(_documents_cache, dict):
-            print(f"⚠️ Vector store returned unexpected format: {type(_documents_cache)}")
-            _documents_cache = {'documents': [] if _documents_cache is None else _documents_cache}
-        elif 'documents' not in _documents_cache:
-            print(f"⚠️ Vector store missing 'documents' key, fixing...")
-            _documents_cache = {'documents': []}
-        
-        print(f"✅ Cache refreshed in {elapsed:.1f}s - {len(_documents_cache.get('documents', []))} documents")
-    else:
-        print(f"⚡ Serving cached documents ({len(_documents_cache.get('documents', []))} documents)")
-    
-    return _documents_cache
+    return await documents_catalog.get(force_refresh=force_refresh)
 
 # Set vector store for admin_documents if available
 if admin_docs_available:
@@ -593,11 +618,62 @@ if CODE_UPLOAD_AVAILABLE and code_upload_router:
 # Initialize the database on startup
 @app.on_event("startup")
 async def startup_event():
+    # One shared asyncpg pool for every service (see db_pool.py)
+    if os.getenv("DATABASE_URL"):
+        try:
+            await init_pool_registry()
+            print(f"✅ Shared database pool ready ({db_pool_registry.pool_settings()})")
+        except Exception as e:
+            print(f"⚠️  Could not create shared database pool: {e} (services will retry on first use)")
+
     if hasattr(vector_store, 'init_database'):
         await vector_store.init_database()
+        if VectorStoreClass.__name__ == "PostgresVectorStore":
+            try:
+                has_pgvector = getattr(vector_store, 'has_pgvector', False)
+                doc_count = await vector_store.get_document_count()
+                print(f"📊 pgvector enabled: {has_pgvector}")
+                print(f"📊 Total documents in database: {doc_count:,}")
+                if has_pgvector:
+                    print("✅ Using native pgvector with cosine distance operator")
+                else:
+                    print("⚠️ pgvector NOT available - using fallback Python calculation")
+            except Exception as e:
+                print(f"⚠️ Could not verify pgvector status: {e}")
     else:
         print("✅ ChromaDB initialized successfully")
 
+    # Snapshot which tables/columns/extensions exist so handlers skip information_schema probes
+    if os.getenv("DATABASE_URL"):
+        try:
+            await refresh_schema_capabilities()
+            print(f"✅ Schema capabilities cached: {schema_capabilities.stats()}")
+        except Exception as e:
+            print(f"⚠️  Could not load schema capabilities: {e} (will load on first use)")
+        # Chunk counts for search logging, /health and admin stats (kept current incrementally)
+        try:
+            await refresh_corpus_stats()
+            print(f"✅ Corpus stats cached: {corpus_stats.total_chunks:,} chunks")
+        except Exception as e:
+            print(f"⚠️  Could not load corpus stats: {e} (will load on first use)")
+        # Trigger-maintained conversation counters (migration 007) and the messages
+        # full-text index (migration 008) are applied by run_migration_007/008; until
+        # then stats fall back to COUNT queries and search to ILIKE
+        if conversation_service:
+            if not await conversation_service.detect_stats_schema():
+                print("ℹ️ Conversation stats use COUNT queries until migration 007 is run (POST /api/migrations/007-conversation-stats)")
+            if not await conversation_service.detect_search_schema():
+                print("ℹ️ Conversation search uses ILIKE until migration 008 is run (POST /api/migrations/008-conversation-search)")
+        # Catalog change triggers (migration 010, applied by run_migration_010): every
+        # worker LISTENs, so edits made through any worker (or ingestion) refresh every
+        # worker's documents cache; until then other workers' edits show up on the TTL
+        if getattr(vector_store, 'pool', None):
+            listen_url = os.getenv("DOCUMENTS_CATALOG_LISTEN_URL") or os.getenv("DATABASE_URL")
+            if await documents_catalog.start_change_feed(listen_url, vector_store.pool):
+                print(f"✅ Documents catalog listening for changes across workers (listening={documents_catalog.listening})")
+            else:
+                print("ℹ️ Documents catalog refreshes other workers' changes on its TTL until migration 010 is run (POST /api/migrations/010-documents-catalog-notify)")
+
     # Pre-load documents cache for fast responses
     print("🚀 Pre-loading documents cache...")
     try:
@@ -796,6 +872,14 @@ async def shutdown_event():
     """Graceful shutdown for background services"""
     print("🛑 Shutting down services...")
 
+    # Write queued chat messages before the pool goes away
+    if conversation_service:
+        try:
+            await conversation_service.write_queue.drain()
+            print("✅ Message write queue drained")
+        except Exception as e:
+            print(f"⚠️  Error draining message write queue: {e}")
+
     # Excel Import Service: Close database connections
     if excel_import_service:
         try:
@@ -828,6 +912,25 @@ async def shutdown_event():
         except Exception as e:
             print(f"⚠️  Error during backfill service shutdown: {e}")
 
+    # Stop listening for catalog changes
+    try:
+        await documents_catalog.stop_listener()
+    except Exception as e:
+        print(f"⚠️  Error stopping documents catalog listener: {e}")
+
+    # Stop the PDF page/OCR worker pools
+    try:
+        pdf_processor.shutdown()
+    except Exception as e:
+        print(f"⚠️  Error stopping PDF worker pools: {e}")
+
+    # Close the shared database pool last - the services above may still use it while stopping
+    try:
+        await close_pool_registry()
+        print("✅ Shared database pool closed")
+    except Exception as e:
+        print(f"⚠️  Error closing shared database pool: {e}")
+
 # Initialize chat_handler without persistence first (works immediately)
 # Will be updated with conversation_service later if available
 chat_handler = ChatHandler(vector_store)
@@ -956,8 +1059,7 @@ async def upload_pdf(file: UploadFile = File(...)):
         )
         
         # Invalidate cache after successful upload
-        global _cache_timestamp
-        _cache_timestamp = 0
+        invalidate_global_documents_cache(file.filename)
         print(f"📚 Uploaded {file.filename} - cache invalidated")
         
         return {
@@ -1375,8 +1477,6 @@ async def complete_upload_with_metadata(request: CompleteUploadRequest):
 @app.put("/documents/{filename}/metadata")
 async def update_document_metadata(filename: str, request: UpdateMetadataRequest):
     """Update the title, author, category, MC Press URL, and article URL metadata for a document"""
-    global _cache_timestamp
-    
     # Input validation
     if not request.title or not request.title.strip():
         raise HTTPException(status_code=400, detail="Title is required and cannot be empty")
@@ -1408,7 +1508,7 @@ async def update_document_metadata(filename: str, request: UpdateMetadataRequest
         )
         
         # Invalidate the documents cache so changes are visible immediately
-        _cache_timestamp = 0
+        invalidate_global_documents_cache(decoded_filename)
         print(f"✅ Updated metadata for {decoded_filename} - cache invalidated")
         
         return {
@@ -1532,28 +1632,21 @@ async def chat(
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
+def catalog_response(request: Request, body: bytes) -> Response:
+    """Serialized catalog with its ETag - or 304 Not Modified if the client already has it"""
+    headers = {"ETag": documents_catalog.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), documents_catalog.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/documents")
-async def list_documents():
+async def list_documents(request: Request):
     """List all documents with intelligent caching - fast response for frontend"""
     try:
-        current_time = time.time()
-        cache_invalidated = _cache_timestamp == 0
-        cache_expired = (current_time - _cache_timestamp) > CACHE_TTL
-        
-        # If cache was explicitly invalidated (timestamp=0), force refresh
-        # This ensures edits are visible immediately after save
-        if cache_invalidated or _documents_cache is None:
-            print(f"🔄 Cache invalidated or empty - forcing refresh")
-            return await get_cached_documents(force_refresh=True)
-        
-        # Serve from cache, trigger background refresh if stale
-        if cache_expired:
-            print(f"⚡ Serving cached documents, triggering background refresh")
-            asyncio.create_task(get_cached_documents(force_refresh=True))
-        else:
-            print(f"⚡ Serving cached documents ({len(_documents_cache.get('documents', []))} docs)")
-        
-        return _documents_cache
+        # Edited/uploaded/deleted files are re-read before serving, so changes are
+        # visible immediately; a stale catalog is served while it's checked in the background
+        await get_cached_documents()
+        return catalog_response(request, b'{"documents":' + documents_catalog.documents_json + b'}')
     except Exception as e:
         print(f"❌ Error getting documents: {e}")
         # Return empty list so frontend doesn't break
@@ -1565,14 +1658,11 @@ async def refresh_documents_cache():
     return await get_cached_documents(force_refresh=True)
 
 @app.get("/api/books")
-async def get_books():
+async def get_books(request: Request):
     """Frontend compatibility endpoint with caching"""
     result = await get_cached_documents()
-    documents = result.get('documents', [])
-    return {
-        "total": len(documents),
-        "books": documents
-    }
+    total = len(result.get('documents', []))
+    return catalog_response(request, b'{"total":%d,"books":' % total + documents_catalog.documents_json + b'}')
 
 @app.post("/upload-async")
 async def upload_pdf_async(file: UploadFile = File(...)):
@@ -1626,6 +1716,26 @@ def health_check():
         "restart_trigger": "2025-08-13-restart"  # Force restart
     }
 
+    # Query embedding cache hit rate and micro-batch sizes
+    embedding_service = getattr(vector_store, "embedding_service", None)
+    if embedding_service is not None:
+        health_data["embedding_service"] = embedding_service.stats()
+
+    # Vector index type/parameters and the ef_search/probes applied per query
+    index_manager = getattr(vector_store, "index_manager", None)
+    if index_manager is not None:
+        health_data["vector_index"] = index_manager.stats()
+
+    # Shared asyncpg pool size and per-service usage
+    health_data["db_pool"] = db_pool_registry.stats()
+    health_data["schema"] = schema_capabilities.stats()
+    health_data["corpus"] = corpus_stats.stats()
+    health_data["documents_catalog"] = documents_catalog.stats()
+    # Resident chat history per worker (entries/bytes/evictions, for sizing workers)
+    health_data["conversation_history"] = chat_handler.history.stats()
+    if conversation_service:
+        health_data["message_queue"] = conversation_service.write_queue.stats()
+
     # Story-006: Add code upload system health
     if CODE_UPLOAD_AVAILABLE:
         try:
@@ -0,0 +1,175 @@
+"""
+Write-behind queue for chat message persistence.
+
+ChatHandler used to await two `add_message` calls (an INSERT plus a COUNT-based
+stats UPDATE each) after the answer finished streaming and before sending the
+`metadata`/`done` events, so every chat turn paid the database write latency.
+Messages are now handed to this queue and the turn completes immediately:
+
+  - a background task writes queued messages in batches, flushing when
+    MESSAGE_QUEUE_BATCH_SIZE messages are waiting or the oldest has waited
+    MESSAGE_QUEUE_FLUSH_MS milliseconds
+  - each batch is written by one `write_batch` call (one transaction for the
+    inserts and the conversation stats); if it fails the messages are retried
+    one by one, so a single bad row doesn't drop the rest of the batch
+  - readers that need their own writes (loading a conversation) call
+    `flush_conversation()` first
+  - `drain()` on shutdown stops accepting messages and writes what is left
+
+Configuration (environment):
+    MESSAGE_QUEUE_BATCH_SIZE    messages per batch write (default 100)
+    MESSAGE_QUEUE_FLUSH_MS      maximum time a message waits before being written (default 250)
+    MESSAGE_QUEUE_MAX_SIZE      queued messages before enqueue writes through instead (default 10000)
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriteQueue:
+    """Batches message writes off the request path"""
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Any]], Awaitable[None]],
+        max_batch_size: int = 100,
+        flush_interval_ms: float = 250.0,
+        max_queue_size: int = 10000,
+    ):
+        self._write_batch = write_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.flush_interval = max(0.0, flush_interval_ms) / 1000.0
+        self.max_queue_size = max_queue_size
+
+        self._pending: List[Any] = []
+        self._oldest_at: Optional[float] = None
+        # Queued or being written, per conversation (for read-your-writes)
+        self._unwritten: Counter = Counter()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_ms = 0.0
+
+    def enqueue(self, message) -> bool:
+        """
+        Queue a message for writing. Returns False when the queue is closed or
+        full - the caller should write the message itself.
+        """
+        if self._closing or len(self._pending) >= self.max_queue_size:
+            return False
+        self._ensure_started()
+        if not self._pending:
+            self._oldest_at = time.monotonic()
+        self._pending.append(message)
+        self._unwritten[message.conversation_id] += 1
+        self.enqueued += 1
+        self._wakeup.set()
+        return True
+
+    def has_unwritten(self, conversation_id: str) -> bool:
+        return self._unwritten.get(conversation_id, 0) > 0
+
+    async def flush(self):
+        """Write everything queued so far (waits for a batch already being written)"""
+        if self._write_lock is None:
+            return
+        async with self._write_lock:
+            while self._pending:
+                await self._write(self._take_batch())
+
+    async def flush_conversation(self, conversation_id: str):
+        """Make queued messages of one conversation visible to the next read"""
+        if self.has_unwritten(conversation_id):
+            await self.flush()
+
+    async def drain(self, timeout: float = 10.0):
+        """Stop accepting messages and write the rest (graceful shutdown)"""
+        self._closing = True
+        if self._task is None:
+            return
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Message queue drain timed out with {len(self._pending)} messages unwritten")
+            self._task.cancel()
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+        }
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._wakeup = self._wakeup or asyncio.Event()
+            self._write_lock = self._write_lock or asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _take_batch(self) -> List[Any]:
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        if not self._pending:
+            self._oldest_at = None  # leftovers of a burst keep the old deadline and go next
+        return batch
+
+    async def _run(self):
+        while self._pending or not self._closing:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Wait for a full batch, the flush interval, or shutdown - whichever comes first
+            remaining = self._oldest_at + self.flush_interval - time.monotonic()
+            if len(self._pending) < self.max_batch_size and remaining > 0 and not self._closing:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                # Re-check: more messages arrived, or flush() already wrote them
+                continue
+
+            async with self._write_lock:
+                if self._pending:
+                    await self._write(self._take_batch())
+
+    async def _write(self, batch: List[Any]):
+        start = time.perf_counter()
+        try:
+            await self._write_batch(batch)
+            self.written += len(batch)
+        except Exception as e:
+            logger.warning(f"⚠️ Batch write of {len(batch)} messages failed, retrying one by one: {e}")
+            for message in batch:
+                try:
+                    await self._write_batch([message])
+                    self.written += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"❌ Failed to save message to conversation {message.conversation_id}: {e}")
+        finally:
+            for message in batch:
+                self._unwritten[message.conversation_id] -= 1
+                if self._unwritten[message.conversation_id] <= 0:
+                    del self._unwritten[message.conversation_id]
+        self.batches += 1
+        self.last_batch_ms = (time.perf_counter() - start) * 1000
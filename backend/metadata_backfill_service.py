@@ -30,6 +30,10 @@ except ImportError:
     from backend.author_service import AuthorService
     from backend.document_author_service import DocumentAuthorService
     from backend.excel_lookup_service import ExcelLookupService
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
 
 logger = logging.getLogger(__name__)
 
@@ -86,13 +90,7 @@ class MetadataBackfillService:
     async def _ensure_pool(self):
         """Ensure connection pool is initialized (lazy initialization)."""
         if not self.pool:
-            self.pool = await asyncpg.create_pool(
-                self.database_url,
-                statement_cache_size=0,
-                min_size=1,
-                max_size=10,
-                command_timeout=60,
-            )
+            self.pool = await get_pool('metadata_backfill', self.database_url)
 
     async def close(self):
         """Close database connection pool."""
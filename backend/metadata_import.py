@@ -0,0 +1,181 @@
+"""
+Set-based apply step for spreadsheet/CSV metadata imports.
+
+The importers prepare their rows in Python (pandas), then hand them over in
+bulk: each batch is COPYed into a temp table and applied with one
+UPDATE ... FROM / INSERT ... ON CONFLICT statement, instead of several awaited
+statements per spreadsheet row.
+
+    async with conn.transaction():
+        engine = MetadataImportEngine(conn)
+        book_ids = await engine.resolve_filenames({row_no: [f"{id}.pdf", id], ...})
+        updated = await engine.update_books("id", {book_id: {"title": ...}}, BOOK_COLUMN_TYPES)
+        author_ids, linked = await engine.link_authors([AuthorLink(row_no, book_id, 0, "Jane Doe", None)])
+
+Temp tables are created ON COMMIT DROP, so the engine must run inside a transaction.
+Statement-level catalog triggers (migration 010) fire once per statement.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Writable books columns and their types (for the staging tables)
+BOOK_COLUMN_TYPES = {
+    'title': 'TEXT',
+    'author': 'TEXT',
+    'category': 'TEXT',
+    'subcategory': 'TEXT',
+    'year': 'INTEGER',
+    'description': 'TEXT',
+    'tags': 'TEXT[]',
+    'mc_press_url': 'TEXT',
+    'article_url': 'TEXT',
+    'document_type': 'TEXT',
+}
+
+
+@dataclass
+class AuthorLink:
+    """One author of one spreadsheet row: upsert the author, then link them to the book"""
+    row_no: int
+    book_id: int
+    author_order: int
+    name: str
+    site_url: Optional[str] = None
+
+
+class MetadataImportEngine:
+    def __init__(self, conn):
+        self.conn = conn
+        self._staged = 0
+
+    async def _stage(self, columns: Sequence[Tuple[str, str]], records: List[tuple]) -> str:
+        """COPY `records` into a fresh temp table with `columns` ((name, type) pairs)"""
+        self._staged += 1
+        table = f"import_stage_{self._staged}"
+        column_defs = ", ".join(f"{name} {pg_type}" for name, pg_type in columns)
+        await self.conn.execute(f"CREATE TEMP TABLE {table} ({column_defs}) ON COMMIT DROP")
+        if records:
+            await self.conn.copy_records_to_table(
+                table, records=records, columns=[name for name, _ in columns]
+            )
+        return table
+
+    async def resolve_filenames(self, candidates: Dict[int, Iterable[str]]) -> Dict[int, int]:
+        """
+        Book id for each key whose candidate filenames match a book (lowest id on ties).
+
+        candidates: key (e.g. spreadsheet row) -> filenames to try
+        """
+        records = [(key, filename) for key, filenames in candidates.items() for filename in filenames]
+        table = await self._stage([('import_key', 'INTEGER'), ('filename', 'TEXT')], records)
+        rows = await self.conn.fetch(f"""
+            SELECT DISTINCT ON (s.import_key) s.import_key, b.id
+            FROM {table} s
+            JOIN books b ON b.filename = s.filename
+            ORDER BY s.import_key, b.id
+        """)
+        return {row['import_key']: row['id'] for row in rows}
+
+    async def update_books(
+        self,
+        key_column: str,
+        updates: Dict[Any, Dict[str, Any]],
+        column_types: Dict[str, str],
+        keep_nulls: bool = False,
+    ) -> Set[Any]:
+        """
+        Apply per-book column updates in one UPDATE ... FROM; returns the keys updated.
+
+        updates: key (books.id or books.filename) -> {column: value}; a column a book
+            doesn't mention keeps its value. keep_nulls=False also keeps the current
+            value where the given value is None (sparse CSV rows); True writes the NULL.
+        column_types: type of every column that may appear (see BOOK_COLUMN_TYPES)
+        """
+        if not updates:
+            return set()
+        columns = sorted({column for values in updates.values() for column in values})
+        key_type = 'INTEGER' if key_column == 'id' else 'TEXT'
+        # One "given" flag per column separates "not in this row" from "set to NULL"
+        staged_columns = [('import_key', key_type)]
+        for column in columns:
+            staged_columns += [(column, column_types[column]), (f"{column}__given", 'BOOLEAN')]
+
+        records = []
+        for key, values in updates.items():
+            record = [key]
+            for column in columns:
+                given = column in values and (keep_nulls or values[column] is not None)
+                record += [values.get(column), given]
+            records.append(tuple(record))
+        table = await self._stage(staged_columns, records)
+
+        assignments = ", ".join(
+            f"{column} = CASE WHEN s.{column}__given THEN s.{column} ELSE b.{column} END"
+            for column in columns
+        )
+        rows = await self.conn.fetch(f"""
+            UPDATE books b
+            SET {assignments}
+            FROM {table} s
+            WHERE b.{key_column} = s.import_key
+            RETURNING b.{key_column} AS import_key
+        """)
+        return {row['import_key'] for row in rows}
+
+    async def upsert_authors(self, authors: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, int]:
+        """
+        Create missing authors and fill in site URLs in one INSERT ... ON CONFLICT.
+
+        authors: (name, site_url) in import order; per name the last non-NULL URL is
+            kept (an existing URL is never cleared), as repeated upserts would.
+        Returns name -> author id.
+        """
+        records = [(seq, name, site_url) for seq, (name, site_url) in enumerate(authors)]
+        if not records:
+            return {}
+        table = await self._stage(
+            [('seq', 'INTEGER'), ('name', 'TEXT'), ('site_url', 'TEXT')], records
+        )
+        # ON CONFLICT DO UPDATE can touch each author once per statement: one row per name
+        rows = await self.conn.fetch(f"""
+            INSERT INTO authors (name, site_url)
+            SELECT name, site_url
+            FROM (
+                SELECT DISTINCT ON (name) name, site_url
+                FROM {table}
+                ORDER BY name, (site_url IS NULL), seq DESC
+            ) latest
+            ON CONFLICT (name) DO UPDATE
+            SET site_url = COALESCE(EXCLUDED.site_url, authors.site_url),
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING id, name
+        """)
+        return {row['name']: row['id'] for row in rows}
+
+    async def link_authors(self, links: List[AuthorLink]) -> Tuple[Dict[str, int], int]:
+        """
+        Upsert the authors of `links` and add the missing document_authors rows.
+
+        A book/author pair already linked keeps its order; within the import the
+        first row linking a pair decides it. Returns (name -> author id, links added).
+        """
+        if not links:
+            return {}, 0
+        author_ids = await self.upsert_authors((link.name, link.site_url) for link in links)
+        records = [
+            (link.row_no, link.author_order, link.book_id, author_ids[link.name])
+            for link in links
+        ]
+        table = await self._stage(
+            [('row_no', 'INTEGER'), ('author_order', 'INTEGER'), ('book_id', 'INTEGER'), ('author_id', 'INTEGER')],
+            records,
+        )
+        result = await self.conn.execute(f"""
+            INSERT INTO document_authors (book_id, author_id, author_order)
+            SELECT DISTINCT ON (book_id, author_id) book_id, author_id, author_order
+            FROM {table}
+            ORDER BY book_id, author_id, row_no, author_order
+            ON CONFLICT (book_id, author_id) DO NOTHING
+        """)
+        return author_ids, int(result.split()[-1])
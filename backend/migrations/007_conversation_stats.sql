@@ -0,0 +1,142 @@
+-- Migration 007: Incrementally maintained conversation statistics
+-- conversations.message_count is kept by a trigger on messages, and per-user
+-- totals (conversations, messages, favorites, archived, tag histogram) by a
+-- trigger on conversations, so the stats endpoint reads one row instead of
+-- running COUNT queries over every conversation and message of the user.
+-- Applied by run_migration_007.py (idempotent), never at startup: writes to
+-- conversations/messages wait while the counters are backfilled.
+
+CREATE TABLE IF NOT EXISTS conversation_user_stats (
+    user_id TEXT PRIMARY KEY,
+    total_conversations INTEGER NOT NULL DEFAULT 0,
+    total_messages BIGINT NOT NULL DEFAULT 0,
+    favorite_count INTEGER NOT NULL DEFAULT 0,
+    archived_count INTEGER NOT NULL DEFAULT 0,
+    tag_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Recent-conversation counts (this week / month) are a range scan on this index
+CREATE INDEX IF NOT EXISTS idx_conversations_user_created
+    ON conversations (user_id, created_at DESC);
+
+-- Add `delta` to each tag of `tags` in a {tag: count} histogram, dropping tags that reach 0
+CREATE OR REPLACE FUNCTION conversation_tag_counts_add(counts JSONB, tags TEXT[], delta INTEGER)
+RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_object_agg(tag, total), '{}'::jsonb)
+    FROM (
+        SELECT tag, SUM(n)::int AS total
+        FROM (
+            SELECT key AS tag, value::int AS n FROM jsonb_each_text(COALESCE(counts, '{}'::jsonb))
+            UNION ALL
+            SELECT t, delta FROM unnest(COALESCE(tags, '{}'::text[])) AS t
+        ) changes
+        GROUP BY tag
+        HAVING SUM(n) > 0
+    ) totals
+$$ LANGUAGE sql IMMUTABLE;
+
+-- messages -> conversations.message_count
+CREATE OR REPLACE FUNCTION messages_count_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE conversations SET message_count = COALESCE(message_count, 0) + 1
+        WHERE id = NEW.conversation_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        -- No-op when the conversation itself is being deleted (ON DELETE CASCADE)
+        UPDATE conversations SET message_count = GREATEST(COALESCE(message_count, 0) - 1, 0)
+        WHERE id = OLD.conversation_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- conversations -> conversation_user_stats (applies the row's old values as -1, new values as +1)
+CREATE OR REPLACE FUNCTION conversations_user_stats_trigger() RETURNS TRIGGER AS $$
+DECLARE
+    tags_changed BOOLEAN := TRUE;
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        tags_changed := OLD.tags IS DISTINCT FROM NEW.tags OR OLD.user_id IS DISTINCT FROM NEW.user_id;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE conversation_user_stats SET
+            total_conversations = total_conversations - 1,
+            total_messages = total_messages - COALESCE(OLD.message_count, 0),
+            favorite_count = favorite_count - (CASE WHEN OLD.is_favorite THEN 1 ELSE 0 END),
+            archived_count = archived_count - (CASE WHEN OLD.is_archived THEN 1 ELSE 0 END),
+            tag_counts = CASE WHEN tags_changed
+                              THEN conversation_tag_counts_add(tag_counts, OLD.tags, -1)
+                              ELSE tag_counts END,
+            updated_at = NOW()
+        WHERE user_id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO conversation_user_stats AS s (
+            user_id, total_conversations, total_messages, favorite_count, archived_count, tag_counts
+        ) VALUES (
+            NEW.user_id,
+            1,
+            COALESCE(NEW.message_count, 0),
+            CASE WHEN NEW.is_favorite THEN 1 ELSE 0 END,
+            CASE WHEN NEW.is_archived THEN 1 ELSE 0 END,
+            conversation_tag_counts_add('{}'::jsonb, NEW.tags, 1)
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_conversations = s.total_conversations + 1,
+            total_messages = s.total_messages + EXCLUDED.total_messages,
+            favorite_count = s.favorite_count + EXCLUDED.favorite_count,
+            archived_count = s.archived_count + EXCLUDED.archived_count,
+            tag_counts = CASE WHEN tags_changed
+                              THEN conversation_tag_counts_add(s.tag_counts, NEW.tags, 1)
+                              ELSE s.tag_counts END,
+            updated_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill from the current rows, then install the triggers (the caller holds locks on
+-- conversations and messages for the whole script, so no write is missed in between)
+UPDATE conversations c
+SET message_count = COALESCE(m.count, 0)
+FROM conversations c2
+LEFT JOIN (
+    SELECT conversation_id, COUNT(*) AS count FROM messages GROUP BY conversation_id
+) m ON m.conversation_id = c2.id
+WHERE c.id = c2.id AND c.message_count IS DISTINCT FROM COALESCE(m.count, 0);
+
+DELETE FROM conversation_user_stats;
+INSERT INTO conversation_user_stats (
+    user_id, total_conversations, total_messages, favorite_count, archived_count, tag_counts
+)
+SELECT
+    c.user_id,
+    COUNT(*),
+    COALESCE(SUM(c.message_count), 0),
+    COUNT(*) FILTER (WHERE c.is_favorite),
+    COUNT(*) FILTER (WHERE c.is_archived),
+    COALESCE((
+        SELECT jsonb_object_agg(tag, n)
+        FROM (
+            SELECT t AS tag, COUNT(*) AS n
+            FROM conversations c3, unnest(c3.tags) AS t
+            WHERE c3.user_id = c.user_id
+            GROUP BY t
+        ) tags
+    ), '{}'::jsonb)
+FROM conversations c
+GROUP BY c.user_id;
+
+DROP TRIGGER IF EXISTS messages_count ON messages;
+CREATE TRIGGER messages_count
+    AFTER INSERT OR DELETE ON messages
+    FOR EACH ROW EXECUTE FUNCTION messages_count_trigger();
+
+-- Only the columns the totals depend on (title/updated_at/last_message_at edits don't fire it)
+DROP TRIGGER IF EXISTS conversations_user_stats ON conversations;
+CREATE TRIGGER conversations_user_stats
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, message_count, is_favorite, is_archived, tags ON conversations
+    FOR EACH ROW EXECUTE FUNCTION conversations_user_stats_trigger();
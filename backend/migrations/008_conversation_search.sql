@@ -0,0 +1,13 @@
+-- Migration 008: Full-text search index for conversation search
+-- Each message carries a tsvector of its content, generated by Postgres on
+-- insert/update, with a GIN index so searching a user's conversations is an
+-- index lookup instead of ILIKE '%q%' over every message body.
+-- Applied by run_migration_008.py (idempotent), never at startup: adding the
+-- generated column rewrites the messages table once, under ACCESS EXCLUSIVE.
+
+ALTER TABLE messages
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(content, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_messages_search_vector
+    ON messages USING gin (search_vector);
@@ -0,0 +1,23 @@
+-- Migration 009: Indexes matching the keyset pagination orders
+-- List endpoints page with `WHERE (sort key, id) < (cursor values) ORDER BY sort key, id
+-- LIMIT n` (backend/pagination.py). With an index in the same order each page is
+-- an index range scan of n rows, however deep the page.
+-- Expressions must match the SortKeys exactly (nullable columns are COALESCEd).
+-- Built CONCURRENTLY (writes continue), so never in a transaction or at startup:
+-- apply with run_migration_009.py.
+
+-- ConversationService.list_conversations (CONVERSATION_KEYSET)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_conversations_user_last_message
+    ON conversations (user_id, last_message_at DESC, id DESC);
+
+-- GET /api/v2/books (BOOKS_KEYSET)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_books_processed_at_id
+    ON books ((COALESCE(processed_at, '-infinity'::timestamp)) DESC, id DESC);
+
+-- GET /admin/documents sorted by title (the default)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_books_title_id
+    ON books ((COALESCE(title, ''::text)), id);
+
+-- GET /api/process/jobs (JOBS_KEYSET)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_processing_jobs_created_job
+    ON processing_jobs ((COALESCE(created_at, '-infinity'::timestamp)) DESC, job_id DESC);
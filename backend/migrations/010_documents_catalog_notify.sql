@@ -0,0 +1,143 @@
+-- Migration 010: Document catalog change notifications
+-- Every write that changes the /documents catalog (books, chunks in documents,
+-- author links and author names) takes the next documents_catalog_version_seq
+-- value and NOTIFYs 'documents_catalog' with it and the filenames touched.
+-- NOTIFY is delivered after commit to every listening connection, so each
+-- worker's DocumentsCatalog re-reads just those files, whichever process wrote.
+-- A sequence rather than a counter row: writers never wait on each other.
+-- Replacing the triggers locks books, documents, document_authors and authors
+-- (SHARE ROW EXCLUSIVE), so this is never applied at startup: run it with
+-- run_migration_010.py. Until then workers only see their own writes at once and
+-- other workers' on the catalog TTL. Idempotent.
+
+CREATE SEQUENCE IF NOT EXISTS documents_catalog_version_seq;
+
+-- Bump the version and notify; NULL filenames means "reload everything".
+-- Statement-level triggers fire once per statement: once per COPY, but once per
+-- row on the per-row INSERT path. Repeats of the transaction's
+-- previous notification are skipped, so a file's chunks inserted row by row
+-- still notify once.
+CREATE OR REPLACE FUNCTION documents_catalog_notify(filenames TEXT[]) RETURNS VOID AS $$
+DECLARE
+    touched TEXT := md5(COALESCE(array_to_string(filenames, E'\n'), '*'));
+    version BIGINT;
+    payload TEXT;
+BEGIN
+    IF current_setting('documents_catalog.notified', true) = touched THEN
+        RETURN;
+    END IF;
+    -- Transaction-local: forgotten at commit or rollback
+    PERFORM set_config('documents_catalog.notified', touched, true);
+    version := nextval('documents_catalog_version_seq');
+    payload := json_build_object('version', version, 'filenames', filenames)::text;
+    -- NOTIFY payloads are limited to 8000 bytes
+    IF octet_length(payload) > 7900 THEN
+        payload := json_build_object('version', version, 'filenames', NULL)::text;
+    END IF;
+    PERFORM pg_notify('documents_catalog', payload);
+END;
+$$ LANGUAGE plpgsql;
+
+-- books / documents: the filenames of the rows the statement touched
+-- (statement-level with transition tables: one per COPY or bulk UPDATE)
+CREATE OR REPLACE FUNCTION documents_catalog_filename_trigger() RETURNS TRIGGER AS $$
+DECLARE
+    changed TEXT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT filename) INTO changed FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT filename) INTO changed FROM old_rows;
+    ELSE
+        SELECT array_agg(DISTINCT filename) INTO changed
+        FROM (SELECT filename FROM new_rows UNION SELECT filename FROM old_rows) touched;
+    END IF;
+    IF changed IS NOT NULL THEN
+        PERFORM documents_catalog_notify(changed);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- document_authors: the books whose author list (or order) changed
+CREATE OR REPLACE FUNCTION document_authors_catalog_trigger() RETURNS TRIGGER AS $$
+DECLARE
+    changed TEXT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT b.filename) INTO changed
+        FROM books b WHERE b.id IN (SELECT book_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        -- Rows of books deleted in the same statement are gone; their books trigger notified
+        SELECT array_agg(DISTINCT b.filename) INTO changed
+        FROM books b WHERE b.id IN (SELECT book_id FROM old_rows);
+    ELSE
+        SELECT array_agg(DISTINCT b.filename) INTO changed
+        FROM books b WHERE b.id IN (SELECT book_id FROM new_rows UNION SELECT book_id FROM old_rows);
+    END IF;
+    IF changed IS NOT NULL THEN
+        PERFORM documents_catalog_notify(changed);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- authors: renamed authors / changed site URLs show up on every book they wrote
+CREATE OR REPLACE FUNCTION authors_catalog_trigger() RETURNS TRIGGER AS $$
+DECLARE
+    changed TEXT[];
+BEGIN
+    SELECT array_agg(DISTINCT b.filename) INTO changed
+    FROM new_rows a
+    JOIN old_rows o ON o.id = a.id
+    JOIN document_authors da ON da.author_id = a.id
+    JOIN books b ON b.id = da.book_id
+    WHERE a.name IS DISTINCT FROM o.name OR a.site_url IS DISTINCT FROM o.site_url;
+    IF changed IS NOT NULL THEN
+        PERFORM documents_catalog_notify(changed);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS books_catalog_insert ON books;
+CREATE TRIGGER books_catalog_insert AFTER INSERT ON books
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION documents_catalog_filename_trigger();
+DROP TRIGGER IF EXISTS books_catalog_update ON books;
+CREATE TRIGGER books_catalog_update AFTER UPDATE ON books
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION documents_catalog_filename_trigger();
+DROP TRIGGER IF EXISTS books_catalog_delete ON books;
+CREATE TRIGGER books_catalog_delete AFTER DELETE ON books
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION documents_catalog_filename_trigger();
+
+-- Chunk UPDATEs (token/metadata backfills) don't change the catalog
+DROP TRIGGER IF EXISTS documents_catalog_insert ON documents;
+CREATE TRIGGER documents_catalog_insert AFTER INSERT ON documents
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION documents_catalog_filename_trigger();
+DROP TRIGGER IF EXISTS documents_catalog_delete ON documents;
+CREATE TRIGGER documents_catalog_delete AFTER DELETE ON documents
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION documents_catalog_filename_trigger();
+
+DROP TRIGGER IF EXISTS document_authors_catalog_insert ON document_authors;
+CREATE TRIGGER document_authors_catalog_insert AFTER INSERT ON document_authors
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_authors_catalog_trigger();
+DROP TRIGGER IF EXISTS document_authors_catalog_update ON document_authors;
+CREATE TRIGGER document_authors_catalog_update AFTER UPDATE ON document_authors
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_authors_catalog_trigger();
+DROP TRIGGER IF EXISTS document_authors_catalog_delete ON document_authors;
+CREATE TRIGGER document_authors_catalog_delete AFTER DELETE ON document_authors
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_authors_catalog_trigger();
+
+DROP TRIGGER IF EXISTS authors_catalog_update ON authors;
+CREATE TRIGGER authors_catalog_update AFTER UPDATE ON authors
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION authors_catalog_trigger();
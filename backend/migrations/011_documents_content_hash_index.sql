@@ -0,0 +1,10 @@
+-- Migration 011: Index on documents.content_hash
+-- Ingestion reuses the embeddings of already stored identical chunks
+-- (PostgresVectorStore.embeddings_by_content_hash); without this index every lookup
+-- scans documents, so the reuse stays off until it exists.
+-- documents is the largest table: the index is built CONCURRENTLY, which cannot run
+-- in a transaction or at startup. Apply with run_migration_011.py (it also drops an
+-- INVALID index left by an interrupted build first).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS documents_content_hash_idx
+    ON documents (content_hash);
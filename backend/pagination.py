@@ -0,0 +1,151 @@
+"""
+Keyset pagination helpers with opaque cursors.
+
+LIMIT/OFFSET makes deep pages slower (Postgres reads and throws away every
+skipped row) and pages shift when rows are added in between. A keyset page
+continues after the sort key of the previous page's last row instead:
+
+    keyset = Keyset(SortKey("processed_at", "b.processed_at", "timestamp", descending=True),
+                    SortKey("id", "b.id", "integer", descending=True))
+    condition, params = keyset.after(keyset.decode(cursor), first_param=len(params) + 1)
+    ... WHERE <filters> AND <condition> ORDER BY <keyset.order_by()> LIMIT <limit + 1>
+    next_cursor = keyset.cursor_for(rows[limit - 1]) if len(rows) > limit else None
+
+A cursor is those sort key values, JSON encoded and base64url'd so clients treat
+it as an opaque token and pass it back unchanged. The last key must be unique
+(the primary key) so the order is total and no row is skipped or repeated.
+
+Totals are optional: `count_total()` returns the exact COUNT, the planner's
+row estimate (pg_class statistics, no scan) or nothing, so cursor clients don't
+pay for a full count on every page.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+TOTAL_MODES = ("exact", "estimate", "none")
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Values of a cursor made by encode_cursor; ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+class SortKey(NamedTuple):
+    """One ORDER BY key of a keyset-paginated query"""
+    name: str  # field of the returned rows/items holding the value, and its name in the cursor
+    expression: str  # SQL expression sorted on
+    sql_type: str  # type cursor values are cast back to ('text', 'timestamp', 'integer', ...)
+    descending: bool = False
+    nulls_as: Optional[str] = None  # SQL literal NULLs sort as, for nullable columns
+
+    def sql(self) -> str:
+        if self.nulls_as is None:
+            return self.expression
+        return f"COALESCE({self.expression}, {self.nulls_as}::{self.sql_type})"
+
+    def param_sql(self, index: int) -> str:
+        param = f"${index}::text::{self.sql_type}"
+        return param if self.nulls_as is None else f"COALESCE({param}, {self.nulls_as}::{self.sql_type})"
+
+
+class Keyset:
+    """Sort order of a keyset-paginated query, and its cursors"""
+
+    def __init__(self, *keys: SortKey):
+        if not keys:
+            raise ValueError("Keyset needs at least one sort key")
+        self.keys = keys
+        # Ties the cursor to this ordering: a cursor from another sort is rejected, not misread
+        self.signature = ",".join(f"{k.name}{'-' if k.descending else '+'}" for k in keys)
+
+    def order_by(self) -> str:
+        return ", ".join(f"{k.sql()} {'DESC' if k.descending else 'ASC'}" for k in self.keys)
+
+    def after(self, values: Optional[Dict[str, Any]], first_param: int) -> Tuple[str, List[Optional[str]]]:
+        """
+        SQL condition selecting the rows after `values` (from decode()) in this order,
+        with its parameters numbered from $first_param. ("TRUE", []) when values is None.
+        """
+        if values is None:
+            return "TRUE", []
+
+        params = [None if values[k.name] is None else str(values[k.name]) for k in self.keys]
+        columns = [k.sql() for k in self.keys]
+        placeholders = [k.param_sql(first_param + i) for i, k in enumerate(self.keys)]
+
+        if len({k.descending for k in self.keys}) == 1:
+            # Same direction throughout: a row comparison, which a matching index can serve
+            op = "<" if self.keys[0].descending else ">"
+            return f"({', '.join(columns)}) {op} ({', '.join(placeholders)})", params
+
+        # Mixed directions: (a > $1) OR (a = $1 AND b < $2) OR ...
+        branches = []
+        for i, key in enumerate(self.keys):
+            op = "<" if key.descending else ">"
+            equal = [f"{columns[j]} = {placeholders[j]}" for j in range(i)]
+            branches.append("(" + " AND ".join(equal + [f"{columns[i]} {op} {placeholders[i]}"]) + ")")
+        return "(" + " OR ".join(branches) + ")", params
+
+    def cursor_for(self, item: Any) -> str:
+        """Cursor continuing after `item` (a row/dict with the key names, or an object with those attributes)"""
+        values = {"_": self.signature}
+        for key in self.keys:
+            value = item[key.name] if isinstance(item, Mapping) or hasattr(item, "keys") else getattr(item, key.name)
+            values[key.name] = value.isoformat() if isinstance(value, (datetime, date)) else value
+        return encode_cursor(values)
+
+    def decode(self, cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Sort key values of a cursor made by cursor_for (None for no cursor); ValueError if it doesn't fit"""
+        if not cursor:
+            return None
+        values = decode_cursor(cursor)
+        if values.get("_") != self.signature or any(k.name not in values for k in self.keys):
+            raise ValueError("Cursor does not match this listing's sort order")
+        return values
+
+
+def resolve_total_mode(total: Optional[str], cursor: Optional[str]) -> str:
+    """
+    Which total a list request gets: offset pages default to the exact count they
+    always had, cursor pages to none. ValueError for an unknown mode.
+    """
+    if total is None:
+        return "none" if cursor else "exact"
+    if total not in TOTAL_MODES:
+        raise ValueError(f"total must be one of {', '.join(TOTAL_MODES)}")
+    return total
+
+
+async def count_total(conn, mode: str, rows_sql: str, *params) -> Optional[int]:
+    """
+    Total rows of `rows_sql` (the listing query without ORDER BY/LIMIT): an exact
+    COUNT, the planner's estimate from table statistics (no scan), or None.
+    """
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {rows_sql}", *params)
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return await conn.fetchval(f"SELECT COUNT(*) FROM ({rows_sql}) AS counted", *params)
+
+
+def page_count(total: Optional[int], per_page: int) -> Optional[int]:
+    return None if total is None else (total + per_page - 1) // per_page
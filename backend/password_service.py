@@ -12,8 +12,11 @@ import os
 import re
 from typing import List, Optional, Dict, Any
 
-import asyncpg
 import bcrypt
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
 
 
 class PasswordService:
@@ -39,13 +42,7 @@ class PasswordService:
         """Initialize database connection pool"""
         if self.pool:
             return
-        self.pool = await asyncpg.create_pool(
-            self.database_url,
-            statement_cache_size=0,
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
+        self.pool = await get_pool('password_service', self.database_url)
 
     async def _ensure_pool(self):
         """Ensure connection pool is initialized (lazy initialization)"""
@@ -0,0 +1,200 @@
+"""
+Per-page PDF extraction stage used by PDFProcessorFull.
+
+Everything here works on a page range of one file and is importable by worker
+processes: each call opens its own fitz document, extracts text, embedded
+images (as PNG bytes, once per xref, flagged for OCR only when large and
+varied enough to hold text) and code blocks for its pages, and returns plain dicts
+that pickle cheaply. PDFProcessorFull shards a book into page ranges, runs
+them in a process pool, OCRs the images with a bounded thread pool and merges
+the results in page order, so the output matches the serial path exactly.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Set
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+# Images at or above this many pixels are kept but not OCR'd (memory/time bound)
+OCR_MAX_PIXELS = 2000000
+# Below these an image is kept but not OCR'd: too small to hold readable text,
+# or too uniform (grayscale histogram entropy in bits) to be anything but a fill.
+# Sparse black-on-white text is only ~0.3 bits, so keep the entropy floor low
+OCR_MIN_PIXELS = int(os.getenv("PDF_OCR_MIN_PIXELS", "10000"))
+OCR_MIN_ENTROPY = float(os.getenv("PDF_OCR_MIN_ENTROPY", "0.1"))
+
+CODE_PATTERNS = [
+    # Markdown code blocks
+    (r'```(\w+)?\n(.*?)```', 'detected'),
+
+    # RPG Free-Format patterns (check BEFORE generic patterns)
+    (r'^\s*(?:dcl-s|dcl-pi|dcl-pr|dcl-ds|dcl-c|dcl-f)\s+.*', 'rpg-free'),
+    (r'^\s*/free\s*$.*?^\s*/end-free\s*$', 'rpg-free'),
+    (r'^\s*(?:if|elseif|else|endif|for|endfor|dow|enddo|select|when|other|endsl)\s+.*', 'rpg-free'),
+    (r'^\s*(?:begsr|endsr|return|exsr|leavesr)\s+.*', 'rpg-free'),
+    (r'^\s*(?:monitor|on-error|endmon)\s+.*', 'rpg-free'),
+
+    # Traditional RPG IV Fixed-Format patterns
+    (r'^\s*(?:H|F|D|P|C|O)\s+.*', 'rpg-fixed'),
+
+    # SQL patterns
+    (r'^\s*(?:SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP)\s+.*(?:\n.*)*?(?=;|\n\s*$)', 'sql'),
+
+    # DDS (Data Description Specifications) patterns
+    (r'^\s*(?:A|R)\s+.*(?:DSPSIZ|CA\d+|CF\d+|OVERLAY|DSPATR|COLHDG)', 'dds'),
+
+    # General programming patterns (after RPG patterns)
+    (r'^\s*(?:def|class|import|from|if __name__|for|while|try|except|function|var|let|const)\s+.*(?:\n.*)*?(?=\n\s*$|\n[^\s]|\Z)', 'programming'),
+
+    # Indented code (4+ spaces) - moved to end as fallback
+    (r'^    .+(?:\n    .+)*', 'generic'),
+]
+
+# Compiled once per process instead of on every page
+_COMPILED_CODE_PATTERNS = [(re.compile(pattern, re.MULTILINE | re.DOTALL), lang) for pattern, lang in CODE_PATTERNS]
+
+
+def extract_code_blocks(text: str, page_num: int, filename: str) -> List[Dict[str, Any]]:
+    code_blocks = []
+
+    for pattern, default_lang in _COMPILED_CODE_PATTERNS:
+        for match in pattern.finditer(text):
+            try:
+                if len(match.groups()) > 1:
+                    language = match.group(1) or default_lang
+                    content = match.group(2)
+                else:
+                    language = default_lang
+                    content = match.group(0)
+
+                content = content.strip()
+
+                # Only include substantial code blocks
+                if len(content) > 30:
+                    code_blocks.append({
+                        "page": page_num,
+                        "language": language,
+                        "content": content,
+                        "book": filename
+                    })
+            except Exception as e:
+                print(f"Error extracting code block: {e}")
+                continue
+
+    return code_blocks
+
+
+def _is_benign_image_error(e: Exception, *words: str) -> bool:
+    message = str(e).lower()
+    return any(word in message for word in words)
+
+
+def _worth_ocr(pix) -> bool:
+    """Skip OCR for tiny images and near-uniform ones (rules, fills, photos of flat colour)"""
+    pixels = pix.width * pix.height
+    if pixels < OCR_MIN_PIXELS or pixels >= OCR_MAX_PIXELS:
+        return False
+    if OCR_MIN_ENTROPY <= 0:
+        return True
+    mode = "RGB" if pix.n - pix.alpha == 3 else "L"
+    if pix.alpha:
+        gray = Image.frombytes(mode + "A", (pix.width, pix.height), pix.samples).convert("L")
+    else:
+        gray = Image.frombytes(mode, (pix.width, pix.height), pix.samples).convert("L")
+    return gray.entropy() >= OCR_MIN_ENTROPY
+
+
+def extract_page_images(doc, page, page_num: int, seen_xrefs: Set[int]) -> List[Dict[str, Any]]:
+    """
+    Embedded images on one page as PNG bytes (CMYK/other colour spaces converted to RGB).
+
+    Pixmaps are read from the already open document. Images whose xref was already
+    seen (logos, running headers repeated on every page) are skipped.
+    """
+    images = []
+    for img_index, img in enumerate(page.get_images(full=True)):
+        xref = img[0]
+        if xref in seen_xrefs:
+            continue
+        seen_xrefs.add(xref)
+        try:
+            pix = fitz.Pixmap(doc, xref)
+
+            # Skip invalid pixmaps
+            if not pix or pix.width <= 10 or pix.height <= 10:
+                continue
+
+            # Convert CMYK and other colour spaces that can't be written as PNG to RGB
+            if pix.n - pix.alpha > 3:
+                try:
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                except Exception:
+                    # Silently skip colorspace conversion issues - these are common and non-critical
+                    continue
+
+            try:
+                images.append({
+                    "page": page_num + 1,
+                    "index": img_index,
+                    "xref": xref,
+                    "png": pix.tobytes("png"),
+                    "width": pix.width,
+                    "height": pix.height,
+                    "ocr": _worth_ocr(pix),
+                })
+            except Exception as e:
+                # Only log critical errors, not format conversion issues
+                if not _is_benign_image_error(e, "unsupported", "cannot"):
+                    print(f"Critical image processing error on page {page_num + 1}: {e}")
+
+        except Exception as e:
+            # Only log non-trivial image processing errors
+            if not _is_benign_image_error(e, "unsupported", "invalid"):
+                print(f"Image processing error {img_index} on page {page_num + 1}: {e}")
+            continue
+    return images
+
+
+def extract_page_range(file_path: str, start: int, end: int, filename: str) -> List[Dict[str, Any]]:
+    """
+    Extract pages [start, end) of one PDF.
+
+    Returns one dict per page: {'page', 'text', 'images', 'code_blocks'} with
+    1-based page numbers. Runs in a worker process, so it opens its own document,
+    and reuses that one handle for every image in the range. Each image xref is
+    returned once per range (the caller de-duplicates across ranges).
+    """
+    results = []
+    seen_xrefs: Set[int] = set()
+    doc = fitz.open(file_path)
+    try:
+        for page_num in range(start, end):
+            try:
+                page = doc[page_num]
+            except Exception as e:
+                print(f"Error extracting text from page {page_num + 1}: {e}")
+                results.append({"page": page_num + 1, "text": "", "images": [], "code_blocks": []})
+                continue
+
+            try:
+                text = page.get_text()
+            except Exception as e:
+                print(f"Error extracting text from page {page_num + 1}: {e}")
+                text = ""
+
+            try:
+                images = extract_page_images(doc, page, page_num, seen_xrefs)
+            except Exception as e:
+                print(f"Error processing images on page {page_num + 1}: {e}")
+                images = []
+            # Decoded images stay in MuPDF's resource store; each xref is read only once,
+            # so empty it rather than let it grow to its cap
+            fitz.TOOLS.store_shrink(100)
+
+            code_blocks = extract_code_blocks(text, page_num + 1, filename) if text.strip() else []
+            results.append({"page": page_num + 1, "text": text, "images": images, "code_blocks": code_blocks})
+    finally:
+        doc.close()
+    return results
@@ -2,7 +2,11 @@ import fitz  # PyMuPDF
 import base64
 import io
 import re
-from typing import List, Dict, Any
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional
 from PIL import Image
 import pytesseract
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -10,8 +14,23 @@ import asyncio
 import os
 try:
     from author_extractor import get_author_extractor
+    from pdf_page_extractor import extract_code_blocks, extract_page_range
 except ImportError:
     from backend.author_extractor import get_author_extractor
+    from backend.pdf_page_extractor import extract_code_blocks, extract_page_range
+
+
+def ocr_png(png_bytes: bytes) -> str:
+    try:
+        img = Image.open(io.BytesIO(png_bytes))
+        
+        # Use OCR to extract text
+        text = pytesseract.image_to_string(img, config='--psm 6')
+        return text.strip()
+    except Exception as e:
+        # OCR failures are common and non-critical - don't spam logs
+        return ""
+
 
 class PDFProcessorFull:
     def __init__(self):
@@ -21,18 +40,112 @@ class PDFProcessorFull:
             separators=["\n\n", "\n", ".", " ", ""]
         )
         self.author_extractor = get_author_extractor()
+        # Page-parallel extraction: page ranges go to a process pool (each worker opens
+        # its own document), OCR runs on a bounded thread pool. Small books stay serial.
+        self.page_workers = int(os.getenv("PDF_PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.ocr_workers = int(os.getenv("PDF_OCR_WORKERS", "2"))
+        self.pages_per_shard = int(os.getenv("PDF_PAGES_PER_SHARD", "16"))
+        self.parallel_min_pages = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+        self._page_pool: Optional[ProcessPoolExecutor] = None
+        self._ocr_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
         
     async def process_pdf(self, file_path: str) -> Dict[str, Any]:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self._process_pdf_sync, file_path)
     
-    def _process_pdf_sync(self, file_path: str) -> Dict[str, Any]:
+    def _get_page_pool(self) -> ProcessPoolExecutor:
+        # Several uploads can be processed at once on executor threads
+        with self._pool_lock:
+            if self._page_pool is None:
+                # spawn: the app process has threads (executors, asyncpg), which fork doesn't mix with
+                self._page_pool = ProcessPoolExecutor(
+                    max_workers=self.page_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._page_pool
+
+    def _get_ocr_pool(self) -> ThreadPoolExecutor:
+        # tesseract runs as a subprocess, so threads give real OCR parallelism
+        with self._pool_lock:
+            if self._ocr_pool is None:
+                self._ocr_pool = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix="pdf-ocr")
+            return self._ocr_pool
+
+    def shutdown(self):
+        """Stop the page and OCR worker pools"""
+        if self._page_pool is not None:
+            self._page_pool.shutdown(wait=False, cancel_futures=True)
+            self._page_pool = None
+        if self._ocr_pool is not None:
+            self._ocr_pool.shutdown(wait=False, cancel_futures=True)
+            self._ocr_pool = None
+
+    def _extract_pages(self, file_path: str, total_pages: int, filename: str,
+                       page_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Per-page text, images (with OCR) and code blocks, in page order.
+
+        Page ranges are extracted in a process pool when the book is large enough;
+        OCR for each range starts as soon as that range is back. Results are merged
+        by page, so the output is identical to extracting serially. An image that
+        appears on several pages (same xref) is kept, and OCR'd, once.
+        """
+        workers = self.page_workers if page_workers is None else page_workers
+        shard = max(1, self.pages_per_shard)
+        ranges = [(start, min(start + shard, total_pages)) for start in range(0, total_pages, shard)]
+        ocr_pool = self._get_ocr_pool()
+        # One OCR call per distinct image, even when ranges repeat an xref
+        ocr_futures: Dict[int, Any] = {}
+
+        def start_ocr(index: int, pages: List[Dict[str, Any]]):
+            for page in pages:
+                for img in page["images"]:
+                    if img["ocr"] and img["xref"] not in ocr_futures:
+                        ocr_futures[img["xref"]] = ocr_pool.submit(ocr_png, img["png"])
+
+        shard_pages: Dict[int, List[Dict[str, Any]]] = {}
+        if workers > 1 and total_pages >= self.parallel_min_pages and len(ranges) > 1:
+            try:
+                pool = self._get_page_pool()
+                futures = {
+                    pool.submit(extract_page_range, file_path, start, end, filename): index
+                    for index, (start, end) in enumerate(ranges)
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    shard_pages[index] = future.result()
+                    start_ocr(index, shard_pages[index])
+            except BrokenProcessPool as e:
+                print(f"⚠️ Page worker pool failed ({e}) - extracting {filename} serially")
+                self._page_pool = None
+                shard_pages.clear()
+                ocr_futures.clear()
+
+        if not shard_pages:
+            for index, (start, end) in enumerate(ranges):
+                shard_pages[index] = extract_page_range(file_path, start, end, filename)
+                start_ocr(index, shard_pages[index])
+
+        pages = []
+        seen_xrefs = set()
+        for index in range(len(ranges)):
+            for page in shard_pages[index]:
+                # Keep each image at its first page only
+                page["images"] = [img for img in page["images"] if img["xref"] not in seen_xrefs]
+                for img in page["images"]:
+                    seen_xrefs.add(img["xref"])
+                    future = ocr_futures.get(img["xref"]) if img["ocr"] else None
+                    img["ocr_text"] = future.result() if future is not None else ""
+                pages.append(page)
+        return pages
+
+    def _process_pdf_sync(self, file_path: str, page_workers: Optional[int] = None) -> Dict[str, Any]:
         filename = os.path.basename(file_path)
         
         try:
-            # Open document once and extract all metadata first
-            doc = fitz.open(file_path)
-            total_pages = len(doc)
+            with fitz.open(file_path) as doc:
+                total_pages = len(doc)
             
             # Extract author information with debug logging
             print(f"🔍 Extracting author information for: {os.path.basename(file_path)}")
@@ -42,123 +155,26 @@ class PDFProcessorFull:
             else:
                 print(f"⚠️  No author found for: {os.path.basename(file_path)}")
             
-            # First pass: Extract all text content
+            pages = self._extract_pages(file_path, total_pages, filename, page_workers)
+
+            # Merge in page order: text, images, code blocks
             all_text = ""
-            page_texts = []
-            
-            for page_num in range(total_pages):
-                try:
-                    page = doc[page_num]
-                    page_text = page.get_text()
-                    page_texts.append(page_text)
-                    
-                    if page_text.strip():
-                        all_text += f"\n\n{page_text}"
-                except Exception as e:
-                    print(f"Error extracting text from page {page_num + 1}: {e}")
-                    page_texts.append("")
-            
-            # Second pass: Extract images with better error handling
             images = []
-            for page_num in range(total_pages):
-                try:
-                    page = doc[page_num]
-                    image_list = page.get_images(full=True)
-                    
-                    for img_index, img in enumerate(image_list):
-                        try:
-                            # Create a new document reference for each image to avoid closure issues
-                            img_doc = fitz.open(file_path)
-                            
-                            xref = img[0]
-                            pix = fitz.Pixmap(img_doc, xref)
-                            
-                            # Skip invalid pixmaps
-                            if not pix or pix.width <= 10 or pix.height <= 10:
-                                if pix:
-                                    pix = None
-                                img_doc.close()
-                                continue
-                            
-                            # Convert CMYK to RGB if needed
-                            if pix.n - pix.alpha == 4:  # CMYK
-                                try:
-                                    rgb_pix = fitz.Pixmap(fitz.csRGB, pix)
-                                    if hasattr(pix, "drop"): pix.drop()  # Clean up original pixmap
-                                    pix = rgb_pix
-                                except Exception as e:
-                                    # Silently skip CMYK conversion issues - these are common and non-critical
-                                    if pix:
-                                        if hasattr(pix, "drop"): pix.drop()
-                                    img_doc.close()
-                                    continue
-                            
-                            # Handle other color spaces that can't be converted to PNG
-                            if pix and pix.n - pix.alpha > 3:  # Not RGB or grayscale
-                                try:
-                                    # Try to convert to RGB
-                                    rgb_pix = fitz.Pixmap(fitz.csRGB, pix)
-                                    if hasattr(pix, "drop"): pix.drop()
-                                    pix = rgb_pix
-                                except Exception as e:
-                                    # Silently skip colorspace conversion issues - these are common and non-critical
-                                    if pix:
-                                        if hasattr(pix, "drop"): pix.drop()
-                                    img_doc.close()
-                                    continue
-                            
-                            # Ensure we have a valid pixmap for PNG conversion
-                            if pix and (pix.n - pix.alpha <= 3):  # RGB or grayscale
-                                try:
-                                    # Convert to PNG
-                                    img_data = pix.tobytes("png")
-                                    img_base64 = base64.b64encode(img_data).decode()
-                                    
-                                    # OCR for text extraction (limit size to avoid memory issues)
-                                    ocr_text = ""
-                                    if pix.width * pix.height < 2000000:  # 2MP limit
-                                        ocr_text = self._extract_text_from_image(pix)
-                                    
-                                    images.append({
-                                        "page": page_num + 1,
-                                        "index": img_index,
-                                        "base64": img_base64,
-                                        "ocr_text": ocr_text,
-                                        "width": pix.width,
-                                        "height": pix.height,
-                                        "book": filename  # Track which book this image came from
-                                    })
-                                    
-                                except Exception as e:
-                                    # Only log critical errors, not format conversion issues
-                                    if "unsupported" not in str(e).lower() and "cannot" not in str(e).lower():
-                                        print(f"Critical image processing error on page {page_num + 1}: {e}")
-                            
-                            # Clean up pixmap memory
-                            if pix:
-                                if hasattr(pix, "drop"): pix.drop()
-                                pix = None
-                            img_doc.close()
-                            
-                        except Exception as e:
-                            # Only log non-trivial image processing errors
-                            if "unsupported" not in str(e).lower() and "invalid" not in str(e).lower():
-                                print(f"Image processing error {img_index} on page {page_num + 1}: {e}")
-                            continue
-                            
-                except Exception as e:
-                    print(f"Error processing images on page {page_num + 1}: {e}")
-                    continue
-            
-            # Close the main document
-            doc.close()
-            
-            # Extract code blocks from all text
             code_blocks = []
-            for page_num, page_text in enumerate(page_texts):
-                if page_text.strip():
-                    page_code_blocks = self._extract_code_blocks(page_text, page_num + 1, filename)
-                    code_blocks.extend(page_code_blocks)
+            for page in pages:
+                if page["text"].strip():
+                    all_text += f"\n\n{page['text']}"
+                for img in page["images"]:
+                    images.append({
+                        "page": img["page"],
+                        "index": img["index"],
+                        "base64": base64.b64encode(img.pop("png")).decode(),
+                        "ocr_text": img["ocr_text"],
+                        "width": img["width"],
+                        "height": img["height"],
+                        "book": filename  # Track which book this image came from
+                    })
+                code_blocks.extend(page["code_blocks"])
             
             # Create chunks
             chunks = []
@@ -266,73 +282,10 @@ class PDFProcessorFull:
             }
     
     def _extract_text_from_image(self, pixmap) -> str:
-        try:
-            img_data = pixmap.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-            
-            # Use OCR to extract text
-            text = pytesseract.image_to_string(img, config='--psm 6')
-            return text.strip()
-        except Exception as e:
-            # OCR failures are common and non-critical - don't spam logs
-            return ""
+        return ocr_png(pixmap.tobytes("png"))
     
     def _extract_code_blocks(self, text: str, page_num: int, filename: str) -> List[Dict[str, Any]]:
-        code_blocks = []
-        
-        patterns = [
-            # Markdown code blocks
-            (r'```(\w+)?\n(.*?)```', 'detected'),
-            
-            # RPG Free-Format patterns (check BEFORE generic patterns)
-            (r'^\s*(?:dcl-s|dcl-pi|dcl-pr|dcl-ds|dcl-c|dcl-f)\s+.*', 'rpg-free'),
-            (r'^\s*/free\s*$.*?^\s*/end-free\s*$', 'rpg-free'),
-            (r'^\s*(?:if|elseif|else|endif|for|endfor|dow|enddo|select|when|other|endsl)\s+.*', 'rpg-free'),
-            (r'^\s*(?:begsr|endsr|return|exsr|leavesr)\s+.*', 'rpg-free'),
-            (r'^\s*(?:monitor|on-error|endmon)\s+.*', 'rpg-free'),
-            
-            # Traditional RPG IV Fixed-Format patterns  
-            (r'^\s*(?:H|F|D|P|C|O)\s+.*', 'rpg-fixed'),
-            
-            # SQL patterns
-            (r'^\s*(?:SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP)\s+.*(?:\n.*)*?(?=;|\n\s*$)', 'sql'),
-            
-            # DDS (Data Description Specifications) patterns
-            (r'^\s*(?:A|R)\s+.*(?:DSPSIZ|CA\d+|CF\d+|OVERLAY|DSPATR|COLHDG)', 'dds'),
-            
-            # General programming patterns (after RPG patterns)
-            (r'^\s*(?:def|class|import|from|if __name__|for|while|try|except|function|var|let|const)\s+.*(?:\n.*)*?(?=\n\s*$|\n[^\s]|\Z)', 'programming'),
-            
-            # Indented code (4+ spaces) - moved to end as fallback
-            (r'^    .+(?:\n    .+)*', 'generic'),
-        ]
-        
-        for pattern, default_lang in patterns:
-            matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL)
-            for match in matches:
-                try:
-                    if len(match.groups()) > 1:
-                        language = match.group(1) or default_lang
-                        content = match.group(2)
-                    else:
-                        language = default_lang
-                        content = match.group(0)
-                    
-                    content = content.strip()
-                    
-                    # Only include substantial code blocks
-                    if len(content) > 30:
-                        code_blocks.append({
-                            "page": page_num,
-                            "language": language,
-                            "content": content,
-                            "book": filename
-                        })
-                except Exception as e:
-                    print(f"Error extracting code block: {e}")
-                    continue
-        
-        return code_blocks
+        return extract_code_blocks(text, page_num, filename)
     
     def _estimate_page_from_chunk(self, chunk_index: int, total_chunks: int, total_pages: int) -> int:
         """Estimate which page a chunk belongs to based on its position"""
@@ -0,0 +1,71 @@
+"""
+Binary wire codec for pgvector's `vector` type.
+
+The shared pool (db_pool) registers it on every connection it opens, so
+`embedding` columns always decode to a list of floats and vector parameters can
+be sent as numpy arrays (bulk COPY) as well as '[0.1,0.2,...]' text literals.
+"""
+
+import logging
+import struct
+from typing import List
+
+import asyncpg
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - numpy ships with the embedding stack
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+_warned = False
+
+
+def encode_pgvector(value) -> bytes:
+    """
+    Encode an embedding into pgvector's binary wire format.
+
+    Layout: uint16 dimension, uint16 unused (0), then dimension big-endian float32 values.
+    Accepts numpy arrays, sequences of floats, or a '[0.1,0.2,...]' text literal so that
+    queries still passing text parameters with `$1::vector` keep working once the codec
+    is registered on a connection.
+    """
+    if isinstance(value, str):
+        body = value.strip().strip('[]')
+        value = [float(x) for x in body.split(',')] if body else []
+    if numpy is not None:
+        values = numpy.asarray(value, dtype='>f4').ravel()
+        return struct.pack('>HH', values.shape[0], 0) + values.tobytes()
+    values = [float(x) for x in value]
+    return struct.pack(f'>HH{len(values)}f', len(values), 0, *values)
+
+
+def decode_pgvector(data: bytes) -> List[float]:
+    """Decode pgvector's binary wire format into a list of floats"""
+    dim, _unused = struct.unpack_from('>HH', data)
+    return list(struct.unpack_from(f'>{dim}f', data, 4))
+
+
+async def register_vector_codec(conn) -> bool:
+    """
+    Register the binary pgvector codec on a connection.
+
+    Returns False when the vector type is not installed so callers can fall back
+    to the text/JSON paths (warned about once per process).
+    """
+    global _warned
+    try:
+        await conn.set_type_codec(
+            'vector',
+            schema='public',
+            encoder=encode_pgvector,
+            decoder=decode_pgvector,
+            format='binary'
+        )
+        return True
+    except (ValueError, asyncpg.PostgresError) as e:
+        if not _warned:
+            _warned = True
+            logger.warning(f"⚠️ Could not register binary pgvector codec: {e}")
+        return False
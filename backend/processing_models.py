@@ -138,9 +138,10 @@ class StorageMetrics(BaseModel):
 class JobListResponse(BaseModel):
     """Response for listing jobs"""
     jobs: List[ProcessingJob]
-    total: int
+    total: Optional[int]  # None when not requested (total=none, the default for cursor pages)
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as `cursor` to get the next page
 
 
 class JobStatusResponse(BaseModel):
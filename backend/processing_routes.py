@@ -11,13 +11,20 @@ try:
         ProcessingJob, ProcessingStage, JobListResponse,
         JobStatusResponse, StartProcessingRequest, RetryJobRequest
     )
-    from document_processing_service import DocumentProcessingService
+    from document_processing_service import DocumentProcessingService, JOBS_KEYSET
+    from pagination import count_total, resolve_total_mode
 except ImportError:
     from backend.processing_models import (
         ProcessingJob, ProcessingStage, JobListResponse,
         JobStatusResponse, StartProcessingRequest, RetryJobRequest
     )
-    from backend.document_processing_service import DocumentProcessingService
+    from backend.document_processing_service import DocumentProcessingService, JOBS_KEYSET
+    from backend.pagination import count_total, resolve_total_mode
+
+try:
+    from schema_capabilities import refresh_schema_capabilities
+except ImportError:
+    from backend.schema_capabilities import refresh_schema_capabilities
 
 router = APIRouter(prefix="/api/process", tags=["processing"])
 
@@ -158,7 +165,9 @@ async def cancel_job(job_id: str):
 async def list_jobs(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
-    stage: Optional[ProcessingStage] = None
+    stage: Optional[ProcessingStage] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over page)"),
+    total: Optional[str] = Query(None, description="exact, estimate or none (default: exact for pages, none with a cursor)")
 ):
     """
     List all processing jobs with pagination
@@ -167,29 +176,38 @@ async def list_jobs(
     """
     service = get_service()
 
+    try:
+        after = JOBS_KEYSET.decode(cursor)
+        total_mode = resolve_total_mode(total, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # One row past the page tells whether there is a next one
     offset = (page - 1) * page_size
     jobs = await service.list_jobs(
-        limit=page_size,
+        limit=page_size + 1,
         offset=offset,
-        stage_filter=stage
+        stage_filter=stage,
+        after=after
     )
+    next_cursor = JOBS_KEYSET.cursor_for(jobs[page_size - 1]) if len(jobs) > page_size else None
+    jobs = jobs[:page_size]
 
-    # Get total count
-    await service.init_pool()
+    # Total (exact, estimated or skipped)
     async with service.pool.acquire() as conn:
         if stage:
-            total = await conn.fetchval(
-                "SELECT COUNT(*) FROM processing_jobs WHERE stage = $1",
-                stage.value
+            total_count = await count_total(
+                conn, total_mode, "SELECT 1 FROM processing_jobs WHERE stage = $1", stage.value
             )
         else:
-            total = await conn.fetchval("SELECT COUNT(*) FROM processing_jobs")
+            total_count = await count_total(conn, total_mode, "SELECT 1 FROM processing_jobs")
 
     return JobListResponse(
         jobs=jobs,
-        total=total,
+        total=total_count,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
@@ -339,6 +357,8 @@ async def run_migration():
                 count = await conn.fetchval(f"SELECT COUNT(*) FROM {table['table_name']}")
                 table_counts[table['table_name']] = count
 
+            await refresh_schema_capabilities(conn)
+
         return {
             "status": "success",
             "message": "Migration completed successfully",
@@ -20,6 +20,11 @@ try:
 except ImportError:
     from backend.background_embeddings import start_background_regeneration, get_regeneration_status
 
+try:
+    from background_token_counts import start_background_backfill, get_backfill_status
+except ImportError:
+    from backend.background_token_counts import start_background_backfill, get_backfill_status
+
 def set_vector_store(vs):
     global vector_store
     vector_store = vs
@@ -76,6 +81,52 @@ async def regenerate_embeddings_start(batch_size: int = 100) -> Dict[str, Any]:
         logger.error(f"Error starting background regeneration: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/admin/backfill-token-counts-status")
+async def backfill_token_counts_status() -> Dict[str, Any]:
+    """Check status of the chunk token count backfill (both pending and in-progress)"""
+    if not vector_store:
+        raise HTTPException(status_code=500, detail="Vector store not initialized")
+
+    try:
+        bg_status = get_backfill_status()
+
+        if not vector_store.pool:
+            await vector_store.init_database()
+
+        async with vector_store.pool.acquire() as conn:
+            result = await conn.fetchrow("""
+                SELECT COUNT(*) as count
+                FROM documents
+                WHERE token_count IS NULL OR content_hash IS NULL
+            """)
+
+            return {
+                "documents_needing_token_counts": result['count'],
+                "background_task": bg_status
+            }
+    except Exception as e:
+        logger.error(f"Error checking token count backfill status: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/admin/backfill-token-counts-start")
+async def backfill_token_counts_start(batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Start background backfill of chunk token counts and content hashes
+
+    Args:
+        batch_size: Number of chunks to process per batch (default 1000)
+
+    This runs in the background and you can check progress with /admin/backfill-token-counts-status
+    """
+    if not vector_store:
+        raise HTTPException(status_code=500, detail="Vector store not initialized")
+
+    try:
+        return start_background_backfill(vector_store, batch_size)
+    except Exception as e:
+        logger.error(f"Error starting token count backfill: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/admin/regenerate-embeddings")
 async def regenerate_embeddings(limit: int = 10) -> Dict[str, Any]:
     """
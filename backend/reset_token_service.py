@@ -14,8 +14,11 @@ import os
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
 
-import asyncpg
 
 
 class ResetTokenService:
@@ -40,13 +43,7 @@ class ResetTokenService:
         """Initialize database connection pool"""
         if self.pool:
             return
-        self.pool = await asyncpg.create_pool(
-            self.database_url,
-            statement_cache_size=0,
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
+        self.pool = await get_pool('reset_token_service', self.database_url)
 
     async def _ensure_pool(self):
         """Ensure connection pool is initialized (lazy initialization)"""
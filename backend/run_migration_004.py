@@ -17,6 +17,11 @@ try:
 except ImportError:
     pass
 
+try:
+    from schema_capabilities import refresh_schema_capabilities
+except ImportError:
+    from backend.schema_capabilities import refresh_schema_capabilities
+
 router = APIRouter()
 
 
@@ -94,6 +99,8 @@ async def run_migration_004():
                 )
                 table_counts[table['table_name']] = count
 
+            await refresh_schema_capabilities(conn)
+
         return {
             "status": "success",
             "message": "Migration 004 completed successfully",
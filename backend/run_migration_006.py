@@ -14,8 +14,10 @@ router = APIRouter(tags=["migrations"])
 
 try:
     from auth_routes import get_current_user
+    from schema_capabilities import refresh_schema_capabilities
 except ImportError:
     from backend.auth_routes import get_current_user
+    from backend.schema_capabilities import refresh_schema_capabilities
 
 
 @router.post("/api/migrations/006-add-total-pages")
@@ -90,6 +92,7 @@ async def run_migration_006(current_user: Dict[str, Any] = Depends(get_current_u
                 logger.info(f"✅ Reclassified {updated_count2} mcpressonline.com entries from 'book' to 'article'")
 
             logger.info("✅ Migration 006: all missing columns and constraints added to books table")
+            await refresh_schema_capabilities(conn)
             return {"status": "success", "message": "All missing columns, unique constraint, and article reclassification applied"}
         finally:
             await conn.close()
@@ -0,0 +1,73 @@
+"""
+Migration 007: Incrementally maintained conversation statistics.
+
+Installing the counter triggers locks conversations and messages against writes
+(SHARE ROW EXCLUSIVE) while every user's totals are backfilled, so unlike most
+schema checks it is never applied at startup. Run it once, off-peak:
+
+    POST /api/migrations/007-conversation-stats
+    DATABASE_URL=postgresql://... python3 -m backend.run_migration_007
+
+Conversation stats use COUNT queries until then; workers switch to the
+counters on their next schema check (CONVERSATION_SCHEMA_RECHECK_SECONDS).
+Safe to run multiple times (idempotent).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["migrations"])
+
+try:
+    from auth_routes import get_current_user
+    from conversation_routes import get_conversation_service
+    from conversation_service import STATS_MIGRATION_LOCK_SQL, STATS_SCHEMA_CHECK_SQL
+    from schema_capabilities import apply_migration, refresh_schema_capabilities
+except ImportError:
+    from backend.auth_routes import get_current_user
+    from backend.conversation_routes import get_conversation_service
+    from backend.conversation_service import STATS_MIGRATION_LOCK_SQL, STATS_SCHEMA_CHECK_SQL
+    from backend.schema_capabilities import apply_migration, refresh_schema_capabilities
+
+MIGRATION_FILE = '007_conversation_stats.sql'
+
+
+@router.post("/api/migrations/007-conversation-stats")
+async def run_migration_007(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    service=Depends(get_conversation_service),
+):
+    """Install the conversation stats table and triggers and backfill them if they don't exist."""
+    try:
+        applied = await service.install_stats_schema()
+        await refresh_schema_capabilities()
+        logger.info(f"✅ Migration 007: conversation stats triggers {'installed' if applied else 'already present'}")
+        return {"status": "success", "applied": applied}
+    except Exception as e:
+        logger.error(f"Migration 007 failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def main():
+    import asyncpg
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    pool = await asyncpg.create_pool(database_url, min_size=1, max_size=1)
+    try:
+        applied = await apply_migration(pool, MIGRATION_FILE, STATS_SCHEMA_CHECK_SQL, STATS_MIGRATION_LOCK_SQL)
+        print(f"✅ Migration 007 {'applied' if applied else 'already applied'}")
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Migration 009: Indexes matching the keyset pagination orders.
+
+Without them the keyset list queries (conversations, books, processing jobs)
+still work but sort instead of reading an index range. The indexes are built
+with CREATE INDEX CONCURRENTLY - writes to those tables keep going - which
+cannot run inside a transaction, so this is never applied at startup. Run it once:
+
+    POST /api/migrations/009-keyset-pagination-indexes
+    DATABASE_URL=postgresql://... python3 -m backend.run_migration_009
+
+Safe to run multiple times (idempotent).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["migrations"])
+
+try:
+    from auth_routes import get_current_user
+    from schema_capabilities import apply_concurrent_indexes
+except ImportError:
+    from backend.auth_routes import get_current_user
+    from backend.schema_capabilities import apply_concurrent_indexes
+
+MIGRATION_FILE = '009_keyset_pagination_indexes.sql'
+BUILD_TIMEOUT = float(os.getenv('KEYSET_INDEX_BUILD_TIMEOUT', '3600'))
+
+
+@router.post("/api/migrations/009-keyset-pagination-indexes")
+async def run_migration_009(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Build the keyset pagination indexes concurrently if they don't exist."""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise HTTPException(status_code=500, detail="DATABASE_URL not configured")
+
+    import asyncpg
+    conn = await asyncpg.connect(database_url)
+    try:
+        built = await apply_concurrent_indexes(conn, MIGRATION_FILE, BUILD_TIMEOUT)
+        logger.info(f"✅ Migration 009: built {built or 'nothing (all present)'}")
+        return {"status": "success", "built": built}
+    except Exception as e:
+        logger.error(f"Migration 009 failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await conn.close()
+
+
+async def main():
+    import asyncpg
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    conn = await asyncpg.connect(database_url)
+    try:
+        built = await apply_concurrent_indexes(conn, MIGRATION_FILE, BUILD_TIMEOUT)
+        print(f"✅ Migration 009: built {', '.join(built) if built else 'nothing (all present)'}")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+Migration 010: Document catalog change notifications.
+
+Installing the triggers takes SHARE ROW EXCLUSIVE locks on books, documents,
+document_authors and authors (ingestion and admin edits wait until it is done),
+so unlike most schema checks it is never applied at startup. Run it once:
+
+    POST /api/migrations/010-documents-catalog-notify
+    DATABASE_URL=postgresql://... python3 -m backend.run_migration_010
+
+Until then each worker sees other workers' catalog changes on the
+DOCUMENTS_CACHE_TTL refresh, which is also when it starts listening once the
+triggers exist. Safe to run multiple times (idempotent).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["migrations"])
+
+try:
+    from auth_routes import get_current_user
+    from db_pool import get_pool
+    from documents_catalog import documents_catalog, install_catalog_schema
+except ImportError:
+    from backend.auth_routes import get_current_user
+    from backend.db_pool import get_pool
+    from backend.documents_catalog import documents_catalog, install_catalog_schema
+
+
+@router.post("/api/migrations/010-documents-catalog-notify")
+async def run_migration_010(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Install the documents catalog change triggers if they don't exist."""
+    try:
+        applied = await install_catalog_schema(await get_pool('documents_catalog'))
+        # This worker listens right away; the others on their next TTL refresh
+        await documents_catalog.start_listener_if_installed()
+        logger.info(f"✅ Migration 010: catalog change notifications {'installed' if applied else 'already present'}")
+        return {"status": "success", "applied": applied}
+    except Exception as e:
+        logger.error(f"Migration 010 failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def main():
+    import asyncpg
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    pool = await asyncpg.create_pool(database_url, min_size=1, max_size=1)
+    try:
+        applied = await install_catalog_schema(pool)
+        print(f"✅ Migration 010 {'applied' if applied else 'already applied'}")
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
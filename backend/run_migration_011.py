@@ -0,0 +1,73 @@
+"""
+Migration 011: Index on documents.content_hash for chunk embedding reuse.
+
+documents is the largest table, so the index is built with CREATE INDEX
+CONCURRENTLY - chunk writes keep going while it builds. CONCURRENTLY cannot run
+inside a transaction, so it is never applied at startup. Run it once:
+
+    POST /api/migrations/011-content-hash-index
+    DATABASE_URL=postgresql://... python3 -m backend.run_migration_011
+
+Ingestion skips the embedding reuse lookup until the index is valid.
+Safe to run multiple times (idempotent).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["migrations"])
+
+try:
+    from auth_routes import get_current_user
+    from schema_capabilities import apply_concurrent_indexes
+except ImportError:
+    from backend.auth_routes import get_current_user
+    from backend.schema_capabilities import apply_concurrent_indexes
+
+MIGRATION_FILE = '011_documents_content_hash_index.sql'
+BUILD_TIMEOUT = float(os.getenv('CONTENT_HASH_INDEX_BUILD_TIMEOUT', '3600'))
+
+
+@router.post("/api/migrations/011-content-hash-index")
+async def run_migration_011(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Build documents_content_hash_idx concurrently if it doesn't exist."""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise HTTPException(status_code=500, detail="DATABASE_URL not configured")
+
+    import asyncpg
+    conn = await asyncpg.connect(database_url)
+    try:
+        built = await apply_concurrent_indexes(conn, MIGRATION_FILE, BUILD_TIMEOUT)
+        logger.info(f"✅ Migration 011: content_hash index {'built' if built else 'already present'}")
+        return {"status": "success", "applied": bool(built)}
+    except Exception as e:
+        logger.error(f"Migration 011 failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await conn.close()
+
+
+async def main():
+    import asyncpg
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    conn = await asyncpg.connect(database_url)
+    try:
+        built = await apply_concurrent_indexes(conn, MIGRATION_FILE, BUILD_TIMEOUT)
+        print(f"✅ Migration 011 {'applied' if built else 'already applied'}")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
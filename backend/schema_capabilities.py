@@ -0,0 +1,215 @@
+"""
+Schema capability cache.
+
+Several request handlers used to probe information_schema on every call (does
+the books table exist, are the temporal columns migrated yet, are the
+multi-author tables there) to stay compatible with databases at different
+migration levels. This module snapshots the catalog once at startup:
+
+  - tables and their columns in the current search_path
+  - installed extensions (pgvector)
+
+Handlers read the snapshot with no database round trip:
+
+    schema = await get_schema_capabilities()
+    if schema.has_columns('books', 'rpg_era'):
+        ...
+
+Call `refresh_schema_capabilities()` after a migration runs. The snapshot is also
+re-read once it is older than SCHEMA_CAPABILITIES_TTL seconds (default 600), so
+schema changes made by other processes show up without a restart.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    from db_pool import get_pool
+except ImportError:
+    from backend.db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+TEMPORAL_COLUMNS = ('publication_year', 'rpg_era')
+MULTI_AUTHOR_TABLES = ('authors', 'document_authors')
+
+
+class SchemaCapabilities:
+    """Snapshot of which tables, columns and extensions exist"""
+
+    def __init__(self, ttl: float = 600.0):
+        self.ttl = ttl
+        self.columns: Dict[str, Set[str]] = {}
+        self.extensions: Set[str] = set()
+        self.loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Future] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or (self.ttl > 0 and time.monotonic() - self.loaded_at > self.ttl)
+
+    async def refresh(self, conn=None):
+        """Re-read the catalog (two queries). Uses the shared pool unless a connection is given."""
+        if conn is None:
+            pool = await get_pool('schema_capabilities')
+            async with pool.acquire() as conn:
+                await self._load(conn)
+        else:
+            await self._load(conn)
+
+    async def _load(self, conn):
+        rows = await conn.fetch("""
+            SELECT c.table_name, c.column_name
+            FROM information_schema.columns c
+            WHERE c.table_schema = ANY(current_schemas(false))
+        """)
+        columns: Dict[str, Set[str]] = {}
+        for row in rows:
+            columns.setdefault(row['table_name'], set()).add(row['column_name'])
+
+        extensions = await conn.fetch("SELECT extname FROM pg_extension")
+
+        self.columns = columns
+        self.extensions = {row['extname'] for row in extensions}
+        self.loaded_at = time.monotonic()
+        logger.info(
+            f"✅ Schema capabilities loaded: {len(columns)} tables, "
+            f"temporal={self.has_temporal_columns}, multi_author={self.has_multi_author}, "
+            f"pgvector={self.has_pgvector}"
+        )
+
+    async def ensure_fresh(self):
+        if not self.is_stale():
+            return
+        if self.loaded:
+            # Serve the current snapshot; re-read in the background so requests never wait
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.ensure_future(self._background_refresh())
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self.refresh()
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"⚠️ Schema capability refresh failed (keeping previous snapshot): {e}")
+
+    # ------------------------------------------------------------------
+    # Lookups (no database access)
+    # ------------------------------------------------------------------
+
+    def has_table(self, table: str) -> bool:
+        return table in self.columns
+
+    def columns_of(self, table: str) -> Set[str]:
+        return self.columns.get(table, set())
+
+    def has_columns(self, table: str, *columns: str) -> bool:
+        return set(columns) <= self.columns_of(table)
+
+    @property
+    def has_temporal_columns(self) -> bool:
+        return self.has_columns('books', *TEMPORAL_COLUMNS)
+
+    @property
+    def has_multi_author(self) -> bool:
+        return all(self.has_table(table) for table in MULTI_AUTHOR_TABLES)
+
+    @property
+    def has_pgvector(self) -> bool:
+        return 'vector' in self.extensions
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded else None,
+            "tables": len(self.columns),
+            "temporal_columns": self.has_temporal_columns,
+            "multi_author": self.has_multi_author,
+            "pgvector": self.has_pgvector,
+        }
+
+
+schema_capabilities = SchemaCapabilities(ttl=float(os.getenv('SCHEMA_CAPABILITIES_TTL', '600')))
+
+
+async def get_schema_capabilities() -> SchemaCapabilities:
+    """Current snapshot (loaded on first use, re-read when older than the TTL)"""
+    await schema_capabilities.ensure_fresh()
+    return schema_capabilities
+
+
+async def refresh_schema_capabilities(conn=None) -> SchemaCapabilities:
+    """Re-read the catalog now - call after running a migration"""
+    await schema_capabilities.refresh(conn)
+    return schema_capabilities
+
+
+async def apply_migration(pool, filename: str, check_sql: str, lock_sql: Optional[str] = None) -> bool:
+    """
+    Run migrations/<filename> unless check_sql already returns true. One installer
+    at a time across workers; returns whether this call applied it.
+    """
+    async with pool.acquire() as conn:
+        if await conn.fetchval(check_sql):
+            return False
+        migration_sql = (Path(__file__).parent / 'migrations' / filename).read_text()
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", filename)
+            if await conn.fetchval(check_sql):
+                return False
+            if lock_sql:
+                await conn.execute(lock_sql)
+            await conn.execute(migration_sql)
+    return True
+
+
+INDEX_VALID_SQL = """
+    SELECT COALESCE((SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)), false)
+"""
+CONCURRENT_INDEX_RE = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)', re.I)
+
+
+def concurrent_index_statements(filename: str) -> List[tuple]:
+    """(index name, statement) of each CREATE INDEX CONCURRENTLY in migrations/<filename>"""
+    lines = (Path(__file__).parent / 'migrations' / filename).read_text().splitlines()
+    sql = '\n'.join(line for line in lines if not line.lstrip().startswith('--'))
+    statements = []
+    for statement in filter(None, (part.strip() for part in sql.split(';'))):
+        match = CONCURRENT_INDEX_RE.match(statement)
+        if not match:
+            raise ValueError(f"{filename}: not a CREATE INDEX CONCURRENTLY IF NOT EXISTS statement: {statement[:60]}")
+        statements.append((match.group(1), statement))
+    return statements
+
+
+async def apply_concurrent_indexes(conn, filename: str, timeout: Optional[float] = None) -> List[str]:
+    """
+    Build the indexes of migrations/<filename> one statement at a time with
+    CREATE INDEX CONCURRENTLY (writes continue meanwhile), so `conn` must not be
+    in a transaction. An INVALID index left by an interrupted build is dropped and
+    rebuilt. One runner at a time across workers; returns the indexes built.
+    """
+    built = []
+    await conn.execute("SELECT pg_advisory_lock(hashtext($1))", filename)
+    try:
+        for name, statement in concurrent_index_statements(filename):
+            if await conn.fetchval(INDEX_VALID_SQL, name):
+                continue
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}", timeout=timeout)
+            await conn.execute(statement, timeout=timeout)
+            built.append(name)
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", filename)
+    return built
@@ -0,0 +1,55 @@
+"""
+Per-stage wall-clock timings of one request.
+
+    timings = StageTimings()
+    history_task = asyncio.create_task(timings.run("history", load_history()))
+    results = await timings.run("search", search())
+    ...
+    timings.mark("first_token")            # milliseconds since the request started
+    logger.info(f"⏱️ {timings.summary()}")  # history=12ms search=85ms ... first_token=640ms
+
+Stages may overlap (concurrent stages each record their own duration), so they
+don't add up to the total; `mark()` records points on the request's timeline
+(e.g. time to first token) to read them against.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class StageTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}  # name -> milliseconds
+
+    def record(self, name: str, seconds: float):
+        self.stages[name] = round(seconds * 1000, 1)
+
+    async def run(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable`, recording how long it took (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @contextmanager
+    def measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def mark(self, name: str):
+        """Record the time since the request started under `name`"""
+        self.record(name, time.perf_counter() - self.started)
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(self.stages)
+
+    def summary(self) -> str:
+        return " ".join(f"{name}={ms:.0f}ms" for name, ms in self.stages.items())
@@ -20,9 +20,11 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException
 
 try:
-    import asyncpg
+    from db_pool import get_pool
+    from book_metadata_cache import invalidate_book_metadata
 except ImportError:
-    pass
+    from backend.db_pool import get_pool
+    from backend.book_metadata_cache import invalidate_book_metadata
 
 router = APIRouter()
 
@@ -49,11 +51,11 @@ def year_to_era(year: int | None) -> str:
 
 
 async def _get_pool():
-    """Create a temporary connection pool for enrichment execution."""
+    """Shared application pool view for enrichment execution."""
     database_url = os.getenv("DATABASE_URL")
     if not database_url:
         raise HTTPException(status_code=500, detail="DATABASE_URL not configured")
-    return await asyncpg.create_pool(database_url, min_size=1, max_size=2)
+    return await get_pool("temporal_enrichment", database_url)
 
 
 @router.post("/api/temporal/enrich")
@@ -67,7 +69,6 @@ async def enrich_temporal_metadata():
 
     Returns a JSON summary with counts per era category and total updated.
     """
-    pool = None
     try:
         pool = await _get_pool()
 
@@ -111,6 +112,7 @@ async def enrich_temporal_metadata():
                             book_id,
                         )
                         era_counts[new_era] = era_counts.get(new_era, 0) + 1
+                invalidate_book_metadata()
 
             return {
                 "status": "success",
@@ -129,6 +131,3 @@ async def enrich_temporal_metadata():
             status_code=500,
             detail=f"Temporal enrichment failed: {str(e)}",
         )
-    finally:
-        if pool:
-            await pool.close()
@@ -0,0 +1,56 @@
+"""
+Unit tests for the book metadata cache used by chat source enrichment.
+
+Tests cover:
+  - Hit/miss split, de-duplication and negative caching
+  - TTL expiry, LRU bound and invalidation
+"""
+
+try:
+    from backend.book_metadata_cache import BookMetadataCache
+except ImportError:
+    from book_metadata_cache import BookMetadataCache
+
+
+def test_get_many_splits_hits_and_misses():
+    cache = BookMetadataCache()
+    cache.put_many({"a.pdf": {"title": "A"}, "missing.pdf": {}})
+
+    found, missing = cache.get_many(["a.pdf", "b.pdf", "a.pdf", "missing.pdf", "b.pdf"])
+
+    assert found == {"a.pdf": {"title": "A"}, "missing.pdf": {}}
+    assert missing == ["b.pdf"]
+    assert cache.stats()["hits"] == 2
+
+
+def test_ttl_expiry():
+    cache = BookMetadataCache(ttl=-1)
+    cache.put_many({"a.pdf": {"title": "A"}})
+
+    found, missing = cache.get_many(["a.pdf"])
+
+    assert found == {}
+    assert missing == ["a.pdf"]
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_bound():
+    cache = BookMetadataCache(max_size=2)
+    cache.put_many({"a.pdf": {}, "b.pdf": {}})
+    cache.get_many(["a.pdf"])  # a is now most recently used
+    cache.put_many({"c.pdf": {}})
+
+    found, missing = cache.get_many(["a.pdf", "b.pdf", "c.pdf"])
+    assert set(found) == {"a.pdf", "c.pdf"}
+    assert missing == ["b.pdf"]
+
+
+def test_invalidate_one_or_all():
+    cache = BookMetadataCache()
+    cache.put_many({"a.pdf": {}, "b.pdf": {}})
+
+    cache.invalidate("a.pdf")
+    assert cache.get_many(["a.pdf", "b.pdf"])[1] == ["a.pdf"]
+
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,86 @@
+"""
+Unit tests for the token-budgeted context packer.
+
+Tests cover:
+  - Whole chunks packed in ranked order with separators counted
+  - The first chunk that doesn't fit is trimmed at a token boundary
+  - Token counts cached by content hash
+  - Precomputed (stored) token counts used without tokenizing
+"""
+
+import re
+
+try:
+    from backend.context_packer import ContextPacker
+except ImportError:
+    from context_packer import ContextPacker
+
+
+class WordEncoding:
+    """Deterministic stand-in for a tiktoken encoding: words, whitespace runs and punctuation"""
+
+    _pattern = re.compile(r"\s+|\w+|[^\w\s]")
+
+    def __init__(self):
+        self.encode_calls = 0
+
+    def encode(self, text):
+        self.encode_calls += 1
+        return self._pattern.findall(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def test_packs_whole_chunks_within_budget():
+    packer = ContextPacker(WordEncoding())
+    chunks = ["alpha beta", "gamma delta", "epsilon"]  # 3, 3, 1 tokens; separator "|" is 1
+
+    packed = packer.pack(chunks, budget=7, separator="|")
+
+    assert packed.text == "alpha beta|gamma delta"
+    assert (packed.tokens, packed.chunks_used, packed.chunks_total) == (7, 2, 3)
+    assert packed.truncated
+
+
+def test_everything_fits():
+    packer = ContextPacker(WordEncoding())
+    packed = packer.pack(["a b", "c"], budget=100, separator="|")
+    assert packed.text == "a b|c"
+    assert not packed.truncated
+
+
+def test_last_chunk_trimmed_at_token_boundary():
+    packer = ContextPacker(WordEncoding())
+    chunks = ["one two", "three four five six"]  # 3 + 1 + 7 tokens
+
+    packed = packer.pack(chunks, budget=8, separator="|")
+
+    assert packed.text == "one two|three four "
+    assert packed.tokens == 8
+    assert packed.chunks_used == 2 and packed.truncated
+
+
+def test_counts_cached_by_content():
+    encoding = WordEncoding()
+    packer = ContextPacker(encoding)
+    chunks = ["some chunk text", "another chunk"]
+
+    packer.pack(chunks, budget=100, separator="|")
+    calls = encoding.encode_calls
+    packer.pack(list(chunks), budget=100, separator="|")
+
+    assert encoding.encode_calls == calls
+    assert packer.stats()["hits"] >= 3
+
+
+def test_known_token_counts_skip_tokenizing():
+    encoding = WordEncoding()
+    packer = ContextPacker(encoding)
+    chunks = ["alpha beta", "gamma delta", "epsilon"]
+
+    packed = packer.pack(chunks, budget=100, separator="|", token_counts=[3, 3, None])
+
+    assert packed.text == "alpha beta|gamma delta|epsilon"
+    assert packed.tokens == 9
+    assert encoding.encode_calls == 2  # the separator and the chunk without a count
@@ -0,0 +1,98 @@
+"""
+Unit tests for the bounded conversation history store.
+
+Tests cover:
+  - Only the last history_limit messages are kept per conversation
+  - Least recently used conversations evicted by entry count and by bytes
+  - Resident byte accounting and eviction counters
+  - Another user's conversation id is treated as a miss
+  - Stores must implement the whole ConversationHistoryStore interface
+  - Client conversation labels map to a stable, per-user DB id
+"""
+
+import pytest
+
+try:
+    from backend.conversation_history import (
+        ConversationHistory, ConversationHistoryStore, LRUConversationHistoryStore, message_bytes,
+        persistent_conversation_id,
+    )
+except ImportError:
+    from conversation_history import (
+        ConversationHistory, ConversationHistoryStore, LRUConversationHistoryStore, message_bytes,
+        persistent_conversation_id,
+    )
+
+
+def _msg(text):
+    return {"role": "user", "content": text}
+
+
+@pytest.mark.asyncio
+async def test_keeps_only_recent_messages():
+    store = LRUConversationHistoryStore(history_limit=3)
+    await store.put("c1", ConversationHistory(db_id="c1"))
+
+    await store.append("c1", [_msg(str(i)) for i in range(5)])
+
+    history = await store.get("c1")
+    assert [m["content"] for m in history.messages] == ["2", "3", "4"]
+    assert store.resident_bytes == sum(message_bytes(m) for m in history.messages)
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used_by_count():
+    store = LRUConversationHistoryStore(max_entries=2)
+    for cid in ("a", "b"):
+        await store.put(cid, ConversationHistory(db_id=cid))
+    await store.get("a")  # b is now least recently used
+    await store.put("c", ConversationHistory(db_id="c"))
+
+    assert await store.get("b") is None
+    assert await store.get("a") is not None
+    assert store.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_evicts_by_bytes():
+    size = message_bytes(_msg("x" * 100))
+    store = LRUConversationHistoryStore(max_bytes=size * 2, history_limit=10)
+    for cid in ("a", "b", "c"):
+        await store.put(cid, ConversationHistory(db_id=cid))
+        await store.append(cid, [_msg("x" * 100)])
+
+    assert len(store) == 2
+    assert store.resident_bytes == size * 2
+    assert await store.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_other_users_conversation_is_a_miss():
+    store = LRUConversationHistoryStore()
+    await store.put("c1", ConversationHistory(db_id="db-1", user_id="alice"))
+
+    assert await store.get("c1", "bob") is None
+    assert (await store.get("c1", "alice")).db_id == "db-1"
+
+
+@pytest.mark.asyncio
+async def test_append_after_eviction_is_noop():
+    store = LRUConversationHistoryStore()
+    await store.append("missing", [_msg("hi")])
+    assert len(store) == 0 and store.resident_bytes == 0
+
+
+def test_incomplete_store_cannot_be_created():
+    class GetOnlyStore(ConversationHistoryStore):
+        async def get(self, conversation_id, user_id=None):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyStore()
+
+
+def test_persistent_conversation_id_is_stable_per_user():
+    # Any worker, any time: the same label of the same user is the same conversation
+    assert persistent_conversation_id("default", "alice") == persistent_conversation_id("default", "alice")
+    assert persistent_conversation_id("default", "alice") != persistent_conversation_id("default", "bob")
+    assert persistent_conversation_id("default", "alice") != persistent_conversation_id("other", "alice")
@@ -0,0 +1,89 @@
+"""
+Unit tests for conversation search helpers.
+
+Tests cover:
+  - Free-text queries turned into prefix tsquery text (punctuation can't break to_tsquery)
+  - Snippets HTML-escaped with matched terms wrapped in <mark>
+  - Pagination cursors round-trip and reject malformed input
+  - The full-text index is detected (never installed) at use, re-checked while missing
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+
+try:
+    from backend import conversation_service
+    from backend.conversation_service import build_prefix_tsquery, highlight_snippet, HEADLINE_OPTIONS
+    from backend.pagination import encode_cursor, decode_cursor
+except ImportError:
+    import conversation_service
+    from conversation_service import build_prefix_tsquery, highlight_snippet, HEADLINE_OPTIONS
+    from pagination import encode_cursor, decode_cursor
+
+
+def test_prefix_tsquery():
+    assert build_prefix_tsquery("Free-form RPG") == "free:* & form:* & rpg:*"
+    assert build_prefix_tsquery("subfile's & | ! :* (sfl)") == "subfile:* & sfl:*"
+    assert build_prefix_tsquery("snake_case") == "snake:* & case:*"
+    assert build_prefix_tsquery("a") == "a:*"
+    assert build_prefix_tsquery("  ?! ") is None
+
+
+def test_highlight_snippet_escapes_content():
+    start, stop = "\ue000", "\ue001"
+    assert start in HEADLINE_OPTIONS and stop in HEADLINE_OPTIONS
+
+    headline = f"use <b>{start}subfile{stop}</b> & {start}SFLCTL{stop}"
+    assert highlight_snippet(headline) == "use &lt;b&gt;<mark>subfile</mark>&lt;/b&gt; &amp; <mark>SFLCTL</mark>"
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"rank": 0.1, "id": "3f2a"})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"rank": 0.1, "id": "3f2a"}
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", "bm90IGpzb24", encode_cursor({"a": 1})[:-3], "WzFd"])
+def test_malformed_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+class CatalogPool:
+    """Answers schema checks with `installed`, counting them"""
+
+    def __init__(self):
+        self.installed = False
+        self.checks = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetchval(self, query, *args):
+        self.checks.append(query)
+        return self.installed
+
+
+@pytest.mark.asyncio
+async def test_search_index_detected_and_rechecked(monkeypatch):
+    service = conversation_service.ConversationService.__new__(conversation_service.ConversationService)
+    service.vector_store = type("Store", (), {"pool": CatalogPool()})()
+    service.search_index = None
+    service._schema_checked_at = {}
+    pool = service.vector_store.pool
+    clock = [1000.0]
+    monkeypatch.setattr(conversation_service.time, "monotonic", lambda: clock[0])
+
+    assert await service.detect_search_schema() is False
+    # Migration run elsewhere: not seen until the re-check interval passes
+    pool.installed = True
+    assert await service.detect_search_schema() is False
+    clock[0] += conversation_service.SCHEMA_RECHECK_SECONDS + 1
+    assert await service.detect_search_schema() is True
+    # Once installed it's never checked again
+    clock[0] += conversation_service.SCHEMA_RECHECK_SECONDS + 1
+    assert await service.detect_search_schema() is True
+    assert len(pool.checks) == 2
+    assert "ALTER" not in " ".join(pool.checks)
@@ -0,0 +1,63 @@
+"""
+Unit tests for the incrementally maintained corpus stats.
+
+Tests cover:
+  - Loading per-filename counts from one GROUP BY
+  - Incremental add/delete bookkeeping
+  - Staleness triggering a background recount
+"""
+
+import asyncio
+
+import pytest
+
+try:
+    from backend.corpus_stats import CorpusStats
+except ImportError:
+    from corpus_stats import CorpusStats
+
+
+class FakeConn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def fetch(self, query):
+        self.queries += 1
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_refresh_and_incremental_updates():
+    stats = CorpusStats()
+    await stats.refresh(FakeConn([{"filename": "a.pdf", "chunks": 10}, {"filename": "b.pdf", "chunks": 5}]))
+    assert (stats.total_chunks, stats.total_documents) == (15, 2)
+
+    stats.record_added("c.pdf", 7)
+    stats.record_added("a.pdf", 3)
+    assert stats.total_chunks == 25
+    assert stats.chunks_for("a.pdf") == 13
+
+    stats.record_deleted("a.pdf")
+    stats.record_deleted("missing.pdf")
+    assert (stats.total_chunks, stats.total_documents) == (12, 2)
+
+
+@pytest.mark.asyncio
+async def test_stale_counts_recounted_in_background():
+    stats = CorpusStats(ttl=1)
+    conn = FakeConn([{"filename": "a.pdf", "chunks": 4}])
+    await stats.refresh(conn)
+    stats.loaded_at -= 10
+
+    calls = []
+
+    async def refresh(conn=None):
+        calls.append(conn)
+
+    stats.refresh = refresh
+    await stats.ensure_fresh()
+    await asyncio.sleep(0)
+    assert calls == [None]
+    # Readers are still served the previous counts
+    assert stats.total_chunks == 4
@@ -0,0 +1,142 @@
+"""
+Unit tests for the shared asyncpg pool registry.
+
+Tests cover:
+  - One underlying pool shared by every service view
+  - Per-service usage stats (acquisitions, peak concurrency, errors)
+  - Service views never close the shared pool
+  - Every new connection gets the pgvector codec through the pool's init hook
+
+The asyncpg pool is replaced by a small in-process stand-in, so no database is needed.
+"""
+
+import asyncio
+
+import pytest
+
+try:
+    from backend import db_pool
+except ImportError:
+    import db_pool
+
+
+class StandInPool:
+    def __init__(self):
+        self.released = []
+        self.closed = False
+
+    async def acquire(self, timeout=None):
+        await asyncio.sleep(0)
+        return object()
+
+    async def release(self, conn):
+        self.released.append(conn)
+
+    async def close(self):
+        self.closed = True
+
+    def get_size(self):
+        return 2
+
+    def get_idle_size(self):
+        return 1
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return 20
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    pools = []
+
+    async def fake_create_pool(dsn, **settings):
+        pools.append((dsn, settings))
+        return StandInPool()
+
+    monkeypatch.setattr(db_pool.asyncpg, "create_pool", fake_create_pool)
+    reg = db_pool.PoolRegistry()
+    reg.created = pools
+    return reg
+
+
+@pytest.mark.asyncio
+async def test_services_share_one_pool(registry, monkeypatch):
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "7")
+
+    a, b = await asyncio.gather(
+        registry.get("author_service", "postgresql://db/a"),
+        registry.get("usage_gate", "postgresql://db/a"),
+    )
+    assert await registry.get("author_service") is a
+
+    assert len(registry.created) == 1
+    dsn, settings = registry.created[0]
+    assert settings["max_size"] == 7
+    assert settings["statement_cache_size"] == 0
+    assert a is not b
+
+
+@pytest.mark.asyncio
+async def test_per_service_stats(registry):
+    service = await registry.get("chat_handler", "postgresql://db/a")
+
+    async def use():
+        async with service.acquire():
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(use(), use(), use())
+
+    with pytest.raises(RuntimeError):
+        async with service.acquire():
+            raise RuntimeError("query failed")
+
+    stats = registry.stats()
+    assert stats["size"] == 2
+    chat = stats["services"]["chat_handler"]
+    assert chat["acquisitions"] == 4
+    assert chat["peak_active"] == 3
+    assert chat["active"] == 0
+    assert chat["errors"] == 1
+    assert len(registry.pool.released) == 4
+
+
+@pytest.mark.asyncio
+async def test_service_close_keeps_shared_pool_open(registry):
+    service = await registry.get("books_api", "postgresql://db/a")
+    shared = registry.pool
+
+    await service.close()
+    assert not shared.closed
+
+    await registry.close()
+    assert shared.closed
+    assert registry.pool is None
+
+
+class CodecConnection:
+    def __init__(self, has_vector=True):
+        self.has_vector = has_vector
+        self.codecs = []
+
+    async def set_type_codec(self, typename, **kwargs):
+        if not self.has_vector:
+            raise ValueError(f"unknown type: public.{typename}")
+        self.codecs.append((typename, kwargs["format"]))
+
+
+@pytest.mark.asyncio
+async def test_connections_get_vector_codec(registry):
+    await registry.get("vector_store", "postgresql://db/a")
+    init = registry.created[0][1]["init"]
+
+    conn = CodecConnection()
+    await init(conn)
+    assert conn.codecs == [("vector", "binary")]
+    assert registry.vector_codec
+
+    # Before CREATE EXTENSION vector: the text paths are used
+    await init(CodecConnection(has_vector=False))
+    assert not registry.vector_codec
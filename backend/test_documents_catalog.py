@@ -0,0 +1,270 @@
+"""
+Unit tests for the incrementally refreshed documents catalog.
+
+Tests cover:
+  - One full load, then only invalidated filenames re-listed and merged in order
+  - Deleted files dropped, new files inserted, full invalidation reloading everything
+  - Invalidations during a load not lost, failed loads retried
+  - NOTIFY payloads from other workers marking files (or everything) for reload
+  - Single-flight rebuilds and version checks instead of TTL reloads while listening
+  - TTL-only refresh until migration 010 is installed, then listening from the next refresh
+  - ETags that change with the content only, and If-None-Match matching
+"""
+
+import asyncio
+import json
+
+import pytest
+
+try:
+    from backend.documents_catalog import DocumentsCatalog, etag_matches
+except ImportError:
+    from documents_catalog import DocumentsCatalog, etag_matches
+
+
+class FakeStore:
+    """list_documents over an in-memory books table"""
+
+    def __init__(self, books):
+        self.books = books
+        self.calls = []
+        self.fail = False
+
+    async def list_documents(self, filenames=None):
+        self.calls.append(filenames)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        rows = [dict(b) for b in self.books if filenames is None or b["filename"] in filenames]
+        return {"documents": sorted(rows, key=lambda b: b["id"], reverse=True)}
+
+
+def _book(book_id, title=None):
+    return {"id": book_id, "filename": f"{book_id}.pdf", "title": title or f"Book {book_id}"}
+
+
+class FakePool:
+    """pool.acquire() yielding a connection that reports the catalog version"""
+
+    def __init__(self, version, installed=True):
+        self.version = version
+        self.installed = installed
+
+    def acquire(self):
+        pool = self
+
+        class _Acquire:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def fetchval(self, query):
+                if "pg_trigger" in query:
+                    return pool.installed
+                return pool.version
+
+        return _Acquire()
+
+
+def _catalog(store, ttl=300):
+    catalog = DocumentsCatalog(ttl=ttl)
+    catalog.set_loader(store.list_documents)
+    return catalog
+
+
+@pytest.mark.asyncio
+async def test_changed_files_merged_without_full_reload():
+    store = FakeStore([_book(1), _book(2), _book(3)])
+    catalog = _catalog(store)
+    assert [d["id"] for d in (await catalog.get())["documents"]] == [3, 2, 1]
+
+    store.books[1]["title"] = "Edited"
+    store.books.append(_book(4))
+    del store.books[0]
+    for filename in ("2.pdf", "4.pdf", "1.pdf"):
+        catalog.invalidate(filename)
+
+    documents = (await catalog.get())["documents"]
+    assert [(d["id"], d["title"]) for d in documents] == [(4, "Book 4"), (3, "Book 3"), (2, "Edited")]
+    assert store.calls == [None, ["1.pdf", "2.pdf", "4.pdf"]]
+
+    # Nothing pending: served from memory
+    await catalog.get()
+    assert len(store.calls) == 2
+    assert catalog.stats()["partial_reloads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_invalidation_reloads_everything():
+    store = FakeStore([_book(1)])
+    catalog = _catalog(store)
+    await catalog.get()
+    catalog.invalidate("1.pdf")
+    catalog.invalidate()
+    await catalog.get()
+    assert store.calls == [None, None]
+    assert catalog.stats()["pending_files"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_is_kept():
+    store = FakeStore([_book(1)])
+    catalog = _catalog(store)
+    loading = store.list_documents
+
+    async def slow_load(filenames=None):
+        result = await loading(filenames)
+        catalog.invalidate("1.pdf")  # a write committed while the query ran
+        return result
+
+    catalog.set_loader(slow_load)
+    await catalog.get()
+    catalog.set_loader(store.list_documents)
+    await catalog.get()
+    assert store.calls == [None, ["1.pdf"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_retried_and_stale_catalog_reloaded_in_background():
+    store = FakeStore([_book(1)])
+    catalog = _catalog(store, ttl=1)
+    await catalog.get()
+
+    store.fail = True
+    catalog.invalidate("1.pdf")
+    with pytest.raises(RuntimeError):
+        await catalog.get()
+    assert catalog.stats()["pending_files"] == 1
+
+    store.fail = False
+    store.books.append(_book(2))
+    catalog.invalidate()
+    catalog._loaded_at -= 10
+    assert len((await catalog.get())["documents"]) == 2
+
+    # Stale: the current catalog is served and reloaded behind the request
+    catalog._loaded_at -= 10
+    await catalog.get()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert catalog.stats()["full_reloads"] == 3
+
+
+@pytest.mark.asyncio
+async def test_notifications_from_other_workers():
+    store = FakeStore([_book(1), _book(2)])
+    catalog = _catalog(store)
+    await catalog.get()
+
+    catalog._on_notify(None, 4242, "documents_catalog", json.dumps({"version": 7, "filenames": ["2.pdf"]}))
+    catalog._on_notify(None, 4242, "documents_catalog", json.dumps({"version": 5, "filenames": ["1.pdf"]}))
+    assert catalog.version == 7
+    await catalog.get()
+    assert store.calls[-1] == ["1.pdf", "2.pdf"]
+
+    # Too many files for one payload: reload everything
+    catalog._on_notify(None, 4242, "documents_catalog", json.dumps({"version": 8, "filenames": None}))
+    await catalog.get()
+    assert store.calls[-1] is None
+    assert catalog.stats()["notifications"] == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rebuilds_single_flight():
+    store = FakeStore([_book(1)])
+    catalog = _catalog(store)
+    loading = store.list_documents
+
+    async def slow_load(filenames=None):
+        await asyncio.sleep(0.01)
+        return await loading(filenames)
+
+    catalog.set_loader(slow_load)
+    await asyncio.gather(*(catalog.get() for _ in range(10)))
+    await asyncio.gather(*(catalog.get(force_refresh=True) for _ in range(10)))
+    assert store.calls == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_stale_catalog_checks_version_while_listening():
+    store = FakeStore([_book(1)])
+    catalog = _catalog(store, ttl=1)
+    catalog._pool, catalog.listening = FakePool(3), True
+    await catalog.get()
+    assert catalog.version == 3
+
+    catalog._loaded_at -= 10
+    await catalog.get()
+    await catalog._refresh_task
+    assert (catalog.full_reloads, catalog.version_checks) == (1, 1)
+
+    # A change this worker wasn't notified of: rebuild
+    catalog._pool.version = 4
+    catalog._loaded_at -= 10
+    await catalog.get()
+    await catalog._refresh_task
+    assert (catalog.full_reloads, catalog.version) == (2, 4)
+
+
+@pytest.mark.asyncio
+async def test_change_feed_waits_for_migration(monkeypatch):
+    store = FakeStore([_book(1)])
+    catalog = _catalog(store, ttl=1)
+    started = []
+
+    async def start_listener(database_url, pool):
+        started.append(database_url)
+        catalog._listener_task = asyncio.ensure_future(asyncio.sleep(0))
+        catalog.listening = True
+
+    monkeypatch.setattr(catalog, "start_listener", start_listener)
+    pool = FakePool(0, installed=False)
+    assert not await catalog.start_change_feed("postgresql://db/a", pool)
+    await catalog.get()
+
+    # Not installed: the stale catalog is reloaded on the TTL
+    catalog._loaded_at -= 10
+    await catalog.get()
+    await catalog._refresh_task
+    assert (catalog.full_reloads, started) == (2, [])
+
+    # Installed meanwhile (run_migration_010): the next TTL refresh starts listening
+    pool.installed = True
+    catalog._loaded_at -= 10
+    await catalog.get()
+    await catalog._refresh_task
+    assert started == ["postgresql://db/a"] and catalog.listening
+
+
+@pytest.mark.asyncio
+async def test_etag_follows_content():
+    store = FakeStore([_book(1), _book(2)])
+    catalog = _catalog(store)
+    await catalog.get()
+    etag = catalog.etag
+    assert json.loads(catalog.documents_json) == (await catalog.get())["documents"]
+
+    catalog.invalidate("1.pdf")
+    await catalog.get()
+    assert catalog.etag == etag
+
+    store.books[0]["title"] = "Edited"
+    catalog.invalidate("1.pdf")
+    await catalog.get()
+    assert catalog.etag != etag
+
+    # Another worker holding the same catalog computes the same ETag
+    other = _catalog(store)
+    await other.get()
+    assert other.etag == catalog.etag
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('"abc"', None)
@@ -0,0 +1,88 @@
+"""
+Unit and property-based tests for InMemoryEmbeddingIndex (no-pgvector fallback search).
+
+Tests cover:
+  - Top-k results match a brute-force cosine similarity ranking
+  - Incremental add / remove_filename, including compaction
+  - Duplicate ids and dimension validation
+"""
+
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+try:
+    from backend.embedding_index import InMemoryEmbeddingIndex
+except ImportError:
+    from embedding_index import InMemoryEmbeddingIndex
+
+
+DIM = 8
+
+
+def _brute_force(vectors, ids, query, k):
+    vectors = np.asarray(vectors, dtype=np.float64)
+    sims = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    order = np.argsort(-sims, kind='stable')[:k]
+    return [ids[i] for i in order], sims[order]
+
+
+@settings(max_examples=50, deadline=None)
+@given(count=st.integers(min_value=1, max_value=300), k=st.integers(min_value=1, max_value=20),
+       seed=st.integers(min_value=0, max_value=2**32 - 1))
+def test_search_matches_brute_force(count, k, seed):
+    """Top-k similarities equal the brute-force ranking (ids may differ only on ties)."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, DIM))
+    ids = list(range(100, 100 + count))
+    query = rng.standard_normal(DIM)
+
+    index = InMemoryEmbeddingIndex(DIM, initial_capacity=4)
+    index.add(ids, ["doc.pdf"] * count, vectors)
+
+    hits = index.search(query, k)
+    _, expected_sims = _brute_force(vectors, ids, query, k)
+
+    assert len(hits) == min(k, count)
+    np.testing.assert_allclose([sim for _, sim in hits], expected_sims, atol=1e-5)
+    assert len({chunk_id for chunk_id, _ in hits}) == len(hits)
+
+
+def test_remove_filename_excludes_rows_and_compacts():
+    rng = np.random.default_rng(0)
+    index = InMemoryEmbeddingIndex(DIM)
+    index.add([1, 2, 3], ["a.pdf"] * 3, rng.standard_normal((3, DIM)))
+    index.add([4, 5], ["b.pdf"] * 2, rng.standard_normal((2, DIM)))
+
+    assert index.remove_filename("a.pdf") == 3
+    assert index.remove_filename("a.pdf") == 0
+    assert len(index) == 2
+    # 3 of 5 rows were tombstoned, which is past the threshold
+    assert index.stats()["tombstones"] == 0
+
+    hits = index.search(rng.standard_normal(DIM), 10)
+    assert sorted(chunk_id for chunk_id, _ in hits) == [4, 5]
+
+    # The index stays usable after compaction
+    index.add([6], ["c.pdf"], rng.standard_normal((1, DIM)))
+    assert index.remove_filename("b.pdf") == 2
+    assert [chunk_id for chunk_id, _ in index.search(rng.standard_normal(DIM), 10)] == [6]
+
+
+def test_add_skips_existing_ids():
+    index = InMemoryEmbeddingIndex(DIM)
+    vectors = np.eye(DIM)[:2]
+    assert index.add([1, 2], ["a.pdf", "a.pdf"], vectors) == 2
+    assert index.add([2, 3], ["a.pdf", "a.pdf"], vectors) == 1
+    assert len(index) == 3
+
+
+def test_add_rejects_wrong_dimension():
+    index = InMemoryEmbeddingIndex(DIM)
+    with pytest.raises(ValueError):
+        index.add([1], ["a.pdf"], np.ones((1, DIM + 1)))
+
+
+def test_search_empty_index():
+    assert InMemoryEmbeddingIndex(DIM).search(np.ones(DIM), 5) == []
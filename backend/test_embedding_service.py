@@ -0,0 +1,133 @@
+"""
+Unit tests for EmbeddingService (query embedding cache + micro-batching).
+
+Tests cover:
+  - Query normalization used as the cache key
+  - LRU eviction and TTL expiry
+  - Concurrent queries merged into a single encode call
+  - Running batch tasks kept referenced until they finish
+  - Encoder errors propagated to every waiter
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+try:
+    from backend.embedding_service import EmbeddingService, normalize_query
+except ImportError:
+    from embedding_service import EmbeddingService, normalize_query
+
+
+class RecordingEncoder:
+    """Fake encoder that records each batch and the thread it ran on"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.threads = set()
+        self.fail = fail
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.threads.add(threading.get_ident())
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+@given(text=st.text(max_size=40))
+def test_normalize_query_is_idempotent(text):
+    key = normalize_query(text)
+    assert normalize_query(key) == key
+    assert normalize_query("  " + text.upper() + "\n") == normalize_query(text.upper())
+
+
+def test_normalize_query_collapses_case_and_whitespace():
+    assert normalize_query("  How do I\tdeclare a   DS? ") == "how do i declare a ds?"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_batch():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, batch_window_ms=20)
+
+    results = await asyncio.gather(
+        service.embed_query("alpha"),
+        service.embed_query("beta"),
+        service.embed_query("ALPHA "),  # same key as "alpha", shares the in-flight slot
+    )
+
+    assert encoder.batches == [["alpha", "beta"]]
+    assert threading.get_ident() not in encoder.threads
+    np.testing.assert_array_equal(results[0], results[2])
+    stats = service.stats()
+    assert stats["batches"] == 1
+    assert stats["max_batch_size"] == 2
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_skip_encoder():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, batch_window_ms=0)
+
+    first = await service.embed_query("free-form RPG")
+    second = await service.embed_query("free-form rpg")
+
+    assert len(encoder.batches) == 1
+    assert second is first
+    assert not first.flags.writeable
+    assert service.stats()["cache_hit_rate"] == 0.5
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batches_split_at_max_batch_size():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, max_batch_size=2, batch_window_ms=50)
+
+    await asyncio.gather(*(service.embed_query(f"q{i}") for i in range(5)))
+
+    assert sorted(len(batch) for batch in encoder.batches) == [1, 2, 2]
+    # Each batch task stays referenced until it finishes, then drops out
+    await asyncio.gather(*service._batch_tasks)
+    await asyncio.sleep(0)
+    assert not service._batch_tasks
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, cache_size=2, batch_window_ms=0)
+
+    for text in ("a", "b", "c"):
+        await service.embed_query(text)
+    assert service.stats()["cache_entries"] == 2
+
+    await service.embed_query("a")  # evicted, encoded again
+    assert len(encoder.batches) == 4
+
+    service.cache_ttl = -1
+    service._cache_put("d", np.zeros(2))
+    await service.embed_query("d")  # expired, encoded again
+    assert len(encoder.batches) == 5
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_encoder_error_reaches_all_waiters():
+    service = EmbeddingService(RecordingEncoder(fail=True), batch_window_ms=5)
+
+    results = await asyncio.gather(
+        service.embed_query("x"), service.embed_query("x"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    # Failures are not cached
+    assert service.stats()["cache_entries"] == 0
+    service.shutdown()
@@ -0,0 +1,419 @@
+"""
+Unit tests for the pipelined ingestion run.
+
+Tests cover:
+  - Downloads reuse pooled FTP connections instead of logging in per file
+  - Each stage stays within its concurrency limit
+  - Extracted files are written in batches, one transaction per batch
+  - A failing file (in any stage, or inside a batch write) doesn't affect the others
+  - Per-stage progress recorded on the run
+  - Files identical to a stored book (or to another file of the run) are skipped
+  - A duplicate is processed instead when the file it waited on fails
+  - An interrupted run's downloads and extractions are resumed, not redone
+  - Chunks with stored identical content reuse their embeddings
+  - Written chunks join the no-pgvector fallback index only once committed
+"""
+
+import asyncio
+import ftplib
+import hashlib
+import os
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+try:
+    from backend import ingestion_service
+    from backend.ingestion_service import ExtractedDocument, IngestionService
+    from backend.vector_store_postgres import PostgresVectorStore, PreparedDocuments
+    from backend.embedding_index import InMemoryEmbeddingIndex
+except ImportError:
+    import ingestion_service
+    from ingestion_service import ExtractedDocument, IngestionService
+    from vector_store_postgres import PostgresVectorStore, PreparedDocuments
+    from embedding_index import InMemoryEmbeddingIndex
+
+
+class FakeConnection:
+    def __init__(self, store):
+        self.store = store
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.store.transactions += 1
+        staged = []
+        self.store.staged = staged
+        yield
+        self.store.books.extend(staged)
+
+    async def execute(self, query, *args):
+        if "INTO ingestion_checkpoints" in query:
+            self.store.checkpoints.append((args[0], args[2]))
+        return "UPDATE 0"
+
+    async def executemany(self, query, rows):
+        rows = list(rows)
+        if "INTO ingestion_checkpoints" in query:
+            self.store.checkpoints.extend((row[0], row[2]) for row in rows)
+            return
+        if any(row[0] in self.store.fail_store for row in rows):
+            raise RuntimeError("constraint violation")
+        self.store.staged.extend(row[0] for row in rows)
+
+    async def fetch(self, query, *args):
+        if "FROM ingestion_checkpoints" in query:
+            return [row for row in self.store.saved_checkpoints if row["filename"] in args[0]]
+        return [{"file_hash": h, "filename": f} for h, f in self.store.book_hashes.items()]
+
+    async def fetchval(self, query, *args):
+        return 1
+
+
+class FakePool:
+    def __init__(self, store):
+        self.store = store
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self.store)
+
+
+class FakeVectorStore:
+    def __init__(self, fail_store=()):
+        self.fail_store = set(fail_store)
+        self.books = []
+        self.book_hashes = {}
+        self.saved_checkpoints = []
+        self.checkpoints = []
+        self.transactions = 0
+        self.staged = []
+        self.batches = []
+        self.pool = FakePool(self)
+
+    async def prepare_documents(self, documents, metadata=None):
+        return PreparedDocuments(metadata["filename"], documents, metadata, np.ones((len(documents), 4)), [1])
+
+    async def store_prepared(self, batch, bulk=None, conn=None):
+        self.batches.append([prepared.filename for prepared in batch])
+
+    def prepared_stored(self, batch):
+        pass
+
+
+class Gauge:
+    """Tracks the highest number of concurrent holders"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    async def hold(self, seconds=0.01):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        await asyncio.sleep(seconds)
+        self.current -= 1
+
+
+class FakeProcessor:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.gauge = Gauge()
+        self.processed = []
+
+    async def process_pdf(self, file_path):
+        self.processed.append(os.path.basename(file_path))
+        await self.gauge.hold()
+        if file_path.endswith(tuple(self.fail)):
+            raise ValueError("damaged PDF")
+        return {"chunks": [{"content": "text"}], "total_pages": 3, "author": "Jane Doe"}
+
+
+class FakeCategoryMapper:
+    def get_category(self, filename):
+        return "RPG"
+
+
+def pdf_bytes(filename):
+    return b"%PDF-1.4 " + filename.encode()
+
+
+class FakeFTP:
+    logins = 0
+    retrieved = []
+
+    def __init__(self, missing=(), contents=None):
+        FakeFTP.logins += 1
+        self.missing = missing
+        self.contents = contents or {}
+
+    def retrbinary(self, command, callback):
+        filename = command.split(" ", 1)[1]
+        if filename in self.missing:
+            raise ftplib.error_perm("550 No such file")
+        FakeFTP.retrieved.append(filename)
+        callback(self.contents.get(filename, pdf_bytes(filename)))
+
+    def quit(self):
+        pass
+
+
+def make_service(monkeypatch, vector_store, processor, missing=(), contents=None, **limits):
+    service = IngestionService(vector_store, processor, FakeCategoryMapper())
+    FakeFTP.logins = 0
+    FakeFTP.retrieved = []
+    monkeypatch.setattr(service, "_connect_ftp", lambda: FakeFTP(missing, contents))
+    for name, value in limits.items():
+        setattr(service, name, value)
+    return service
+
+
+async def run_pipeline(service, filenames, tmp_path):
+    result = ingestion_service.IngestionRunResult(run_id="run", status="running", started_at=None)
+    pool = ingestion_service.FTPConnectionPool(service._connect_ftp, service.download_workers)
+    await service._run_pipeline(result, filenames, str(tmp_path), pool)
+    await pool.close()
+    return result
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_all_files_in_batches(monkeypatch, tmp_path):
+    vector_store = FakeVectorStore()
+    processor = FakeProcessor()
+    service = make_service(
+        monkeypatch, vector_store, processor,
+        download_workers=3, process_workers=2, store_batch_size=4,
+    )
+    filenames = [f"book-{i}.pdf" for i in range(20)]
+
+    result = await run_pipeline(service, filenames, tmp_path)
+
+    assert sorted(vector_store.books) == sorted(filenames)
+    assert result.files_processed == 20
+    assert result.files_failed == 0
+    assert FakeFTP.logins <= 3
+    assert processor.gauge.peak <= 2
+    assert all(len(batch) <= 4 for batch in vector_store.batches)
+    assert vector_store.transactions == len(vector_store.batches) < 20
+    assert result.stage_progress == {
+        "download": {"done": 20, "failed": 0, "active": 0, "resumed": 0, "duplicates": 0},
+        "process": {"done": 20, "failed": 0, "active": 0},
+        "store": {"done": 20, "failed": 0, "active": 0},
+    }
+    # Downloads are removed once extracted, extractions once stored
+    assert list(tmp_path.iterdir()) == []
+    assert sorted(vector_store.checkpoints) == sorted(
+        (filename, stage) for filename in filenames for stage in ("downloaded", "processed", "stored")
+    )
+
+
+@pytest.mark.asyncio
+async def test_failures_are_isolated_per_file_and_stage(monkeypatch, tmp_path):
+    vector_store = FakeVectorStore(fail_store={"book-5.pdf"})
+    processor = FakeProcessor(fail={"book-3.pdf"})
+    service = make_service(
+        monkeypatch, vector_store, processor, missing={"book-1.pdf"},
+        download_workers=2, process_workers=2, store_batch_size=8,
+    )
+    filenames = [f"book-{i}.pdf" for i in range(10)]
+
+    result = await run_pipeline(service, filenames, tmp_path)
+
+    assert sorted(vector_store.books) == sorted(set(filenames) - {"book-1.pdf", "book-3.pdf", "book-5.pdf"})
+    assert result.files_processed == 7
+    assert result.files_failed == 3
+    assert {(e["filename"], e["stage"]) for e in result.errors} == {
+        ("book-1.pdf", "download"),
+        ("book-3.pdf", "process"),
+        ("book-5.pdf", "store"),
+    }
+    assert result.stage_progress["download"]["failed"] == 1
+    assert result.stage_progress["process"]["failed"] == 1
+    assert result.stage_progress["store"] == {"done": 7, "failed": 1, "active": 0}
+
+
+@pytest.mark.asyncio
+async def test_ftp_pool_discards_broken_connections():
+    connections = []
+
+    def connect():
+        connections.append(FakeFTP())
+        return connections[-1]
+
+    pool = ingestion_service.FTPConnectionPool(connect, 2)
+    async with pool.connection() as first:
+        pass
+    async with pool.connection() as again:
+        assert again is first
+
+    # Permanent replies keep the connection, anything else drops it
+    with pytest.raises(ftplib.error_perm):
+        async with pool.connection():
+            raise ftplib.error_perm("550")
+    with pytest.raises(EOFError):
+        async with pool.connection():
+            raise EOFError()
+    async with pool.connection() as fresh:
+        assert fresh is not first
+    assert len(connections) == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_skipped(monkeypatch, tmp_path):
+    vector_store = FakeVectorStore()
+    vector_store.book_hashes = {hashlib.sha256(b"stored book").hexdigest(): "stored.pdf"}
+    processor = FakeProcessor()
+    service = make_service(
+        monkeypatch, vector_store, processor, download_workers=1,
+        contents={"renamed.pdf": b"stored book", "copy-b.pdf": pdf_bytes("copy-a.pdf")},
+    )
+
+    result = await run_pipeline(service, ["renamed.pdf", "copy-a.pdf", "copy-b.pdf", "new.pdf"], tmp_path)
+
+    assert sorted(vector_store.books) == ["copy-a.pdf", "new.pdf"]
+    assert sorted(processor.processed) == ["copy-a.pdf", "new.pdf"]
+    assert result.files_skipped == 2
+    assert result.stage_progress["download"]["duplicates"] == 2
+    assert ("renamed.pdf", "duplicate") in vector_store.checkpoints
+    assert ("copy-b.pdf", "duplicate") in vector_store.checkpoints
+
+
+@pytest.mark.asyncio
+async def test_duplicate_takes_over_when_the_original_fails(monkeypatch, tmp_path):
+    class FailFirstProcessor(FakeProcessor):
+        async def process_pdf(self, file_path):
+            # Two download workers race for the claim, so fail whichever copy won it
+            if not self.processed:
+                self.fail.add(os.path.basename(file_path))
+            return await super().process_pdf(file_path)
+
+    vector_store = FakeVectorStore()
+    processor = FailFirstProcessor()
+    service = make_service(
+        monkeypatch, vector_store, processor, download_workers=2,
+        contents={name: b"same book" for name in ("copy-a.pdf", "copy-b.pdf", "copy-c.pdf", "copy-d.pdf")},
+    )
+
+    result = await run_pipeline(service, ["copy-a.pdf", "copy-b.pdf", "copy-c.pdf", "copy-d.pdf"], tmp_path)
+
+    # The first copy fails processing, so a second one is processed and stored; the rest are duplicates
+    original, takeover = processor.processed
+    assert vector_store.books == [takeover]
+    assert original != takeover
+    assert result.files_failed == 1
+    assert result.files_skipped == 2
+    assert (original, "duplicate") not in vector_store.checkpoints
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_checkpoints(monkeypatch, tmp_path):
+    vector_store = FakeVectorStore()
+    processor = FakeProcessor()
+    service = make_service(monkeypatch, vector_store, processor)
+
+    # Left behind in the interrupted run's directory: one download, one extraction
+    old_dir = tmp_path / "old"
+    old_dir.mkdir()
+    (old_dir / "downloaded.pdf").write_bytes(pdf_bytes("downloaded.pdf"))
+    # Not the run's to delete
+    (tmp_path / "operator-notes.txt").write_text("keep")
+    extracted = ExtractedDocument(
+        filename="processed.pdf", metadata={"title": "Processed", "author": "Jane Doe", "document_type": "book"},
+        category="RPG", total_pages=3, author="Jane Doe", metadata_source="default", resolved_authors=[],
+        chunk_count=1, file_hash="abc",
+        prepared=PreparedDocuments("processed.pdf", [{"content": "text"}], {"filename": "processed.pdf"},
+                                   np.ones((1, 4), dtype=np.float32), [1]),
+    )
+    extracted.save(service.extracted_path(str(old_dir), "processed.pdf"))
+    vector_store.saved_checkpoints = [
+        {"filename": "downloaded.pdf", "run_id": "old", "stage": "downloaded",
+         "file_hash": hashlib.sha256(pdf_bytes("downloaded.pdf")).hexdigest()},
+        {"filename": "processed.pdf", "run_id": "old", "stage": "processed", "file_hash": "abc"},
+        # The download this checkpoint refers to is gone: downloaded again
+        {"filename": "lost.pdf", "run_id": "old", "stage": "downloaded", "file_hash": "def"},
+    ]
+
+    result = await run_pipeline(service, ["downloaded.pdf", "processed.pdf", "lost.pdf", "new.pdf"], tmp_path)
+
+    assert sorted(FakeFTP.retrieved) == ["lost.pdf", "new.pdf"]
+    assert sorted(processor.processed) == ["downloaded.pdf", "lost.pdf", "new.pdf"]
+    assert sorted(vector_store.books) == ["downloaded.pdf", "lost.pdf", "new.pdf", "processed.pdf"]
+    assert result.stage_progress["download"]["resumed"] == 2
+    # Resumed files are checkpointed under the run that adopted them
+    assert ("downloaded.pdf", "downloaded") in vector_store.checkpoints
+    assert [p.name for p in tmp_path.iterdir()] == ["operator-notes.txt"]
+
+
+def test_extracted_document_round_trip(tmp_path):
+    document = ExtractedDocument(
+        filename="a.pdf", metadata={"title": "A"}, category="RPG", total_pages=2, author="Jane Doe",
+        metadata_source="excel", resolved_authors=["Jane Doe"], chunk_count=2, file_hash="abc",
+        prepared=PreparedDocuments("a.pdf", [{"content": "x"}, {"content": "y"}], {"filename": "a.pdf"},
+                                   np.arange(6, dtype=np.float32).reshape(2, 3), [1, None], 1),
+    )
+    path = str(tmp_path / "a.pdf.extracted.npz")
+    document.save(path)
+
+    loaded = ExtractedDocument.load(path)
+    assert loaded.stats() == document.stats()
+    assert loaded.resolved_authors == ["Jane Doe"]
+    assert loaded.prepared.documents == document.prepared.documents
+    assert loaded.prepared.token_counts == [1, None]
+    assert loaded.prepared.reused_embeddings == 1
+    np.testing.assert_array_equal(loaded.prepared.embeddings, document.prepared.embeddings)
+
+
+@pytest.mark.asyncio
+async def test_prepare_documents_reuses_stored_embeddings(monkeypatch):
+    store = PostgresVectorStore.__new__(PostgresVectorStore)
+    embedded = []
+
+    class FakeEmbeddingService:
+        async def embed_documents(self, texts):
+            embedded.extend(texts)
+            return np.full((len(texts), 3), 2.0, dtype=np.float32)
+
+    async def stored(hashes):
+        return {h: [1.0, 1.0, 1.0] for h in hashes if h == hashlib.sha1(b"known").hexdigest()}
+
+    store.embedding_service = FakeEmbeddingService()
+    monkeypatch.setattr(store, "embeddings_by_content_hash", stored)
+
+    prepared = await store.prepare_documents(
+        [{"content": "known"}, {"content": "new"}, {"content": "new"}], metadata={"filename": "a.pdf"}
+    )
+
+    assert embedded == ["new"]
+    assert prepared.reused_embeddings == 1
+    np.testing.assert_array_equal(prepared.embeddings, [[1, 1, 1], [2, 2, 2], [2, 2, 2]])
+
+
+@pytest.mark.asyncio
+async def test_fallback_index_updated_after_commit():
+    store = PostgresVectorStore.__new__(PostgresVectorStore)
+    store.has_pgvector, store.bulk_ingestion = False, False
+    store._fallback_index = InMemoryEmbeddingIndex(3)
+    store._fallback_index.loaded = True
+
+    class Connection:
+        @asynccontextmanager
+        async def transaction(self):
+            yield
+
+        async def execute(self, query, *args):
+            pass
+
+        async def fetch(self, query, filename, count):
+            return [{"id": chunk_id} for chunk_id in (12, 11, 10)[:count]]
+
+    prepared = PreparedDocuments("a.pdf", [{"content": c} for c in "xyz"], {"filename": "a.pdf"},
+                                 np.eye(3, dtype=np.float32), [1, 1, 1])
+    await store._write_prepared(Connection(), [prepared])
+    # The caller's transaction may still roll back
+    assert len(store._fallback_index) == 0
+
+    store.prepared_stored([prepared])
+    assert len(store._fallback_index) == 3
+    assert store._fallback_index.search(np.array([1, 0, 0], dtype=np.float32), 1)[0][0] == 10
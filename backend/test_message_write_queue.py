@@ -0,0 +1,97 @@
+"""
+Unit tests for the write-behind message queue.
+
+Tests cover:
+  - Messages written in one batch once the batch size is reached
+  - Partial batches written after the flush interval
+  - A failing batch retried message by message (one bad row doesn't drop the rest)
+  - flush_conversation / drain write everything still queued
+"""
+
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+try:
+    from backend.message_write_queue import MessageWriteQueue
+except ImportError:
+    from message_write_queue import MessageWriteQueue
+
+
+@dataclass
+class FakeMessage:
+    conversation_id: str
+    content: str
+
+
+class RecordingWriter:
+    def __init__(self, fail_on=None, delay=0.0):
+        self.batches = []
+        self.fail_on = fail_on
+        self.delay = delay
+
+    async def __call__(self, messages):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_on and any(m.content == self.fail_on for m in messages):
+            raise RuntimeError("bad row")
+        self.batches.append([m.content for m in messages])
+
+
+@pytest.mark.asyncio
+async def test_full_batch_written_together():
+    writer = RecordingWriter()
+    queue = MessageWriteQueue(writer, max_batch_size=3, flush_interval_ms=10_000)
+
+    for i in range(3):
+        assert queue.enqueue(FakeMessage("c1", str(i)))
+    await asyncio.sleep(0.05)
+
+    assert writer.batches == [["0", "1", "2"]]
+    assert not queue.has_unwritten("c1")
+    await queue.drain()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_written_after_interval():
+    writer = RecordingWriter()
+    queue = MessageWriteQueue(writer, max_batch_size=100, flush_interval_ms=20)
+
+    queue.enqueue(FakeMessage("c1", "a"))
+    queue.enqueue(FakeMessage("c2", "b"))
+    await asyncio.sleep(0.01)
+    assert writer.batches == []
+    await asyncio.sleep(0.1)
+
+    assert writer.batches == [["a", "b"]]
+    await queue.drain()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_retried_one_by_one():
+    writer = RecordingWriter(fail_on="bad")
+    queue = MessageWriteQueue(writer, max_batch_size=3, flush_interval_ms=10_000)
+
+    for content in ("a", "bad", "c"):
+        queue.enqueue(FakeMessage("c1", content))
+    await queue.drain()
+
+    assert writer.batches == [["a"], ["c"]]
+    assert queue.stats()["failed"] == 1 and queue.stats()["written"] == 2
+
+
+@pytest.mark.asyncio
+async def test_flush_conversation_and_drain():
+    writer = RecordingWriter(delay=0.01)
+    queue = MessageWriteQueue(writer, max_batch_size=100, flush_interval_ms=10_000)
+
+    queue.enqueue(FakeMessage("c1", "a"))
+    assert queue.has_unwritten("c1")
+    await queue.flush_conversation("c1")
+    assert writer.batches == [["a"]]
+
+    queue.enqueue(FakeMessage("c1", "b"))
+    await queue.drain()
+    assert writer.batches == [["a"], ["b"]]
+    assert not queue.enqueue(FakeMessage("c1", "late"))  # closed: caller writes through
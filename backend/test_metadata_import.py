@@ -0,0 +1,103 @@
+"""
+Unit tests for the set-based metadata import engine.
+
+Tests cover:
+  - Rows staged with one COPY per batch and applied with a fixed number of statements
+  - "Not given" vs explicit NULL columns in book updates
+  - Author upserts and links staged in import order
+"""
+
+import pytest
+
+try:
+    from backend.metadata_import import AuthorLink, MetadataImportEngine, BOOK_COLUMN_TYPES
+except ImportError:
+    from metadata_import import AuthorLink, MetadataImportEngine, BOOK_COLUMN_TYPES
+
+
+class RecordingConnection:
+    """Records statements and COPYs; fetch answers come from `results` in order"""
+
+    def __init__(self, results=()):
+        self.statements = []
+        self.copies = {}
+        self.results = list(results)
+
+    async def execute(self, query, *args):
+        self.statements.append(" ".join(query.split()))
+        return "INSERT 0 3"
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies[table] = (columns, list(records))
+
+    async def fetch(self, query, *args):
+        self.statements.append(" ".join(query.split()))
+        return self.results.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_update_books_stages_given_flags():
+    conn = RecordingConnection(results=[[{'import_key': 1}, {'import_key': 2}]])
+    engine = MetadataImportEngine(conn)
+
+    updated = await engine.update_books('id', {
+        1: {'title': 'RPG IV', 'article_url': None},
+        2: {'title': None},
+        3: {'article_url': 'https://example.com/a'},
+    }, BOOK_COLUMN_TYPES, keep_nulls=True)
+
+    assert updated == {1, 2}
+    columns, records = conn.copies['import_stage_1']
+    assert columns == ['import_key', 'article_url', 'article_url__given', 'title', 'title__given']
+    assert records == [
+        (1, None, True, 'RPG IV', True),
+        (2, None, False, None, True),
+        (3, 'https://example.com/a', True, None, False),
+    ]
+    assert "CASE WHEN s.title__given THEN s.title ELSE b.title END" in conn.statements[-1]
+    assert "WHERE b.id = s.import_key" in conn.statements[-1]
+
+
+@pytest.mark.asyncio
+async def test_update_books_sparse_rows_keep_current_values():
+    conn = RecordingConnection(results=[[{'import_key': 'a.pdf'}]])
+    engine = MetadataImportEngine(conn)
+
+    await engine.update_books('filename', {'a.pdf': {'year': 2020, 'tags': None}}, BOOK_COLUMN_TYPES)
+
+    columns, records = conn.copies['import_stage_1']
+    assert records == [('a.pdf', None, False, 2020, True)]
+    assert conn.statements[0].startswith("CREATE TEMP TABLE import_stage_1 (import_key TEXT, tags TEXT[]")
+
+
+@pytest.mark.asyncio
+async def test_link_authors_statement_count_is_independent_of_rows():
+    links = [
+        AuthorLink(row_no, 100 + row_no, order, name, url)
+        for row_no in range(1, 501)
+        for order, (name, url) in enumerate([("Jane Doe", None), (f"Author {row_no % 7}", "https://example.com")])
+    ]
+    author_ids = {"Jane Doe": 1, **{f"Author {i}": 10 + i for i in range(7)}}
+    conn = RecordingConnection(results=[[{'id': i, 'name': n} for n, i in author_ids.items()]])
+    engine = MetadataImportEngine(conn)
+
+    ids, added = await engine.link_authors(links)
+
+    assert ids == author_ids
+    assert added == 3
+    # Two temp tables, one upsert, one link insert - for 1000 links
+    assert len(conn.statements) == 4
+    _, upserts = conn.copies['import_stage_1']
+    assert upserts[:2] == [(0, "Jane Doe", None), (1, "Author 1", "https://example.com")]
+    _, staged_links = conn.copies['import_stage_2']
+    assert staged_links[:2] == [(1, 0, 101, 1), (1, 1, 101, 11)]
+    assert "ON CONFLICT (book_id, author_id) DO NOTHING" in conn.statements[-1]
+
+
+@pytest.mark.asyncio
+async def test_nothing_to_apply():
+    conn = RecordingConnection()
+    engine = MetadataImportEngine(conn)
+    assert await engine.update_books('id', {}, BOOK_COLUMN_TYPES) == set()
+    assert await engine.link_authors([]) == ({}, 0)
+    assert conn.statements == []
@@ -0,0 +1,73 @@
+"""
+Unit tests for keyset pagination helpers.
+
+Tests cover:
+  - Row comparison for single-direction orders, expanded OR for mixed directions
+  - Nullable sort keys compared through the same COALESCE on both sides
+  - Cursors round-trip datetimes and are rejected under a different sort order
+  - Total modes (exact for offset pages, none for cursor pages by default)
+"""
+
+from datetime import datetime
+
+import pytest
+
+try:
+    from backend.pagination import Keyset, SortKey, resolve_total_mode, page_count
+except ImportError:
+    from pagination import Keyset, SortKey, resolve_total_mode, page_count
+
+
+NEWEST_FIRST = Keyset(
+    SortKey("created_at", "j.created_at", "timestamp", descending=True, nulls_as="'-infinity'"),
+    SortKey("id", "j.id", "integer", descending=True)
+)
+
+
+def test_single_direction_uses_row_comparison():
+    keyset = Keyset(SortKey("name", "a.name", "text"), SortKey("id", "a.id", "integer"))
+
+    condition, params = keyset.after({"name": "Smith", "id": 7}, first_param=3)
+
+    assert condition == "(a.name, a.id) > ($3::text::text, $4::text::integer)"
+    assert params == ["Smith", "7"]
+    assert keyset.order_by() == "a.name ASC, a.id ASC"
+    assert keyset.after(None, first_param=3) == ("TRUE", [])
+
+
+def test_mixed_directions_expand():
+    keyset = Keyset(SortKey("n", "n", "bigint", descending=True), SortKey("id", "id", "integer"))
+
+    condition, _ = keyset.after({"n": 3, "id": 1}, first_param=1)
+
+    assert condition == "((n < $1::text::bigint) OR (n = $1::text::bigint AND id > $2::text::integer))"
+
+
+def test_nullable_key_coalesced_on_both_sides():
+    condition, params = NEWEST_FIRST.after({"created_at": None, "id": 4}, first_param=1)
+
+    assert condition.startswith("(COALESCE(j.created_at, '-infinity'::timestamp), j.id) < (")
+    assert "COALESCE($1::text::timestamp, '-infinity'::timestamp)" in condition
+    assert params == [None, "4"]
+    assert NEWEST_FIRST.order_by() == "COALESCE(j.created_at, '-infinity'::timestamp) DESC, j.id DESC"
+
+
+def test_cursor_round_trip_and_sort_mismatch():
+    cursor = NEWEST_FIRST.cursor_for({"created_at": datetime(2026, 1, 2, 3, 4, 5), "id": 9, "title": "x"})
+
+    assert NEWEST_FIRST.decode(cursor) == {"_": "created_at-,id-", "created_at": "2026-01-02T03:04:05", "id": 9}
+    assert NEWEST_FIRST.decode(None) is None
+
+    oldest_first = Keyset(SortKey("created_at", "j.created_at", "timestamp"), SortKey("id", "j.id", "integer"))
+    with pytest.raises(ValueError):
+        oldest_first.decode(cursor)
+
+
+def test_total_modes():
+    assert resolve_total_mode(None, None) == "exact"
+    assert resolve_total_mode(None, "abc") == "none"
+    assert resolve_total_mode("estimate", "abc") == "estimate"
+    with pytest.raises(ValueError):
+        resolve_total_mode("approximate", None)
+    assert page_count(None, 20) is None
+    assert page_count(41, 20) == 3
@@ -0,0 +1,92 @@
+"""
+Tests for the page-parallel PDF extraction pipeline.
+
+Tests cover:
+  - Per-page extraction returns text, images and code blocks with 1-based pages
+  - Sharded/process-pool extraction produces exactly the serial output
+  - Images repeated across pages (same xref) are kept once
+  - OCR is skipped for tiny and near-uniform images
+"""
+
+import io
+
+import fitz  # PyMuPDF
+import numpy as np
+import pytest
+from PIL import Image
+
+try:
+    from backend.pdf_page_extractor import _worth_ocr, extract_page_range
+    from backend.pdf_processor_full import PDFProcessorFull
+except ImportError:
+    from pdf_page_extractor import _worth_ocr, extract_page_range
+    from pdf_processor_full import PDFProcessorFull
+
+
+@pytest.fixture(scope="module")
+def book_pdf(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("pdf") / "book.pdf")
+    logo = io.BytesIO()
+    Image.new("RGB", (60, 40), (200, 30, 30)).save(logo, "PNG")
+    doc = fitz.open()
+    # insert_image with the same xref: one embedded image shown on every page
+    logo_xref = 0
+    for page_num in range(6):
+        page = doc.new_page()
+        text = f"Chapter {page_num}\n" + "RPG programming on IBM i with embedded SQL. " * 20 + "\n"
+        text += "dcl-s customerName char(50) inz('unknown customer');\n"
+        page.insert_text((50, 60), text, fontsize=7)
+        logo_xref = page.insert_image(fitz.Rect(50, 400, 110, 440), stream=logo.getvalue(), xref=logo_xref)
+        figure = io.BytesIO()
+        Image.new("RGB", (120 + page_num, 90), (page_num * 40, 90, 200)).save(figure, "PNG")
+        page.insert_image(fitz.Rect(150, 400, 270, 490), stream=figure.getvalue())
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_extract_page_range(book_pdf):
+    pages = extract_page_range(book_pdf, 2, 4, "book.pdf")
+
+    assert [page["page"] for page in pages] == [3, 4]
+    assert "Chapter 2" in pages[0]["text"]
+    # The shared logo is returned once per range, on its first page
+    assert [(img["page"], img["width"], img["height"]) for img in pages[0]["images"]] == [(3, 60, 40), (3, 122, 90)]
+    assert [(img["page"], img["width"]) for img in pages[1]["images"]] == [(4, 123)]
+    assert pages[0]["code_blocks"][0]["language"] == "rpg-free"
+    assert pages[0]["code_blocks"][0]["page"] == 3
+
+
+def test_parallel_matches_serial(book_pdf):
+    processor = PDFProcessorFull()
+    processor.pages_per_shard = 2
+    processor.parallel_min_pages = 1
+    try:
+        serial = processor._process_pdf_sync(book_pdf, page_workers=1)
+        processor.page_workers = 2
+        parallel = processor._process_pdf_sync(book_pdf, page_workers=2)
+    finally:
+        processor.shutdown()
+
+    assert serial["total_pages"] == 6
+    assert serial["chunks"]
+    # 6 distinct figures + the logo once, across shards
+    assert len(serial["images"]) == 7
+    assert [img["page"] for img in serial["images"]] == [1, 1, 2, 3, 4, 5, 6]
+    for key in ("chunks", "text", "images", "code_blocks"):
+        assert parallel[key] == serial[key]
+
+
+def test_ocr_thresholds():
+    rng = np.random.default_rng(0)
+
+    def binary_noise(width, height):
+        samples = (rng.integers(0, 2, width * height, dtype=np.uint8) * 255).tobytes()
+        return fitz.Pixmap(fitz.csGRAY, width, height, samples, False)
+
+    blank = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 100), False)
+    blank.set_rect(blank.irect, (255, 255, 255))
+
+    assert not _worth_ocr(blank)  # uniform fill
+    assert _worth_ocr(binary_noise(200, 100))
+    assert not _worth_ocr(binary_noise(40, 40))  # too small
@@ -0,0 +1,123 @@
+"""
+Unit tests for the schema capability cache.
+
+Tests cover:
+  - Table/column/extension lookups from a catalog snapshot
+  - Stale snapshots refresh in the background instead of blocking callers
+  - Concurrent index migrations build only missing or invalid indexes
+
+A stand-in connection returns canned catalog rows, so no database is needed.
+"""
+
+import asyncio
+
+import pytest
+
+try:
+    from backend.schema_capabilities import SchemaCapabilities, apply_concurrent_indexes
+except ImportError:
+    from schema_capabilities import SchemaCapabilities, apply_concurrent_indexes
+
+
+class CatalogConnection:
+    def __init__(self, columns, extensions):
+        self.columns = columns
+        self.extensions = extensions
+        self.queries = 0
+
+    async def fetch(self, query, *args):
+        self.queries += 1
+        if "pg_extension" in query:
+            return [{"extname": name} for name in self.extensions]
+        return [
+            {"table_name": table, "column_name": column}
+            for table, columns in self.columns.items()
+            for column in columns
+        ]
+
+
+@pytest.mark.asyncio
+async def test_lookups_from_snapshot():
+    conn = CatalogConnection(
+        {
+            "books": ["id", "filename", "publication_year", "rpg_era"],
+            "authors": ["id", "name"],
+            "document_authors": ["book_id", "author_id", "author_order"],
+        },
+        ["plpgsql", "vector"],
+    )
+    schema = SchemaCapabilities()
+    await schema.refresh(conn)
+
+    assert conn.queries == 2
+    assert schema.has_table("books") and not schema.has_table("metadata_history")
+    assert schema.has_columns("document_authors", "book_id", "author_order")
+    assert not schema.has_columns("books", "total_pages")
+    assert schema.has_temporal_columns
+    assert schema.has_multi_author
+    assert schema.has_pgvector
+
+
+@pytest.mark.asyncio
+async def test_pre_migration_database():
+    schema = SchemaCapabilities()
+    await schema.refresh(CatalogConnection({"books": ["id", "filename"]}, ["plpgsql"]))
+
+    assert not schema.has_temporal_columns
+    assert not schema.has_multi_author
+    assert not schema.has_pgvector
+    assert schema.columns_of("books") & {"rpg_era"} == set()
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_refreshes_in_background():
+    schema = SchemaCapabilities(ttl=0.01)
+    await schema.refresh(CatalogConnection({"books": ["id"]}, []))
+    await asyncio.sleep(0.02)
+
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_refresh(conn=None):
+        started.set()
+        await release.wait()
+        await SchemaCapabilities._load(schema, CatalogConnection({"books": ["id", "rpg_era"]}, []))
+
+    schema.refresh = slow_refresh
+
+    await schema.ensure_fresh()  # returns immediately with the old snapshot
+    assert not schema.has_columns("books", "rpg_era")
+
+    await started.wait()
+    release.set()
+    await schema._refresh_task
+    assert schema.has_columns("books", "rpg_era")
+
+
+class IndexConnection:
+    """Knows which indexes exist and are valid; records the statements it runs"""
+
+    def __init__(self, valid):
+        self.valid = valid
+        self.statements = []
+
+    async def fetchval(self, query, name):
+        return self.valid.get(name, False)
+
+    async def execute(self, query, *args, timeout=None):
+        if "advisory" not in query:
+            self.statements.append(" ".join(query.split())[:60])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_indexes_built_only_when_missing_or_invalid():
+    # idx_books_title_id is left INVALID by an interrupted build; the others are fine or missing
+    conn = IndexConnection({"idx_conversations_user_last_message": True, "idx_books_processed_at_id": True,
+                            "idx_books_title_id": False})
+
+    built = await apply_concurrent_indexes(conn, "009_keyset_pagination_indexes.sql")
+
+    assert built == ["idx_books_title_id", "idx_processing_jobs_created_job"]
+    assert conn.statements[0] == "DROP INDEX CONCURRENTLY IF EXISTS idx_books_title_id"
+    assert conn.statements[1].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_books_title_id")
+    assert all("CONCURRENTLY" in statement for statement in conn.statements)
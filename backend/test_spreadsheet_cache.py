@@ -0,0 +1,138 @@
+"""
+Unit tests for compiled spreadsheet sidecars and the ExcelLookupService using them.
+
+Tests cover:
+  - Round trip of string / NULL / non-ASCII cells through the binary layout
+  - Sidecar reused while the spreadsheet is unchanged (also across processes' loads)
+  - Touched-but-identical spreadsheets reuse the sidecar; edited ones are recompiled
+  - ExcelLookupService lookups served from the sidecar without parsing the xlsx
+"""
+
+import os
+
+import openpyxl
+import pytest
+
+try:
+    from backend import spreadsheet_cache
+    from backend.spreadsheet_cache import CompiledRows, SourceStamp, load_compiled, sidecar_path
+    from backend.excel_lookup_service import ExcelLookupService
+except ImportError:
+    import spreadsheet_cache
+    from spreadsheet_cache import CompiledRows, SourceStamp, load_compiled, sidecar_path
+    from excel_lookup_service import ExcelLookupService
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_cache(monkeypatch):
+    monkeypatch.setattr(spreadsheet_cache, "_loaded", {})
+    monkeypatch.delenv("EXCEL_LOOKUP_CACHE_DIR", raising=False)
+
+
+def _counting_reader(rows):
+    calls = []
+
+    def read(path):
+        calls.append(path)
+        return rows
+
+    return read, calls
+
+
+def test_round_trip():
+    stamp = SourceStamp(10, 20, "abc")
+    rows = CompiledRows.from_rows(("id", "title", "url"), [
+        ("1", "Subfiles in Free-Form RPG", None),
+        ("2", "", "https://www.mcpressonline.com/x/2-slug"),
+        ("3", "Ünïcode – titles", "u"),
+    ], stamp)
+
+    loaded = CompiledRows.from_buffer(rows.to_bytes())
+    assert loaded.columns == ("id", "title", "url")
+    assert len(loaded) == 3
+    assert loaded.row(0) == ("1", "Subfiles in Free-Form RPG", None)
+    assert loaded.row(1) == ("2", "", "https://www.mcpressonline.com/x/2-slug")
+    assert loaded.cell(2, 1) == "Ünïcode – titles"
+    assert loaded.column("id") == ["1", "2", "3"]
+    assert loaded.source == stamp
+
+
+def test_sidecar_reused_until_the_file_changes(tmp_path, monkeypatch):
+    source = tmp_path / "sheet.xlsx"
+    source.write_bytes(b"version 1")
+    read, calls = _counting_reader([("1", "a")])
+
+    assert load_compiled(str(source), ("id", "title"), read).row(0) == ("1", "a")
+    assert os.path.isfile(sidecar_path(str(source)))
+
+    # A new process: nothing in memory, the sidecar is mapped instead of parsing
+    monkeypatch.setattr(spreadsheet_cache, "_loaded", {})
+    assert load_compiled(str(source), ("id", "title"), read).row(0) == ("1", "a")
+    assert len(calls) == 1
+
+    # Same content, new mtime: verified by hash, not recompiled
+    monkeypatch.setattr(spreadsheet_cache, "_loaded", {})
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    load_compiled(str(source), ("id", "title"), read)
+    assert len(calls) == 1
+
+    # Edited: recompiled
+    source.write_bytes(b"version 2")
+    read2, calls2 = _counting_reader([("1", "b")])
+    assert load_compiled(str(source), ("id", "title"), read2).row(0) == ("1", "b")
+    assert len(calls2) == 1
+
+
+def test_cache_dir(tmp_path):
+    source = tmp_path / "sheet.xlsx"
+    source.write_bytes(b"x")
+    cache_dir = tmp_path / "cache"
+    read, _ = _counting_reader([("1",)])
+
+    load_compiled(str(source), ("id",), read, cache_dir=str(cache_dir))
+    assert [p.name for p in cache_dir.iterdir()] == [os.path.basename(sidecar_path(str(source), str(cache_dir)))]
+    assert not os.path.exists(str(source) + spreadsheet_cache.SIDECAR_SUFFIX)
+
+
+def _write_workbook(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def test_lookup_service_uses_compiled_sidecars(tmp_path, monkeypatch):
+    articles = tmp_path / "articles.xlsx"
+    books = tmp_path / "books.xlsx"
+    header = ["id", "title"] + [None] * 7 + ["author", "url"]
+    _write_workbook(articles, [
+        header,
+        [27814, "Subfiles Revisited"] + [None] * 7 + ["Jane Doe and John Roe", "https://ww.mcpressonline.com/rpg/27814-subfiles"],
+        [27815, "nan"] + [None] * 7 + ["nan", None],
+    ])
+    _write_workbook(books, [
+        ["URL", "Title", "Author"],
+        ["https://www.mcpressonline.com/books/50001-mastering", "Mastering IBM i", "Jim Buck"],
+        ["https://www.mcpressonline.com/books/27814-dup", "Duplicate", "Nobody"],
+    ])
+
+    first = ExcelLookupService(str(articles), str(books))
+    assert first.article_count == 3
+    assert first.book_count == 2
+
+    # Later constructions (here: a fresh process) never open the workbooks
+    monkeypatch.setattr(spreadsheet_cache, "_loaded", {})
+    monkeypatch.setattr(openpyxl, "load_workbook", lambda *a, **k: pytest.fail("xlsx parsed again"))
+    service = ExcelLookupService(str(articles), str(books))
+
+    entry = service.lookup_by_filename("27814.pdf")
+    assert entry.title == "Subfiles Revisited"
+    assert entry.author == "Jane Doe and John Roe"
+    assert entry.url == "https://www.mcpressonline.com/rpg/27814-subfiles"
+    assert service.lookup_by_id("27815").title == ""
+    assert service.lookup_by_id("50001").title == "Mastering IBM i"
+    assert service.lookup_by_id("99999") is None
+    assert service.article_count == 3
+    assert [e.title for e in service.book_entries] == ["Mastering IBM i", "Duplicate"]
@@ -0,0 +1,59 @@
+"""
+Unit tests for per-stage request timings.
+
+Tests cover:
+  - Concurrent stages each record their own duration
+  - A stage that raises is still recorded
+  - mark() measures from the start of the request
+"""
+
+import asyncio
+
+import pytest
+
+try:
+    from backend.stage_timings import StageTimings
+except ImportError:
+    from stage_timings import StageTimings
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stages_recorded_separately():
+    timings = StageTimings()
+
+    async def stage(delay, value):
+        await asyncio.sleep(delay)
+        return value
+
+    slow = asyncio.create_task(timings.run("slow", stage(0.05, "a")))
+    fast = await timings.run("fast", stage(0.01, "b"))
+    assert fast == "b"
+    assert await slow == "a"
+
+    stages = timings.as_dict()
+    assert set(stages) == {"slow", "fast"}
+    assert stages["fast"] < stages["slow"]
+
+
+@pytest.mark.asyncio
+async def test_failing_stage_is_recorded():
+    timings = StageTimings()
+
+    async def boom():
+        raise RuntimeError("no")
+
+    with pytest.raises(RuntimeError):
+        await timings.run("boom", boom())
+    assert "boom" in timings.as_dict()
+
+
+def test_mark_and_summary():
+    timings = StageTimings()
+    with timings.measure("context"):
+        pass
+    timings.mark("first_token")
+
+    stages = timings.as_dict()
+    assert stages["first_token"] >= stages["context"]
+    assert timings.summary().startswith("context=")
+    assert "first_token=" in timings.summary()
@@ -0,0 +1,57 @@
+"""
+Unit tests for pgvector index parameter derivation and query-time settings.
+
+Tests cover:
+  - lists / m / ef_construction derived from the row count
+  - Parsing index type and options from pg_indexes.indexdef
+  - ef_search never below k, probes defaulting to sqrt(lists)
+"""
+
+import pytest
+
+try:
+    from backend.vector_index_manager import VectorIndexManager, parse_index_definition, plan_index
+except ImportError:
+    from vector_index_manager import VectorIndexManager, parse_index_definition, plan_index
+
+
+@pytest.mark.parametrize("rows,lists", [(0, 10), (50_000, 50), (1_000_000, 1000), (4_000_000, 2000)])
+def test_ivfflat_lists_follow_row_count(rows, lists):
+    plan = plan_index(rows, "ivfflat")
+    assert plan.lists == lists
+    assert plan.with_clause() == f"WITH (lists = {lists})"
+
+
+def test_hnsw_parameters_grow_with_corpus():
+    small, large = plan_index(10_000, "hnsw"), plan_index(5_000_000, "hnsw")
+    assert (small.m, small.ef_construction) == (16, 64)
+    assert large.m > small.m and large.ef_construction >= 2 * large.m
+
+
+def test_unknown_index_type_rejected():
+    with pytest.raises(ValueError):
+        plan_index(100, "btree")
+
+
+def test_parse_index_definition():
+    info = parse_index_definition(
+        "CREATE INDEX documents_embedding_idx ON public.documents USING hnsw "
+        "(embedding vector_cosine_ops) WITH (m='16', ef_construction='64')"
+    )
+    assert info == {"index_type": "hnsw", "m": 16, "ef_construction": 64}
+
+
+def test_search_settings(monkeypatch):
+    monkeypatch.delenv("VECTOR_HNSW_EF_SEARCH", raising=False)
+    monkeypatch.delenv("VECTOR_IVFFLAT_PROBES", raising=False)
+    manager = VectorIndexManager()
+
+    manager.current = {"index_type": "hnsw", "m": 16}
+    assert manager.search_settings(5) == {"hnsw.ef_search": 40}
+    assert manager.search_settings(100) == {"hnsw.ef_search": 100}
+
+    manager.current = {"index_type": "ivfflat", "lists": 400}
+    assert manager.search_settings(5) == {"ivfflat.probes": 20}
+
+    manager.current = {}
+    assert manager.search_settings(5) == {}
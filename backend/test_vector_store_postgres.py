@@ -0,0 +1,121 @@
+"""
+Unit and property-based tests for PostgresVectorStore helpers.
+
+Tests cover:
+  - Binary pgvector codec round trip (bulk COPY ingestion)
+  - Record building shared by the INSERT and COPY ingestion paths (incl. token count / content hash)
+
+These tests do not need a database; the store is constructed with a dummy DATABASE_URL.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+try:
+    from backend.vector_store_postgres import (
+        PostgresVectorStore,
+        DOCUMENT_COLUMNS,
+        encode_pgvector,
+        decode_pgvector,
+    )
+    from backend.context_packer import content_hash
+except ImportError:
+    from vector_store_postgres import (
+        PostgresVectorStore,
+        DOCUMENT_COLUMNS,
+        encode_pgvector,
+        decode_pgvector,
+    )
+    from context_packer import content_hash
+
+
+os.environ.setdefault("DATABASE_URL", "postgresql://unit-test/placeholder")
+
+
+def _make_store(has_pgvector: bool) -> PostgresVectorStore:
+    store = PostgresVectorStore()
+    store.has_pgvector = has_pgvector
+    return store
+
+
+# ============================================================================
+# Binary pgvector codec
+# ============================================================================
+
+_floats = st.floats(min_value=-1e6, max_value=1e6, allow_nan=False, allow_infinity=False, width=32)
+
+
+@settings(max_examples=100)
+@given(values=st.lists(_floats, min_size=0, max_size=64))
+def test_codec_round_trip(values):
+    """decode(encode(v)) returns the same float32 values for lists and arrays."""
+    assert decode_pgvector(encode_pgvector(values)) == values
+    assert decode_pgvector(encode_pgvector(np.array(values, dtype=np.float32))) == values
+
+
+def test_codec_header_layout():
+    """Header is uint16 dim + uint16 unused, followed by big-endian float32 values."""
+    data = encode_pgvector([1.0, -2.0, 0.5])
+    assert struct.unpack_from(">HH", data) == (3, 0)
+    assert len(data) == 4 + 3 * 4
+    assert struct.unpack_from(">3f", data, 4) == (1.0, -2.0, 0.5)
+
+
+def test_codec_accepts_text_literal():
+    """Text literals used with $1::vector still encode once the codec is registered."""
+    assert decode_pgvector(encode_pgvector("[0.25, 1, -3]")) == [0.25, 1.0, -3.0]
+    assert decode_pgvector(encode_pgvector("[]")) == []
+
+
+# ============================================================================
+# Record building
+# ============================================================================
+
+def _sample_chunks():
+    documents = [
+        {"content": "first", "page_number": 1, "chunk_index": 0, "metadata": {"type": "text"}},
+        {"content": "second", "chunk_index": 1},
+    ]
+    embeddings = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float32)
+    return documents, embeddings
+
+
+def test_build_records_binary_keeps_arrays():
+    store = _make_store(has_pgvector=True)
+    documents, embeddings = _sample_chunks()
+
+    records = store._build_records(documents, embeddings, "book.pdf", {"filename": "book.pdf"}, binary_vectors=True)
+
+    assert len(records) == 2
+    assert all(len(r) == len(DOCUMENT_COLUMNS) for r in records)
+    assert records[0][:4] == ("book.pdf", "first", 1, 0)
+    assert records[1][2] == 0  # missing page_number defaults to 0
+    assert isinstance(records[0][4], np.ndarray)
+    assert json.loads(records[0][5]) == {"type": "text", "filename": "book.pdf"}
+    assert records[0][6] is None  # token count not supplied
+    assert records[0][7] == content_hash("first")
+
+
+def test_build_records_text_literal_for_insert_path():
+    store = _make_store(has_pgvector=True)
+    documents, embeddings = _sample_chunks()
+
+    records = store._build_records(documents, embeddings, "book.pdf", binary_vectors=False, token_counts=[12, None])
+
+    assert (records[0][6], records[1][6]) == (12, None)
+    assert records[0][4].startswith("[") and records[0][4].endswith("]")
+    assert decode_pgvector(encode_pgvector(records[0][4])) == embeddings[0].tolist()
+
+
+def test_build_records_jsonb_without_pgvector():
+    store = _make_store(has_pgvector=False)
+    documents, embeddings = _sample_chunks()
+
+    for binary in (True, False):
+        records = store._build_records(documents, embeddings, "book.pdf", binary_vectors=binary)
+        assert json.loads(records[1][4]) == embeddings[1].tolist()
@@ -0,0 +1,118 @@
+"""
+In-memory title index for fuzzy book-title matching.
+
+Built once from the books catalog (e.g. once per spreadsheet import) instead of
+fetching every title and scanning all of them for each row:
+
+    index = TitleIndex(await conn.fetch("SELECT id, title FROM books"), score_cutoff=80)
+    book_id = index.match("Mastering IBM i")
+
+Scores are fuzz.ratio (0-100, rounded) on titles normalized the way fuzzywuzzy's
+default processor does (lowercased, non-word characters -> spaces, stripped), so
+matches are the ones process.extractOne(title, titles, scorer=fuzz.ratio) found.
+
+Candidates are blocked with a bigram inverted index and a q-gram count filter
+that is lossless for the cutoff: turning one string into another with d
+insertions/deletions destroys at most q of its (padded) q-grams, so a title can
+only reach the cutoff if it shares at least max(len) + q - 1 - q * d_max bigrams
+with the query, where d_max is the largest indel distance the cutoff allows.
+Only the survivors are scored - with rapidfuzz's vectorized cdist when it is
+installed, fuzzywuzzy otherwise.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+except ImportError:
+    rf_fuzz = rf_process = None
+    from fuzzywuzzy import fuzz
+
+Q = 2  # bigrams: q=3 filters nothing for typical title lengths at an 80 cutoff
+_PAD = "\x00"
+_NON_WORD = re.compile(r"(?ui)\W")
+
+
+def normalize_title(title: str) -> str:
+    """fuzzywuzzy's full_process: non-word characters to spaces, lowercase, strip"""
+    return _NON_WORD.sub(" ", title).lower().strip()
+
+
+def _grams(text: str) -> Counter:
+    padded = _PAD * (Q - 1) + text + _PAD * (Q - 1)
+    return Counter(padded[i:i + Q] for i in range(len(padded) - Q + 1))
+
+
+class TitleIndex:
+    def __init__(self, rows: Iterable[Tuple[int, str]], score_cutoff: int = 80):
+        """rows: (book_id, title) pairs in catalog order (ties go to the earliest)"""
+        self.score_cutoff = score_cutoff
+        # Lowest unrounded ratio that still rounds up to the cutoff
+        self._min_ratio = (score_cutoff - 0.5) / 100
+
+        self.ids: List[int] = []
+        self.titles: List[str] = []
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for book_id, title in rows:
+            normalized = normalize_title(title) if title else ""
+            if not normalized:
+                continue  # scores 0 against anything
+            position = len(self.ids)
+            self.ids.append(book_id)
+            self.titles.append(normalized)
+            for gram, count in _grams(normalized).items():
+                positions, counts = postings.setdefault(gram, ([], []))
+                positions.append(position)
+                counts.append(count)
+
+        self.lengths = np.array([len(t) for t in self.titles], dtype=np.int32)
+        self._postings = {
+            gram: (np.array(positions, dtype=np.int32), np.array(counts, dtype=np.int32))
+            for gram, (positions, counts) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def candidates(self, normalized: str) -> np.ndarray:
+        """Positions (ascending) of titles that can reach the cutoff against `normalized`"""
+        length = len(normalized)
+        shared = np.zeros(len(self.ids), dtype=np.int32)
+        for gram, query_count in _grams(normalized).items():
+            posting = self._postings.get(gram)
+            if posting is not None:
+                positions, counts = posting
+                shared[positions] += np.minimum(counts, query_count)
+
+        # ratio = (la + lb - d) / (la + lb) >= min_ratio  =>  d <= d_max
+        d_max = np.floor((1 - self._min_ratio) * (length + self.lengths) + 1e-9)
+        required = np.maximum(self.lengths, length) + Q - 1 - Q * d_max
+        keep = (np.abs(self.lengths - length) <= d_max) & (shared >= required)
+        return np.flatnonzero(keep)
+
+    def match(self, title: str) -> Optional[int]:
+        """Book id of the best-scoring title at or above the cutoff, or None"""
+        if not title or not self.ids:
+            return None
+        normalized = normalize_title(title)
+        if not normalized:
+            return None
+
+        positions = self.candidates(normalized)
+        if len(positions) == 0:
+            return None
+        choices = [self.titles[p] for p in positions]
+
+        if rf_process is not None:
+            scores = np.rint(rf_process.cdist([normalized], choices, scorer=rf_fuzz.ratio)[0])
+        else:
+            scores = np.array([fuzz.ratio(normalized, choice) for choice in choices])
+        best = int(np.argmax(scores))  # first maximum, as extractOne
+        if scores[best] < self.score_cutoff:
+            return None
+        return self.ids[positions[best]]
+
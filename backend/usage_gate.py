@@ -11,6 +11,12 @@ from typing import Optional
 
 import asyncpg
 from pydantic import BaseModel
+try:
+    from db_pool import get_pool
+    from schema_capabilities import get_schema_capabilities
+except ImportError:
+    from backend.db_pool import get_pool
+    from backend.schema_capabilities import get_schema_capabilities
 
 logger = logging.getLogger(__name__)
 
@@ -58,16 +64,11 @@ class UsageGate:
 
     async def init(self):
         """Create connection pool and ensure free_usage_tracking table exists with user_email column."""
-        self.pool = await asyncpg.create_pool(dsn=self.database_url)
+        self.pool = await get_pool('usage_gate', self.database_url)
+        schema = await get_schema_capabilities()
         async with self.pool.acquire() as conn:
             # Check if old fingerprint-based table exists and drop it
-            has_fingerprint = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT 1 FROM information_schema.columns
-                    WHERE table_name = 'free_usage_tracking'
-                    AND column_name = 'fingerprint'
-                )
-            """)
+            has_fingerprint = schema.has_columns('free_usage_tracking', 'fingerprint')
             if has_fingerprint:
                 logger.info("UsageGate: dropping old fingerprint-based free_usage_tracking table")
                 await conn.execute("DROP TABLE free_usage_tracking")
@@ -0,0 +1,259 @@
+"""
+pgvector index management for the documents embedding column.
+
+The store used to create one ivfflat index with fixed parameters (lists=100) and
+never set probes at query time, so recall and latency drifted as the corpus grew.
+This module:
+
+  - derives index parameters from the current row count
+    (HNSW: m / ef_construction, IVFFlat: lists, following pgvector's guidance)
+  - builds HNSW or IVFFlat indexes, and rebuilds them CONCURRENTLY under a
+    temporary name before swapping, so search keeps working during a rebuild
+  - applies per-query search settings (hnsw.ef_search / ivfflat.probes) with
+    SET LOCAL inside the search transaction, which is safe behind pgbouncer
+
+Configuration (environment):
+    VECTOR_INDEX_TYPE           index type for new builds/rebuilds: hnsw (default) or ivfflat
+    VECTOR_HNSW_M               override derived m
+    VECTOR_HNSW_EF_CONSTRUCTION override derived ef_construction
+    VECTOR_HNSW_EF_SEARCH       query-time candidate list size (default 40, never below k)
+    VECTOR_IVFFLAT_LISTS        override derived lists
+    VECTOR_IVFFLAT_PROBES       query-time lists to scan (default sqrt(lists))
+    VECTOR_INDEX_BUILD_TIMEOUT  seconds allowed for one index build (default 3600; the pool's
+                                command timeout is far too short for HNSW on a large corpus)
+"""
+
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ('hnsw', 'ivfflat')
+DEFAULT_INDEX_NAME = 'documents_embedding_idx'
+
+# HNSW arrived in pgvector 0.5.0
+HNSW_MIN_VERSION = (0, 5, 0)
+
+
+def _env_int(name: str) -> Optional[int]:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == '':
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning(f"{name} has non-integer value '{raw}', ignoring")
+        return None
+
+
+@dataclass
+class IndexPlan:
+    """Parameters for one index build"""
+    index_type: str
+    row_count: int
+    m: Optional[int] = None
+    ef_construction: Optional[int] = None
+    lists: Optional[int] = None
+
+    def with_clause(self) -> str:
+        if self.index_type == 'hnsw':
+            return f"WITH (m = {self.m}, ef_construction = {self.ef_construction})"
+        return f"WITH (lists = {self.lists})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+def plan_index(row_count: int, index_type: str = 'hnsw') -> IndexPlan:
+    """
+    Derive build parameters from the number of rows.
+
+    IVFFlat: lists = rows / 1000 up to 1M rows, sqrt(rows) beyond (pgvector guidance).
+    HNSW: pgvector's defaults (m=16, ef_construction=64) for small corpora, growing the
+    graph degree and build candidate list for larger ones to hold recall.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unsupported index type '{index_type}' (expected one of {INDEX_TYPES})")
+    row_count = max(0, int(row_count))
+
+    if index_type == 'ivfflat':
+        if row_count <= 1_000_000:
+            lists = row_count // 1000
+        else:
+            lists = int(math.sqrt(row_count))
+        lists = _env_int('VECTOR_IVFFLAT_LISTS') or max(10, lists)
+        return IndexPlan('ivfflat', row_count, lists=lists)
+
+    if row_count < 100_000:
+        m, ef_construction = 16, 64
+    elif row_count < 1_000_000:
+        m, ef_construction = 16, 128
+    else:
+        m, ef_construction = 24, 200
+    m = _env_int('VECTOR_HNSW_M') or m
+    ef_construction = _env_int('VECTOR_HNSW_EF_CONSTRUCTION') or ef_construction
+    # pgvector requires ef_construction >= 2 * m
+    ef_construction = max(ef_construction, 2 * m)
+    return IndexPlan('hnsw', row_count, m=m, ef_construction=ef_construction)
+
+
+def parse_index_definition(indexdef: str) -> Dict[str, Any]:
+    """Pull the access method and WITH options out of a pg_indexes.indexdef string"""
+    info: Dict[str, Any] = {}
+    method = re.search(r'USING (\w+)', indexdef)
+    if method:
+        info['index_type'] = method.group(1).lower()
+    options = re.search(r'WITH \((.*?)\)', indexdef)
+    if options:
+        for part in options.group(1).split(','):
+            if '=' in part:
+                key, value = (p.strip().strip("'") for p in part.split('=', 1))
+                info[key] = int(value) if value.isdigit() else value
+    return info
+
+
+class VectorIndexManager:
+    """Builds, inspects and tunes the pgvector index on one table column"""
+
+    def __init__(self, table: str = 'documents', column: str = 'embedding',
+                 index_name: str = DEFAULT_INDEX_NAME):
+        self.table = table
+        self.column = column
+        self.index_name = index_name
+        configured = os.getenv('VECTOR_INDEX_TYPE', 'hnsw').lower()
+        if configured not in INDEX_TYPES:
+            logger.warning(f"VECTOR_INDEX_TYPE '{configured}' not supported, using hnsw")
+            configured = 'hnsw'
+        self.preferred_type = configured
+        self.build_timeout = float(os.getenv('VECTOR_INDEX_BUILD_TIMEOUT', '3600'))
+        # What is actually in the database (refreshed by inspect())
+        self.current: Dict[str, Any] = {}
+        self.pgvector_version: Optional[tuple] = None
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+
+    async def inspect(self, conn) -> Dict[str, Any]:
+        """Record the installed pgvector version and the current index definition"""
+        version = await conn.fetchval("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        if version:
+            self.pgvector_version = tuple(int(p) for p in re.findall(r'\d+', version)[:3])
+
+        indexdef = await conn.fetchval("""
+            SELECT indexdef FROM pg_indexes
+            WHERE tablename = $1 AND indexname = $2
+        """, self.table, self.index_name)
+        self.current = parse_index_definition(indexdef) if indexdef else {}
+        return self.current
+
+    def supports_hnsw(self) -> bool:
+        return self.pgvector_version is None or self.pgvector_version >= HNSW_MIN_VERSION
+
+    def resolve_type(self, index_type: Optional[str] = None) -> str:
+        index_type = (index_type or self.preferred_type).lower()
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type '{index_type}' (expected one of {INDEX_TYPES})")
+        if index_type == 'hnsw' and not self.supports_hnsw():
+            logger.warning(f"⚠️ pgvector {self.pgvector_version} has no HNSW support - using ivfflat")
+            return 'ivfflat'
+        return index_type
+
+    async def estimate_rows(self, conn) -> int:
+        """Planner row estimate (no table scan); falls back to COUNT(*) for never-analyzed tables"""
+        estimate = await conn.fetchval(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass($1)", self.table
+        )
+        if estimate is None or estimate < 0:
+            estimate = await conn.fetchval(
+                f"SELECT COUNT(*) FROM {self.table} WHERE {self.column} IS NOT NULL"
+            )
+        return int(estimate or 0)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _create_sql(self, name: str, plan: IndexPlan, concurrently: bool) -> str:
+        return f"""
+            CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name}
+            ON {self.table} USING {plan.index_type} ({self.column} vector_cosine_ops)
+            {plan.with_clause()}
+        """
+
+    async def ensure_index(self, conn) -> Dict[str, Any]:
+        """Create the index if it is missing (startup); an existing index is left as is"""
+        await self.inspect(conn)
+        if self.current:
+            logger.info(f"📋 Vector index {self.index_name}: {self.current}")
+            return self.current
+
+        plan = plan_index(await self.estimate_rows(conn), self.resolve_type())
+        logger.info(f"🔨 Creating vector index {self.index_name}: {plan.to_dict()}")
+        await conn.execute(self._create_sql(self.index_name, plan, concurrently=False), timeout=self.build_timeout)
+        return await self.inspect(conn)
+
+    async def rebuild(self, conn, index_type: Optional[str] = None, concurrently: bool = True) -> IndexPlan:
+        """
+        Build a fresh index with parameters derived from the current row count, then swap
+        it in. With concurrently=True the build doesn't block writes and searches keep
+        using the old index until the swap (the connection must not be inside a transaction).
+        """
+        await self.inspect(conn)
+        plan = plan_index(await self.estimate_rows(conn), self.resolve_type(index_type))
+        new_name = f"{self.index_name}_new"
+        logger.info(f"🔨 Rebuilding vector index {self.index_name}: {plan.to_dict()} (concurrently={concurrently})")
+
+        # Left over from an interrupted rebuild (possibly INVALID)
+        await conn.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {new_name}")
+        try:
+            await conn.execute(self._create_sql(new_name, plan, concurrently), timeout=self.build_timeout)
+        except Exception:
+            await conn.execute(f"DROP INDEX IF EXISTS {new_name}")
+            raise
+
+        async with conn.transaction():
+            await conn.execute(f"DROP INDEX IF EXISTS {self.index_name}")
+            await conn.execute(f"ALTER INDEX {new_name} RENAME TO {self.index_name}")
+
+        await self.inspect(conn)
+        return plan
+
+    # ------------------------------------------------------------------
+    # Query-time tuning
+    # ------------------------------------------------------------------
+
+    def search_settings(self, k: int) -> Dict[str, int]:
+        """GUCs to apply for a top-k query against the current index"""
+        index_type = self.current.get('index_type')
+        if index_type == 'hnsw':
+            ef_search = _env_int('VECTOR_HNSW_EF_SEARCH') or 40
+            # HNSW can't return more than ef_search rows
+            return {'hnsw.ef_search': max(ef_search, k)}
+        if index_type == 'ivfflat':
+            probes = _env_int('VECTOR_IVFFLAT_PROBES')
+            if probes is None:
+                lists = int(self.current.get('lists', 100))
+                probes = max(1, round(math.sqrt(lists)))
+            return {'ivfflat.probes': probes}
+        return {}
+
+    async def apply_search_settings(self, conn, k: int) -> Dict[str, int]:
+        """SET LOCAL the search GUCs - call inside the search transaction"""
+        settings = self.search_settings(k)
+        for name, value in settings.items():
+            await conn.execute(f"SET LOCAL {name} = {int(value)}")
+        return settings
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index_name": self.index_name,
+            "current": self.current,
+            "preferred_type": self.preferred_type,
+            "pgvector_version": '.'.join(map(str, self.pgvector_version)) if self.pgvector_version else None,
+            "search_settings": self.search_settings(k=5),
+        }
@@ -5,17 +5,102 @@ Provides semantic similarity search equivalent to ChromaDB
 
 import os
 import asyncio
+import threading
+import time
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 import asyncpg
 import json
 import logging
 
+try:
+    from embedding_index import InMemoryEmbeddingIndex
+except ImportError:
+    from backend.embedding_index import InMemoryEmbeddingIndex
+
+try:
+    from embedding_service import EmbeddingService
+except ImportError:
+    from backend.embedding_service import EmbeddingService
+
+try:
+    from db_pool import get_pool, registry as db_pool_registry
+except ImportError:
+    from backend.db_pool import get_pool, registry as db_pool_registry
+
+try:
+    from pgvector_codec import decode_pgvector, encode_pgvector
+except ImportError:
+    from backend.pgvector_codec import decode_pgvector, encode_pgvector
+
+try:
+    from book_metadata_cache import invalidate_book_metadata
+except ImportError:
+    from backend.book_metadata_cache import invalidate_book_metadata
+
+try:
+    from documents_catalog import invalidate_documents_catalog
+except ImportError:
+    from backend.documents_catalog import invalidate_documents_catalog
+
+try:
+    from stage_timings import StageTimings
+except ImportError:
+    from backend.stage_timings import StageTimings
+
+try:
+    from schema_capabilities import get_schema_capabilities
+except ImportError:
+    from backend.schema_capabilities import get_schema_capabilities
+
+try:
+    from vector_index_manager import VectorIndexManager
+except ImportError:
+    from backend.vector_index_manager import VectorIndexManager
+
+try:
+    from corpus_stats import corpus_stats, get_corpus_stats
+except ImportError:
+    from backend.corpus_stats import corpus_stats, get_corpus_stats
+
+try:
+    from chunk_tokens import chunk_token_counter, content_hash
+except ImportError:
+    from backend.chunk_tokens import chunk_token_counter, content_hash
+
 logger = logging.getLogger(__name__)
 
 # Lazy imports for embeddings
 sentence_transformers = None
 numpy = None
 
+# Lookups of stored embeddings by chunk content_hash need this index (migration 011,
+# built CONCURRENTLY by run_migration_011 - never at startup, documents is the largest table)
+CONTENT_HASH_INDEX = 'documents_content_hash_idx'
+CONTENT_HASH_INDEX_READY_SQL = f"""
+    SELECT COALESCE(
+        (SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass('{CONTENT_HASH_INDEX}')),
+        false
+    )
+"""
+
+# Column order used by both ingestion paths (per-row INSERT and bulk COPY)
+DOCUMENT_COLUMNS = ['filename', 'content', 'page_number', 'chunk_index', 'embedding', 'metadata',
+                    'token_count', 'content_hash']
+
+
+@dataclass
+class PreparedDocuments:
+    """One file's chunks with their embeddings and token counts, ready to write"""
+    filename: str
+    documents: List[Dict[str, Any]]
+    metadata: Optional[Dict[str, Any]]
+    embeddings: Any
+    token_counts: List[Optional[int]]
+    reused_embeddings: int = 0  # chunks whose embedding was copied from identical stored content
+    stored_ids: Optional[List[int]] = None  # ids of the written chunks, for the resident fallback index
+
+
 def ensure_embedding_dependencies():
     """Import embedding dependencies on demand"""
     global sentence_transformers, numpy
@@ -31,6 +116,42 @@ def ensure_embedding_dependencies():
                 "Install with: pip install sentence-transformers numpy"
             )
 
+
+def _book_listing(row, existing_columns) -> Dict[str, Any]:
+    """Catalog entry of one books row (with its chunk_count and aggregated authors)"""
+    authors = row['authors']
+    if isinstance(authors, str):
+        authors = json.loads(authors)
+    authors_list = [
+        {'id': a['id'], 'name': a['name'], 'site_url': a['site_url']} for a in authors or []
+    ]
+    
+    # Fallback to legacy author field if no multi-author data
+    if not authors_list:
+        legacy_author = row['author'] or 'Unknown'
+        authors_list = [{'id': None, 'name': legacy_author, 'site_url': None}]
+    
+    # Safely get optional columns with defaults
+    doc_type = row.get('document_type', 'book') if 'document_type' in existing_columns else 'book'
+    mc_url = row.get('mc_press_url') if 'mc_press_url' in existing_columns else None
+    art_url = row.get('article_url') if 'article_url' in existing_columns else None
+    pages = row.get('total_pages') if 'total_pages' in existing_columns else None
+    
+    return {
+        'id': row['id'],
+        'filename': row['filename'],
+        'title': row['title'] or row['filename'].replace('.pdf', ''),
+        'author': ', '.join(a['name'] for a in authors_list),  # Legacy field for compatibility
+        'authors': authors_list,  # Full author objects with site_url
+        'category': row['category'] or 'Uncategorized',
+        'document_type': doc_type or 'book',
+        'mc_press_url': mc_url,
+        'article_url': art_url,
+        'total_pages': pages or 'N/A',
+        'chunk_count': row['chunk_count'] or 0,
+        'uploaded_at': None
+    }
+
 class PostgresVectorStore:
     def __init__(self):
         self.database_url = os.getenv('DATABASE_URL')
@@ -40,15 +161,36 @@ class PostgresVectorStore:
         self._embedding_model = None
         self.pool = None
         self.embedding_dim = 384  # all-MiniLM-L6-v2 dimension
-    
+        # Bulk COPY ingestion (one transaction per document) - set VECTOR_BULK_INGESTION=false
+        # to fall back to the per-row INSERT path
+        self.bulk_ingestion = os.getenv('VECTOR_BULK_INGESTION', 'true').lower() == 'true'
+        # Resident index used only when pgvector is unavailable (built on first search)
+        self._fallback_index: Optional[InMemoryEmbeddingIndex] = None
+        self._fallback_index_lock = asyncio.Lock()
+        # HNSW/IVFFlat index build parameters and per-query ef_search/probes
+        self.index_manager = VectorIndexManager()
+        # Query embeddings are cached, micro-batched and encoded off the event loop
+        self._model_lock = threading.Lock()
+        self.embedding_service = EmbeddingService(
+            self._generate_embeddings,
+            cache_size=int(os.getenv('EMBEDDING_CACHE_SIZE', '1024')),
+            cache_ttl=float(os.getenv('EMBEDDING_CACHE_TTL', '3600')),
+            max_batch_size=int(os.getenv('EMBEDDING_BATCH_SIZE', '32')),
+            batch_window_ms=float(os.getenv('EMBEDDING_BATCH_WINDOW_MS', '5')),
+            max_workers=int(os.getenv('EMBEDDING_WORKERS', '2')),
+        )
+
     @property
     def embedding_model(self):
         """Lazy load the embedding model"""
         if self._embedding_model is None:
-            ensure_embedding_dependencies()
-            logger.info("Loading embedding model (all-MiniLM-L6-v2)...")
-            self._embedding_model = sentence_transformers.SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("✅ Embedding model loaded successfully!")
+            # Encoding runs on executor threads, so guard against loading the model twice
+            with self._model_lock:
+                if self._embedding_model is None:
+                    ensure_embedding_dependencies()
+                    logger.info("Loading embedding model (all-MiniLM-L6-v2)...")
+                    self._embedding_model = sentence_transformers.SentenceTransformer('all-MiniLM-L6-v2')
+                    logger.info("✅ Embedding model loaded successfully!")
         return self._embedding_model
     
     async def init_database(self):
@@ -58,13 +200,8 @@ class PostgresVectorStore:
             logger.info("Database pool already initialized, skipping...")
             return
 
-        self.pool = await asyncpg.create_pool(
-            self.database_url,
-            statement_cache_size=0,  # Fix for pgbouncer compatibility
-            min_size=1,
-            max_size=10,
-            command_timeout=60  # Increased from 10 to 60 seconds for large table queries
-        )
+        # Shared application pool (sizes, timeouts and pgbouncer settings live in db_pool)
+        self.pool = await get_pool('vector_store', self.database_url)
         
         self.has_pgvector = False
         
@@ -74,6 +211,9 @@ class PostgresVectorStore:
                 await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
                 self.has_pgvector = True
                 logger.info("✅ pgvector extension enabled - using vector similarity")
+                if not db_pool_registry.vector_codec:
+                    # Pooled connections opened before the extension existed lack the codec
+                    await db_pool_registry.reset_connections()
             except Exception as e:
                 logger.warning(f"⚠️ pgvector not available: {e}")
                 logger.info("🔄 Using pure PostgreSQL with embedding similarity calculation")
@@ -105,12 +245,9 @@ class PostgresVectorStore:
                 except Exception as e:
                     logger.info(f"📋 Migration: vector embedding column already exists or migration not needed: {e}")
                 
-                # Create vector index for fast similarity search
-                await conn.execute("""
-                    CREATE INDEX IF NOT EXISTS documents_embedding_idx 
-                    ON documents USING ivfflat (embedding vector_cosine_ops)
-                    WITH (lists = 100)
-                """)
+                # Create vector index for fast similarity search (parameters derived from
+                # the row count; an existing index is kept - rebuild via /documents/reindex)
+                await self.index_manager.ensure_index(conn)
             else:
                 # Use JSON column for embeddings without pgvector
                 await conn.execute("""
@@ -142,6 +279,14 @@ class PostgresVectorStore:
                     ON documents USING gin (embedding)
                 """)
             
+            # Migration: per-chunk token count and content hash, written at ingestion
+            # (existing rows are filled in by background_token_counts)
+            await conn.execute("""
+                ALTER TABLE documents
+                ADD COLUMN IF NOT EXISTS token_count INTEGER,
+                ADD COLUMN IF NOT EXISTS content_hash TEXT
+            """)
+
             # Create metadata indexes for filtering
             await conn.execute("""
                 CREATE INDEX IF NOT EXISTS documents_filename_idx 
@@ -164,129 +309,374 @@ class PostgresVectorStore:
         embeddings = self.embedding_model.encode(texts, show_progress_bar=False)
         return embeddings
     
-    async def add_documents(self, documents: List[Dict[str, Any]], metadata: Dict[str, Any] = None):
-        """Add documents with embeddings to the database"""
+    async def add_documents(self, documents: List[Dict[str, Any]], metadata: Dict[str, Any] = None, bulk: Optional[bool] = None):
+        """
+        Add documents with embeddings to the database.
+
+        Args:
+            documents: Chunks with 'content' and optional 'page_number', 'chunk_index', 'metadata'
+            metadata: Document-level metadata merged into every chunk (must include 'filename')
+            bulk: Use the COPY-based path (defaults to self.bulk_ingestion)
+        """
         if not documents:
             return
 
-        # Only init if pool doesn't exist
-        if not self.pool:
-            await self.init_database()
-        
+        await self.store_prepared([await self.prepare_documents(documents, metadata)], bulk=bulk)
+
+    async def prepare_documents(self, documents: List[Dict[str, Any]], metadata: Dict[str, Any] = None) -> PreparedDocuments:
+        """
+        Embed and token-count one file's chunks without writing them (see store_prepared).
+
+        Lets ingestion embed the next files while earlier ones are being written.
+        Chunks whose content is already stored (same content_hash), or repeated
+        within the file, are embedded once and reuse that embedding.
+        """
         # Extract texts for embedding
         texts = [doc['content'] for doc in documents]
-        logger.info(f"Generating embeddings for {len(texts)} documents...")
-        
-        # Generate embeddings
-        embeddings = self._generate_embeddings(texts)
-        
+        hashes = chunk_token_counter.hash_many(texts)
+        known = await self.embeddings_by_content_hash(set(hashes))
+        reused = sum(1 for h in hashes if h in known)
+
+        # Generate embeddings (in the executor, so chat streams keep flowing during uploads)
+        pending = {}
+        for h, text in zip(hashes, texts):
+            if h not in known:
+                pending.setdefault(h, text)
+        logger.info(
+            f"Generating embeddings for {len(pending)} of {len(texts)} documents "
+            f"({reused} reused from identical stored chunks)..."
+        )
+        if pending:
+            new_embeddings = await self.embedding_service.embed_documents(list(pending.values()))
+            known.update(zip(pending, new_embeddings))
+
+        if texts:
+            # numpy only: if every chunk was reused the embedding model is never loaded
+            import numpy as np
+            embeddings = np.stack([np.asarray(known[h], dtype=np.float32) for h in hashes])
+        else:
+            embeddings = []
+
+        # Token counts are stored with the chunk so chat context is budgeted without re-tokenizing
+        token_counts = await asyncio.get_running_loop().run_in_executor(
+            None, chunk_token_counter.count_many, texts
+        )
+
         # Get filename from metadata or first document
         filename = (metadata or {}).get('filename', 'unknown.pdf')
         if not filename and documents:
             filename = documents[0].get('filename', 'unknown.pdf')
-        
+
+        return PreparedDocuments(filename, documents, metadata, embeddings, token_counts, reused)
+
+    async def embeddings_by_content_hash(self, hashes) -> Dict[str, Any]:
+        """
+        Stored embeddings of chunks with the given content hashes, {content_hash: embedding}.
+        Empty until the content_hash index exists (a lookup without it scans documents).
+        """
+        if not hashes or not self.pool:
+            return {}
         async with self.pool.acquire() as conn:
-            # Insert documents with embeddings
-            for i, doc in enumerate(documents):
-                # For pgvector, we need to format the embedding as a string representation
-                # of an array that PostgreSQL can cast to vector type
-                if self.has_pgvector:
-                    # Format as PostgreSQL array string: '[0.1, 0.2, ...]'
-                    embedding_list = embeddings[i].tolist()
-                    embedding_data = '[' + ','.join(map(str, embedding_list)) + ']'
-                else:
-                    # For JSONB column, JSON-encode the embedding
-                    embedding_data = json.dumps(embeddings[i].tolist())
-                
-                # Combine document metadata with passed metadata
-                doc_metadata = doc.get('metadata', {})
-                if metadata:
-                    doc_metadata.update(metadata)
-                
-                # Use proper type casting for pgvector
-                if self.has_pgvector:
-                    await conn.execute("""
-                        INSERT INTO documents (filename, content, page_number, chunk_index, embedding, metadata)
-                        VALUES ($1, $2, $3, $4, $5::vector, $6)
-                    """, 
-                    filename,
-                    doc['content'],
-                    doc.get('page_number', 0),
-                    doc.get('chunk_index', 0),
-                    embedding_data,
-                    json.dumps(doc_metadata)
-                    )
+            if not await conn.fetchval(CONTENT_HASH_INDEX_READY_SQL):
+                return {}
+            rows = await conn.fetch("""
+                SELECT DISTINCT ON (content_hash) content_hash, embedding
+                FROM documents
+                WHERE content_hash = ANY($1::text[]) AND embedding IS NOT NULL
+            """, list(hashes))
+        # pgvector decodes to a list (pool codec); JSONB arrays arrive as JSON text
+        return {
+            row['content_hash']: json.loads(row['embedding']) if isinstance(row['embedding'], str) else row['embedding']
+            for row in rows
+        }
+
+    async def store_prepared(self, batch: List[PreparedDocuments], bulk: Optional[bool] = None, conn=None):
+        """
+        Write prepared chunks of one or more files in a single COPY (or INSERT) transaction.
+
+        With `conn` the write joins the caller's transaction, and the caller calls
+        prepared_stored(batch) once it has committed.
+        """
+        batch = [prepared for prepared in batch if prepared.documents]
+        if not batch:
+            return
+
+        if conn is not None:
+            await self._write_prepared(conn, batch, bulk)
+            return
+
+        # Only init if pool doesn't exist
+        if not self.pool:
+            await self.init_database()
+
+        async with self.pool.acquire() as conn:
+            await self._write_prepared(conn, batch, bulk)
+        self.prepared_stored(batch)
+
+    async def _write_prepared(self, conn, batch: List[PreparedDocuments], bulk: Optional[bool] = None):
+        use_bulk = self.bulk_ingestion if bulk is None else bulk
+        records = []
+        for prepared in batch:
+            records.extend(self._build_records(
+                prepared.documents, prepared.embeddings, prepared.filename, prepared.metadata,
+                binary_vectors=use_bulk, token_counts=prepared.token_counts,
+            ))
+
+        if use_bulk:
+            await self._copy_records(conn, records)
+        else:
+            async with conn.transaction():
+                await self._insert_records(conn, records)
+
+        if not self.has_pgvector:
+            # Added to the resident index by prepared_stored, once the write has committed
+            for prepared in batch:
+                prepared.stored_ids = await self._written_chunk_ids(conn, prepared.filename, len(prepared.documents))
+
+        logger.info(
+            f"✅ Added {len(records)} documents ({len(batch)} file(s)) with embeddings to PostgreSQL "
+            f"({'COPY' if use_bulk else 'INSERT'})"
+        )
+
+    def prepared_stored(self, batch: List[PreparedDocuments]):
+        """Corpus stats, catalog and fallback index bookkeeping for committed prepared chunks"""
+        for prepared in batch:
+            if prepared.documents:
+                corpus_stats.record_added(prepared.filename, len(prepared.documents))
+                invalidate_documents_catalog(prepared.filename)
+                self._add_to_fallback_index(prepared)
+
+    def _build_records(self, documents: List[Dict[str, Any]], embeddings, filename: str,
+                       metadata: Dict[str, Any] = None, binary_vectors: bool = False,
+                       token_counts: Optional[List[Optional[int]]] = None) -> List[tuple]:
+        """
+        Build one tuple per chunk in DOCUMENT_COLUMNS order.
+
+        With binary_vectors the pgvector embedding stays a float32 array for the binary
+        codec; otherwise it is formatted as a '[0.1,0.2,...]' text literal.
+        JSONB columns are always sent as JSON text. token_counts lines up with
+        documents (None entries are backfilled later).
+        """
+        records = []
+        for i, doc in enumerate(documents):
+            if self.has_pgvector:
+                if binary_vectors:
+                    embedding_data = embeddings[i]
                 else:
-                    await conn.execute("""
-                        INSERT INTO documents (filename, content, page_number, chunk_index, embedding, metadata)
-                        VALUES ($1, $2, $3, $4, $5, $6)
-                    """, 
-                    filename,
-                    doc['content'],
-                    doc.get('page_number', 0),
-                    doc.get('chunk_index', 0),
-                    embedding_data,
-                    json.dumps(doc_metadata)
-                    )
-        
-        logger.info(f"✅ Added {len(documents)} documents with embeddings to PostgreSQL")
+                    # Format as PostgreSQL array string: '[0.1, 0.2, ...]'
+                    embedding_data = '[' + ','.join(map(str, embeddings[i].tolist())) + ']'
+            else:
+                # For JSONB column, JSON-encode the embedding
+                embedding_data = json.dumps(embeddings[i].tolist())
+
+            # Combine document metadata with passed metadata
+            doc_metadata = doc.get('metadata', {})
+            if metadata:
+                doc_metadata.update(metadata)
+
+            records.append((
+                filename,
+                doc['content'],
+                doc.get('page_number', 0),
+                doc.get('chunk_index', 0),
+                embedding_data,
+                json.dumps(doc_metadata),
+                token_counts[i] if token_counts else None,
+                content_hash(doc['content'])
+            ))
+        return records
+
+    async def _insert_records(self, conn, records: List[tuple], table: str = 'documents'):
+        """Per-row INSERT path (one round trip per chunk)"""
+        embedding_param = '$5::vector' if self.has_pgvector else '$5'
+        for record in records:
+            await conn.execute(f"""
+                INSERT INTO {table} (filename, content, page_number, chunk_index, embedding, metadata,
+                                     token_count, content_hash)
+                VALUES ($1, $2, $3, $4, {embedding_param}, $6, $7, $8)
+            """, *record)
+
+    async def _copy_records(self, conn, records: List[tuple], table: str = 'documents'):
+        """
+        Bulk path: stream all records with binary COPY inside one transaction.
+
+        pgvector embeddings go over the wire through the binary codec the shared pool
+        registers on its connections instead of text literals. Falls back to the
+        per-row path if the codec isn't available.
+        """
+        if self.has_pgvector and not db_pool_registry.vector_codec:
+            records = [
+                record[:4] + ('[' + ','.join(map(str, record[4].tolist())) + ']',) + record[5:]
+                for record in records
+            ]
+            async with conn.transaction():
+                await self._insert_records(conn, records, table)
+            return
+
+        async with conn.transaction():
+            await conn.copy_records_to_table(table, records=records, columns=DOCUMENT_COLUMNS)
+
+    async def _ensure_fallback_index(self) -> InMemoryEmbeddingIndex:
+        """
+        Build the in-memory embedding index on first use (no-pgvector mode only).
+
+        Rows are streamed with a server-side cursor so the JSONB embeddings are decoded
+        once per process instead of once per query.
+        """
+        if self._fallback_index is not None and self._fallback_index.loaded:
+            return self._fallback_index
+
+        async with self._fallback_index_lock:
+            if self._fallback_index is not None and self._fallback_index.loaded:
+                return self._fallback_index
+
+            logger.info("🔄 Building in-memory embedding index for fallback search...")
+            index = InMemoryEmbeddingIndex(self.embedding_dim)
+            batch_size = 5000
+            ids, filenames, vectors = [], [], []
+            skipped = 0
+
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    async for row in conn.cursor("""
+                        SELECT id, filename, embedding
+                        FROM documents
+                        WHERE embedding IS NOT NULL
+                    """, prefetch=batch_size):
+                        embedding = row['embedding']
+                        if isinstance(embedding, str):
+                            embedding = json.loads(embedding)
+                        if not embedding or len(embedding) != self.embedding_dim:
+                            skipped += 1
+                            continue
+                        ids.append(row['id'])
+                        filenames.append(row['filename'])
+                        vectors.append(embedding)
+                        if len(ids) >= batch_size:
+                            index.add(ids, filenames, vectors)
+                            ids, filenames, vectors = [], [], []
+
+            index.add(ids, filenames, vectors)
+            index.loaded = True
+            self._fallback_index = index
+            logger.info(f"✅ In-memory embedding index ready: {index.stats()} ({skipped} rows skipped)")
+            return index
+
+    async def _written_chunk_ids(self, conn, filename: str, count: int) -> Optional[List[int]]:
+        """Ids of the chunks just written for filename (inside the write's transaction)"""
+        if self._fallback_index is None or not self._fallback_index.loaded:
+            return None
+        # Ids are assigned in record order within a single write, so the newest
+        # `count` ids for this filename line up with the embeddings array
+        rows = await conn.fetch("""
+            SELECT id FROM documents
+            WHERE filename = $1
+            ORDER BY id DESC
+            LIMIT $2
+        """, filename, count)
+        return [row['id'] for row in reversed(rows)]
+
+    def _add_to_fallback_index(self, prepared: PreparedDocuments):
+        """Append committed chunks to the resident index (if it has been built)"""
+        ids, prepared.stored_ids = prepared.stored_ids, None
+        if ids is None or self._fallback_index is None or not self._fallback_index.loaded:
+            return
+        if len(ids) == len(prepared.embeddings):
+            self._fallback_index.add(ids, [prepared.filename] * len(ids), prepared.embeddings)
+        else:
+            logger.warning(f"⚠️ Fallback index out of sync for {prepared.filename} - will rebuild on next search")
+            self._fallback_index = None
+
+    def on_chunks_deleted(self, filename: str):
+        """
+        Keep in-process state in sync after chunks are deleted outside delete_by_filename
+        (e.g. the admin delete endpoints, which delete inside their own transaction).
+        """
+        if self._fallback_index is not None:
+            self._fallback_index.remove_filename(filename)
+        corpus_stats.record_deleted(filename)
+        invalidate_book_metadata(filename)
+        invalidate_documents_catalog(filename)
     
     async def search(self, query: str, n_results: int = 5, **kwargs) -> List[Dict[str, Any]]:
-        """Search for similar documents using vector similarity"""
+        """
+        Search for similar documents using vector similarity.
+
+        Each result carries its book's rpg_era/publication_year, joined in the same
+        query (when the temporal columns exist) so temporal re-ranking needs no second
+        lookup. Pass timings=StageTimings() to record the embed and query stages.
+        """
         # Only init if pool doesn't exist
         if not self.pool:
             await self.init_database()
+        timings = kwargs.get('timings') or StageTimings()
 
         # Generate query embedding
-        query_embedding = self._generate_embeddings([query])[0]
+        query_embedding = await timings.run('embed', self.embedding_service.embed_query(query))
+
+        # Built before acquiring a connection: the first build streams the table on its own
+        fallback_index = None if self.has_pgvector else await self._ensure_fallback_index()
+
+        # Book temporal metadata joined onto the hits (columns from migration 006)
+        schema = await get_schema_capabilities()
+        temporal_columns = schema.columns_of('books') & {'rpg_era', 'publication_year'}
+        with_eras = 'rpg_era' in temporal_columns
+        era_select = era_join = ""
+        if with_eras:
+            year = "b.publication_year" if 'publication_year' in temporal_columns else "NULL::int"
+            era_select = f", b.rpg_era, {year} AS publication_year"
+            era_join = "LEFT JOIN books b ON b.filename = d.filename"
 
+        query_started = time.perf_counter()
         async with self.pool.acquire() as conn:
             if self.has_pgvector:
                 # Use pgvector for efficient similarity search
                 # Format query embedding as PostgreSQL array string
                 query_vector = '[' + ','.join(map(str, query_embedding.tolist())) + ']'
-                logger.info(f"🔍 Using pgvector to search ALL {await self.get_document_count():,} documents")
-                rows = await conn.fetch("""
-                    SELECT
-                        filename, content, page_number, chunk_index, metadata,
-                        1 - (embedding <=> $1::vector) as similarity,
-                        (embedding <=> $1::vector) as distance
-                    FROM documents
-                    WHERE embedding IS NOT NULL
-                    ORDER BY embedding <=> $1::vector
-                    LIMIT $2
-                """, query_vector, n_results)
+                logger.info(f"🔍 Using pgvector to search ALL {(await get_corpus_stats()).total_chunks:,} documents")
+                # SET LOCAL keeps ef_search/probes scoped to this query's transaction
+                async with conn.transaction():
+                    await self.index_manager.apply_search_settings(conn, n_results)
+                    # Nearest chunks first (index scan), then their books for n_results rows
+                    rows = await conn.fetch(f"""
+                        SELECT d.*{era_select}
+                        FROM (
+                            SELECT
+                                filename, content, page_number, chunk_index, metadata,
+                                token_count, content_hash,
+                                1 - (embedding <=> $1::vector) as similarity,
+                                (embedding <=> $1::vector) as distance
+                            FROM documents
+                            WHERE embedding IS NOT NULL
+                            ORDER BY embedding <=> $1::vector
+                            LIMIT $2
+                        ) d
+                        {era_join}
+                        ORDER BY d.distance
+                    """, query_vector, n_results)
             else:
-                # Calculate similarity in Python without pgvector
-                # WARNING: Without pgvector, this loads ALL documents into memory
-                # This is inefficient but ensures we search the full corpus
+                # Calculate similarity in Python without pgvector, against the resident
+                # index (one matrix-vector product) instead of re-reading every embedding
                 logger.warning("⚠️ pgvector not available - using fallback Python similarity calculation")
-                rows = await conn.fetch("""
-                    SELECT filename, content, page_number, chunk_index, metadata, embedding
-                    FROM documents
-                    WHERE embedding IS NOT NULL
-                """)
-
-                logger.info(f"🔍 Calculating similarity for {len(rows):,} documents in Python")
+                logger.info(f"🔍 Calculating similarity for {len(fallback_index):,} documents in memory")
+                hits = fallback_index.search(query_embedding, n_results)
 
-                # Calculate cosine similarity for each document
-                similarities = []
-                for row in rows:
-                    if row['embedding']:
-                        # JSONB returns the embedding as already parsed JSON (list)
-                        # But we need to handle both cases for safety
-                        if isinstance(row['embedding'], str):
-                            doc_embedding = numpy.array(json.loads(row['embedding']))
-                        else:
-                            doc_embedding = numpy.array(row['embedding'])
-                        similarity = numpy.dot(query_embedding, doc_embedding) / (
-                            numpy.linalg.norm(query_embedding) * numpy.linalg.norm(doc_embedding)
-                        )
-                        similarities.append((row, similarity, 1.0 - similarity))
-
-                # Sort by similarity and take top results
-                similarities.sort(key=lambda x: x[1], reverse=True)
-                rows = [(row[0], row[1], row[2]) for row in similarities[:n_results]]
+                rows = []
+                if hits:
+                    fetched = await conn.fetch(f"""
+                        SELECT d.id, d.filename, d.content, d.page_number, d.chunk_index, d.metadata,
+                               d.token_count, d.content_hash{era_select}
+                        FROM documents d
+                        {era_join}
+                        WHERE d.id = ANY($1::int[])
+                    """, [chunk_id for chunk_id, _ in hits])
+                    by_id = {row['id']: row for row in fetched}
+                    # Keep the index's ranking; skip ids deleted since the index was updated
+                    rows = [
+                        (by_id[chunk_id], similarity, 1.0 - similarity)
+                        for chunk_id, similarity in hits
+                        if chunk_id in by_id
+                    ]
             
             results = []
             for item in rows:
@@ -329,6 +719,8 @@ class PostgresVectorStore:
                         'metadata': metadata,
                         'distance': float(row['distance']),  # pgvector cosine distance (0-2)
                         'similarity': float(row['similarity']),  # converted to similarity (0-1)
+                        'token_count': row['token_count'],  # None until backfilled
+                        'content_hash': row['content_hash'],
                         'using_pgvector': True  # Flag to indicate pgvector was used
                     })
                 else:
@@ -369,129 +761,95 @@ class PostgresVectorStore:
                         'metadata': metadata,
                         'distance': float(distance),  # 1 - similarity
                         'similarity': float(similarity),  # cosine similarity (0-1)
+                        'token_count': row['token_count'],  # None until backfilled
+                        'content_hash': row['content_hash'],
                         'using_pgvector': False  # Flag to indicate fallback mode
                     })
+
+                if with_eras:
+                    results[-1]['rpg_era'] = row['rpg_era'] or 'general'
+                    results[-1]['publication_year'] = row['publication_year']
+        timings.record('vector_query', time.perf_counter() - query_started)
         
         logger.info(f"Found {len(results)} similar documents for query")
         return results
     
-    async def list_documents(self) -> Dict[str, Any]:
-        """List all documents from books table with multi-author support"""
+    async def list_documents(self, filenames: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        List all documents from books table with multi-author support.
+
+        One round trip: chunk counts and authors are aggregated in the same query
+        instead of two queries per book. `filenames` restricts the listing to those
+        files (used to refresh single catalog entries after a write).
+        """
         # Only init if pool doesn't exist
         if not self.pool:
             await self.init_database()
         
+        # Table/column availability comes from the cached schema snapshot
+        schema = await get_schema_capabilities()
+        params = [filenames] if filenames is not None else []
+        
         async with self.pool.acquire() as conn:
             # Check if books table exists (for backward compatibility)
-            books_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'books'
-                )
-            """)
+            books_exists = schema.has_table('books')
             
             if books_exists:
                 # Check which columns exist in the books table
-                columns_result = await conn.fetch("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'books'
-                """)
-                existing_columns = {row['column_name'] for row in columns_result}
+                existing_columns = schema.columns_of('books')
                 
                 # Build dynamic SELECT query based on available columns
                 base_columns = ['id', 'filename', 'title', 'author', 'category']
                 optional_columns = ['mc_press_url', 'article_url', 'document_type', 'total_pages']
                 
-                select_columns = base_columns.copy()
+                select_columns = [f"b.{col}" for col in base_columns]
                 for col in optional_columns:
                     if col in existing_columns:
-                        select_columns.append(col)
+                        select_columns.append(f"b.{col}")
                 
-                query = f"""
-                    SELECT {', '.join(select_columns)}
-                    FROM books 
-                    ORDER BY id DESC
-                """
-                rows = await conn.fetch(query)
+                # Authors with their website URLs from the multi-author tables, if present
+                authors_join, authors_column = "", "NULL::json AS authors"
+                if schema.has_table('authors') and schema.has_table('document_authors'):
+                    authors_join = """
+                    LEFT JOIN (
+                        SELECT da.book_id,
+                               json_agg(json_build_object('id', a.id, 'name', a.name, 'site_url', a.site_url)
+                                        ORDER BY da.author_order) AS authors
+                        FROM document_authors da
+                        JOIN authors a ON a.id = da.author_id
+                        GROUP BY da.book_id
+                    ) ba ON ba.book_id = b.id"""
+                    authors_column = "ba.authors"
                 
-                # Check if authors and document_authors tables exist
-                authors_table_exists = await conn.fetchval("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables 
-                        WHERE table_name = 'authors'
-                    )
-                """)
-                
-                document_authors_exists = await conn.fetchval("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables 
-                        WHERE table_name = 'document_authors'
-                    )
-                """)
+                file_filter = "WHERE filename = ANY($1::text[])" if filenames is not None else ""
+                book_filter = "WHERE b.filename = ANY($1::text[])" if filenames is not None else ""
+                rows = await conn.fetch(f"""
+                    SELECT {', '.join(select_columns)},
+                           COALESCE(cc.chunk_count, 0) AS chunk_count,
+                           {authors_column}
+                    FROM books b
+                    LEFT JOIN (
+                        SELECT filename, COUNT(*) AS chunk_count
+                        FROM documents
+                        {file_filter}
+                        GROUP BY filename
+                    ) cc ON cc.filename = b.filename{authors_join}
+                    {book_filter}
+                    ORDER BY b.id DESC
+                """, *params)
                 
-                documents = []
-                for row in rows:
-                    # Get chunk count from documents table
-                    chunk_count = await conn.fetchval("""
-                        SELECT COUNT(*) FROM documents WHERE filename = $1
-                    """, row['filename'])
-                    
-                    # Get authors with their website URLs from multi-author tables
-                    authors_list = []
-                    if authors_table_exists and document_authors_exists:
-                        author_rows = await conn.fetch("""
-                            SELECT a.id, a.name, a.site_url
-                            FROM authors a
-                            JOIN document_authors da ON a.id = da.author_id
-                            WHERE da.book_id = $1
-                            ORDER BY da.author_order
-                        """, row['id'])
-                        
-                        for author_row in author_rows:
-                            authors_list.append({
-                                'id': author_row['id'],
-                                'name': author_row['name'],
-                                'site_url': author_row['site_url']
-                            })
-                    
-                    # Fallback to legacy author field if no multi-author data
-                    if not authors_list:
-                        legacy_author = row['author'] or 'Unknown'
-                        authors_list = [{'id': None, 'name': legacy_author, 'site_url': None}]
-                    
-                    # Build author names string for legacy compatibility
-                    author_names = ', '.join([a['name'] for a in authors_list])
-                    
-                    # Safely get optional columns with defaults
-                    doc_type = row.get('document_type', 'book') if 'document_type' in existing_columns else 'book'
-                    mc_url = row.get('mc_press_url') if 'mc_press_url' in existing_columns else None
-                    art_url = row.get('article_url') if 'article_url' in existing_columns else None
-                    pages = row.get('total_pages') if 'total_pages' in existing_columns else None
-                    
-                    documents.append({
-                        'id': row['id'],
-                        'filename': row['filename'],
-                        'title': row['title'] or row['filename'].replace('.pdf', ''),
-                        'author': author_names,  # Legacy field for compatibility
-                        'authors': authors_list,  # Full author objects with site_url
-                        'category': row['category'] or 'Uncategorized',
-                        'document_type': doc_type or 'book',
-                        'mc_press_url': mc_url,
-                        'article_url': art_url,
-                        'total_pages': pages or 'N/A',
-                        'chunk_count': chunk_count or 0,
-                        'uploaded_at': None
-                    })
+                documents = [_book_listing(row, existing_columns) for row in rows]
             else:
                 # Fallback to old documents table aggregation
-                rows = await conn.fetch("""
+                file_filter = "WHERE filename = ANY($1::text[])" if filenames is not None else ""
+                rows = await conn.fetch(f"""
                     WITH doc_stats AS (
                         SELECT filename,
                                COUNT(*) as chunk_count,
                                MAX(page_number) as total_pages,
                                MIN(created_at) as uploaded_at
                         FROM documents
+                        {file_filter}
                         GROUP BY filename
                     ),
                     latest_metadata AS (
@@ -499,6 +857,7 @@ class PostgresVectorStore:
                                filename,
                                metadata
                         FROM documents
+                        {file_filter}
                         ORDER BY filename, id DESC
                     )
                     SELECT ds.filename,
@@ -509,7 +868,7 @@ class PostgresVectorStore:
                     FROM doc_stats ds
                     JOIN latest_metadata lm ON ds.filename = lm.filename
                     ORDER BY ds.uploaded_at DESC
-                """)
+                """, *params)
                 
                 documents = []
                 for row in rows:
@@ -554,6 +913,8 @@ class PostgresVectorStore:
             deleted_count = int(result.split()[-1])
             logger.info(f"Deleted {deleted_count} chunks for {filename}")
 
+        self.on_chunks_deleted(filename)
+
     async def update_document_metadata(self, filename: str, title: str, author: str, category: str = None, mc_press_url: str = None, article_url: str = None, publication_year: int = None, rpg_era: str = None):
         """Update document metadata in books table, documents table, and optionally authors table"""
         # Only init if pool doesn't exist
@@ -588,16 +949,13 @@ class PostgresVectorStore:
             'article_url': article_url
         }
 
+        schema = await get_schema_capabilities()
+
         async with self.pool.acquire() as conn:
             # Use a transaction to ensure all updates succeed or fail together
             async with conn.transaction():
                 # Check if books table exists
-                books_exists = await conn.fetchval("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables 
-                        WHERE table_name = 'books'
-                    )
-                """)
+                books_exists = schema.has_table('books')
                 
                 rows_updated = 0
                 book_id = None
@@ -609,12 +967,7 @@ class PostgresVectorStore:
                     """, filename)
                     
                     # Check which columns exist
-                    columns_result = await conn.fetch("""
-                        SELECT column_name 
-                        FROM information_schema.columns 
-                        WHERE table_name = 'books'
-                    """)
-                    existing_columns = {row['column_name'] for row in columns_result}
+                    existing_columns = schema.columns_of('books')
                     
                     # Build dynamic UPDATE query based on available columns
                     update_parts = ["title = $2", "author = $3"]
@@ -658,12 +1011,7 @@ class PostgresVectorStore:
                 # If author is provided and book_id exists, update the primary author in authors table
                 if author and book_id:
                     # Check if document_authors table exists
-                    doc_authors_exists = await conn.fetchval("""
-                        SELECT EXISTS (
-                            SELECT FROM information_schema.tables 
-                            WHERE table_name = 'document_authors'
-                        )
-                    """)
+                    doc_authors_exists = schema.has_table('document_authors')
                     
                     if doc_authors_exists:
                         # Get the primary author (order 0) for this book
@@ -718,12 +1066,23 @@ class PostgresVectorStore:
                 
                 logger.info(f"Successfully updated metadata for {filename}: title='{title}', author='{author}', mc_press_url='{mc_press_url}', article_url='{article_url}'")
 
-    async def get_document_count(self) -> int:
-        """Get total number of document chunks"""
+        invalidate_book_metadata(filename)
+        invalidate_documents_catalog(filename)
+
+    async def get_document_count(self, exact: bool = False) -> int:
+        """
+        Get total number of document chunks.
+
+        Served from the incrementally maintained corpus stats; pass exact=True to run
+        COUNT(*) (a full scan of the documents table).
+        """
         # Only init if pool doesn't exist
         if not self.pool:
             await self.init_database()
-        
+
+        if not exact:
+            return (await get_corpus_stats()).total_chunks
+
         async with self.pool.acquire() as conn:
             count = await conn.fetchval("SELECT COUNT(*) FROM documents")
             return count or 0
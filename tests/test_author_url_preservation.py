@@ -34,7 +34,8 @@ BOOK_ONLY_AUTHORS = [
 def test_article_authors_have_site_url():
     """
     Verify article-imported authors already have non-NULL site_url.
-    The article import path passes author_url to _get_or_create_author_in_transaction().
+    The article import path links authors with their author_url (_author_links, then
+    MetadataImportEngine.upsert_authors).
     This baseline must be preserved after the fix. (Req 3.2)
     """
     for author_info in ARTICLE_AUTHORS: